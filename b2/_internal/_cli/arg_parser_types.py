@@ -9,12 +9,15 @@
 ######################################################################
 
 import argparse
+import datetime
 import functools
 import re
 
 import arrow
 from b2sdk.v3 import RetentionPeriod
 
+from b2._internal._cli.const import AUTO_PART_SIZE
+
 _arrow_version = tuple(int(p) for p in arrow.__version__.split('.'))
 
 
@@ -76,3 +79,44 @@ def wrap_with_argument_type_error(func, translator=str, exc_type=ValueError):
             raise argparse.ArgumentTypeError(translator(e))
 
     return wrapper
+
+
+_SIZE_UNITS = {'': 1, 'K': 1000, 'M': 1000**2, 'G': 1000**3, 'T': 1000**4}
+
+
+def parse_size(s):
+    """
+    Parse size in bytes with an optional decimal unit suffix, e.g. 100000, 64M or 1.5G
+    """
+    m = re.match(r'^(?P<value>\d+(\.\d+)?)\s*(?P<unit>[KMGT]?)B?$', s.strip(), re.IGNORECASE)
+    if not m:
+        raise argparse.ArgumentTypeError(
+            f'{s!r} is not a valid size, expected a number of bytes optionally followed by K, M, G or T'
+        )
+    return int(float(m.group('value')) * _SIZE_UNITS[m.group('unit').upper()])
+
+
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60, 'w': 7 * 24 * 60 * 60}
+
+
+def parse_duration(s):
+    """
+    Parse duration with a unit suffix, e.g. 90s, 30m, 12h, 7d or 2w
+    """
+    m = re.match(r'^(?P<value>\d+(\.\d+)?)\s*(?P<unit>[smhdw])$', s.strip(), re.IGNORECASE)
+    if not m:
+        raise argparse.ArgumentTypeError(
+            f'{s!r} is not a valid duration, expected a number followed by s, m, h, d or w'
+        )
+    return datetime.timedelta(
+        seconds=float(m.group('value')) * _DURATION_UNITS[m.group('unit').lower()]
+    )
+
+
+def parse_part_size(s):
+    """
+    Parse part size: either a size accepted by ``parse_size`` or ``auto``
+    """
+    if s.strip().lower() == AUTO_PART_SIZE:
+        return AUTO_PART_SIZE
+    return parse_size(s)
@@ -13,6 +13,7 @@ Utility functions for adding b2-specific arguments to an argparse parser.
 
 import argparse
 import functools
+import re
 from os import environ
 from typing import Optional, Union
 
@@ -74,6 +75,22 @@ def b2id_or_file_like_b2_uri(value: str, *, by_id: Optional[bool] = None) -> B2U
     return b2_uri
 
 
+def b2id_or_file_like_b2_uri_with_range(
+    value: str,
+) -> tuple[B2URIBase, Optional[tuple[int, int]]]:
+    """
+    Parse a B2 URI pointing to a file, optionally followed by an inclusive range of its bytes,
+    e.g. b2://bucketName/fileName@0,99
+    """
+    match = re.fullmatch(r'(?P<uri>.+)@(?P<start>\d+),(?P<end>\d+)', value, re.DOTALL)
+    if match is None:
+        return b2id_or_file_like_b2_uri(value), None
+    start, end = int(match['start']), int(match['end'])
+    if start > end:
+        raise ValueError(f'the range of {value} ends before it starts')
+    return b2id_or_file_like_b2_uri(match['uri']), (start, end)
+
+
 def parse_bucket_name(value: str, allow_all_buckets: bool = False) -> str:
     uri = parse_uri(value, allow_all_buckets=allow_all_buckets)
     if isinstance(uri, B2URI):
@@ -86,12 +103,15 @@ def parse_bucket_name(value: str, allow_all_buckets: bool = False) -> str:
 
 
 def b2id_or_file_like_b2_uri_or_bucket_name(
-    value: str, *, by_id: Optional[bool] = None
+    value: str, *, by_id: Optional[bool] = None, allow_folders: bool = False
 ) -> Union[B2URIBase, str]:
     if '://' not in value:
         return value
     else:
-        b2_uri = b2id_or_file_like_b2_uri(value, by_id=by_id)
+        if allow_folders:
+            b2_uri = parse_b2_uri(value)
+        else:
+            b2_uri = b2id_or_file_like_b2_uri(value, by_id=by_id)
         if isinstance(b2_uri, B2FileIdURI) and by_id is False:
             raise ValueError(
                 "This command doesn't support file id as an argument, use b2://bucketName/fileName instead"
@@ -103,6 +123,9 @@ B2ID_URI_ARG_TYPE = wrap_with_argument_type_error(b2id_uri)
 B2_BUCKET_URI_ARG_TYPE = wrap_with_argument_type_error(b2_bucket_uri)
 B2ID_OR_B2_URI_ARG_TYPE = wrap_with_argument_type_error(parse_b2_uri)
 B2ID_OR_B2_BUCKET_URI_ARG_TYPE = wrap_with_argument_type_error(b2id_or_b2_bucket_uri)
+B2ID_OR_FILE_LIKE_B2_URI_WITH_RANGE_ARG_TYPE = wrap_with_argument_type_error(
+    b2id_or_file_like_b2_uri_with_range
+)
 B2ID_OR_B2_URI_OR_ALL_BUCKETS_ARG_TYPE = wrap_with_argument_type_error(
     functools.partial(parse_b2_uri, allow_all_buckets=True)
 )
@@ -166,7 +189,11 @@ def add_b2id_uri_argument(parser: argparse.ArgumentParser, name='B2_URI'):
 
 
 def add_b2id_or_b2_uri_argument(
-    parser: argparse.ArgumentParser, name='B2_URI', *, allow_all_buckets: bool = False
+    parser: argparse.ArgumentParser,
+    name='B2_URI',
+    *,
+    allow_all_buckets: bool = False,
+    nargs=None,
 ):
     """
     Add B2 URI (b2:// or b2id://) as an argument to the parser.
@@ -188,6 +215,7 @@ def add_b2id_or_b2_uri_argument(
         argument_spec = parser.add_argument(
             name,
             type=B2ID_OR_B2_URI_ARG_TYPE,
+            nargs=nargs,
             help='B2 URI pointing to a bucket, directory or a file. '
             'e.g. b2://yourBucket, b2://yourBucket/file.txt, b2://yourBucket/folderName/, or b2id://fileId',
         )
@@ -206,7 +234,11 @@ def add_b2id_or_b2_bucket_uri_argument(parser: argparse.ArgumentParser, name='B2
 
 
 def add_b2id_or_file_like_b2_uri_argument(
-    parser: argparse.ArgumentParser, name='B2_URI', *, by_id: Optional[bool] = None
+    parser: argparse.ArgumentParser,
+    name='B2_URI',
+    *,
+    by_id: Optional[bool] = None,
+    nargs: Optional[str] = None,
 ):
     """
     Add a B2 URI pointing to a file as an argument to the parser.
@@ -216,6 +248,7 @@ def add_b2id_or_file_like_b2_uri_argument(
         type=wrap_with_argument_type_error(
             functools.partial(b2id_or_file_like_b2_uri, by_id=by_id)
         ),
+        nargs=nargs,
         help='B2 URI pointing to a file, e.g. b2://yourBucket/file.txt or b2id://fileId',
     )
     arg.completer = b2uri_file_completer
@@ -223,18 +256,27 @@ def add_b2id_or_file_like_b2_uri_argument(
 
 
 def add_b2id_or_file_like_b2_uri_or_bucket_name_argument(
-    parser: argparse.ArgumentParser, name='B2_URI', by_id: Optional[bool] = None
+    parser: argparse.ArgumentParser,
+    name='B2_URI',
+    by_id: Optional[bool] = None,
+    allow_folders: bool = False,
 ):
     """
     Add a B2 URI pointing to a file as an argument to the parser.
+
+    If allow_folders is True, the argument will accept B2 URI pointing to a folder too.
     """
     help_ = 'B2 URI pointing to a file, e.g. b2://yourBucket/file.txt'
     if by_id is not False:
         help_ += ' or b2id://fileId'
+    if allow_folders:
+        help_ += ', or to a folder, e.g. b2://yourBucket/folderName/'
     arg = parser.add_argument(
         name,
         type=wrap_with_argument_type_error(
-            functools.partial(b2id_or_file_like_b2_uri_or_bucket_name, by_id=by_id)
+            functools.partial(
+                b2id_or_file_like_b2_uri_or_bucket_name, by_id=by_id, allow_folders=allow_folders
+            )
         ),
         help=help_,
     )
@@ -22,6 +22,9 @@ B2_SOURCE_SSE_C_KEY_B64_ENV_VAR = 'B2_SOURCE_SSE_C_KEY_B64'
 # Threads defaults
 DEFAULT_THREADS = 10
 
+# `--part-size` value enabling throughput-adaptive part sizing
+AUTO_PART_SIZE = 'auto'
+
 # Constants used in the B2 API
 CREATE_BUCKET_TYPES = ('allPublic', 'allPrivate')
 
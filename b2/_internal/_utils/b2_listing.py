@@ -0,0 +1,173 @@
+######################################################################
+#
+# File: b2/_internal/_utils/b2_listing.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Listing of B2 folders with several threads.
+
+A recursive listing of a B2 folder is a single sequence of ``b2_list_file_versions`` calls,
+each one waiting for the previous one.  ``ShardedB2Folder`` splits the folder into
+shards, its subfolders, lists them concurrently and concatenates their listings:
+names of the files in a subfolder all sort next to each other, so concatenating
+the listings in the order of the subfolders gives the order of the recursive listing.
+
+Subfolders are found by a non-recursive listing of the folder, made with the ``/``
+delimiter, for which the server returns every subfolder as a single entry, skipping over
+its contents.  Shards are subfolders, rather than arbitrary ranges of names, because
+the delimiter listing finds them in a few calls, while the names in a range are not known
+without listing it.  If a folder has fewer subfolders than there are threads, the subfolders
+are split into their own subfolders, a few levels deep.
+"""
+
+from __future__ import annotations
+
+import collections
+import queue
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from b2sdk.v3 import B2Api, B2Folder, FileVersion
+
+# how many levels of subfolders are split into shards, at most
+MAX_SPLIT_DEPTH = 3
+# how many listing results are looked through for subfolders when deciding whether to split a level
+MAX_SPLIT_LOOKAHEAD = 10000
+# how many files and shards are buffered ahead of the consumer, at most
+MAX_ITEMS_AHEAD = 10000
+# how many pages of results every shard lister may have ready ahead of the consumer
+SHARD_BUFFER_PAGES = 4
+SHARD_PAGE_SIZE = 1000
+
+_END = object()
+
+
+class _Shard:
+    """
+    Recursive listing of a subfolder, run by a worker thread.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.pages = queue.Queue(maxsize=SHARD_BUFFER_PAGES)
+
+    def list(self, folder: ShardedB2Folder, stopped: threading.Event) -> None:
+        try:
+            page = []
+            for file_version, _ in folder.bucket.ls(self.prefix, latest_only=False, recursive=True):
+                page.append(file_version)
+                if len(page) >= SHARD_PAGE_SIZE:
+                    if not self._put(page, stopped):
+                        return
+                    page = []
+            if page and not self._put(page, stopped):
+                return
+            self._put(_END, stopped)
+        except Exception as e:
+            self._put(e, stopped)
+
+    def _put(self, item, stopped: threading.Event) -> bool:
+        while not stopped.is_set():
+            try:
+                self.pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def file_versions(self) -> Iterator[FileVersion]:
+        while True:
+            page = self.pages.get()
+            if page is _END:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield from page
+
+
+class ShardedB2Folder(B2Folder):
+    """
+    B2 folder listed by ``list_threads`` threads.
+    """
+
+    def __init__(self, bucket_name: str, folder_name: str, api: B2Api, list_threads: int = 1):
+        super().__init__(bucket_name, folder_name, api)
+        if list_threads < 1:
+            raise ValueError('number of list threads must be at least 1')
+        self.list_threads = list_threads
+
+    def get_file_versions(self):
+        if self.list_threads == 1:
+            yield from super().get_file_versions()
+            return
+
+        stopped = threading.Event()
+        # shards are started in the order they are consumed in, so the one consumed
+        # is always running, even if all others are waiting for the consumer
+        executor = ThreadPoolExecutor(self.list_threads, thread_name_prefix='list')
+        try:
+            yield from self._concatenate(executor, stopped)
+        finally:
+            stopped.set()
+            executor.shutdown(cancel_futures=True)
+
+    def _concatenate(self, executor: ThreadPoolExecutor, stopped: threading.Event):
+        planned = self._plan(self.folder_name, depth=0)
+        ahead = collections.deque()  # of files and started shards
+        started = 0
+        while True:
+            # keep up to two shards per thread started ahead of the consumer
+            while started < 2 * self.list_threads and len(ahead) < MAX_ITEMS_AHEAD:
+                item = next(planned, None)
+                if item is None:
+                    break
+                if isinstance(item, str):
+                    item = _Shard(item)
+                    executor.submit(item.list, self, stopped)
+                    started += 1
+                ahead.append(item)
+            if not ahead:
+                return
+            item = ahead.popleft()
+            if isinstance(item, _Shard):
+                started -= 1
+                yield from item.file_versions()
+            else:
+                yield item
+
+    def _plan(self, prefix: str, depth: int) -> Iterator[FileVersion | str]:
+        """
+        Yield the file versions directly in the folder, and its subfolders to list, as prefixes, in name order.
+        """
+        # the top level is listed like ``B2Folder`` lists it, which also handles a folder name naming a file
+        listing = iter(self.bucket.ls(prefix, latest_only=False, recursive=False))
+        lookahead = []
+        split = False
+        if depth < MAX_SPLIT_DEPTH:
+            subfolders = 0
+            for entry in listing:
+                lookahead.append(entry)
+                if entry[1] is not None:
+                    subfolders += 1
+                if subfolders >= self.list_threads or len(lookahead) >= MAX_SPLIT_LOOKAHEAD:
+                    break
+            # a level with few subfolders, but not too many files, is split into the subfolders of its subfolders
+            split = subfolders < self.list_threads and len(lookahead) < MAX_SPLIT_LOOKAHEAD
+
+        for file_version, subfolder in _chain(lookahead, listing):
+            if subfolder is None:
+                yield file_version
+            elif split:
+                yield from self._plan(subfolder, depth + 1)
+            else:
+                yield subfolder
+
+
+def _chain(first: list, rest: Iterator) -> Iterator:
+    yield from first
+    yield from rest
@@ -0,0 +1,420 @@
+######################################################################
+#
+# File: b2/_internal/_utils/buffer_pool.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Upload of unbound streams through a fixed pool of reusable buffers.
+
+``Bucket.upload_unbound_stream`` allocates a fresh buffer for every part and grows it
+by concatenating chunks returned by ``read()``.  Here a fixed number of buffers is
+allocated once (lazily) and reused for the whole upload; each buffer is filled in place
+with ``readinto()`` and handed over to the upload as a ``memoryview``, so neither reading
+nor hashing a part copies it.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from typing import Callable
+
+from b2sdk.v3 import AbstractUploadSource, DoNothingProgressListener, WriteIntent
+from b2sdk.v3.exception import B2SimpleError
+
+from b2._internal._utils.part_size import MAX_PART_SIZE, AdaptivePartSizer
+
+
+class BufferPoolTimeout(B2SimpleError):
+    """
+    Raised when no buffer was returned to the pool for a certain amount of time.
+    """
+
+    def __init__(self, timeout_seconds: float):
+        super().__init__(f'no upload buffer was released in {timeout_seconds} seconds')
+
+
+class BufferPool:
+    """
+    A fixed number of ``bytearray`` buffers.
+
+    Buffers are allocated on first use, so a short stream never allocates more than it needs.
+    A buffer too small for the requested size is replaced by a bigger one.
+    Released buffers are handed out again in LIFO order to keep the most recently used
+    (and therefore most likely still resident) memory in rotation.
+
+    This class is THREAD SAFE: buffers are acquired by the reading thread
+    and released by the upload threads.
+    """
+
+    def __init__(self, buffers_count: int, buffer_size: int):
+        if buffers_count < 1:
+            raise ValueError('buffers_count has to be a positive integer')
+        if buffer_size < 1:
+            raise ValueError('buffer_size has to be a positive integer')
+        self.buffers_count = buffers_count
+        self.buffer_size = buffer_size
+        self._free = queue.LifoQueue()
+        self._allocated = 0
+        self._lock = threading.Lock()
+
+    @property
+    def allocated(self) -> int:
+        return self._allocated
+
+    def acquire(self, timeout: float | None = None, size: int | None = None) -> bytearray:
+        """
+        Get a free buffer, allocating a new one if the pool is not exhausted yet.
+
+        :param timeout: maximum number of seconds to wait for a buffer to be released
+        :param size: minimum size of the buffer, ``buffer_size`` if not given
+        :raises BufferPoolTimeout: if no buffer became available in time
+        """
+        size = size or self.buffer_size
+        buffer = self._get_free(timeout)
+        if buffer is None:
+            return bytearray(size)
+        if len(buffer) < size:
+            # drop the reference to the old buffer first, so that both are never held at once
+            del buffer
+            return bytearray(size)
+        return buffer
+
+    def _get_free(self, timeout: float | None) -> bytearray | None:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._allocated < self.buffers_count:
+                self._allocated += 1
+                return None
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise BufferPoolTimeout(timeout)
+
+    def release(self, buffer: bytearray) -> None:
+        self._free.put(buffer)
+
+
+class MemoryViewStream(io.RawIOBase):
+    """
+    Seekable, read-only stream over a ``memoryview``.
+
+    ``release_function`` is called exactly once, when the stream is closed,
+    which happens after the upload of the part has been concluded (including retries).
+    ``read_started`` is the monotonic time of the first read, i.e. when the upload begun.
+    """
+
+    def __init__(self, view: memoryview, release_function: Callable[[], None]):
+        super().__init__()
+        self._view = view
+        self._position = 0
+        self._release_function = release_function
+        self.read_started: float | None = None
+
+    def __len__(self):
+        return len(self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = pos
+        elif whence == io.SEEK_CUR:
+            position = self._position + pos
+        elif whence == io.SEEK_END:
+            position = len(self._view) + pos
+        else:
+            raise ValueError(f'invalid whence ({whence})')
+        if position < 0:
+            raise ValueError(f'negative seek position {position}')
+        self._position = position
+        return position
+
+    def read(self, size=-1):
+        return bytes(self._read_view(size))
+
+    def _read_view(self, size=-1) -> memoryview:
+        if self.read_started is None:
+            self.read_started = time.monotonic()
+        start = min(self._position, len(self._view))
+        if size is None or size < 0:
+            end = len(self._view)
+        else:
+            end = min(start + size, len(self._view))
+        self._position = max(self._position, end)
+        return self._view[start:end]
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._release_function()
+        super().close()
+
+
+class PooledUploadSource(AbstractUploadSource):
+    """
+    Upload source for a single part of an unbound stream, backed by a pooled buffer.
+
+    Like b2sdk's ``UnboundSourceBytes``, both length and sha1 are known upfront, so nothing
+    but the upload itself iterates over the data, and it has to go through ``emerge_unbound``,
+    which pushes the buffers to the cloud exactly as they come.
+    """
+
+    def __init__(self, view: memoryview, release_function: Callable[[], None]):
+        self.length = len(view)
+        self.chunk_sha1 = hashlib.sha1(view).hexdigest()
+        self.stream = MemoryViewStream(view, release_function)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__} length={self.length} sha1={self.chunk_sha1}>'
+
+    def get_content_length(self):
+        return self.length
+
+    def get_content_sha1(self):
+        return self.chunk_sha1
+
+    def is_sha1_known(self):
+        return True
+
+    def open(self):
+        return self.stream
+
+
+class PooledWriteIntentGenerator:
+    """
+    Generator of write intents for an unbound stream, filling buffers of a ``BufferPool``.
+
+    At most ``pool.buffers_count`` buffers are ever allocated; when all of them are
+    in flight the generator waits for one to be released by the upload.
+    """
+
+    def __init__(
+        self,
+        read_only_source,
+        pool: BufferPool,
+        queue_timeout_seconds: float,
+        read_size: int | None = None,
+    ):
+        """
+        :param read_only_source: object with a ``readinto`` (preferred) or ``read`` method
+        :param pool: pool of buffers; its ``buffer_size`` is the size of every part but the last one
+        :param queue_timeout_seconds: maximum time to wait for a free buffer
+        :param read_size: maximum size of a single read, or ``None`` to read as much as fits into a buffer
+        """
+        self.read_only_source = read_only_source
+        self.pool = pool
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.read_size = read_size
+        self._readinto = getattr(read_only_source, 'readinto', None)
+
+    def get_fill_size(self, offset: int, parts_count: int) -> int:
+        """
+        Return the number of bytes the next part should be filled with.
+
+        :param offset: number of bytes read from the stream so far
+        :param parts_count: number of parts created so far
+        """
+        return self.pool.buffer_size
+
+    def iterator(self) -> Iterator[WriteIntent]:
+        offset = 0
+        parts_count = 0
+        datastream_done = False
+
+        while not datastream_done:
+            fill_size = self.get_fill_size(offset, parts_count)
+            buffer = self.pool.acquire(timeout=self.queue_timeout_seconds, size=fill_size)
+            view = memoryview(buffer)[:fill_size]
+            filled = self._fill(view)
+            if filled < len(view):
+                datastream_done = True
+            if filled == 0:
+                self.pool.release(buffer)
+                break
+
+            source = self._make_source(view[:filled], buffer, fill_size)
+            yield WriteIntent(source, destination_offset=offset)
+            offset += filled
+            parts_count += 1
+
+        # Even an empty stream has to result in a (zero-length) file.
+        if offset == 0:
+            empty = PooledUploadSource(memoryview(b''), release_function=lambda: None)
+            yield WriteIntent(empty, destination_offset=offset)
+
+    def _make_source(self, view: memoryview, buffer: bytearray, fill_size: int):
+        return PooledUploadSource(view, functools.partial(self.pool.release, buffer))
+
+    def _fill(self, view: memoryview) -> int:
+        """
+        Read from the source into ``view`` until it is full or the source is exhausted.
+        """
+        filled = 0
+        while filled < len(view):
+            end = len(view) if self.read_size is None else min(len(view), filled + self.read_size)
+            if self._readinto is not None:
+                count = self._readinto(view[filled:end])
+            else:
+                data = self.read_only_source.read(end - filled)
+                count = len(data)
+                view[filled : filled + count] = data
+            if not count:
+                break
+            filled += count
+        return filled
+
+
+class AdaptiveWriteIntentGenerator(PooledWriteIntentGenerator):
+    """
+    Pooled write intent generator which lets an ``AdaptivePartSizer`` pick the size of every part
+    and feeds it with the upload time of each completed part.
+    """
+
+    def __init__(
+        self,
+        read_only_source,
+        pool: BufferPool,
+        queue_timeout_seconds: float,
+        part_sizer: AdaptivePartSizer,
+        read_size: int | None = None,
+        total_bytes: int | None = None,
+    ):
+        """
+        :param part_sizer: the sizer deciding about part sizes
+        :param total_bytes: size of the stream, if known upfront
+        """
+        super().__init__(read_only_source, pool, queue_timeout_seconds, read_size=read_size)
+        self.part_sizer = part_sizer
+        self.total_bytes = total_bytes
+
+    def get_fill_size(self, offset: int, parts_count: int) -> int:
+        return self.part_sizer.next_part_size(
+            transferred_bytes=offset, parts_count=parts_count, total_bytes=self.total_bytes
+        )
+
+    def _make_source(self, view: memoryview, buffer: bytearray, fill_size: int):
+        source = None
+
+        def release():
+            started = source.stream.read_started
+            if started is not None:
+                self.part_sizer.record(fill_size, len(view), time.monotonic() - started)
+            self.pool.release(buffer)
+
+        source = PooledUploadSource(view, release)
+        return source
+
+
+def upload_unbound_stream(
+    bucket,
+    read_only_object,
+    file_name: str,
+    buffers_count: int = 2,
+    buffer_size: int | None = None,
+    read_size: int | None = None,
+    unused_buffer_timeout_seconds: float = 3600.0,
+    recommended_upload_part_size: int | None = None,
+    progress_listener=None,
+    part_sizer: AdaptivePartSizer | None = None,
+    total_bytes: int | None = None,
+    **kwargs,
+):
+    """
+    Pooled-buffer equivalent of ``Bucket.upload_unbound_stream``.
+
+    Accepts the same arguments, except for header arguments, which are expected
+    to be already merged into ``file_info``.  If ``part_sizer`` is given,
+    it decides about the size of every part instead of ``buffer_size``;
+    ``total_bytes`` may then tell it the size of the stream.
+    """
+    if buffers_count <= 1:
+        raise ValueError('buffers_count has to be at least 2')
+    if read_size is not None and read_size <= 0:
+        raise ValueError('read_size has to be a positive integer')
+    if unused_buffer_timeout_seconds <= 0.0:
+        raise ValueError('unused_buffer_timeout_seconds has to be a positive float')
+
+    emerger = bucket.api.services.emerger
+    buffer_size = (
+        buffer_size
+        or recommended_upload_part_size
+        or emerger.get_emerge_planner().recommended_upload_part_size
+    )
+    pool = BufferPool(buffers_count, buffer_size)
+    if part_sizer is None:
+        generator = PooledWriteIntentGenerator(
+            read_only_object,
+            pool,
+            queue_timeout_seconds=unused_buffer_timeout_seconds,
+            read_size=read_size,
+        )
+    else:
+        generator = AdaptiveWriteIntentGenerator(
+            read_only_object,
+            pool,
+            queue_timeout_seconds=unused_buffer_timeout_seconds,
+            part_sizer=part_sizer,
+            read_size=read_size,
+            total_bytes=total_bytes,
+        )
+    return emerger.emerge_unbound(
+        bucket.id_,
+        generator.iterator(),
+        file_name,
+        progress_listener=progress_listener or DoNothingProgressListener(),
+        recommended_upload_part_size=recommended_upload_part_size,
+        # one buffer is always being filled from the stream while the others are uploaded
+        max_queue_size=buffers_count - 1,
+        **kwargs,
+    )
+
+
+def derive_memory_limited_settings(
+    max_memory: int,
+    threads: int,
+    min_part_size: int,
+    part_size: int | None = None,
+) -> tuple[int, int]:
+    """
+    Pick the number of buffers and the part size so that all buffers fit in ``max_memory``.
+
+    One buffer per upload thread plus one being filled from the stream is preferred;
+    if that would make parts smaller than ``min_part_size`` (or than ``part_size``, if given),
+    concurrency is reduced instead.
+
+    :return: a ``(buffers_count, part_size)`` tuple
+    :raises ValueError: if ``max_memory`` cannot fit two buffers
+    """
+    smallest_part = part_size or min_part_size
+    if max_memory < 2 * smallest_part:
+        raise ValueError(
+            f'--max-memory has to be at least {2 * smallest_part} bytes (two buffers of {smallest_part} bytes)'
+        )
+    buffers_count = max(2, min(threads + 1, max_memory // smallest_part))
+    if part_size is None:
+        part_size = min(max_memory // buffers_count, MAX_PART_SIZE)
+    return buffers_count, part_size
@@ -0,0 +1,213 @@
+######################################################################
+#
+# File: b2/_internal/_utils/compiled_filters.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Name filters compiled to be matched in a single pass, however many patterns they have.
+
+b2sdk tests a name against every pattern in turn.  A ``PatternSet`` sorts the patterns
+instead: literal ones, which are most of them in practice, are looked up in tables keyed
+by their length, and the others are joined into one regular expression, whose alternatives
+go from the last pattern to the first, so that the alternative which matches is the one
+of the last matching pattern.  Patterns which cannot be joined without changing their
+meaning, like those with backreferences or global flags, are matched one by one.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections.abc import Iterable, Sequence
+
+from b2sdk.v3 import Filter, FilterType, ScanPoliciesManager
+
+_REGEX_SPECIAL = frozenset('.^$*+?{}[]|()')
+_WILDCARD_SPECIAL = frozenset('*?[')
+_DEFAULT_FLAGS = re.compile('').flags
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def _regex_literal(pattern: str) -> str | None:
+    """
+    Return the string the regex matches, if it is a plain string, with escaped punctuation.
+    """
+    chars = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            if char.isascii() and char.isalnum():
+                return None  # a character class, an anchor, or a group reference
+            chars.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char in _REGEX_SPECIAL:
+            return None
+        else:
+            chars.append(char)
+    if escaped:
+        return None
+    return ''.join(chars)
+
+
+def _joinable(compiled: re.Pattern) -> bool:
+    return (
+        compiled.flags == _DEFAULT_FLAGS
+        and not compiled.groupindex
+        and not (compiled.groups and _BACKREFERENCE.search(compiled.pattern))
+    )
+
+
+class PatternSet:
+    """
+    Patterns matched against names in a single pass.
+
+    Regexes match the start of a name, like ``re.match``, while wildcards, with
+    ``wildcards=True``, match the whole of it, like ``fnmatch.fnmatchcase``.
+    """
+
+    def __init__(self, patterns: Iterable[str | re.Pattern], wildcards: bool = False):
+        # literal -> index of the last pattern of it, by the length of the literal
+        self._prefixes: dict[int, dict[str, int]] = {}
+        self._names: dict[str, int] = {}
+        self._separate: list[tuple[int, re.Pattern]] = []
+        joined: list[tuple[int, str]] = []
+        for index, pattern in enumerate(patterns):
+            if isinstance(pattern, re.Pattern):
+                self._separate.append((index, pattern))
+                continue
+            if wildcards:
+                regex = self._add_wildcard(index, pattern)
+            else:
+                regex = self._add_regex(index, pattern)
+            if regex is None:
+                continue
+            compiled = re.compile(regex)
+            if _joinable(compiled):
+                joined.append((index, regex))
+            else:
+                self._separate.append((index, compiled))
+        self._separate.reverse()
+        self._joined = None
+        self._group_indexes: dict[int, int] = {}
+        if joined:
+            self._joined = re.compile('|'.join(f'({regex})' for _, regex in reversed(joined)))
+            # every alternative is a group, numbered after the groups of those before it
+            group = 1
+            for index, regex in reversed(joined):
+                self._group_indexes[group] = index
+                group += 1 + re.compile(regex).groups
+
+    def _add_prefix(self, literal: str, index: int) -> None:
+        self._prefixes.setdefault(len(literal), {})[literal] = index
+
+    def _add_regex(self, index: int, pattern: str) -> str | None:
+        if pattern.endswith('$'):
+            literal = _regex_literal(pattern[:-1])
+            if literal is not None:
+                # $ also matches before a newline ending the name
+                self._names[literal] = self._names[literal + '\n'] = index
+                return None
+        literal = _regex_literal(pattern)
+        if literal is not None:
+            self._add_prefix(literal, index)
+            return None
+        return pattern
+
+    def _add_wildcard(self, index: int, pattern: str) -> str | None:
+        if not _WILDCARD_SPECIAL.intersection(pattern):
+            self._names[pattern] = index
+            return None
+        if pattern.endswith('*') and not _WILDCARD_SPECIAL.intersection(pattern[:-1]):
+            self._add_prefix(pattern[:-1], index)
+            return None
+        return fnmatch.translate(pattern)
+
+    def matches(self, name: str) -> bool:
+        if name in self._names:
+            return True
+        for length, literals in self._prefixes.items():
+            if name[:length] in literals:
+                return True
+        if self._joined is not None and self._joined.match(name):
+            return True
+        return any(compiled.match(name) for _, compiled in self._separate)
+
+    def last_match(self, name: str) -> int:
+        """
+        Return the index of the last pattern matching the name, or -1 if none does.
+        """
+        last = self._names.get(name, -1)
+        for length, literals in self._prefixes.items():
+            last = max(last, literals.get(name[:length], -1))
+        if self._joined is not None:
+            match = self._joined.match(name)
+            if match is not None:
+                last = max(last, self._group_indexes[match.lastindex])
+        for index, compiled in self._separate:
+            if index < last:
+                break
+            if compiled.match(name):
+                return index
+        return last
+
+
+class CompiledFilterMatcher:
+    """
+    Matcher of names against ``--include`` and ``--exclude`` wildcards, like b2sdk's
+    ``FilterMatcher``: the last matching filter decides, and only includes exclude
+    everything else.
+    """
+
+    def __init__(self, filters: Sequence[Filter]):
+        if filters and all(filter_.type == FilterType.INCLUDE for filter_ in filters):
+            filters = [Filter.exclude('*'), *filters]
+        self.filters = list(filters)
+        self._patterns = PatternSet((filter_.pattern for filter_ in self.filters), wildcards=True)
+
+    def match(self, name: str) -> bool:
+        last = self._patterns.last_match(name)
+        return last == -1 or self.filters[last].type == FilterType.INCLUDE
+
+
+class CompiledScanPoliciesManager(ScanPoliciesManager):
+    """
+    Scan policies manager matching the regexes of each kind in a single pass.
+    """
+
+    def __init__(
+        self,
+        exclude_dir_regexes: Iterable[str | re.Pattern] = (),
+        exclude_file_regexes: Iterable[str | re.Pattern] = (),
+        include_file_regexes: Iterable[str | re.Pattern] = (),
+        **kwargs,
+    ):
+        exclude_dir_regexes = list(exclude_dir_regexes)
+        exclude_file_regexes = list(exclude_file_regexes)
+        include_file_regexes = list(include_file_regexes)
+        # b2sdk validates the arguments
+        super().__init__(
+            exclude_dir_regexes=exclude_dir_regexes,
+            exclude_file_regexes=exclude_file_regexes,
+            include_file_regexes=include_file_regexes,
+            **kwargs,
+        )
+        self._exclude_dirs = PatternSet(exclude_dir_regexes)
+        self._exclude_files = PatternSet(exclude_file_regexes)
+        self._include_files = PatternSet(include_file_regexes)
+
+    def should_exclude_relative_path(self, relative_path: str) -> bool:
+        if self._include_files.matches(relative_path):
+            return False
+        return self._exclude_files.matches(relative_path)
+
+    def should_exclude_b2_directory(self, dir_path: str) -> bool:
+        return self._exclude_dirs.matches(dir_path)
+
+    def should_exclude_local_directory(self, dir_path: str) -> bool:
+        return self._exclude_dirs.matches(dir_path)
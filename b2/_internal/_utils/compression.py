@@ -0,0 +1,266 @@
+######################################################################
+#
+# File: b2/_internal/_utils/compression.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Streaming compression of uploads and decompression of downloads.
+
+Data is compressed by a background thread while the upload threads send
+the already compressed parts, so reading, compressing and uploading overlap.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import queue
+import threading
+import zlib
+from typing import BinaryIO
+
+from b2sdk.v3.exception import B2SimpleError
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:
+    _zstd = None
+
+try:
+    import zstandard as _zstandard
+except ImportError:
+    _zstandard = None
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+COMPRESSION_ALGORITHMS = (GZIP, ZSTD)
+
+# file info keys describing the data before compression
+ORIGINAL_SIZE_FILE_INFO_KEY = 'original_size'
+ORIGINAL_SHA1_FILE_INFO_KEY = 'original_sha1'
+
+COMPRESSION_CHUNK_SIZE = 1024 * 1024
+
+
+class UnsupportedCompression(B2SimpleError):
+    """
+    Raised when the requested compression algorithm cannot be used.
+    """
+
+    def __init__(self, algorithm: str, reason: str):
+        super().__init__(f'{algorithm}: {reason}')
+
+
+class DecompressionError(B2SimpleError):
+    """
+    Raised when downloaded data cannot be decompressed.
+    """
+
+
+def make_compressor(algorithm: str, threads: int = 1):
+    """
+    Return an object with ``compress(data)`` and ``flush()`` methods.
+
+    :param algorithm: one of ``COMPRESSION_ALGORITHMS``
+    :param threads: number of worker threads the compression library may use itself
+    """
+    if algorithm == GZIP:
+        return zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    if algorithm == ZSTD:
+        if _zstd is not None:
+            options = None
+            if threads > 1 and _zstd.CompressionParameter.nb_workers.bounds()[1] > 0:
+                options = {_zstd.CompressionParameter.nb_workers: threads}
+            return _zstd.ZstdCompressor(options=options)
+        if _zstandard is not None:
+            return _zstandard.ZstdCompressor(threads=threads if threads > 1 else 0).compressobj()
+        raise UnsupportedCompression(
+            algorithm, 'requires Python 3.14+ or the zstandard package to be installed'
+        )
+    raise UnsupportedCompression(algorithm, 'unknown compression algorithm')
+
+
+def make_decompressor(algorithm: str):
+    """
+    Return an object with a ``decompress(data)`` method and ``eof``, ``unused_data`` attributes.
+    """
+    if algorithm == GZIP:
+        return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    if algorithm == ZSTD:
+        if _zstd is not None:
+            return _zstd.ZstdDecompressor()
+        if _zstandard is not None:
+            return _zstandard.ZstdDecompressor().decompressobj()
+        raise UnsupportedCompression(
+            algorithm, 'requires Python 3.14+ or the zstandard package to be installed'
+        )
+    raise UnsupportedCompression(algorithm, 'unknown compression algorithm')
+
+
+def hash_file(path: str, chunk_size: int = COMPRESSION_CHUNK_SIZE) -> tuple[int, str]:
+    """
+    Return the size and the hex sha1 of a local file.
+    """
+    digest = hashlib.sha1()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+class CompressingReader(io.RawIOBase):
+    """
+    Readable stream of the compressed contents of ``source``.
+
+    A background thread reads ``source`` and compresses it into a bounded queue
+    of chunks, from which ``readinto`` serves the compressed data.  Size and sha1
+    of the original data are available as ``original_size`` and ``original_sha1``
+    once the stream was read to the end.
+    """
+
+    def __init__(
+        self,
+        source: BinaryIO,
+        algorithm: str,
+        threads: int = 1,
+        chunk_size: int = COMPRESSION_CHUNK_SIZE,
+        queue_size: int = 4,
+    ):
+        """
+        :param source: binary stream to compress
+        :param algorithm: one of ``COMPRESSION_ALGORITHMS``
+        :param threads: number of worker threads the compression library may use itself
+        :param chunk_size: size of reads from ``source``
+        :param queue_size: maximum number of compressed chunks waiting to be read
+        """
+        super().__init__()
+        self.source = source
+        self.chunk_size = chunk_size
+        self._compressor = make_compressor(algorithm, threads)
+        self._digest = hashlib.sha1()
+        self.original_size = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._thread = None
+        self._chunk = memoryview(b'')
+        self._done = False
+
+    @property
+    def original_sha1(self) -> str:
+        return self._digest.hexdigest()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._compress, daemon=True)
+            self._thread.start()
+        while not self._chunk and not self._done:
+            item = self._queue.get()
+            if item is None:
+                self._done = True
+            elif isinstance(item, BaseException):
+                self._done = True
+                raise item
+            else:
+                self._chunk = memoryview(item)
+        count = min(len(b), len(self._chunk))
+        b[:count] = self._chunk[:count]
+        self._chunk = self._chunk[count:]
+        return count
+
+    def close(self):
+        if self._thread is not None and not self.closed:
+            self._stopped.set()
+            while self._thread.is_alive():  # unblock the compressing thread
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._thread.join()
+        super().close()
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _compress(self):
+        try:
+            while True:
+                data = self.source.read(self.chunk_size)
+                if not data:
+                    break
+                self._digest.update(data)
+                self.original_size += len(data)
+                compressed = self._compressor.compress(data)
+                if compressed and not self._put(compressed):
+                    return  # the reader is gone
+            tail = self._compressor.flush()
+            if not tail or self._put(tail):
+                self._put(None)
+        except Exception as e:
+            self._put(e)
+
+
+class DecompressingWriter(io.RawIOBase):
+    """
+    Writable stream decompressing everything written to it into ``target``.
+
+    Size and sha1 of the decompressed data are available as ``size`` and ``sha1``.
+    """
+
+    def __init__(self, target: BinaryIO, algorithm: str):
+        super().__init__()
+        self.target = target
+        self.algorithm = algorithm
+        self._decompressor = make_decompressor(algorithm)
+        self._digest = hashlib.sha1()
+        self.size = 0
+        self._received = False
+
+    @property
+    def sha1(self) -> str:
+        return self._digest.hexdigest()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        data = bytes(b)
+        self._received = self._received or bool(data)
+        while data:
+            if self._decompressor.eof:
+                # concatenated streams (e.g. multi-member gzip) are decompressed one after another
+                self._decompressor = make_decompressor(self.algorithm)
+            try:
+                output = self._decompressor.decompress(data)
+            except Exception as e:
+                raise DecompressionError(f'invalid {self.algorithm} data: {e}') from e
+            self._emit(output)
+            data = self._decompressor.unused_data if self._decompressor.eof else b''
+        return len(b)
+
+    def finish(self) -> None:
+        """
+        Check that the compressed data was complete.
+        """
+        if self._received and not self._decompressor.eof:
+            raise DecompressionError(f'truncated {self.algorithm} data')
+
+    def _emit(self, output: bytes) -> None:
+        if output:
+            self._digest.update(output)
+            self.size += len(output)
+            self.target.write(output)
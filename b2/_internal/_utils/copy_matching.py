@@ -0,0 +1,239 @@
+######################################################################
+#
+# File: b2/_internal/_utils/copy_matching.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Uploads replaced by server-side copies of matching files, for ``sync --copy-existing``.
+
+The destination files are indexed by size and sha1 first, in a listing of their own, before
+the folders are compared.  The actions of the sync then go through as they are made: the local
+files to upload of the sizes found in the index are hashed, a window of them at a time, and
+the matching ones are copied on the server instead of being uploaded.  A file may be copied
+from a destination file deleted earlier in the sync, so the deletions of indexed files are held
+back until all actions are made, and wait for the copies of the deleted file to finish.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import logging
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future
+
+from b2sdk.v3 import (
+    SRC_LAST_MODIFIED_MILLIS,
+    AbstractAction,
+    AbstractFolder,
+    B2DeleteAction,
+    B2Path,
+    B2UploadAction,
+    Bucket,
+    EncryptionMode,
+    FileVersion,
+    ProgressReport,
+    SyncFileReporter,
+)
+from b2sdk.v3.exception import B2Error
+
+from b2._internal._utils.sha1_compare import (
+    CONTENT_ENCODING_FILE_INFO_KEY,
+    LARGE_FILE_SHA1_FILE_INFO_KEY,
+    LocalHasher,
+    get_content_sha1,
+)
+from b2._internal._utils.sync_actions import add_hook
+
+logger = logging.getLogger(__name__)
+
+
+class CopyMatcher:
+    """
+    Index of the destination files, turning uploads of the same contents into server-side copies.
+
+    Up to ``window`` uploads are hashed ahead of the one being matched.
+    """
+
+    WINDOW = 256
+
+    def __init__(self, local_hasher: LocalHasher, window: int = WINDOW):
+        self.local_hasher = local_hasher
+        self.window = window
+        self._files: dict[tuple[int, str], FileVersion] = {}
+        self._sizes: set[int] = set()
+        self._file_ids: set[str] = set()
+
+    def index_folder(self, folder: AbstractFolder, reporter: ProgressReport) -> None:
+        for dest_path in folder.all_files(reporter):
+            self.index(dest_path)
+
+    def index(self, dest_path: B2Path | None) -> None:
+        if dest_path is None or not dest_path.is_visible():
+            return
+        file_version = dest_path.selected_version
+        content_sha1 = get_content_sha1(file_version)
+        if (
+            content_sha1 is None
+            or CONTENT_ENCODING_FILE_INFO_KEY in (file_version.file_info or {})
+            or file_version.server_side_encryption.mode == EncryptionMode.SSE_C
+        ):
+            return
+        self._files.setdefault((file_version.size, content_sha1), file_version)
+        self._sizes.add(file_version.size)
+        self._file_ids.add(file_version.id_)
+
+    def match(self, actions: Iterable[AbstractAction]) -> Iterator[AbstractAction]:
+        """
+        Yield the actions, the uploads matching indexed files as copies of them,
+        and the deletions of indexed files last.
+        """
+        hashing: deque[tuple[AbstractAction, Future[str] | None]] = deque()
+        deletes: list[B2DeleteAction] = []
+        copies_by_file_id: dict[str, list[ServerSideCopyAction]] = {}
+        for action in actions:
+            if isinstance(action, B2DeleteAction) and action.file_id in self._file_ids:
+                deletes.append(action)
+                continue
+            future = None
+            if (
+                isinstance(action, B2UploadAction)
+                and 0 < action.size
+                and action.size in self._sizes
+            ):
+                future = self.local_hasher.submit(action.local_full_path)
+            hashing.append((action, future))
+            if len(hashing) > self.window:
+                yield self._matched(*hashing.popleft(), copies_by_file_id)
+        while hashing:
+            yield self._matched(*hashing.popleft(), copies_by_file_id)
+        for delete in deletes:
+            yield wait_for_copies(delete, copies_by_file_id.get(delete.file_id, []))
+
+    def _matched(
+        self,
+        action: AbstractAction,
+        future: Future[str] | None,
+        copies_by_file_id: dict[str, list[ServerSideCopyAction]],
+    ) -> AbstractAction:
+        if future is None:
+            return action
+        try:
+            source_version = self._files.get((action.size, future.result()))
+        except OSError:
+            return action  # the upload reports the problem
+        if source_version is None:
+            return action
+        copy = ServerSideCopyAction(action, source_version)
+        copies_by_file_id.setdefault(source_version.id_, []).append(copy)
+        return copy
+
+
+class ServerSideCopyAction(AbstractAction):
+    """
+    Upload of a local file done as a server-side copy of a B2 file with the same contents.
+
+    If the copy fails, the file is uploaded after all.
+    """
+
+    def __init__(self, upload: B2UploadAction, source_version: FileVersion):
+        self.upload = upload
+        self.source_version = source_version
+        self.copied = False
+        self.done = threading.Event()
+
+    @property
+    def relative_name(self) -> str:
+        return self.upload.relative_name
+
+    def get_bytes(self) -> int:
+        return self.upload.size
+
+    def run(self, bucket: Bucket, reporter: ProgressReport, dry_run: bool = False):
+        self.copied = dry_run  # a dry run reports the copy it would make
+        try:
+            return super().run(bucket, reporter, dry_run)
+        finally:
+            self.done.set()
+
+    def do_action(self, bucket: Bucket, reporter: ProgressReport) -> None:
+        upload = self.upload
+        file_info = {SRC_LAST_MODIFIED_MILLIS: str(upload.mod_time_millis)}
+        if self.source_version.content_sha1 in (None, 'none'):
+            file_info[LARGE_FILE_SHA1_FILE_INFO_KEY] = get_content_sha1(self.source_version)
+        encryption_settings_provider = upload.encryption_settings_provider
+        try:
+            with contextlib.ExitStack() as exit_stack:
+                progress_listener = None
+                if reporter:
+                    progress_listener = exit_stack.enter_context(SyncFileReporter(reporter))
+                file_version = bucket.copy(
+                    self.source_version.id_,
+                    upload.b2_file_name,
+                    file_info=file_info,
+                    length=upload.size,
+                    progress_listener=progress_listener,
+                    destination_encryption=encryption_settings_provider.get_setting_for_upload(
+                        bucket=bucket,
+                        b2_file_name=upload.b2_file_name,
+                        file_info=file_info,
+                        length=upload.size,
+                    ),
+                    source_encryption=encryption_settings_provider.get_source_setting_for_copy(
+                        bucket=bucket, source_file_version=self.source_version
+                    ),
+                )
+        except B2Error as e:
+            logger.warning(
+                'cannot copy %s to %s, uploading it instead: %r',
+                self.source_version.file_name,
+                upload.b2_file_name,
+                e,
+            )
+            upload.do_action(bucket, reporter)
+            return
+        self.copied = True
+        if hasattr(upload, 'record_result'):
+            upload.record_result(file_version)
+        if reporter is not None and hasattr(reporter, 'update_copied'):
+            reporter.update_copied(1, upload.size)
+
+    def do_report(self, bucket: Bucket, reporter: ProgressReport) -> None:
+        if not self.copied:
+            self.upload.do_report(bucket, reporter)
+            return
+        # the source is named relative to the synced folder, like the copy
+        prefix = self.upload.b2_file_name[: -len(self.upload.relative_name)]
+        source_name = self.source_version.file_name[len(prefix) :]
+        reporter.print_completion(f'copy {source_name} -> {self.upload.relative_name}')
+
+    def __str__(self):
+        return f'b2_copy({self.source_version.file_name}, {self.upload.b2_file_name})'
+
+
+@dataclasses.dataclass
+class WaitForCopies:
+    """
+    Hook of delete actions waiting for the copies of the deleted file to finish.
+    """
+
+    copies: list[ServerSideCopyAction]
+
+    def __call__(self, action, do_action, bucket: Bucket, reporter: ProgressReport) -> None:
+        # the copies were scheduled before, so they are running or done
+        for copy in self.copies:
+            copy.done.wait()
+        do_action(bucket, reporter)
+
+
+def wait_for_copies(delete: B2DeleteAction, copies: list[ServerSideCopyAction]) -> B2DeleteAction:
+    """
+    Make the deletion wait for the copies of the deleted file, which must be scheduled before it.
+    """
+    return add_hook(delete, WaitForCopies(copies))
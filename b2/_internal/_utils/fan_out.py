@@ -0,0 +1,165 @@
+######################################################################
+#
+# File: b2/_internal/_utils/fan_out.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+One scan of a local folder shared by its syncs to several destinations.
+
+Every sync reads the folder through a view of its own, which it scans twice: once to count
+the files, and once to compare them with the destination.  The views take the files from
+a single scan, which starts once every sync asked for them, and runs as far ahead of
+the slowest sync as the bounded queues of the views allow.  The counting passes just follow
+the count of the scan.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from collections.abc import Iterator
+
+from b2sdk.v3 import DEFAULT_SCAN_MANAGER, LocalFolder, LocalPath, ScanPoliciesManager
+
+# how many files a view can lag behind the scan
+SHARED_SCAN_QUEUE_SIZE = 1000
+
+_END = object()
+
+
+class SharedLocalScan:
+    """
+    Scan of a local folder, feeding the files to ``consumers`` views of the folder.
+    """
+
+    def __init__(
+        self, folder: LocalFolder, consumers: int, queue_size: int = SHARED_SCAN_QUEUE_SIZE
+    ):
+        self.folder = folder
+        self.count = 0
+        self.done = False
+        self._queues = [queue.Queue(queue_size) for _ in range(consumers)]
+        self._reporters = []
+        self._policies_manager = DEFAULT_SCAN_MANAGER
+        self._waiting = set(range(consumers))
+        self._detached = set()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def view(self, index: int) -> SharedScanFolder:
+        return SharedScanFolder(self, index)
+
+    def files(
+        self, index: int, reporter, policies_manager: ScanPoliciesManager
+    ) -> Iterator[LocalPath]:
+        with self._condition:
+            if reporter is not None:
+                self._reporters.append(reporter)
+            self._policies_manager = policies_manager
+            self._arrive(index)
+        try:
+            while True:
+                item = self._queues[index].get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.detach(index)
+
+    def counted(self) -> Iterator[None]:
+        """
+        Yield once for every file the scan finds, as it finds them.
+        """
+        counted = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self.count > counted or self.done)
+                found, done = self.count, self.done
+            yield from itertools.repeat(None, found - counted)
+            counted = found
+            if done:
+                return
+
+    def detach(self, index: int) -> None:
+        """
+        Stop feeding the view, whose sync is over, or failed.
+        """
+        with self._condition:
+            self._detached.add(index)
+            self._arrive(index)
+
+    def _arrive(self, index: int) -> None:
+        self._waiting.discard(index)
+        if not self._waiting and self._thread is None:
+            self._thread = threading.Thread(target=self._scan, name='shared-scan', daemon=True)
+            self._thread.start()
+
+    def _scan(self) -> None:
+        end = _END
+        try:
+            reporter = _ScanReporters(self._reporters)
+            for path in self.folder.all_files(reporter, self._policies_manager):
+                if len(self._detached) == len(self._queues):
+                    break
+                with self._condition:
+                    self.count += 1
+                    self._condition.notify_all()
+                for index in range(len(self._queues)):
+                    self._put(index, path)
+        except Exception as e:
+            end = e
+        with self._condition:
+            self.done = True
+            self._condition.notify_all()
+        for index in range(len(self._queues)):
+            self._put(index, end)
+
+    def _put(self, index: int, item) -> None:
+        while index not in self._detached:
+            try:
+                self._queues[index].put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+
+class SharedScanFolder(LocalFolder):
+    """
+    View of a local folder, taking its files from a shared scan.
+    """
+
+    def __init__(self, shared_scan: SharedLocalScan, index: int):
+        super().__init__(shared_scan.folder.root)
+        self.shared_scan = shared_scan
+        self.index = index
+
+    def all_files(
+        self, reporter, policies_manager: ScanPoliciesManager = DEFAULT_SCAN_MANAGER
+    ) -> Iterator[LocalPath]:
+        if reporter is None:
+            # b2sdk counts the files of a local source without a reporter
+            return self.shared_scan.counted()
+        return self.shared_scan.files(self.index, reporter, policies_manager)
+
+
+class _ScanReporters:
+    """
+    Reporter of the problems found by a shared scan to the reports of all its syncs.
+    """
+
+    def __init__(self, reporters: list):
+        self.reporters = reporters
+
+    def __getattr__(self, name: str):
+        def report(*args, **kwargs):
+            for reporter in self.reporters:
+                getattr(reporter, name)(*args, **kwargs)
+
+        return report
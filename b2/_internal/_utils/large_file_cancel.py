@@ -0,0 +1,135 @@
+######################################################################
+#
+# File: b2/_internal/_utils/large_file_cancel.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Cancellation of the unfinished large files of a bucket, for ``file large unfinished cancel``.
+
+b2sdk's ``UnfinishedLargeFile`` does not keep the upload timestamp of a file, so the unfinished
+files are listed with the raw calls, which have it, to select the files older than a given age.
+The selected files are canceled by a pool of threads, which takes only as many files from
+the listing as it has room for, and, if asked to, counts the parts of every file before
+canceling it, to report what was reclaimed.  The results come out in the order of the listing.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from b2sdk.v3 import B2Api
+from b2sdk.v3.exception import B2Error
+
+LIST_UNFINISHED_BATCH_SIZE = 100
+
+
+@dataclass(frozen=True)
+class UnfinishedFile:
+    file_id: str
+    file_name: str
+    # millis since epoch
+    upload_timestamp: int
+
+
+@dataclass
+class CancelResult:
+    file: UnfinishedFile
+    parts: int | None = None
+    bytes: int | None = None
+    error: B2Error | None = None
+
+
+class UnfinishedLargeFilesCancel:
+    """
+    Cancellation of the unfinished large files of a bucket, with a name starting with
+    ``prefix`` and uploaded before ``uploaded_before``, if given.
+
+    With ``dry_run``, the files are only selected, and their parts counted, if asked to.
+    """
+
+    def __init__(
+        self,
+        api: B2Api,
+        bucket_id: str,
+        threads: int,
+        prefix: str | None = None,
+        uploaded_before: int | None = None,
+        count_parts: bool = False,
+        dry_run: bool = False,
+    ):
+        self.api = api
+        self.bucket_id = bucket_id
+        self.threads = threads
+        self.prefix = prefix
+        self.uploaded_before = uploaded_before
+        self.count_parts = count_parts
+        self.dry_run = dry_run
+        self.files = 0
+        self.parts = 0
+        self.bytes = 0
+        self.failed = 0
+
+    def unfinished_files(self) -> Iterator[UnfinishedFile]:
+        start_file_id = None
+        while True:
+            batch = self.api.session.list_unfinished_large_files(
+                self.bucket_id, start_file_id, LIST_UNFINISHED_BATCH_SIZE, self.prefix
+            )
+            for file_dict in batch['files']:
+                unfinished = UnfinishedFile(
+                    file_dict['fileId'], file_dict['fileName'], file_dict['uploadTimestamp']
+                )
+                if (
+                    self.uploaded_before is None
+                    or unfinished.upload_timestamp < self.uploaded_before
+                ):
+                    yield unfinished
+            start_file_id = batch.get('nextFileId')
+            if start_file_id is None:
+                break
+
+    def run(self, report: Callable[[CancelResult], None]) -> None:
+        """
+        Cancel the files, passing the result for each one to ``report``, in the order
+        of the listing.
+
+        A file failing with a B2 error is reported with the error, and the others go on.
+        """
+        pending: deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            for unfinished in self.unfinished_files():
+                if len(pending) >= 2 * self.threads:
+                    self._report(pending.popleft().result(), report)
+                pending.append(executor.submit(self._cancel, unfinished))
+            while pending:
+                self._report(pending.popleft().result(), report)
+
+    def _report(self, result: CancelResult, report: Callable[[CancelResult], None]) -> None:
+        if result.error is not None:
+            self.failed += 1
+        else:
+            self.files += 1
+            self.parts += result.parts or 0
+            self.bytes += result.bytes or 0
+        report(result)
+
+    def _cancel(self, unfinished: UnfinishedFile) -> CancelResult:
+        result = CancelResult(unfinished)
+        try:
+            if self.count_parts:
+                result.parts = result.bytes = 0
+                for part in self.api.list_parts(unfinished.file_id):
+                    result.parts += 1
+                    result.bytes += part.content_length
+            if not self.dry_run:
+                self.api.cancel_large_file(unfinished.file_id)
+        except B2Error as error:
+            result.error = error
+        return result
@@ -0,0 +1,541 @@
+######################################################################
+#
+# File: b2/_internal/_utils/local_scan.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Scanning of local folders with several threads.
+
+``LocalFolder`` walks the tree in a single thread, one ``stat`` at a time, which is slow
+on network file systems, where every ``stat`` is a round trip.  ``ParallelLocalFolder``
+lists and stats directories in a pool of worker threads instead, while the thread
+iterating over ``all_files`` walks the scanned directories depth first, in name order,
+and so yields files in the same order, and with the same exclusions and warnings,
+as ``LocalFolder``.
+
+Every worker has a deque of directories to scan: it queues the subdirectories of a directory
+it scanned at the back of its own deque and takes its next directory from there, which follows
+the order of the walk; an idle worker steals from the front of the deque of another one,
+which holds the directories needed last.  The number of directories queued ahead of the walk
+is limited, and the walking thread scans a directory itself when it was not queued.
+
+Both keep the sorted entries of every directory on the path of the walk in memory, which
+for directories of millions of files is a lot.  ``ExternalSortLocalFolder`` scans the tree
+in no particular order instead, sorts the files in runs of bounded size, spills the runs
+to temporary files, and merges them.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import heapq
+import itertools
+import os
+import stat
+import struct
+import sys
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+
+from b2sdk.v3 import (
+    DEFAULT_SCAN_MANAGER,
+    LocalFolder,
+    LocalPath,
+    ProgressReport,
+    ScanPoliciesManager,
+)
+
+PREFETCHED_DIRECTORIES_PER_THREAD = 1000
+
+# estimated memory taken by a file of a sorted run, besides its name
+RUN_ENTRY_OVERHEAD = 200
+# runs merged at once; more are merged in several passes
+MAX_MERGE_FAN_IN = 64
+RUN_READ_BUFFER_SIZE = 64 * 1024
+# a spilled file: the length of its name, its modification time and its size, then its name
+RUN_RECORD_HEADER = struct.Struct('<IqQ')
+
+if sys.platform == 'win32':
+
+    def _file_read_access(path: str) -> bool:
+        try:
+            with open(path, 'rb', buffering=0):
+                return True
+        except (FileNotFoundError, PermissionError):
+            return False
+else:
+
+    def _file_read_access(path: str) -> bool:
+        return os.access(path, os.R_OK)
+
+
+def get_invalid_name_reason(name: str) -> str | None:
+    """
+    Return why a file name, i.e. a single segment of a B2 file name, is not valid in B2, ``None`` if it is valid.
+
+    Same checks as made by ``LocalFolder``, restricted to those which can fail for a single segment.
+    """
+    try:
+        name_utf8 = name.encode('utf-8')
+    except UnicodeEncodeError:
+        return 'file name must be valid Unicode, check locale'
+    if '\\' in name:
+        return "file names must not contain '\\'"
+    if chr(127) in name:
+        return 'file names must not contain DEL'
+    if len(name_utf8) > 250:
+        return "file names segments (between '/') can be at most 250 utf-8 bytes"
+    return None
+
+
+class _Directory:
+    """
+    A directory to walk, and the results of scanning it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        relative_path: str,
+        symlink_inode: int | None,
+        parent_symlink_inodes: frozenset[int] = frozenset(),
+    ):
+        self.path = path
+        self.relative_path = relative_path
+        self.symlink_inode = symlink_inode
+        # the walk never enters a symlinked directory a second time, so there is no point
+        # in scanning one found inside of itself
+        self.cyclic = symlink_inode in parent_symlink_inodes
+        if symlink_inode is None or self.cyclic:
+            self.symlink_inodes = parent_symlink_inodes
+        else:
+            self.symlink_inodes = parent_symlink_inodes | {symlink_inode}
+        self.claimed = False  # by the thread scanning it
+        self.queued = False
+        self.discarded = False
+        self.scanned = threading.Event()
+        self.entries: list[LocalPath | _Directory] = []
+        self.issues: list[tuple] = []  # reporter method names and their arguments
+        self.error: Exception | None = None
+
+    def child(self, path: str, relative_path: str, symlink_inode: int | None) -> _Directory:
+        return _Directory(path, relative_path, symlink_inode, self.symlink_inodes)
+
+
+class _ParallelScan:
+    """
+    A single walk of a ``ParallelLocalFolder``, with its worker threads.
+    """
+
+    def __init__(self, folder: ParallelLocalFolder, policies_manager: ScanPoliciesManager):
+        self.folder = folder
+        self.policies_manager = policies_manager
+        self._condition = threading.Condition()
+        self._deques = [collections.deque() for _ in range(folder.threads)]
+        self._prefetched = 0
+        self._max_prefetched = folder.threads * PREFETCHED_DIRECTORIES_PER_THREAD
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._work, args=(index,), name=f'scan-{index}', daemon=True)
+            for index in range(folder.threads)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+
+    def walk(
+        self,
+        directory: _Directory,
+        reporter: ProgressReport | None,
+        visited_symlinks: set[int] | None = None,
+    ) -> Iterator[LocalPath]:
+        # same bookkeeping of visited symlinks as in ``LocalFolder``, to skip the same directories
+        visited_symlinks = visited_symlinks or set()
+        if directory.symlink_inode is not None:
+            if directory.symlink_inode in visited_symlinks:
+                if reporter is not None:
+                    reporter.circular_symlink_skipped(directory.path)
+                self._discard(directory)
+                return
+            visited_symlinks.add(directory.symlink_inode)
+
+        self._wait_for(directory)
+        if reporter is not None:
+            for method_name, *args in directory.issues:
+                getattr(reporter, method_name)(*args)
+        if directory.error is not None:
+            raise directory.error
+
+        entries, directory.entries = directory.entries, []
+        for entry in entries:
+            if isinstance(entry, _Directory):
+                yield from self.walk(entry, reporter, visited_symlinks)
+            else:
+                yield entry
+
+    def _wait_for(self, directory: _Directory) -> None:
+        with self._condition:
+            if directory.queued:
+                self._prefetched -= 1
+            scan_here = not directory.claimed
+            directory.claimed = True
+        if scan_here:
+            self._scan(directory, worker_index=0)
+        directory.scanned.wait()
+
+    def _discard(self, directory: _Directory) -> None:
+        with self._condition:
+            self._discard_locked(directory)
+
+    def _discard_locked(self, directory: _Directory) -> None:
+        directory.discarded = True
+        directory.claimed = True
+        if directory.queued:
+            self._prefetched -= 1
+            directory.queued = False
+        if directory.scanned.is_set():
+            for entry in directory.entries:
+                if isinstance(entry, _Directory):
+                    self._discard_locked(entry)
+
+    def _work(self, index: int) -> None:
+        while True:
+            directory = self._take(index)
+            if directory is None:
+                return
+            self._scan(directory, index)
+
+    def _take(self, index: int) -> _Directory | None:
+        with self._condition:
+            while not self._closed:
+                own = self._deques[index]
+                while own:
+                    directory = own.pop()
+                    if not directory.claimed:
+                        directory.claimed = True
+                        return directory
+                for other in self._deques:
+                    while other:
+                        directory = other.popleft()
+                        if not directory.claimed:
+                            directory.claimed = True
+                            return directory
+                self._condition.wait()
+            return None
+
+    def _scan(self, directory: _Directory, worker_index: int) -> None:
+        try:
+            self._scan_entries(directory)
+        except Exception as e:
+            directory.error = e
+        with self._condition:
+            directory.scanned.set()
+            if directory.discarded:
+                return
+            subdirectories = [
+                entry
+                for entry in directory.entries
+                if isinstance(entry, _Directory) and not entry.cyclic
+            ]
+            subdirectories = subdirectories[: max(self._max_prefetched - self._prefetched, 0)]
+            if not subdirectories:
+                return
+            for subdirectory in subdirectories:
+                subdirectory.queued = True
+            self._prefetched += len(subdirectories)
+            # the first subdirectory is walked first, so it goes where the worker takes from
+            self._deques[worker_index].extend(reversed(subdirectories))
+            self._condition.notify_all()
+
+    def _scan_entries(self, directory: _Directory) -> None:
+        try:
+            with os.scandir(directory.path) as dir_entries:
+                dir_entries = list(dir_entries)
+        except PermissionError:  # `chmod -r dir` can trigger this
+            directory.issues.append(('local_permission_error', directory.path))
+            return
+
+        entries = []
+        for dir_entry in dir_entries:
+            entry = scan_entry(
+                self.folder,
+                self.policies_manager,
+                directory,
+                dir_entry.name,
+                dir_entry.is_symlink(),
+            )
+            if isinstance(entry, _Directory):
+                # directories sort as if their names ended with '/', like their files do in B2
+                entries.append((dir_entry.name + '/', entry))
+            elif entry is not None:
+                entries.append((dir_entry.name, entry))
+
+        entries.sort(key=lambda sort_key_and_entry: sort_key_and_entry[0])
+        directory.entries = [entry for _, entry in entries]
+
+
+def scan_entry(
+    folder: LocalFolder,
+    policies_manager: ScanPoliciesManager,
+    directory: _Directory,
+    name: str,
+    is_symlink: bool,
+) -> LocalPath | _Directory | None:
+    """
+    Return the file, or the directory to descend into, of the given name in ``directory``.
+
+    Return ``None`` for an excluded or inaccessible entry, with issues to report added to ``directory``.
+    """
+    local_path = os.path.join(directory.path, name)
+    relative_path = f'{directory.relative_path}/{name}' if directory.relative_path else name
+
+    if policies_manager.exclude_all_symlinks and is_symlink:
+        directory.issues.append(('symlink_skipped', local_path))
+        return None
+    invalid_name_reason = get_invalid_name_reason(name)
+    if invalid_name_reason is not None:
+        directory.issues.append(('invalid_name', local_path, invalid_name_reason))
+        return None
+
+    try:
+        file_stat = os.stat(local_path)
+    except PermissionError:  # `chmod -x dir` can trigger this
+        if not policies_manager.should_exclude_local_directory(relative_path):
+            directory.issues.append(('local_permission_error', local_path))
+        return None
+    except (OSError, ValueError):
+        file_stat = None
+
+    if file_stat is not None and stat.S_ISDIR(file_stat.st_mode):
+        if policies_manager.should_exclude_local_directory(relative_path):
+            return None  # not descending into excluded directories
+        symlink_inode = file_stat.st_ino if is_symlink else None
+        return directory.child(local_path, relative_path, symlink_inode)
+
+    if policies_manager.should_exclude_relative_path(relative_path):
+        return None
+    if file_stat is None:
+        directory.issues.append(('local_access_error', local_path))
+        return None
+    local_scan_path = LocalPath(
+        absolute_path=folder.make_full_path(relative_path),
+        relative_path=relative_path,
+        mod_time=int(file_stat.st_mtime * 1000),
+        size=file_stat.st_size,
+    )
+    if policies_manager.should_exclude_local_path(local_scan_path):
+        return None
+    if not _file_read_access(local_path):
+        directory.issues.append(('local_permission_error', local_path))
+        return None
+    return local_scan_path
+
+
+class ParallelLocalFolder(LocalFolder):
+    """
+    Local folder scanned by several threads.
+    """
+
+    def __init__(self, root, threads: int):
+        super().__init__(root)
+        if threads < 1:
+            raise ValueError('number of scan threads must be at least 1')
+        self.threads = threads
+
+    def all_files(
+        self, reporter: ProgressReport | None, policies_manager=DEFAULT_SCAN_MANAGER
+    ) -> Iterator[LocalPath]:
+        symlink_inode = os.stat(self.root).st_ino if os.path.islink(self.root) else None
+        root = _Directory(self.root, '', symlink_inode)
+        scan = _ParallelScan(self, policies_manager)
+        try:
+            yield from scan.walk(root, reporter)
+        finally:
+            scan.close()
+
+    def some_files(
+        self,
+        reporter: ProgressReport | None,
+        policies_manager: ScanPoliciesManager,
+        relative_paths: Iterable[str],
+    ) -> Iterator[LocalPath]:
+        """
+        Yield the files at, and under, the given paths, in the order of ``all_files``.
+
+        Paths which do not exist, or which ``all_files`` would not reach, are skipped.
+        """
+        found = {}
+        scan = _ParallelScan(self, policies_manager)
+        try:
+            for relative_path in sorted(set(relative_paths)):
+                for local_path in self._files_at(scan, relative_path, reporter):
+                    found[local_path.relative_path] = local_path
+        finally:
+            scan.close()
+        yield from sorted(found.values(), key=lambda local_path: local_path.relative_path)
+
+    def _files_at(
+        self, scan: _ParallelScan, relative_path: str, reporter: ProgressReport | None
+    ) -> Iterator[LocalPath]:
+        parent_relative_path, _, name = relative_path.rpartition('/')
+        parent_path = self.root
+        parent_names = parent_relative_path.split('/') if parent_relative_path else []
+        for index, parent_name in enumerate(parent_names):
+            parent_path = os.path.join(parent_path, parent_name)
+            if (
+                get_invalid_name_reason(parent_name) is not None
+                or (scan.policies_manager.exclude_all_symlinks and os.path.islink(parent_path))
+                or scan.policies_manager.should_exclude_local_directory(
+                    '/'.join(parent_names[: index + 1])
+                )
+            ):
+                return
+        local_path = os.path.join(parent_path, name)
+        if not os.path.lexists(local_path):
+            return
+
+        parent = _Directory(parent_path, parent_relative_path, symlink_inode=None)
+        entry = scan_entry(self, scan.policies_manager, parent, name, os.path.islink(local_path))
+        if reporter is not None:
+            for method_name, *args in parent.issues:
+                getattr(reporter, method_name)(*args)
+        if isinstance(entry, _Directory):
+            yield from scan.walk(entry, reporter)
+        elif entry is not None:
+            yield entry
+
+
+class ExternalSortLocalFolder(LocalFolder):
+    """
+    Local folder of which the files are sorted on disk, so that scanning it takes bounded memory.
+
+    Up to ``max_memory`` bytes of files are sorted in memory at a time; larger folders
+    are sorted in runs, spilled to temporary files in ``temp_dir``, and merged.  Files are
+    yielded in the same order, and with the same exclusions and warnings, as ``LocalFolder``,
+    except that of two symlinks to the same directory, the one scanned first is followed,
+    which is not necessarily the first one by name.
+
+    Without a reporter, files are yielded unsorted, as they are scanned: b2sdk lists
+    the source folder of a sync without one only to count its files, while the files
+    are compared, and sorting them twice at once would double the memory and disk used.
+    """
+
+    def __init__(self, root, max_memory: int, temp_dir: str | None = None):
+        super().__init__(root)
+        self.max_memory = max_memory
+        self.temp_dir = temp_dir
+
+    def all_files(
+        self, reporter: ProgressReport | None, policies_manager=DEFAULT_SCAN_MANAGER
+    ) -> Iterator[LocalPath]:
+        if reporter is None:
+            yield from self._scan(reporter, policies_manager)
+            return
+        # the runs being read are closed before their directory is removed
+        with (
+            tempfile.TemporaryDirectory(prefix='b2-sync-', dir=self.temp_dir) as run_dir,
+            contextlib.ExitStack() as run_readers,
+        ):
+            run_paths = (os.path.join(run_dir, f'run-{number}') for number in itertools.count())
+            runs = []
+            entries = []
+            entries_memory = 0
+            for local_path in self._scan(reporter, policies_manager):
+                name = local_path.relative_path.encode('utf-8')
+                entries.append((name, local_path.mod_time, local_path.size))
+                entries_memory += len(name) + RUN_ENTRY_OVERHEAD
+                if entries_memory >= self.max_memory:
+                    entries.sort()
+                    runs.append(_write_run(next(run_paths), entries))
+                    entries = []
+                    entries_memory = 0
+            entries.sort()
+            if runs:
+                if entries:
+                    runs.append(_write_run(next(run_paths), entries))
+                while len(runs) > MAX_MERGE_FAN_IN:
+                    with contextlib.ExitStack() as merged_readers:
+                        merged = heapq.merge(*_read_runs(runs[:MAX_MERGE_FAN_IN], merged_readers))
+                        runs.append(_write_run(next(run_paths), merged))
+                    for run in runs[:MAX_MERGE_FAN_IN]:
+                        os.unlink(run)
+                    runs = runs[MAX_MERGE_FAN_IN:]
+                entries = heapq.merge(*_read_runs(runs, run_readers))
+            for name, mod_time, size in entries:
+                relative_path = name.decode('utf-8')
+                yield LocalPath(
+                    absolute_path=self.make_full_path(relative_path),
+                    relative_path=relative_path,
+                    mod_time=mod_time,
+                    size=size,
+                )
+
+    def _scan(
+        self, reporter: ProgressReport | None, policies_manager: ScanPoliciesManager
+    ) -> Iterator[LocalPath]:
+        """
+        Yield the files of the folder, in no particular order.
+        """
+        symlink_inode = os.stat(self.root).st_ino if os.path.islink(self.root) else None
+        pending = [_Directory(self.root, '', symlink_inode)]
+        visited_symlinks = set()
+        while pending:
+            directory = pending.pop()
+            if directory.symlink_inode is not None:
+                if directory.symlink_inode in visited_symlinks:
+                    if reporter is not None:
+                        reporter.circular_symlink_skipped(directory.path)
+                    continue
+                visited_symlinks.add(directory.symlink_inode)
+            try:
+                dir_entries = os.scandir(directory.path)
+            except PermissionError:  # `chmod -r dir` can trigger this
+                if reporter is not None:
+                    reporter.local_permission_error(directory.path)
+                continue
+            with dir_entries:
+                for dir_entry in dir_entries:
+                    entry = scan_entry(
+                        self, policies_manager, directory, dir_entry.name, dir_entry.is_symlink()
+                    )
+                    if reporter is not None:
+                        for method_name, *args in directory.issues:
+                            getattr(reporter, method_name)(*args)
+                    directory.issues.clear()
+                    if isinstance(entry, _Directory):
+                        pending.append(entry)
+                    elif entry is not None:
+                        yield entry
+
+
+def _write_run(path: str, entries: Iterable[tuple[bytes, int, int]]) -> str:
+    with open(path, 'wb', buffering=RUN_READ_BUFFER_SIZE) as run_file:
+        for name, mod_time, size in entries:
+            run_file.write(RUN_RECORD_HEADER.pack(len(name), mod_time, size))
+            run_file.write(name)
+    return path
+
+
+def _read_runs(
+    paths: Iterable[str], exit_stack: contextlib.ExitStack
+) -> list[Iterator[tuple[bytes, int, int]]]:
+    return [exit_stack.enter_context(contextlib.closing(_read_run(path))) for path in paths]
+
+
+def _read_run(path: str) -> Iterator[tuple[bytes, int, int]]:
+    with open(path, 'rb', buffering=RUN_READ_BUFFER_SIZE) as run_file:
+        while header := run_file.read(RUN_RECORD_HEADER.size):
+            name_length, mod_time, size = RUN_RECORD_HEADER.unpack(header)
+            yield run_file.read(name_length), mod_time, size
@@ -0,0 +1,153 @@
+######################################################################
+#
+# File: b2/_internal/_utils/mmap_upload.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Uploads of local files read through memory mappings.
+
+Parts of a memory-mapped file are handed to hashing and to the HTTP layer as
+read-only ``memoryview`` slices of the mapping, so the data is not copied
+into Python ``bytes`` objects on its way from the page cache to the socket.
+
+Reading a mapped page past the end of a file truncated in the meantime kills the process
+with ``SIGBUS``, which Python cannot handle.  Mapped files are checked for changes on every
+read, which then fails the upload, but the data already read may still be touched after
+a truncation, so mappings are only safe for files which are not truncated during the upload.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import mmap
+import os
+
+from b2sdk.v3 import Bucket, UploadMode, UploadSourceLocalFile
+from b2sdk.v3.exception import B2SimpleError, FileNotPresent
+
+from b2._internal._utils.buffer_pool import MemoryViewStream
+
+logger = logging.getLogger(__name__)
+
+IO_MODE_BUFFERED = 'buffered'
+IO_MODE_MMAP = 'mmap'
+IO_MODES = (IO_MODE_BUFFERED, IO_MODE_MMAP)
+
+
+class MappedFileChanged(B2SimpleError):
+    """
+    Raised when a memory-mapped file changes while it is being read.
+    """
+
+
+def _file_state(stat: os.stat_result) -> tuple[int, int]:
+    return stat.st_size, stat.st_mtime_ns
+
+
+class MappedFileStream(MemoryViewStream):
+    """
+    Seekable, read-only stream over a memory-mapped file.
+
+    As opposed to ``MemoryViewStream``, ``read`` returns slices of the mapping
+    instead of copies of them.  Before every read, the file, kept open, is checked
+    not to have changed since it was mapped.
+    """
+
+    def __init__(self, mapping: mmap.mmap, f):
+        super().__init__(memoryview(mapping), self._unmap)
+        self._mapping = mapping
+        self._file = f
+        self._state = _file_state(os.fstat(f.fileno()))
+
+    def read(self, size=-1):
+        if _file_state(os.fstat(self._file.fileno())) != self._state:
+            raise MappedFileChanged(f'{self._file.name} changed while it was being read')
+        return self._read_view(size)
+
+    def _unmap(self) -> None:
+        self._file.close()
+        self._view.release()
+        try:
+            self._mapping.close()
+        except BufferError:
+            # a slice is still referenced, e.g. by a traceback; it keeps the mapping alive until it is gone
+            pass
+
+
+class MmapUploadSource(UploadSourceLocalFile):
+    """
+    Upload source of a local file reading it through a memory mapping.
+
+    Every ``open``, i.e. every part of a large file, maps the file anew.  If size
+    or modification time of the file changed since the source was created, it is read
+    through a regular file object instead, like without the mapping; if they change while
+    it is mapped, reading it raises ``MappedFileChanged``.
+    """
+
+    def __init__(self, local_path, content_sha1=None):
+        super().__init__(local_path, content_sha1)
+        self._stat = os.stat(local_path)
+
+    def open(self):
+        f = open(self.local_path, 'rb')
+        try:
+            mapping = self._map(f)
+        except BaseException:
+            f.close()
+            raise
+        if mapping is None:
+            return f
+        return MappedFileStream(mapping, f)
+
+    def _map(self, f) -> mmap.mmap | None:
+        stat = os.fstat(f.fileno())
+        if _file_state(stat) != _file_state(self._stat):
+            logger.debug('%s changed since the upload started, not mapping it', self.local_path)
+            return None
+        if stat.st_size == 0:  # empty files cannot be mapped
+            return None
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.debug('cannot map %s, reading it instead: %r', self.local_path, e)
+            return None
+
+
+def upload_local_file(
+    bucket: Bucket,
+    local_file: str,
+    file_name: str,
+    sha1_sum: str | None = None,
+    upload_mode: UploadMode = UploadMode.FULL,
+    io_mode: str = IO_MODE_BUFFERED,
+    **kwargs,
+):
+    """
+    Equivalent of ``Bucket.upload_local_file`` reading the file the given way,
+    and accepting the arguments of ``Bucket.concatenate``, like ``recommended_upload_part_size``.
+
+    Header arguments are expected to be already merged into ``file_info``.
+    """
+    if io_mode == IO_MODE_MMAP:
+        upload_source = MmapUploadSource(local_file, content_sha1=sha1_sum)
+    else:
+        upload_source = UploadSourceLocalFile(local_file, content_sha1=sha1_sum)
+    sources = [upload_source]
+    large_file_sha1 = sha1_sum
+
+    if upload_mode == UploadMode.INCREMENTAL:
+        with contextlib.suppress(FileNotPresent):
+            existing_file_info = bucket.get_file_info_by_name(file_name)
+            sources = upload_source.get_incremental_sources(
+                existing_file_info,
+                bucket.api.session.account_info.get_absolute_minimum_part_size(),
+            )
+            if len(sources) > 1 and not large_file_sha1:
+                large_file_sha1 = upload_source.get_content_sha1()
+
+    return bucket.concatenate(sources, file_name, large_file_sha1=large_file_sha1, **kwargs)
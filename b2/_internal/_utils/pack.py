@@ -0,0 +1,321 @@
+######################################################################
+#
+# File: b2/_internal/_utils/pack.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Packing of many small local files into a few large tar objects.
+
+A pack is a plain (uncompressed) tar archive, so it can be extracted by any tar tool.
+Next to the packs, an index object maps every member name to the pack holding it
+and to the offset of its data in that pack, so that a single member can be fetched
+with one ranged download.  The members are listed in the index sorted by name, and looked
+up by a binary search; the index is still downloaded and parsed in full for every lookup,
+which takes time and memory in proportion to the number of members.
+"""
+
+from __future__ import annotations
+
+import bisect
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import pathlib
+import posixpath
+import tarfile
+from collections.abc import Iterable, Iterator
+
+from b2sdk.v3 import validate_b2_file_name_as_path
+from b2sdk.v3.exception import B2SimpleError
+
+INDEX_FILE_NAME = 'index.json'
+INDEX_VERSION = 1
+PACK_FILE_NAME_FORMAT = 'pack-{:05d}.tar'
+PACK_CONTENT_TYPE = 'application/x-tar'
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# two empty blocks mark the end of a tar archive
+END_OF_ARCHIVE_SIZE = 2 * tarfile.BLOCKSIZE
+
+
+class PackError(B2SimpleError):
+    """
+    Raised when a pack cannot be created or extracted.
+    """
+
+
+@dataclasses.dataclass
+class PackMember:
+    """
+    A file stored in a pack.
+
+    ``offset`` is the position of the file data (not of its tar header) in the pack.
+    """
+
+    name: str
+    size: int
+    mod_time_millis: int
+    pack: int = 0
+    offset: int = 0
+    sha1: str | None = None
+    local_path: str | None = dataclasses.field(default=None, compare=False)
+
+    def to_row(self) -> list:
+        return [self.name, self.pack, self.offset, self.size, self.mod_time_millis, self.sha1]
+
+    @classmethod
+    def from_row(cls, row: list) -> PackMember:
+        name, pack, offset, size, mod_time_millis, sha1 = row
+        return cls(name, size, mod_time_millis, pack=pack, offset=offset, sha1=sha1)
+
+
+@dataclasses.dataclass
+class PackIndex:
+    """
+    Index of the packs: their names, relative to the index, and their members, sorted by name.
+    """
+
+    packs: list[str] = dataclasses.field(default_factory=list)
+    members: list[PackMember] = dataclasses.field(default_factory=list)
+
+    def to_bytes(self) -> bytes:
+        data = {
+            'version': INDEX_VERSION,
+            'packs': self.packs,
+            'members': [member.to_row() for member in sorted(self.members, key=lambda m: m.name)],
+        }
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> PackIndex:
+        try:
+            parsed = json.loads(data)
+            if parsed['version'] != INDEX_VERSION:
+                raise PackError(f'unsupported pack index version: {parsed["version"]}')
+            members = [PackMember.from_row(row) for row in parsed['members']]
+            # indexes are written sorted, for which sorting again takes a single pass
+            members.sort(key=lambda member: member.name)
+            return cls(packs=parsed['packs'], members=members)
+        except (ValueError, KeyError, TypeError) as e:
+            raise PackError(f'invalid pack index: {e!r}') from e
+
+    def get_member(self, name: str) -> PackMember:
+        position = bisect.bisect_left(self.members, name, key=lambda member: member.name)
+        if position < len(self.members) and self.members[position].name == name:
+            return self.members[position]
+        raise PackError(f'{name!r} is not a member of the pack')
+
+
+def load_index(downloaded_file) -> PackIndex:
+    """
+    Read the index from a ``DownloadedFile``.
+    """
+    buffer = io.BytesIO()
+    downloaded_file.save(buffer)
+    return PackIndex.from_bytes(buffer.getvalue())
+
+
+def get_pack_file_name(index_file_name: str, pack_name: str) -> str:
+    """
+    Return the B2 file name of a pack listed in the index of given file name.
+    """
+    return posixpath.join(posixpath.dirname(index_file_name), pack_name)
+
+
+def scan_local_folder(root: str) -> Iterator[PackMember]:
+    """
+    Yield regular files below ``root`` in a stable order, named by their relative POSIX paths.
+    """
+    root_path = pathlib.Path(root)
+    for dirpath, dirnames, filenames in os.walk(root_path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = pathlib.Path(dirpath) / filename
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            yield PackMember(
+                name=path.relative_to(root_path).as_posix(),
+                size=stat.st_size,
+                mod_time_millis=int(stat.st_mtime * 1000),
+                local_path=str(path),
+            )
+
+
+def _tar_header(member: PackMember) -> bytes:
+    tarinfo = tarfile.TarInfo(member.name)
+    tarinfo.size = member.size
+    # whole seconds fit the ustar header, the index keeps the milliseconds
+    tarinfo.mtime = member.mod_time_millis // 1000
+    tarinfo.mode = 0o644
+    return tarinfo.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _padding(size: int) -> int:
+    return -size % tarfile.BLOCKSIZE
+
+
+def group_members(members: Iterable[PackMember], pack_size: int) -> Iterator[list[PackMember]]:
+    """
+    Split members into groups, each making a pack of at most ``pack_size`` bytes.
+
+    A member larger than ``pack_size`` gets a pack of its own.
+    """
+    group = []
+    group_size = END_OF_ARCHIVE_SIZE
+    for member in members:
+        member_size = len(_tar_header(member)) + member.size + _padding(member.size)
+        if group and group_size + member_size > pack_size:
+            yield group
+            group = []
+            group_size = END_OF_ARCHIVE_SIZE
+        group.append(member)
+        group_size += member_size
+    if group:
+        yield group
+
+
+class TarPackReader(io.RawIOBase):
+    """
+    Readable stream of a tar archive of ``members``, generated on the fly.
+
+    While the archive is read, ``offset`` and ``sha1`` of the members are filled in.
+    """
+
+    def __init__(self, members: list[PackMember], pack: int):
+        super().__init__()
+        self.members = members
+        self.pack = pack
+        self._chunks = self._generate()
+        self._chunk = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+        count = min(len(b), len(self._chunk))
+        b[:count] = self._chunk[:count]
+        self._chunk = self._chunk[count:]
+        return count
+
+    def _generate(self) -> Iterator[bytes]:
+        position = 0
+        for member in self.members:
+            header = _tar_header(member)
+            yield header
+            position += len(header)
+            member.pack = self.pack
+            member.offset = position
+            digest = hashlib.sha1()
+            remaining = member.size
+            with open(member.local_path, 'rb') as f:
+                while remaining:
+                    data = f.read(min(READ_CHUNK_SIZE, remaining))
+                    if not data:
+                        raise PackError(f'{member.local_path} was truncated while packing')
+                    digest.update(data)
+                    remaining -= len(data)
+                    yield data
+            member.sha1 = digest.hexdigest()
+            padding = _padding(member.size)
+            yield bytes(padding)
+            position += member.size + padding
+        yield bytes(END_OF_ARCHIVE_SIZE)
+
+
+class MemberExtractingWriter(io.RawIOBase):
+    """
+    Writable stream splitting a sequentially written pack into files of its ``members``,
+    placed below ``target_dir``.
+    """
+
+    def __init__(self, members: Iterable[PackMember], target_dir: str):
+        super().__init__()
+        self.target_dir = pathlib.Path(target_dir)
+        self._members = sorted(members, key=lambda member: member.offset)
+        self._next = 0
+        self._position = 0
+        self._current = None
+        self._file = None
+        self._digest = None
+        self.extracted = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        data = memoryview(b)
+        written = len(data)
+        while data:
+            if self._current is None and not self._start_member():
+                break  # trailing tar padding and end of archive marker
+            member = self._current
+            if self._position < member.offset:
+                skip = min(len(data), member.offset - self._position)
+                data = data[skip:]
+                self._position += skip
+                continue
+            count = min(len(data), member.offset + member.size - self._position)
+            self._file.write(data[:count])
+            self._digest.update(data[:count])
+            data = data[count:]
+            self._position += count
+            if self._position == member.offset + member.size:
+                self._finish_member()
+        self._position += len(data)
+        return written
+
+    def finish(self) -> None:
+        """
+        Check that all the members were extracted.
+        """
+        while self._current is not None or self._start_member():
+            if self._current.size:
+                raise PackError(f'pack ended before the end of member {self._current.name!r}')
+            self._finish_member()
+
+    def _start_member(self) -> bool:
+        if self._next == len(self._members):
+            return False
+        member = self._members[self._next]
+        self._next += 1
+        try:
+            validate_b2_file_name_as_path(member.name)
+        except ValueError as e:
+            raise PackError(f'{e}: {member.name!r}') from e
+        path = self.target_dir / member.name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._current = member
+        self._file = open(path, 'wb')
+        self._digest = hashlib.sha1()
+        if member.size == 0 and self._position >= member.offset:
+            self._finish_member()
+            return self._start_member()
+        return True
+
+    def _finish_member(self) -> None:
+        member = self._current
+        self._file.close()
+        self._current = self._file = None
+        if member.sha1 is not None and self._digest.hexdigest() != member.sha1:
+            raise PackError(f'checksum mismatch of member {member.name!r}')
+        mod_time = member.mod_time_millis / 1000
+        os.utime(self.target_dir / member.name, (mod_time, mod_time))
+        self.extracted += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        super().close()
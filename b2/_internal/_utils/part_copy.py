@@ -0,0 +1,247 @@
+######################################################################
+#
+# File: b2/_internal/_utils/part_copy.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Server-side copy of large files in parts, for ``file server-side-copy --part-size`` and ``--concat``.
+
+Left to itself, b2sdk copies a file in a single piece up to 5GB, and above that it falls back
+to parts, without reporting any progress.  ``PartCopy`` plans the parts instead: each range
+of a source is split in parts of the given size, which a pool of threads copies as ranged copy
+parts of a large file, retrying every part on its own, and reporting the progress as parts
+are done.  A copy part takes its bytes from a single source file, so each range of a file
+assembled with ``--concat`` is at least one part of its own, and every range but the last one
+has to be at least as long as the minimum part size.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from b2sdk.v3 import (
+    AbstractProgressListener,
+    B2Api,
+    EncryptionSetting,
+    FileRetentionSetting,
+    FileVersion,
+    LegalHold,
+)
+from b2sdk.v3.exception import B2Error
+
+from b2._internal._utils.part_size import MAX_PART_SIZE, MAX_PARTS_COUNT
+
+logger = logging.getLogger(__name__)
+
+PART_COPY_ATTEMPTS = 5
+# seconds, doubled after every failed attempt
+PART_COPY_RETRY_DELAY = 1.0
+
+
+class PartCopyError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class CopyRange:
+    file_id: str
+    offset: int
+    length: int
+
+
+@dataclass(frozen=True)
+class CopyPart:
+    part_number: int
+    file_id: str
+    offset: int
+    length: int
+
+    @property
+    def bytes_range(self) -> tuple[int, int]:
+        return self.offset, self.offset + self.length - 1
+
+
+def plan_parts(
+    ranges: Sequence[CopyRange],
+    part_size: int,
+    min_part_size: int,
+    max_part_size: int = MAX_PART_SIZE,
+) -> list[CopyPart]:
+    """
+    Split the ranges in parts of ``part_size``, a shorter remainder of a range being merged
+    into the part before it, or, if that would make it too large, shared evenly with it.
+    """
+    parts = []
+    for index, copy_range in enumerate(ranges):
+        if copy_range.length < min_part_size and index < len(ranges) - 1:
+            raise PartCopyError(
+                f'every range but the last one must be at least {min_part_size} bytes long, '
+                f'range {index + 1} has {copy_range.length} bytes'
+            )
+        lengths = [part_size] * (copy_range.length // part_size)
+        remainder = copy_range.length % part_size
+        if remainder:
+            lengths.append(remainder)
+        if remainder and len(lengths) > 1 and remainder < min_part_size:
+            merged = lengths.pop() + lengths.pop()
+            if merged <= max_part_size:
+                lengths.append(merged)
+            else:
+                lengths += [merged // 2, merged - merged // 2]
+        offset = copy_range.offset
+        for length in lengths:
+            parts.append(CopyPart(len(parts) + 1, copy_range.file_id, offset, length))
+            offset += length
+    if len(parts) > MAX_PARTS_COUNT:
+        raise PartCopyError(
+            f'the copy would take {len(parts)} parts, more than the {MAX_PARTS_COUNT} parts '
+            f'of a large file, use a larger part size'
+        )
+    return parts
+
+
+class PartCopy:
+    """
+    Copy of ranges of source files to a new large file, part by part.
+
+    The parts are copied by ``executor``, if given, so that the parts of several files
+    can share the same pool of threads; otherwise by a pool of ``threads`` of its own.
+    """
+
+    def __init__(
+        self,
+        api: B2Api,
+        parts: Sequence[CopyPart],
+        threads: int,
+        executor: Executor | None = None,
+        attempts: int = PART_COPY_ATTEMPTS,
+        retry_delay: float = PART_COPY_RETRY_DELAY,
+    ):
+        self.api = api
+        self.parts = parts
+        self.threads = threads
+        self.executor = executor
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._bytes_completed = 0
+
+    def copy(
+        self,
+        bucket_id: str,
+        file_name: str,
+        content_type: str,
+        file_info: dict,
+        progress_listener: AbstractProgressListener,
+        destination_encryption: EncryptionSetting | None = None,
+        source_encryption: EncryptionSetting | None = None,
+        file_retention: FileRetentionSetting | None = None,
+        legal_hold: LegalHold | None = None,
+    ) -> FileVersion:
+        session = self.api.session
+        large_file = session.start_large_file(
+            bucket_id,
+            file_name,
+            content_type,
+            file_info,
+            server_side_encryption=destination_encryption,
+            file_retention=file_retention,
+            legal_hold=legal_hold,
+        )
+        large_file_id = large_file['fileId']
+        progress_listener.set_total_bytes(sum(part.length for part in self.parts))
+        if self.executor is not None:
+            pool = contextlib.nullcontext(self.executor)
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.threads)
+        try:
+            with pool as executor:
+                sha1s = self._copy_parts(
+                    executor,
+                    large_file_id,
+                    progress_listener,
+                    destination_encryption,
+                    source_encryption,
+                )
+            response = session.finish_large_file(large_file_id, sha1s)
+        except BaseException:
+            try:
+                session.cancel_large_file(large_file_id)
+            except B2Error:
+                logger.exception('failed to cancel large file %s', large_file_id)
+            raise
+        return self.api.file_version_factory.from_api_response(response)
+
+    def _copy_parts(
+        self,
+        executor: Executor,
+        large_file_id: str,
+        progress_listener: AbstractProgressListener,
+        destination_encryption: EncryptionSetting | None,
+        source_encryption: EncryptionSetting | None,
+    ) -> list[str]:
+        futures = [
+            executor.submit(
+                self._copy_part,
+                part,
+                large_file_id,
+                progress_listener,
+                destination_encryption,
+                source_encryption,
+            )
+            for part in self.parts
+        ]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def _copy_part(
+        self,
+        part: CopyPart,
+        large_file_id: str,
+        progress_listener: AbstractProgressListener,
+        destination_encryption: EncryptionSetting | None,
+        source_encryption: EncryptionSetting | None,
+    ) -> str:
+        delay = self.retry_delay
+        for attempt in range(1, self.attempts + 1):
+            try:
+                response = self.api.session.copy_part(
+                    part.file_id,
+                    large_file_id,
+                    part.part_number,
+                    bytes_range=part.bytes_range,
+                    destination_server_side_encryption=destination_encryption,
+                    source_server_side_encryption=source_encryption,
+                )
+                break
+            except B2Error as e:
+                if attempt == self.attempts or not e.should_retry_upload():
+                    raise
+                logger.info(
+                    'copy of part %i failed (attempt %i of %i), retrying in %.1f seconds: %s',
+                    part.part_number,
+                    attempt,
+                    self.attempts,
+                    delay,
+                    e,
+                )
+                time.sleep(delay)
+                delay *= 2
+        with self._lock:
+            self._bytes_completed += part.length
+            progress_listener.bytes_completed(self._bytes_completed)
+        return response['contentSha1']
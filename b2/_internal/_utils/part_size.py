@@ -0,0 +1,190 @@
+######################################################################
+#
+# File: b2/_internal/_utils/part_size.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from __future__ import annotations
+
+import logging
+import math
+import threading
+
+from b2sdk.v3 import DEFAULT_MIN_PART_SIZE
+
+logger = logging.getLogger(__name__)
+
+# B2 large file limits
+MAX_PART_SIZE = 5 * 1000 * 1000 * 1000
+MAX_PARTS_COUNT = 10000
+
+
+class AdaptivePartSizer:
+    """
+    Chooses the size of upcoming parts of large file uploads based on the throughput
+    measured for the parts uploaded so far.
+
+    The sizer hill-climbs: after ``SAMPLES_PER_STEP`` parts were uploaded with the current
+    part size, their throughput is compared with the best one seen so far.  While it keeps
+    improving, the part size keeps being multiplied (or divided) by ``GROWTH_FACTOR``;
+    the first time it does not, the direction is reversed once, and on the next failure
+    the sizer settles on the best size found.
+
+    Independently of that, every size handed out is kept within the B2 part size range,
+    under ``memory_limit`` and large enough for the upload to fit in ``max_parts`` parts.
+
+    This class is THREAD SAFE: sizes are requested by the reading thread
+    and measurements are recorded by the upload threads.
+    """
+
+    GROWTH_FACTOR = 2
+    SAMPLES_PER_STEP = 2
+    IMPROVEMENT_THRESHOLD = 0.05
+
+    def __init__(
+        self,
+        initial_part_size: int,
+        min_part_size: int = DEFAULT_MIN_PART_SIZE,
+        max_part_size: int = MAX_PART_SIZE,
+        memory_limit: int | None = None,
+        max_parts: int = MAX_PARTS_COUNT,
+    ):
+        """
+        :param initial_part_size: part size to start probing from
+        :param min_part_size: lower limit of part size
+        :param max_part_size: upper limit of part size
+        :param memory_limit: upper limit of memory a single part may take, ``None`` for no limit
+        :param max_parts: maximum number of parts of a single large file
+        """
+        self.min_part_size = min_part_size
+        self.max_part_size = (
+            max_part_size if memory_limit is None else min(max_part_size, memory_limit)
+        )
+        if self.max_part_size < self.min_part_size:
+            raise ValueError(
+                f'part size limit of {self.max_part_size} bytes is lower than '
+                f'the minimum part size of {self.min_part_size} bytes'
+            )
+        self.max_parts = max_parts
+
+        self._lock = threading.Lock()
+        self._part_size = self._clamp(initial_part_size)
+        self._direction = 1
+        self._reversed = False
+        self._settled = False
+        self._best: tuple[int, float] | None = None  # (part size, throughput)
+        self._samples: list[tuple[int, float]] = []  # (bytes, seconds)
+
+    @property
+    def part_size(self) -> int:
+        """
+        Current target part size, before the parts count limit is applied.
+        """
+        return self._part_size
+
+    def next_part_size(
+        self,
+        transferred_bytes: int = 0,
+        parts_count: int = 0,
+        total_bytes: int | None = None,
+    ) -> int:
+        """
+        Return the size of the next part of an upload.
+
+        :param transferred_bytes: number of bytes of this upload already assigned to parts
+        :param parts_count: number of parts of this upload created so far
+        :param total_bytes: size of the whole upload, or ``None`` if unknown (stream);
+                            for streams of unknown size it is assumed that the rest
+                            of the stream is not larger than what has been read so far
+        """
+        remaining_parts = max(1, self.max_parts - parts_count)
+        if total_bytes is None:
+            remaining_bytes = transferred_bytes
+        else:
+            remaining_bytes = max(0, total_bytes - transferred_bytes)
+        floor = math.ceil(remaining_bytes / remaining_parts)
+
+        with self._lock:
+            part_size = self._part_size
+        if floor > part_size:
+            if floor > self.max_part_size:
+                logger.debug(
+                    'upload of %d bytes may not fit in %d parts of at most %d bytes',
+                    remaining_bytes,
+                    remaining_parts,
+                    self.max_part_size,
+                )
+            part_size = self._clamp(floor)
+        return part_size
+
+    def record(self, part_size: int, byte_count: int, seconds: float) -> None:
+        """
+        Record that ``byte_count`` bytes, split in parts of ``part_size``, took ``seconds`` to upload.
+
+        Measurements for other part sizes than the current target are ignored,
+        as they cannot be attributed to the current step.
+        """
+        if seconds <= 0 or byte_count <= 0:
+            return
+        with self._lock:
+            if self._settled or part_size != self._part_size:
+                return
+            self._samples.append((byte_count, seconds))
+            if len(self._samples) < self.SAMPLES_PER_STEP:
+                return
+            throughput = sum(b for b, _ in self._samples) / sum(s for _, s in self._samples)
+            self._samples = []
+            self._step(throughput)
+
+    def _step(self, throughput: float) -> None:
+        current = self._part_size
+        first_step = self._best is None
+        if first_step or throughput > self._best[1] * (1 + self.IMPROVEMENT_THRESHOLD):
+            self._best = (current, throughput)
+            reason = 'throughput improved'
+            next_size = self._clamp(self._scaled(current))
+            if next_size == current:
+                # reached a limit; only worth probing the other way if nothing was probed yet
+                if first_step:
+                    self._reverse()
+                    next_size = self._clamp(self._scaled(current))
+                else:
+                    next_size = None
+        elif not self._reversed:
+            self._reverse()
+            reason = 'throughput did not improve, reversing'
+            next_size = self._clamp(self._scaled(self._best[0]))
+        else:
+            reason = 'throughput did not improve'
+            next_size = None
+
+        if next_size is None or next_size == self._best[0]:
+            self._settled = True
+            next_size = self._best[0]
+            reason += ', settling'
+
+        logger.debug(
+            'part size %d bytes: %.0f B/s (best: %d bytes at %.0f B/s), %s; next part size: %d bytes',
+            current,
+            throughput,
+            self._best[0],
+            self._best[1],
+            reason,
+            next_size,
+        )
+        self._part_size = next_size
+
+    def _reverse(self) -> None:
+        self._direction = -self._direction
+        self._reversed = True
+
+    def _scaled(self, part_size: int) -> int:
+        if self._direction > 0:
+            return part_size * self.GROWTH_FACTOR
+        return part_size // self.GROWTH_FACTOR
+
+    def _clamp(self, part_size: int) -> int:
+        return max(self.min_part_size, min(part_size, self.max_part_size))
@@ -0,0 +1,164 @@
+######################################################################
+#
+# File: b2/_internal/_utils/prefix_copy.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Server-side copy of all the files under a prefix, for ``file server-side-copy --recursive``.
+
+The source and the destination folders are listed side by side: with their prefixes cut off,
+the names of both listings sort the same way, so they are merged as they come, and neither
+listing is held in memory.  Files already in the destination, with the same size and the same
+sha1, known for both, are skipped, so an interrupted copy is resumed by running it again.  The others are copied
+by a pool of threads, which takes only as many files from the listing as it has room for,
+and starts at most as many copies per second as the rate limit allows.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from b2sdk.v3 import LARGE_FILE_SHA1, FileVersion, ProgressReport
+from b2sdk.v3.exception import B2Error
+
+
+class RateLimiter:
+    """
+    Limiter spacing operations evenly, to at most ``rate`` of them per second.
+    """
+
+    def __init__(self, rate: float | None, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = self.clock()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            self.sleep(start - now)
+
+
+@dataclass(frozen=True)
+class CopyJob:
+    source: FileVersion
+    destination_name: str
+
+
+def known_sha1(file_version: FileVersion) -> str | None:
+    if file_version.content_sha1 not in (None, 'none'):
+        return file_version.content_sha1
+    return (file_version.file_info or {}).get(LARGE_FILE_SHA1)
+
+
+def is_copied(source: FileVersion, destination: FileVersion) -> bool:
+    """
+    Tell whether the destination file is a copy of the source one: it has the same size,
+    and the same sha1.  Large files have a sha1 only if it was given in their file info,
+    and files without one are never taken for copies, since the size alone proves nothing.
+    """
+    if source.size != destination.size:
+        return False
+    source_sha1 = known_sha1(source)
+    return source_sha1 is not None and source_sha1 == known_sha1(destination)
+
+
+class PrefixCopy:
+    """
+    Copy of the files under a source prefix to a destination prefix.
+
+    ``copy`` makes the copy of a single file, and is called by the threads of the pool.
+    """
+
+    def __init__(
+        self,
+        source_files: Iterable[FileVersion],
+        source_prefix: str,
+        destination_files: Iterable[FileVersion],
+        destination_prefix: str,
+        copy: Callable[[FileVersion, str], object],
+        threads: int,
+        queue_size: int | None = None,
+        rate: float | None = None,
+    ):
+        self.source_files = source_files
+        self.source_prefix = source_prefix
+        self.destination_files = destination_files
+        self.destination_prefix = destination_prefix
+        self.copy = copy
+        self.threads = threads
+        self.rate_limiter = RateLimiter(rate)
+        self.semaphore = threading.BoundedSemaphore(queue_size or 2 * threads)
+        self.skipped = 0
+        self.failed: list[tuple[CopyJob, B2Error]] = []
+        self._exception: Exception | None = None
+
+    def jobs(self) -> Iterator[CopyJob]:
+        """
+        Yield the files to copy, merging the listing of the destination into that of the source.
+        """
+        destination_files = iter(self.destination_files)
+        destination, destination_name = self._next_destination(destination_files)
+        for source in self.source_files:
+            name = source.file_name[len(self.source_prefix) :]
+            while destination_name is not None and destination_name < name:
+                destination, destination_name = self._next_destination(destination_files)
+            if destination_name == name and is_copied(source, destination):
+                self.skipped += 1
+                continue
+            yield CopyJob(source, self.destination_prefix + name)
+
+    def _next_destination(self, destination_files: Iterator[FileVersion]):
+        destination = next(destination_files, None)
+        if destination is None:
+            return None, None
+        return destination, destination.file_name[len(self.destination_prefix) :]
+
+    def run(self, reporter: ProgressReport) -> None:
+        """
+        Copy the files, reporting the progress and the failed copies.
+
+        Copies failing with a B2 error are recorded in ``failed``, and the others go on;
+        any other error stops the copy, and is raised.
+        """
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            for job in self.jobs():
+                self.semaphore.acquire()
+                if self._exception is not None:
+                    break
+                self.rate_limiter.wait()
+                reporter.update_total(1)
+                future = executor.submit(self.copy, job.source, job.destination_name)
+                future.add_done_callback(lambda future, job=job: self._done(future, job, reporter))
+            reporter.end_total()
+        if self._exception is not None:
+            raise self._exception
+
+    def _done(self, future: Future, job: CopyJob, reporter: ProgressReport) -> None:
+        try:
+            future.result()
+        except B2Error as error:
+            self.failed.append((job, error))
+            reporter.print_completion(
+                f'Copy of file "{job.source.file_name}" ({job.source.id_}) '
+                f'to "{job.destination_name}" failed: {error}'
+            )
+        except Exception as error:
+            self._exception = self._exception or error
+        finally:
+            reporter.update_count(1)
+            self.semaphore.release()
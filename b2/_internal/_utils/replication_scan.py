@@ -0,0 +1,168 @@
+######################################################################
+#
+# File: b2/_internal/_utils/replication_scan.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Replication statistics of several rules of a bucket, for ``replication status``.
+
+b2sdk's ``ReplicationMonitor`` scans the source bucket, and the destination one, for a single
+rule, so a bucket with several rules is listed once for each of them, one rule after the other.
+``MultiRuleReplicationScan`` lists the source bucket once instead, under the folder the rules
+share, and hands every file to the rules it falls under.  The destination bucket of each rule
+is listed at the same time, by a thread of its own, which pairs the destination files with
+the source ones it is handed, like ``ReplicationMonitor`` does, so the statistics of every rule
+are the same as those of a ``ReplicationMonitor`` of its own.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+
+from b2sdk.v3 import (
+    B2Api,
+    B2Folder,
+    B2Path,
+    Bucket,
+    ProgressReport,
+    ReplicationMonitor,
+    ReplicationReport,
+    ReplicationRule,
+    zip_folders,
+)
+
+END_OF_FILES = object()
+
+
+def rule_folder(rule: ReplicationRule) -> str:
+    """
+    Return the prefix of the files of a rule, which ``B2Folder`` lists as a folder.
+    """
+    prefix = rule.file_name_prefix
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    return prefix
+
+
+def common_folder(folders: Iterable[str]) -> str:
+    """
+    Return the innermost folder holding all the given folders, '' for the whole bucket.
+    """
+    prefix = os.path.commonprefix(list(folders))
+    return prefix[: prefix.rfind('/') + 1]
+
+
+class QueueFolder:
+    """
+    Source files of a rule handed over by the listing of the source bucket, as a folder
+    for ``zip_folders``.
+    """
+
+    def __init__(self, queue: Queue):
+        self.queue = queue
+        self.ended = False
+
+    def all_files(self, reporter, policies_manager=None) -> Iterator[B2Path]:
+        while True:
+            path = self.queue.get()
+            if path is END_OF_FILES:
+                self.ended = True
+                return
+            yield path
+
+    def drain(self) -> None:
+        # keeps the listing of the source bucket going, once the pairing stopped
+        if not self.ended:
+            for _ in self.all_files(None):
+                pass
+
+
+class MultiRuleReplicationScan:
+    """
+    Scan of the source bucket (only, or with the destination ones) for several replication
+    rules at once, with reports by the name of the rule.
+    """
+
+    QUEUE_SIZE = ReplicationMonitor.QUEUE_SIZE
+
+    def __init__(
+        self,
+        bucket: Bucket,
+        rules: Sequence[ReplicationRule],
+        reporter: ProgressReport,
+        destination_api: B2Api | None = None,
+        scan_destination: bool = True,
+        queue_size: int = QUEUE_SIZE,
+    ):
+        self.bucket = bucket
+        self.rules = rules
+        self.reporter = reporter
+        self.destination_api = destination_api
+        self.scan_destination = scan_destination
+        self.queue_size = queue_size
+
+    def scan(self) -> dict[str, ReplicationReport]:
+        reports = {rule.name: ReplicationReport() for rule in self.rules}
+        if not self.scan_destination:
+            for rule, path in self.source_paths():
+                reports[rule.name].add(path)
+            return reports
+
+        queues = {rule.name: Queue(maxsize=self.queue_size) for rule in self.rules}
+        with ThreadPoolExecutor(max_workers=len(self.rules) + 1) as executor:
+            futures = [
+                executor.submit(self._pair, rule, queues[rule.name], reports[rule.name])
+                for rule in self.rules
+            ]
+            futures.append(executor.submit(self._hand_over, queues))
+            for future in futures:
+                future.result()
+        return reports
+
+    def source_paths(self) -> Iterator[tuple[ReplicationRule, B2Path]]:
+        """
+        List the source bucket once, and yield its files with each rule they fall under,
+        with paths relative to the folder of the rule.
+        """
+        folders = [(rule, rule_folder(rule)) for rule in self.rules]
+        common = common_folder(folder for _, folder in folders)
+        source_folder = B2Folder(self.bucket.name, common, self.bucket.api)
+        for path in source_folder.all_files(self.reporter):
+            self.reporter.update_total(1)
+            name = common + path.relative_path
+            for rule, folder in folders:
+                if name.startswith(folder):
+                    yield (
+                        rule,
+                        B2Path(name[len(folder) :], path.selected_version, path.all_versions),
+                    )
+        self.reporter.end_total()
+
+    def _hand_over(self, queues: dict[str, Queue]) -> None:
+        try:
+            for rule, path in self.source_paths():
+                queues[rule.name].put(path)
+        finally:
+            for queue in queues.values():
+                queue.put(END_OF_FILES)
+
+    def _pair(self, rule: ReplicationRule, queue: Queue, report: ReplicationReport) -> None:
+        source_folder = QueueFolder(queue)
+        monitor = ReplicationMonitor(
+            bucket=self.bucket,
+            rule=rule,
+            destination_api=self.destination_api,
+            report=self.reporter,
+        )
+        try:
+            for pair in zip_folders(source_folder, monitor.destination_folder, self.reporter):
+                report.add(*pair)
+        finally:
+            source_folder.drain()
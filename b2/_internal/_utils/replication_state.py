@@ -0,0 +1,402 @@
+######################################################################
+#
+# File: b2/_internal/_utils/replication_state.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Incremental replication statistics, for ``replication status --state``.
+
+The statistics of every rule are saved to a state file, along with the time the scan started,
+and with the files whose replication was still pending, which are the ones whose statistics
+may change.  The next scan starts from the saved statistics: B2 lists files by name only,
+so the source bucket is still listed, but only the files uploaded since the last scan, and
+a sample of the pending ones, are examined, and looked up in the destination bucket one by one,
+instead of listing the whole destination bucket.  A pending file gone from the source bucket
+is taken out of the statistics, its replica being counted on its own; other deleted or
+overwritten files are only accounted for by a full scan, made again once the state file is
+removed or the rule is changed.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from queue import Queue
+
+from b2sdk.v3 import (
+    B2Api,
+    B2Path,
+    Bucket,
+    EncryptionMode,
+    ProgressReport,
+    ReplicationMonitor,
+    ReplicationReport,
+    ReplicationRule,
+    ReplicationScanResult,
+    ReplicationStatus,
+    zip_folders,
+)
+
+from b2._internal._utils.replication_scan import (
+    END_OF_FILES,
+    MultiRuleReplicationScan,
+    QueueFolder,
+    rule_folder,
+)
+
+STATE_VERSION = 1
+DEFAULT_SAMPLE_SIZE = 1000
+
+_ENUM_FIELDS = {
+    'source_replication_status': ReplicationStatus,
+    'source_encryption_mode': EncryptionMode,
+    'destination_replication_status': ReplicationStatus,
+}
+
+
+class ReplicationStateError(Exception):
+    pass
+
+
+def result_to_dict(result: ReplicationScanResult) -> dict:
+    # enums are saved by name, since EncryptionMode.UNKNOWN has None for a value
+    return {
+        key: value.name if isinstance(value, Enum) else value
+        for key, value in dataclasses.asdict(result).items()
+    }
+
+
+def result_from_dict(fields: dict) -> ReplicationScanResult:
+    return ReplicationScanResult(
+        **{
+            key: _ENUM_FIELDS[key][value] if key in _ENUM_FIELDS and value is not None else value
+            for key, value in fields.items()
+        }
+    )
+
+
+@dataclass
+class RuleState:
+    """
+    Statistics of a rule, as of ``scanned_before``, in millis since epoch.
+    """
+
+    destination_bucket_id: str
+    file_name_prefix: str
+    scan_destination: bool
+    scanned_before: int
+    counter_by_status: Counter = field(default_factory=Counter)
+    # results of the files whose replication is pending, by their path relative to the rule
+    pending: dict[str, ReplicationScanResult] = field(default_factory=dict)
+
+    def matches(self, rule: ReplicationRule, scan_destination: bool) -> bool:
+        return (
+            self.destination_bucket_id == rule.destination_bucket_id
+            and self.file_name_prefix == rule.file_name_prefix
+            and self.scan_destination == scan_destination
+        )
+
+    def count(self, source: B2Path | None, destination: B2Path | None = None) -> None:
+        result = ReplicationScanResult.from_files(source, destination)
+        self.counter_by_status[result] += 1
+        if source is not None and result.source_replication_status == ReplicationStatus.PENDING:
+            self.pending[source.relative_path] = result
+
+    def forget(self, relative_path: str) -> None:
+        result = self.pending.pop(relative_path, None)
+        if result is not None:
+            self.counter_by_status[result] -= 1
+            if self.counter_by_status[result] <= 0:
+                del self.counter_by_status[result]
+
+    def report(self) -> ReplicationReport:
+        return ReplicationReport(counter_by_status=Counter(self.counter_by_status))
+
+    def to_dict(self) -> dict:
+        return {
+            'destinationBucketId': self.destination_bucket_id,
+            'fileNamePrefix': self.file_name_prefix,
+            'scanDestination': self.scan_destination,
+            'scannedBefore': self.scanned_before,
+            'counters': [
+                {**result_to_dict(result), 'count': count}
+                for result, count in self.counter_by_status.items()
+            ],
+            'pending': {
+                relative_path: result_to_dict(result)
+                for relative_path, result in self.pending.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, rule_dict: dict) -> RuleState:
+        counter_by_status = Counter()
+        for counter in rule_dict['counters']:
+            counter = dict(counter)
+            count = counter.pop('count')
+            counter_by_status[result_from_dict(counter)] = count
+        return cls(
+            destination_bucket_id=rule_dict['destinationBucketId'],
+            file_name_prefix=rule_dict['fileNamePrefix'],
+            scan_destination=rule_dict['scanDestination'],
+            scanned_before=rule_dict['scannedBefore'],
+            counter_by_status=counter_by_status,
+            pending={
+                relative_path: result_from_dict(result)
+                for relative_path, result in rule_dict['pending'].items()
+            },
+        )
+
+
+@dataclass
+class ReplicationState:
+    """
+    Statistics of the replication rules of a bucket, by the name of the rule.
+    """
+
+    bucket_id: str
+    rules: dict[str, RuleState] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str, bucket_id: str) -> ReplicationState:
+        """
+        Load the state of the bucket from ``path``, or start an empty one if there is no such file.
+        """
+        try:
+            with open(path) as file:
+                state_dict = json.load(file)
+        except FileNotFoundError:
+            return cls(bucket_id)
+        except (OSError, ValueError) as e:
+            raise ReplicationStateError(f'cannot read state file {path}: {e}')
+        try:
+            if state_dict['version'] != STATE_VERSION:
+                raise ReplicationStateError(
+                    f'state file {path} has version {state_dict["version"]}, '
+                    f'expected {STATE_VERSION}'
+                )
+            if state_dict['bucketId'] != bucket_id:
+                raise ReplicationStateError(
+                    f'state file {path} is for bucket {state_dict["bucketId"]}, not {bucket_id}'
+                )
+            rules = {
+                name: RuleState.from_dict(rule_dict)
+                for name, rule_dict in state_dict['rules'].items()
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            raise ReplicationStateError(f'invalid state file {path}: {e!r}')
+        return cls(bucket_id, rules)
+
+    def save(self, path: str) -> None:
+        # written aside first, so that an interrupted save leaves the previous state
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'w') as file:
+            json.dump(
+                {
+                    'version': STATE_VERSION,
+                    'bucketId': self.bucket_id,
+                    'rules': {name: rule.to_dict() for name, rule in self.rules.items()},
+                },
+                file,
+            )
+        os.replace(temporary_path, path)
+
+
+class IncrementalReplicationScan(MultiRuleReplicationScan):
+    """
+    Scan of several replication rules at once, starting from their statistics in ``state``,
+    which is updated with the new ones.
+
+    A rule without statistics in the state, or with statistics of another setup, is scanned
+    in full, like ``MultiRuleReplicationScan`` does.  Files uploaded after the scan started are
+    left out, for the next scan to count them.
+    """
+
+    def __init__(
+        self,
+        bucket: Bucket,
+        rules: Sequence[ReplicationRule],
+        reporter: ProgressReport,
+        state: ReplicationState,
+        destination_api: B2Api | None = None,
+        scan_destination: bool = True,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        queue_size: int = MultiRuleReplicationScan.QUEUE_SIZE,
+        clock=time.time,
+        sampler: random.Random | None = None,
+    ):
+        super().__init__(
+            bucket,
+            rules,
+            reporter,
+            destination_api=destination_api,
+            scan_destination=scan_destination,
+            queue_size=queue_size,
+        )
+        self.state = state
+        self.sample_size = sample_size
+        self.clock = clock
+        self.sampler = sampler or random.Random()
+
+    def scan(self) -> dict[str, ReplicationReport]:
+        scanned_before = int(self.clock() * 1000)
+        previous = {}
+        for rule in self.rules:
+            rule_state = self.state.rules.get(rule.name)
+            if rule_state is not None and rule_state.matches(rule, self.scan_destination):
+                previous[rule.name] = rule_state
+        rule_states = {
+            rule.name: RuleState(
+                destination_bucket_id=rule.destination_bucket_id,
+                file_name_prefix=rule.file_name_prefix,
+                scan_destination=self.scan_destination,
+                scanned_before=scanned_before,
+                counter_by_status=Counter(previous[rule.name].counter_by_status)
+                if rule.name in previous
+                else Counter(),
+                pending=dict(previous[rule.name].pending) if rule.name in previous else {},
+            )
+            for rule in self.rules
+        }
+        sampled = {
+            name: set(
+                self.sampler.sample(
+                    sorted(rule_state.pending), min(self.sample_size, len(rule_state.pending))
+                )
+            )
+            for name, rule_state in previous.items()
+        }
+        seen = {name: set() for name in previous}
+
+        queues = {rule.name: Queue(maxsize=self.queue_size) for rule in self.rules}
+        with ThreadPoolExecutor(max_workers=len(self.rules) + 1) as executor:
+            futures = []
+            for rule in self.rules:
+                rule_state = rule_states[rule.name]
+                if rule.name in previous:
+                    futures.append(
+                        executor.submit(
+                            self._examine,
+                            rule,
+                            queues[rule.name],
+                            rule_state,
+                            set(previous[rule.name].pending),
+                            seen[rule.name],
+                        )
+                    )
+                else:
+                    futures.append(
+                        executor.submit(self._count_all, rule, queues[rule.name], rule_state)
+                    )
+            futures.append(
+                executor.submit(self._select, queues, scanned_before, previous, sampled, seen)
+            )
+            for future in futures:
+                future.result()
+
+        self.state.rules.update(rule_states)
+        return {name: rule_state.report() for name, rule_state in rule_states.items()}
+
+    def _select(
+        self,
+        queues: dict[str, Queue],
+        scanned_before: int,
+        previous: dict[str, RuleState],
+        sampled: dict[str, set[str]],
+        seen: dict[str, set[str]],
+    ) -> None:
+        try:
+            for rule, path in self.source_paths():
+                if path.selected_version.upload_timestamp >= scanned_before:
+                    continue
+                rule_state = previous.get(rule.name)
+                if rule_state is not None:
+                    if path.relative_path in rule_state.pending:
+                        seen[rule.name].add(path.relative_path)
+                    is_new = path.selected_version.upload_timestamp >= rule_state.scanned_before
+                    if not is_new and path.relative_path not in sampled[rule.name]:
+                        continue
+                queues[rule.name].put(path)
+        finally:
+            for queue in queues.values():
+                queue.put(END_OF_FILES)
+
+    def _count_all(self, rule: ReplicationRule, queue: Queue, rule_state: RuleState) -> None:
+        source_folder = QueueFolder(queue)
+        try:
+            if not self.scan_destination:
+                for path in source_folder.all_files(self.reporter):
+                    rule_state.count(path)
+                return
+            monitor = ReplicationMonitor(
+                bucket=self.bucket,
+                rule=rule,
+                destination_api=self.destination_api,
+                report=self.reporter,
+            )
+            for pair in zip_folders(source_folder, monitor.destination_folder, self.reporter):
+                rule_state.count(*pair)
+        finally:
+            source_folder.drain()
+
+    def _examine(
+        self,
+        rule: ReplicationRule,
+        queue: Queue,
+        rule_state: RuleState,
+        previous_pending: set[str],
+        seen: set[str],
+    ) -> None:
+        source_folder = QueueFolder(queue)
+        try:
+            destination_bucket = None
+            if self.scan_destination:
+                destination_bucket = ReplicationMonitor(
+                    bucket=self.bucket,
+                    rule=rule,
+                    destination_api=self.destination_api,
+                    report=self.reporter,
+                ).destination_bucket
+            for path in source_folder.all_files(self.reporter):
+                rule_state.forget(path.relative_path)
+                destination = None
+                if destination_bucket is not None:
+                    destination = self._look_up(destination_bucket, rule, path.relative_path)
+                rule_state.count(path, destination)
+        finally:
+            source_folder.drain()
+        # pending files of the previous scan missing from the listing were deleted,
+        # leaving only their replicas, if any
+        for relative_path in sorted(previous_pending - seen):
+            rule_state.forget(relative_path)
+            if destination_bucket is not None:
+                destination = self._look_up(destination_bucket, rule, relative_path)
+                if destination is not None:
+                    rule_state.count(None, destination)
+
+    @classmethod
+    def _look_up(
+        cls, destination_bucket: Bucket, rule: ReplicationRule, relative_path: str
+    ) -> B2Path | None:
+        versions = [
+            file_version
+            for file_version in destination_bucket.list_file_versions(
+                rule_folder(rule) + relative_path
+            )
+            if file_version.action != 'start'
+        ]
+        if not versions:
+            return None
+        return B2Path(relative_path, versions[0], versions)
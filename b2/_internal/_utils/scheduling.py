@@ -0,0 +1,147 @@
+######################################################################
+#
+# File: b2/_internal/_utils/scheduling.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Size-aware ordering of sync actions, for ``sync --schedule``.
+
+b2sdk schedules the actions of a sync in the order of the file names, so a sync can end
+with a few huge files transferred by single threads while the others are idle, or spend
+a long stretch on tiny files which cannot fill the bandwidth.  The scheduler buffers
+a window of actions and lets them out by the size of their files instead.
+
+Actions of one file are kept together, in their order, so that for example an upload
+still comes before the deletion of the version it replaces.
+"""
+
+from __future__ import annotations
+
+import collections
+import heapq
+import itertools
+import time
+from collections.abc import Iterable, Iterator
+
+from b2sdk.v3 import AbstractAction, Bucket, ProgressReport
+
+from b2._internal._utils.copy_matching import WaitForCopies
+from b2._internal._utils.sync_actions import add_hook, has_hook
+
+SCHEDULE_NAME = 'name'
+SCHEDULE_LARGEST_FIRST = 'largest-first'
+SCHEDULE_MIXED = 'mixed'
+SCHEDULES = (SCHEDULE_LARGEST_FIRST, SCHEDULE_MIXED, SCHEDULE_NAME)
+
+# how many actions are buffered, at most
+SCHEDULE_WINDOW = 1000
+
+# upper bounds of the size classes of the files, from the smallest one
+SIZE_CLASSES = (
+    ('small', 1000 * 1000),
+    ('medium', 100 * 1000 * 1000),
+    ('large', None),
+)
+
+
+def size_class(size: int) -> str:
+    for name, limit in SIZE_CLASSES:
+        if limit is None or size < limit:
+            return name
+    raise AssertionError('the last size class has no limit')
+
+
+def action_name(action: AbstractAction) -> str:
+    name = getattr(action, 'relative_name', None)
+    if name is None:
+        # downloads and copies between buckets are named after their source
+        name = action.source_path.relative_path
+    return name
+
+
+class ActionScheduler:
+    """
+    Scheduler letting out the actions of a sync in the order of ``schedule``, one of ``SCHEDULES``.
+
+    With ``largest-first``, the actions of the largest files of the window go first.
+    With ``mixed``, the size classes take turns, from the largest one, so that large
+    transfers keep the bandwidth used while small ones keep the request rate up.
+    The transfers are timed, to report the throughput of every size class.
+    """
+
+    def __init__(self, schedule: str, window: int = SCHEDULE_WINDOW):
+        if schedule not in SCHEDULES:
+            raise ValueError(f'unknown schedule: {schedule}')
+        self.schedule = schedule
+        self.window = window
+        self._buffered = 0
+        self._counter = itertools.count()  # keeps the order of the files of the same size
+        self._largest_first: list[tuple[int, int, list[AbstractAction]]] = []
+        self._by_class = {name: collections.deque() for name, _ in reversed(SIZE_CLASSES)}
+        self._turns = itertools.cycle(self._by_class)
+
+    def schedule_actions(self, actions: Iterable[AbstractAction]) -> Iterator[AbstractAction]:
+        if self.schedule == SCHEDULE_NAME:
+            yield from actions
+            return
+        group: list[AbstractAction] = []
+        for action in actions:
+            if group and action_name(action) != action_name(group[0]):
+                self._push(group)
+                group = []
+                while self._buffered > self.window:
+                    yield from self._pop()
+            if has_hook(action, WaitForCopies):
+                # the copies it waits for have to be scheduled before it
+                self._push(group)
+                group = []
+                yield from self._drain()
+                yield action
+                continue
+            group.append(_timed(action))
+        self._push(group)
+        yield from self._drain()
+
+    def _push(self, group: list[AbstractAction]) -> None:
+        if not group:
+            return
+        size = sum(action.get_bytes() for action in group)
+        if self.schedule == SCHEDULE_LARGEST_FIRST:
+            heapq.heappush(self._largest_first, (-size, next(self._counter), group))
+        else:
+            self._by_class[size_class(size)].append(group)
+        self._buffered += len(group)
+
+    def _pop(self) -> list[AbstractAction]:
+        if self.schedule == SCHEDULE_LARGEST_FIRST:
+            _, _, group = heapq.heappop(self._largest_first)
+        else:
+            name = next(name for name in self._turns if self._by_class[name])
+            group = self._by_class[name].popleft()
+        self._buffered -= len(group)
+        return group
+
+    def _drain(self) -> Iterator[AbstractAction]:
+        while self._buffered:
+            yield from self._pop()
+
+
+def time_transfer(action, do_action, bucket: Bucket, reporter: ProgressReport) -> None:
+    """
+    Hook of actions reporting the time the transfer took, with its size class.
+    """
+    started = time.monotonic()
+    do_action(bucket, reporter)
+    if reporter is not None and hasattr(reporter, 'update_class_throughput'):
+        size = action.get_bytes()
+        reporter.update_class_throughput(size_class(size), size, started, time.monotonic())
+
+
+def _timed(action: AbstractAction) -> AbstractAction:
+    if action.get_bytes() > 0:
+        add_hook(action, time_transfer)
+    return action
@@ -0,0 +1,282 @@
+######################################################################
+#
+# File: b2/_internal/_utils/sha1_compare.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Comparison of synced files by the sha1 of their contents, for ``sync --compare-versions sha1``.
+
+Hashes of B2 files come from their listings.  Local files are hashed by a pool of threads,
+ahead of the comparisons, and their hashes are kept in a SQLite database, so that a file
+is only read again once it changed.  A file is considered changed when its size, inode,
+modification time or status change time is not the one it was hashed with; the status
+change time cannot be set by restoring a file, unlike the modification time.
+"""
+
+from __future__ import annotations
+
+import collections
+import functools
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from b2sdk.v3 import (
+    AbstractPath,
+    B2Path,
+    FileVersion,
+    LocalPath,
+    SyncPolicyManager,
+)
+
+from b2._internal._utils.compression import (
+    ORIGINAL_SHA1_FILE_INFO_KEY,
+    ORIGINAL_SIZE_FILE_INFO_KEY,
+    hash_file,
+)
+
+# how many pairs of files are compared ahead of the actions being scheduled, at most
+HASH_LOOKAHEAD = 1000
+
+LARGE_FILE_SHA1_FILE_INFO_KEY = 'large_file_sha1'
+CONTENT_ENCODING_FILE_INFO_KEY = 'b2-content-encoding'
+
+
+class Sha1Cache:
+    """
+    SQLite database of the sha1 hashes of local files, by absolute path.
+    """
+
+    COMMIT_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._uncommitted = 0
+        try:
+            with self._connection:
+                self._connection.execute('PRAGMA journal_mode=WAL')
+                self._connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS file (
+                        path TEXT PRIMARY KEY,
+                        size INTEGER NOT NULL,
+                        inode INTEGER NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        ctime_ns INTEGER NOT NULL,
+                        sha1 TEXT NOT NULL
+                    ) WITHOUT ROWID
+                    """
+                )
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+    def get(self, path: str, file_stat: os.stat_result) -> str | None:
+        """
+        Return the sha1 of the file, if it was hashed before and did not change since.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT size, inode, mtime_ns, ctime_ns, sha1 FROM file WHERE path = ?', (path,)
+            ).fetchone()
+        if row is None or tuple(row[:4]) != _stat_key(file_stat):
+            return None
+        return row[4]
+
+    def put(self, path: str, file_stat: os.stat_result, sha1: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO file VALUES (?, ?, ?, ?, ?, ?)',
+                (path, *_stat_key(file_stat), sha1),
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.COMMIT_EVERY:
+                self._connection.commit()
+                self._uncommitted = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _stat_key(file_stat: os.stat_result) -> tuple[int, int, int, int]:
+    return file_stat.st_size, file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_ctime_ns
+
+
+class LocalHasher:
+    """
+    Pool of ``threads`` threads hashing local files, with the hashes memoized in ``cache``, if given.
+
+    The cache is closed with the hasher.
+    """
+
+    def __init__(self, threads: int, cache: Sha1Cache | None = None):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix='hash')
+
+    def submit(self, path: str) -> Future[str]:
+        return self._executor.submit(self.hash, path)
+
+    def hash(self, path: str) -> str:
+        file_stat = os.stat(path)
+        if self.cache is not None:
+            sha1 = self.cache.get(path, file_stat)
+            if sha1 is not None:
+                return sha1
+        _, sha1 = hash_file(path)
+        if self.cache is not None:
+            # the file may have been written to while it was read, then it is hashed again next time
+            self.cache.put(path, file_stat, sha1)
+        return sha1
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class HashedLocalPath(LocalPath):
+    """
+    Local file with the sha1 of its contents.
+    """
+
+    __slots__ = ['content_sha1']
+
+    def __init__(self, local_path: LocalPath, content_sha1: str | None):
+        super().__init__(
+            local_path.absolute_path, local_path.relative_path, local_path.mod_time, local_path.size
+        )
+        self.content_sha1 = content_sha1
+
+
+def get_content_sha1(file_version: FileVersion) -> str | None:
+    """
+    Return the sha1 of the contents of a B2 file, before any compression, or ``None`` if it is not known.
+    """
+    file_info = file_version.file_info or {}
+    if CONTENT_ENCODING_FILE_INFO_KEY in file_info:
+        return file_info.get(ORIGINAL_SHA1_FILE_INFO_KEY)
+    if file_version.content_sha1 not in (None, 'none'):
+        return file_version.content_sha1
+    # large files have no sha1 of their own, unless given one in their file info
+    return file_info.get(LARGE_FILE_SHA1_FILE_INFO_KEY)
+
+
+def get_content_size(file_version: FileVersion) -> int:
+    """
+    Return the size of the contents of a B2 file, before any compression.
+    """
+    file_info = file_version.file_info or {}
+    if CONTENT_ENCODING_FILE_INFO_KEY in file_info and ORIGINAL_SIZE_FILE_INFO_KEY in file_info:
+        return int(file_info[ORIGINAL_SIZE_FILE_INFO_KEY])
+    return file_version.size
+
+
+def _sha1_and_size(path: AbstractPath) -> tuple[str | None, int]:
+    if isinstance(path, B2Path):
+        return get_content_sha1(path.selected_version), get_content_size(path.selected_version)
+    return getattr(path, 'content_sha1', None), path.size
+
+
+class Sha1ComparePolicyMixin:
+    """
+    Sync policy mixin comparing the files by the sha1 of their contents.
+
+    Files of different sizes differ without being hashed; files of which a hash is not known
+    are considered different, so that syncing them makes it known.
+    """
+
+    def files_are_different(self, source_path: AbstractPath, dest_path: AbstractPath, *args):
+        source_sha1, source_size = _sha1_and_size(source_path)
+        dest_sha1, dest_size = _sha1_and_size(dest_path)
+        if source_size != dest_size or source_sha1 is None or dest_sha1 is None:
+            return True
+        return source_sha1 != dest_sha1
+
+
+@functools.cache
+def _sha1_compare_policy_class(policy_class: type) -> type:
+    return type(policy_class.__name__, (Sha1ComparePolicyMixin, policy_class), {})
+
+
+class Sha1SyncPolicyManager(SyncPolicyManager):
+    """
+    Sync policy manager of policies comparing the files by the sha1 of their contents.
+    """
+
+    def get_policy_class(self, sync_type, delete, keep_days):
+        return _sha1_compare_policy_class(super().get_policy_class(sync_type, delete, keep_days))
+
+
+def needs_hash(
+    source_path: AbstractPath | None, dest_path: AbstractPath | None
+) -> LocalPath | None:
+    """
+    Return the local file of the pair, if comparing the pair requires its hash.
+    """
+    if source_path is None or dest_path is None or not source_path.is_visible():
+        return None
+    if isinstance(source_path, LocalPath):
+        local_path, b2_path = source_path, dest_path
+    elif isinstance(dest_path, LocalPath):
+        local_path, b2_path = dest_path, source_path
+    else:
+        return None
+    if not isinstance(b2_path, B2Path):
+        return None
+    file_version = b2_path.selected_version
+    if get_content_size(file_version) != local_path.size or get_content_sha1(file_version) is None:
+        return None  # the files differ either way
+    return local_path
+
+
+def hash_ahead(
+    pairs: Iterable[tuple[AbstractPath | None, AbstractPath | None]], hasher: LocalHasher
+) -> Iterator[tuple[AbstractPath | None, AbstractPath | None]]:
+    """
+    Yield the pairs of files, with their local files hashed where the comparison needs it.
+
+    Up to ``HASH_LOOKAHEAD`` pairs are taken ahead, so that their files are hashed concurrently.
+    """
+    ahead = collections.deque()
+    for source_path, dest_path in pairs:
+        local_path = needs_hash(source_path, dest_path)
+        future = hasher.submit(local_path.absolute_path) if local_path is not None else None
+        ahead.append((source_path, dest_path, future))
+        while ahead and (len(ahead) > HASH_LOOKAHEAD or ahead[0][2] is None or ahead[0][2].done()):
+            yield _hashed_pair(*ahead.popleft())
+    while ahead:
+        yield _hashed_pair(*ahead.popleft())
+
+
+def _hashed_pair(source_path, dest_path, future: Future[str] | None):
+    if future is None:
+        return source_path, dest_path
+    try:
+        sha1 = future.result()
+    except OSError:
+        sha1 = None  # the file is synced, and its sync reports the problem
+    if isinstance(source_path, LocalPath):
+        return HashedLocalPath(source_path, sha1), dest_path
+    return source_path, HashedLocalPath(dest_path, sha1)
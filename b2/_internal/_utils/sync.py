@@ -0,0 +1,390 @@
+######################################################################
+#
+# File: b2/_internal/_utils/sync.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from __future__ import annotations
+
+import dataclasses
+import time
+from concurrent import futures
+
+from b2sdk.v3 import (
+    DEFAULT_SCAN_MANAGER,
+    SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    B2DeleteAction,
+    B2HideAction,
+    B2UploadAction,
+    BoundedQueueExecutor,
+    IncompleteSync,
+    KeepOrDeleteMode,
+    Synchronizer,
+    SyncReport,
+    format_and_scale_number,
+    zip_folders,
+)
+from b2sdk.v3.exception import InvalidArgument
+
+from b2._internal._utils.copy_matching import CopyMatcher
+from b2._internal._utils.mmap_upload import IO_MODE_BUFFERED
+from b2._internal._utils.part_size import AdaptivePartSizer
+from b2._internal._utils.scheduling import SCHEDULE_NAME, SIZE_CLASSES, ActionScheduler
+from b2._internal._utils.sha1_compare import LocalHasher, Sha1SyncPolicyManager, hash_ahead
+from b2._internal._utils.sync_actions import (
+    CliUploadAction,
+    ForgetDeleted,
+    RecordHide,
+    UploadOptions,
+    add_hook,
+)
+from b2._internal._utils.sync_events import SyncEventWriter, report_events
+from b2._internal._utils.sync_plan import SyncPlanReader, SyncPlanWriter
+from b2._internal._utils.sync_state import SyncStateDb
+
+
+@dataclasses.dataclass
+class CliSyncReport(SyncReport):
+    """
+    Sync report which also counts the files copied on the server instead of being uploaded,
+    and the throughput of the transfers of every size class, if they are timed.
+
+    It can also report the scan counts and the problems of the sync as events.
+    """
+
+    def __post_init__(self):
+        self.copied_files = 0
+        self.copied_bytes = 0
+        # size class -> [files, bytes, start of the first transfer, end of the last one]
+        self.class_throughput: dict[str, list] = {}
+        self.events: SyncEventWriter | None = None
+        super().__post_init__()
+        self._snapshot_time = self.start_time
+        self._snapshot_bytes = 0
+
+    def report_events(self, events: SyncEventWriter) -> None:
+        self.events = events
+        events.snapshot = self.progress_snapshot
+
+    def progress_snapshot(self) -> dict:
+        """
+        Return the counts of the sync so far, and the throughput since the previous snapshot.
+        """
+        with self.lock:
+            now = time.time()
+            interval = now - self._snapshot_time
+            rate = (self.transfer_bytes - self._snapshot_bytes) / interval if interval > 0 else 0
+            self._snapshot_time = now
+            self._snapshot_bytes = self.transfer_bytes
+            return {
+                'listed_files': self.total_count,
+                'compared_files': self.compare_count,
+                'transferred_files': self.transfer_files,
+                'transferred_bytes': self.transfer_bytes,
+                'bytes_per_second': round(rate),
+            }
+
+    def end_total(self) -> None:
+        super().end_total()
+        if self.events is not None:
+            self.events.emit('scan', stage='list', files=self.total_count)
+
+    def end_compare(self, total_transfer_files: int, total_transfer_bytes: int) -> None:
+        super().end_compare(total_transfer_files, total_transfer_bytes)
+        if self.events is not None:
+            self.events.emit(
+                'scan',
+                stage='compare',
+                files=self.compare_count,
+                transfer_files=total_transfer_files,
+                transfer_bytes=total_transfer_bytes,
+            )
+
+    def error(self, message: str) -> None:
+        super().error(message)
+        if self.events is not None:
+            self.events.emit('error', message=message)
+
+    def close(self) -> None:
+        if self.events is not None and not self.closed:
+            # the warnings of the scan are all known once b2sdk closes the report
+            for warning in self.warnings:
+                self.events.emit('warning', message=warning)
+        super().close()
+
+    def update_copied(self, file_delta: int, byte_delta: int) -> None:
+        with self.lock:
+            self.copied_files += file_delta
+            self.copied_bytes += byte_delta
+
+    def update_class_throughput(
+        self, size_class: str, byte_delta: int, started: float, finished: float
+    ) -> None:
+        with self.lock:
+            stats = self.class_throughput.setdefault(size_class, [0, 0, started, finished])
+            stats[0] += 1
+            stats[1] += byte_delta
+            stats[2] = min(stats[2], started)
+            stats[3] = max(stats[3], finished)
+
+    def print_summary(self) -> None:
+        """
+        Print the counts of the finished sync.
+
+        Not done by ``close``, which b2sdk calls once the folders are compared.
+        """
+        if self.copied_files:
+            saved = format_and_scale_number(self.copied_bytes, 'B')
+            self.print_completion(
+                f'copied {self.copied_files} files on the server, {saved} not uploaded'
+            )
+        for name, _ in SIZE_CLASSES:
+            if name in self.class_throughput:
+                self.print_completion(self._format_class_throughput(name))
+
+    def _format_class_throughput(self, size_class: str) -> str:
+        files, total_bytes, started, finished = self.class_throughput[size_class]
+        seconds = finished - started
+        line = (
+            f'{size_class} files: {files} transferred, '
+            f'{format_and_scale_number(total_bytes, "B")} in {seconds:.1f}s'
+        )
+        if seconds > 0:
+            line += f', {format_and_scale_number(total_bytes / seconds, "B/s")}'
+        return line
+
+
+class CliSynchronizer(Synchronizer):
+    """
+    Synchronizer allowing the CLI to customize the actions created by b2sdk.
+    """
+
+    def __init__(
+        self,
+        *args,
+        part_size: int | None = None,
+        part_sizer: AdaptivePartSizer | None = None,
+        compression: str | None = None,
+        compression_buffer_size: int | None = None,
+        io_mode: str = IO_MODE_BUFFERED,
+        sync_state: SyncStateDb | None = None,
+        local_hasher: LocalHasher | None = None,
+        compare_sha1: bool = False,
+        copy_existing: bool = False,
+        plan_writer: SyncPlanWriter | None = None,
+        schedule: str = SCHEDULE_NAME,
+        events: SyncEventWriter | None = None,
+        **kwargs,
+    ):
+        """
+        :param part_size: part size of large file uploads, ``None`` for the default one
+        :param part_sizer: sizer adapting part size of large file uploads to the measured throughput;
+                           takes precedence over ``part_size``
+        :param compression: compression algorithm to compress uploaded files with, ``None`` for no compression
+        :param compression_buffer_size: size of the buffers of a compressed upload, ``None`` for the part size
+        :param io_mode: how uploaded files are read, one of ``IO_MODES``; ignored when compressing
+        :param sync_state: database to record the results of uploads, hides and deletes in
+        :param local_hasher: hasher of local files, required by ``compare_sha1`` and ``copy_existing``
+        :param compare_sha1: whether to compare the files by the sha1 of their contents
+        :param copy_existing: whether to upload files whose contents the destination already has
+                              as server-side copies
+        :param plan_writer: writer of the plan of the actions to take, which are written
+                            as they are made
+        :param schedule: order to schedule the actions in, one of ``SCHEDULES``
+        :param events: writer of the events of the actions run
+        """
+        if compare_sha1:
+            kwargs['sync_policy_manager'] = Sha1SyncPolicyManager()
+        super().__init__(*args, **kwargs)
+        self.part_size = part_size
+        self.part_sizer = part_sizer
+        self.compression = compression
+        self.compression_buffer_size = compression_buffer_size
+        self.io_mode = io_mode
+        self.sync_state = sync_state
+        self.upload_options = UploadOptions(
+            part_size=part_size,
+            part_sizer=part_sizer,
+            compression=compression,
+            compression_buffer_size=compression_buffer_size,
+            io_mode=io_mode,
+            sync_state=sync_state,
+        )
+        self.local_hasher = local_hasher
+        self.compare_sha1 = compare_sha1
+        self.copy_existing = copy_existing
+        self.plan_writer = plan_writer
+        self.schedule = schedule
+        self.events = events
+
+    def apply_plan(
+        self,
+        plan: SyncPlanReader,
+        source_folder,
+        dest_folder,
+        reporter: SyncReport | None,
+        encryption_settings_provider=SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    ):
+        """
+        Run the actions of a sync plan of the two folders, like ``sync_folders`` runs
+        the actions it makes.
+        """
+        if dest_folder.folder_type() == 'local' and not self.dry_run:
+            dest_folder.ensure_present()
+        if reporter is not None:
+            reporter.end_total()
+            reporter.end_compare(plan.files, plan.bytes)
+
+        # the tasks wait for uploads, so they cannot run in the pool of the uploads
+        sync_executor = BoundedQueueExecutor(
+            futures.ThreadPoolExecutor(max_workers=self.max_workers),
+            queue_limit=self.max_workers + 1000,
+        )
+        if dest_folder.folder_type() == 'b2':
+            action_bucket = dest_folder.bucket
+        else:
+            action_bucket = source_folder.bucket
+        actions = plan.iter_actions(
+            source_folder, dest_folder, encryption_settings_provider, self.customize_action
+        )
+        for action in self._schedule_actions(actions):
+            sync_executor.submit(action.run, action_bucket, reporter, self.dry_run)
+        sync_executor.shutdown()
+        if sync_executor.get_num_exceptions() != 0:
+            raise IncompleteSync('sync is incomplete')
+
+    def _make_folder_sync_actions(self, *args, **kwargs):
+        actions = self._make_compared_folder_sync_actions(*args, **kwargs)
+        actions = self._schedule_actions(actions)
+        if self.plan_writer is None:
+            yield from actions
+            return
+        for action in actions:
+            self.plan_writer.write(action)
+            yield action
+        self.plan_writer.finish()
+
+    def _schedule_actions(self, actions):
+        actions = ActionScheduler(self.schedule).schedule_actions(actions)
+        if self.events is None:
+            return actions
+        return (report_events(action, self.events) for action in actions)
+
+    def _make_compared_folder_sync_actions(
+        self,
+        source_folder,
+        dest_folder,
+        now_millis,
+        reporter,
+        policies_manager=DEFAULT_SCAN_MANAGER,
+        encryption_settings_provider=SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    ):
+        """
+        Mirror ``Synchronizer._make_folder_sync_actions``, hashing the local files ahead of
+        the comparisons when comparing by sha1, and matching uploads with the destination
+        files when copying existing files.
+        """
+        if not self.compare_sha1 and not self.copy_existing:
+            yield from super()._make_folder_sync_actions(
+                source_folder,
+                dest_folder,
+                now_millis,
+                reporter,
+                policies_manager,
+                encryption_settings_provider,
+            )
+            return
+
+        if (
+            self.keep_days_or_delete == KeepOrDeleteMode.KEEP_BEFORE_DELETE
+            and dest_folder.folder_type() == 'local'
+        ):
+            raise InvalidArgument('keep_days_or_delete', 'cannot be used for local files')
+
+        source_type = source_folder.folder_type()
+        dest_type = dest_folder.folder_type()
+        sync_type = f'{source_type}-to-{dest_type}'
+        if source_type != 'b2' and dest_type != 'b2':
+            raise ValueError('Sync between two local folders is not supported!')
+
+        actions = self._make_compared_actions(
+            sync_type,
+            source_folder,
+            dest_folder,
+            now_millis,
+            reporter,
+            policies_manager,
+            encryption_settings_provider,
+        )
+        if self.copy_existing and sync_type == 'local-to-b2':
+            copy_matcher = CopyMatcher(self.local_hasher)
+            copy_matcher.index_folder(dest_folder, reporter)
+            actions = copy_matcher.match(actions)
+
+        total_files = 0
+        total_bytes = 0
+        for action in actions:
+            total_files += 1
+            total_bytes += action.get_bytes()
+            yield action
+
+        if reporter is not None:
+            if source_type == 'b2':
+                reporter.end_total()
+            reporter.end_compare(total_files, total_bytes)
+
+    def _make_compared_actions(
+        self,
+        sync_type,
+        source_folder,
+        dest_folder,
+        now_millis,
+        reporter,
+        policies_manager,
+        encryption_settings_provider,
+    ):
+        pairs = zip_folders(source_folder, dest_folder, reporter, policies_manager)
+        if self.compare_sha1:
+            pairs = hash_ahead(pairs, self.local_hasher)
+        for source_path, dest_path in pairs:
+            if source_path is not None:
+                if sync_type.startswith('b2-'):
+                    reporter.update_total(1)
+                reporter.update_compare(1)
+
+            yield from self._make_file_sync_actions(
+                sync_type,
+                source_path,
+                dest_path,
+                source_folder,
+                dest_folder,
+                now_millis,
+                encryption_settings_provider,
+            )
+
+    def _make_file_sync_actions(self, sync_type, source_path, *args, **kwargs):
+        for action in super()._make_file_sync_actions(sync_type, source_path, *args, **kwargs):
+            yield self.customize_action(
+                action, content_sha1=getattr(source_path, 'content_sha1', None)
+            )
+
+    def customize_action(self, action, content_sha1: str | None = None):
+        """
+        Remake an upload of b2sdk as an upload of the CLI, with the options of the sync,
+        and record the hides and the deletions in the sync state, if there is one.
+
+        :param content_sha1: known sha1 of the uploaded file, if any
+        """
+        if isinstance(action, B2UploadAction):
+            return CliUploadAction.from_action(
+                action, options=self.upload_options, content_sha1=content_sha1
+            )
+        if self.sync_state is not None:
+            if isinstance(action, B2HideAction):
+                return add_hook(action, RecordHide(self.sync_state))
+            if isinstance(action, B2DeleteAction):
+                return add_hook(action, ForgetDeleted(self.sync_state))
+        return action
@@ -0,0 +1,289 @@
+######################################################################
+#
+# File: b2/_internal/_utils/sync_actions.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Sync actions customized by the CLI.
+
+b2sdk makes the actions of a sync, and the CLI changes them in two ways only.  Uploads are
+remade as a ``CliUploadAction``, which uploads the file with the options of the sync.  Any other
+change wraps the ``do_action`` of an action in a hook, added by ``add_hook``: a hook is called
+with the action, the ``do_action`` it wraps, the bucket and the reporter, and the hook added last
+runs first.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import functools
+import time
+from collections.abc import Callable
+
+from b2sdk.v3 import (
+    SRC_LAST_MODIFIED_MILLIS,
+    AbstractAction,
+    B2UploadAction,
+    Bucket,
+    FileVersion,
+    ProgressReport,
+    SyncFileReporter,
+    UploadSourceLocalFile,
+)
+
+from b2._internal._utils.buffer_pool import upload_unbound_stream
+from b2._internal._utils.compression import (
+    ORIGINAL_SHA1_FILE_INFO_KEY,
+    ORIGINAL_SIZE_FILE_INFO_KEY,
+    CompressingReader,
+    hash_file,
+)
+from b2._internal._utils.mmap_upload import IO_MODE_BUFFERED, IO_MODE_MMAP, MmapUploadSource
+from b2._internal._utils.part_size import AdaptivePartSizer
+from b2._internal._utils.sync_state import SyncStateDb
+
+ActionHook = Callable[
+    [AbstractAction, Callable[[Bucket, ProgressReport], None], Bucket, ProgressReport], None
+]
+
+
+class HookedActionMixin:
+    """
+    Action mixin running the hooks of the action around its ``do_action``.
+    """
+
+    hooks: tuple[ActionHook, ...] = ()
+
+    def do_action(self, bucket: Bucket, reporter: ProgressReport) -> None:
+        self._run_hooks(0, bucket, reporter)
+
+    def _run_hooks(self, index: int, bucket: Bucket, reporter: ProgressReport) -> None:
+        if index == len(self.hooks):
+            super().do_action(bucket, reporter)
+            return
+        self.hooks[index](self, functools.partial(self._run_hooks, index + 1), bucket, reporter)
+
+
+def add_hook(action: AbstractAction, hook: ActionHook) -> AbstractAction:
+    """
+    Wrap the ``do_action`` of the action, and of the hooks added before, in ``hook``.
+    """
+    if not isinstance(action, HookedActionMixin):
+        action.__class__ = _hooked_action_class(type(action))
+    action.hooks = (hook, *action.hooks)
+    return action
+
+
+@functools.cache
+def _hooked_action_class(action_class: type) -> type:
+    return type(action_class.__name__, (HookedActionMixin, action_class), {})
+
+
+def has_hook(action: AbstractAction, hook_type: type) -> bool:
+    return any(isinstance(hook, hook_type) for hook in getattr(action, 'hooks', ()))
+
+
+@dataclasses.dataclass
+class UploadOptions:
+    """
+    Options of the uploads of a sync.
+
+    :param part_size: part size of large file uploads, ``None`` for the default one
+    :param part_sizer: sizer adapting part size of large file uploads to the measured throughput;
+                       takes precedence over ``part_size``
+    :param compression: compression algorithm to compress uploaded files with, ``None`` for no compression
+    :param compression_buffer_size: size of each of the ``COMPRESSION_BUFFERS_COUNT`` buffers
+                                    of a compressed upload, ``None`` for the part size
+    :param io_mode: how uploaded files are read, one of ``IO_MODES``; ignored when compressing
+    :param sync_state: database to record the uploaded file versions in
+    """
+
+    part_size: int | None = None
+    part_sizer: AdaptivePartSizer | None = None
+    compression: str | None = None
+    compression_buffer_size: int | None = None
+    io_mode: str = IO_MODE_BUFFERED
+    sync_state: SyncStateDb | None = None
+
+
+class CliUploadAction(B2UploadAction):
+    """
+    Upload action uploading the file, in full or, given the file version it replaces,
+    incrementally, like b2sdk's incremental uploads, with the options of the sync.
+
+    ``do_action`` mirrors ``B2UploadAction.do_action``, which offers no way to pass upload
+    parameters through, and drops the uploaded file version.  A compressed file is uploaded
+    as a stream, through two pooled buffers, since its compressed size is not known upfront,
+    and never incrementally.  Its original size and sha1 have to be in the file info before
+    the upload starts, so unless the sha1 is known, the file is read once more to hash it.
+    """
+
+    # one buffer filled by the compressor while the other one is uploaded; uploads of
+    # different files run in parallel already
+    COMPRESSION_BUFFERS_COUNT = 2
+
+    def __init__(
+        self,
+        *args,
+        file_version: FileVersion | None = None,
+        absolute_minimum_part_size: int | None = None,
+        options: UploadOptions | None = None,
+        content_sha1: str | None = None,
+    ):
+        super().__init__(*args)
+        self.file_version = file_version
+        self.absolute_minimum_part_size = absolute_minimum_part_size
+        self.options = options or UploadOptions()
+        # known sha1 of the file, which is then not read once more just to hash it for the upload
+        self.content_sha1 = content_sha1
+
+    @classmethod
+    def from_action(cls, upload: B2UploadAction, **kwargs) -> CliUploadAction:
+        """
+        Make the upload action of the CLI for an upload action of b2sdk.
+        """
+        return cls(
+            upload.local_full_path,
+            upload.relative_name,
+            upload.b2_file_name,
+            upload.mod_time_millis,
+            upload.size,
+            upload.encryption_settings_provider,
+            file_version=getattr(upload, 'file_version', None),
+            absolute_minimum_part_size=getattr(upload, 'absolute_minimum_part_size', None),
+            **kwargs,
+        )
+
+    @functools.cached_property
+    def upload_source(self) -> UploadSourceLocalFile:
+        if self.options.io_mode == IO_MODE_MMAP:
+            return MmapUploadSource(self.local_full_path, content_sha1=self.content_sha1)
+        return UploadSourceLocalFile(self.local_full_path, content_sha1=self.content_sha1)
+
+    def get_all_sources(self):
+        if self.file_version is None:
+            return [self.upload_source]
+        return self.upload_source.get_incremental_sources(
+            self.file_version, self.absolute_minimum_part_size
+        )
+
+    def get_part_size(self) -> int | None:
+        if self.options.part_sizer is not None:
+            return self.options.part_sizer.next_part_size(total_bytes=self.size)
+        return self.options.part_size
+
+    def record_result(self, file_version: FileVersion) -> None:
+        if self.options.sync_state is not None:
+            self.options.sync_state.record(self.relative_name, file_version)
+
+    def do_action(self, bucket: Bucket, reporter: ProgressReport) -> None:
+        if self.options.compression is not None:
+            file_version = self._upload_compressed(bucket, reporter)
+        else:
+            file_version = self._upload(bucket, reporter)
+        self.record_result(file_version)
+
+    def _upload(self, bucket: Bucket, reporter: ProgressReport) -> FileVersion:
+        file_info = {SRC_LAST_MODIFIED_MILLIS: str(self.mod_time_millis)}
+        encryption = self.encryption_settings_provider.get_setting_for_upload(
+            bucket=bucket,
+            b2_file_name=self.b2_file_name,
+            file_info=file_info,
+            length=self.size,
+        )
+
+        sources = self.get_all_sources()
+        large_file_sha1 = None
+        if len(sources) > 1:
+            # The upload will be incremental, calculate the large_file_sha1
+            large_file_sha1 = self.upload_source.get_content_sha1()
+
+        part_size = self.get_part_size()
+        started = time.monotonic()
+        with contextlib.ExitStack() as exit_stack:
+            progress_listener = None
+            if reporter:
+                progress_listener = exit_stack.enter_context(SyncFileReporter(reporter))
+            file_version = bucket.concatenate(
+                sources,
+                self.b2_file_name,
+                progress_listener=progress_listener,
+                file_info=file_info,
+                encryption=encryption,
+                large_file_sha1=large_file_sha1,
+                recommended_upload_part_size=part_size,
+            )
+        # only files split into a few parts say anything about the part size
+        if self.options.part_sizer is not None and self.size >= 2 * part_size:
+            self.options.part_sizer.record(part_size, self.size, time.monotonic() - started)
+        return file_version
+
+    def _upload_compressed(self, bucket: Bucket, reporter: ProgressReport) -> FileVersion:
+        if self.content_sha1 is not None:
+            original_size, original_sha1 = self.size, self.content_sha1
+        else:
+            original_size, original_sha1 = hash_file(self.local_full_path)
+        file_info = {
+            SRC_LAST_MODIFIED_MILLIS: str(self.mod_time_millis),
+            'b2-content-encoding': self.options.compression,
+            ORIGINAL_SIZE_FILE_INFO_KEY: str(original_size),
+            ORIGINAL_SHA1_FILE_INFO_KEY: original_sha1,
+        }
+        encryption = self.encryption_settings_provider.get_setting_for_upload(
+            bucket=bucket,
+            b2_file_name=self.b2_file_name,
+            file_info=file_info,
+            length=self.size,
+        )
+
+        with contextlib.ExitStack() as exit_stack:
+            progress_listener = None
+            if reporter:
+                progress_listener = exit_stack.enter_context(SyncFileReporter(reporter))
+            local_file = exit_stack.enter_context(open(self.local_full_path, 'rb'))
+            compressed_stream = exit_stack.enter_context(
+                CompressingReader(local_file, self.options.compression)
+            )
+            return upload_unbound_stream(
+                bucket,
+                compressed_stream,
+                self.b2_file_name,
+                buffers_count=self.COMPRESSION_BUFFERS_COUNT,
+                buffer_size=self.options.compression_buffer_size,
+                recommended_upload_part_size=self.get_part_size(),
+                progress_listener=progress_listener,
+                content_type=None,
+                file_info=file_info,
+                encryption=encryption,
+            )
+
+
+@dataclasses.dataclass(frozen=True)
+class RecordHide:
+    """
+    Hook of hide actions hiding the file themselves, to record the hide marker,
+    which b2sdk drops.
+    """
+
+    sync_state: SyncStateDb
+
+    def __call__(self, action, do_action, bucket: Bucket, reporter: ProgressReport) -> None:
+        self.sync_state.record(action.relative_name, bucket.hide_file(action.b2_file_name))
+
+
+@dataclasses.dataclass(frozen=True)
+class ForgetDeleted:
+    """
+    Hook of delete actions forgetting the deleted version, if it was the recorded one.
+    """
+
+    sync_state: SyncStateDb
+
+    def __call__(self, action, do_action, bucket: Bucket, reporter: ProgressReport) -> None:
+        do_action(bucket, reporter)
+        self.sync_state.forget(action.relative_name, action.file_id)
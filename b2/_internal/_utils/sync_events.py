@@ -0,0 +1,200 @@
+######################################################################
+#
+# File: b2/_internal/_utils/sync_events.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Machine-readable events of a sync, for ``sync --events-jsonl``.
+
+Every event is a JSON object on a line of its own, with the time it happened at,
+in seconds since the epoch, in ``ts`` and its kind in ``event``:
+
+* ``sync_start``, ``sync_end`` - a sync of the source to the destination
+* ``scan`` - the end of the listing (``stage`` is ``list``) or of the comparison
+  (``stage`` is ``compare``) of the files
+* ``action_start``, ``action_finish`` - an action on a file, the latter with its bytes,
+  duration and outcome
+* ``retry`` - a request to B2 retried after a pause, with the file it was made for
+* ``error``, ``warning`` - a problem reported by the sync
+* ``progress`` - a periodic snapshot of the counts and the throughput of the sync
+
+Events are queued, and written by a background thread, so that actions never wait
+for the output.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from typing import TextIO
+
+from b2sdk.v3 import (
+    AbstractAction,
+    B2CopyAction,
+    B2DeleteAction,
+    B2DownloadAction,
+    B2HideAction,
+    B2UploadAction,
+    Bucket,
+    LocalDeleteAction,
+    ProgressReport,
+)
+
+from b2._internal._utils.copy_matching import ServerSideCopyAction
+from b2._internal._utils.scheduling import action_name
+from b2._internal._utils.sync_actions import add_hook
+
+# seconds between the progress snapshots
+PROGRESS_INTERVAL = 1.0
+
+# logger of the retries of requests to B2, and the message it logs them with
+RETRY_LOGGER_NAME = 'b2sdk._internal.b2http'
+RETRY_MESSAGE = 'Pausing thread for %i seconds because %s'
+
+# the subclasses go first
+_ACTION_OPS = (
+    (ServerSideCopyAction, 'server_copy'),
+    (B2UploadAction, 'upload'),
+    (B2DownloadAction, 'download'),
+    (B2CopyAction, 'copy'),
+    (B2HideAction, 'hide'),
+    (B2DeleteAction, 'delete'),
+    (LocalDeleteAction, 'local_delete'),
+)
+
+_STOP = object()
+
+# the action run by the current thread, which its retries are reported for
+_current = threading.local()
+
+
+def action_op(action: AbstractAction) -> str:
+    for action_class, op in _ACTION_OPS:
+        if isinstance(action, action_class):
+            return op
+    return type(action).__name__
+
+
+class SyncEventWriter:
+    """
+    Writer of the events of syncs to a text stream, from a background thread.
+
+    While ``snapshot`` is set, the writer calls it every ``interval`` seconds,
+    and writes what it returns as a ``progress`` event.
+    """
+
+    def __init__(self, stream: TextIO, interval: float = PROGRESS_INTERVAL):
+        self.stream = stream
+        self.interval = interval
+        self.snapshot: Callable[[], dict] | None = None
+        self._queue = queue.SimpleQueue()
+        self._retry_handler = RetryEventHandler(self)
+        self._retry_logger = logging.getLogger(RETRY_LOGGER_NAME)
+        self._retry_logger_level = self._retry_logger.level
+        self._thread = threading.Thread(target=self._write_events, name='sync-events', daemon=True)
+        self._thread.start()
+        if not self._retry_logger.isEnabledFor(logging.INFO):
+            self._retry_logger.setLevel(logging.INFO)
+        self._retry_logger.addHandler(self._retry_handler)
+
+    def emit(self, event: str, **fields) -> None:
+        self._queue.put({'ts': round(time.time(), 6), 'event': event, **fields})
+
+    def close(self) -> None:
+        self._retry_logger.removeHandler(self._retry_handler)
+        self._retry_logger.setLevel(self._retry_logger_level)
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write_events(self) -> None:
+        next_snapshot = time.monotonic() + self.interval
+        while True:
+            try:
+                event = self._queue.get(timeout=max(0.0, next_snapshot - time.monotonic()))
+            except queue.Empty:
+                snapshot = self.snapshot
+                if snapshot is not None:
+                    self.emit('progress', **snapshot())
+                next_snapshot = time.monotonic() + self.interval
+                continue
+            if event is _STOP:
+                break
+            self.stream.write(json.dumps(event) + '\n')
+            if self._queue.empty():
+                self.stream.flush()
+        self.stream.flush()
+
+
+class RetryEventHandler(logging.Handler):
+    """
+    Logging handler turning the retries b2sdk logs into ``retry`` events.
+    """
+
+    def __init__(self, events: SyncEventWriter):
+        super().__init__(logging.INFO)
+        self.events = events
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.msg != RETRY_MESSAGE:
+            return
+        delay, reason = record.args
+        self.events.emit('retry', file=getattr(_current, 'file', None), delay=delay, reason=reason)
+
+
+@dataclasses.dataclass(frozen=True)
+class ReportEvents:
+    """
+    Hook of actions reporting the start and the finish of the action.
+    """
+
+    events: SyncEventWriter
+
+    def __call__(self, action, do_action, bucket: Bucket, reporter: ProgressReport) -> None:
+        op = action_op(action)
+        name = action_name(action)
+        size = action.get_bytes()
+        self.events.emit('action_start', op=op, file=name, bytes=size)
+        _current.file = name
+        started = time.monotonic()
+        try:
+            do_action(bucket, reporter)
+        except Exception as e:
+            self.events.emit(
+                'action_finish',
+                op=op,
+                file=name,
+                bytes=size,
+                duration=round(time.monotonic() - started, 6),
+                ok=False,
+                error=repr(e),
+            )
+            raise
+        finally:
+            _current.file = None
+        self.events.emit(
+            'action_finish',
+            op=op,
+            file=name,
+            bytes=size,
+            duration=round(time.monotonic() - started, 6),
+            ok=True,
+        )
+
+
+def report_events(action: AbstractAction, events: SyncEventWriter) -> AbstractAction:
+    return add_hook(action, ReportEvents(events))
@@ -0,0 +1,386 @@
+######################################################################
+#
+# File: b2/_internal/_utils/sync_plan.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Sync plans, for ``sync --plan-out`` and ``sync --apply-plan``.
+
+A plan is the list of the actions a sync would take, written as it is computed, so that
+it can be reviewed and then applied without scanning and comparing the folders again.
+It is a JSON Lines file: a header naming the synced folders, one line per action, in
+the order they are scheduled in, and a trailer with the totals, which a complete plan
+ends with.
+
+Applying an action checks that the local file it reads, overwrites or deletes still has
+the modification time and size it had when the plan was made.  B2 files are not looked up
+again: downloads, copies and deletions name the exact file versions, and fail if those
+are gone.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+from collections.abc import Callable, Iterator
+
+from b2sdk.v3 import (
+    AbstractAction,
+    AbstractSyncEncryptionSettingsProvider,
+    B2CopyAction,
+    B2DeleteAction,
+    B2DownloadAction,
+    B2HideAction,
+    B2Path,
+    B2UploadAction,
+    Bucket,
+    EncryptionSettingFactory,
+    FileVersion,
+    LocalDeleteAction,
+    ProgressReport,
+)
+
+from b2._internal._utils.copy_matching import ServerSideCopyAction, wait_for_copies
+from b2._internal._utils.sync_actions import CliUploadAction, add_hook
+
+PLAN_FORMAT_VERSION = 1
+
+
+class SyncPlanError(Exception):
+    pass
+
+
+class PlanPreconditionFailed(SyncPlanError):
+    pass
+
+
+def folder_uri(folder) -> str:
+    """
+    Return the absolute path of a local folder, or the ``b2://`` URI of a B2 folder.
+    """
+    if folder.folder_type() == 'local':
+        return folder.root
+    return f'b2://{folder.bucket_name}/{folder.folder_name}'
+
+
+def _local_state(path: str) -> list[int] | None:
+    try:
+        file_stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [int(file_stat.st_mtime * 1000), file_stat.st_size]
+
+
+def _encode_version(file_version: FileVersion) -> dict:
+    encryption = file_version.server_side_encryption
+    return {
+        'id': file_version.id_,
+        'name': file_version.file_name,
+        'size': file_version.size,
+        'sha1': file_version.content_sha1,
+        'info': file_version.file_info,
+        'content_type': file_version.content_type,
+        'uploaded': file_version.upload_timestamp,
+        'action': file_version.action,
+        # keys of SSE-C are never written down, they come with the options of the sync
+        'encryption': {
+            'mode': encryption.mode.value,
+            'algorithm': encryption.algorithm.value if encryption.algorithm else None,
+        },
+    }
+
+
+def _decode_version(record: dict, bucket: Bucket) -> FileVersion:
+    return FileVersion(
+        api=bucket.api,
+        id_=record['id'],
+        file_name=record['name'],
+        size=record['size'],
+        content_type=record['content_type'],
+        content_sha1=record['sha1'],
+        file_info=record['info'],
+        upload_timestamp=record['uploaded'],
+        account_id=None,
+        bucket_id=bucket.id_,
+        action=record['action'],
+        content_md5=None,
+        server_side_encryption=EncryptionSettingFactory.from_file_version_dict(
+            {'serverSideEncryption': record['encryption']}
+        ),
+    )
+
+
+def _encode_upload(upload: B2UploadAction) -> dict:
+    record = {
+        'op': 'upload',
+        'name': upload.relative_name,
+        'b2_name': upload.b2_file_name,
+        'path': upload.local_full_path,
+        'mtime': upload.mod_time_millis,
+        'size': upload.size,
+    }
+    # incremental uploads append to the file version they replace
+    if getattr(upload, 'file_version', None) is not None:
+        record['version'] = _encode_version(upload.file_version)
+        record['min_part_size'] = upload.absolute_minimum_part_size
+    return record
+
+
+def encode_action(action: AbstractAction) -> dict:
+    """
+    Return the plan record of a sync action.
+    """
+    if isinstance(action, ServerSideCopyAction):
+        return {
+            **_encode_upload(action.upload),
+            'op': 'server_copy',
+            'from': _encode_version(action.source_version),
+        }
+    if isinstance(action, B2UploadAction):
+        return _encode_upload(action)
+    if isinstance(action, B2DownloadAction):
+        return {
+            'op': 'download',
+            'name': action.source_path.relative_path,
+            'b2_name': action.b2_file_name,
+            'path': action.local_full_path,
+            'version': _encode_version(action.source_path.selected_version),
+            'local': _local_state(action.local_full_path),
+        }
+    if isinstance(action, B2CopyAction):
+        return {
+            'op': 'copy',
+            'name': action.source_path.relative_path,
+            'b2_name': action.b2_file_name,
+            'dest_b2_name': action.dest_b2_file_name,
+            'version': _encode_version(action.source_path.selected_version),
+        }
+    if isinstance(action, B2HideAction):
+        return {'op': 'hide', 'name': action.relative_name, 'b2_name': action.b2_file_name}
+    if isinstance(action, B2DeleteAction):
+        return {
+            'op': 'delete',
+            'name': action.relative_name,
+            'b2_name': action.b2_file_name,
+            'id': action.file_id,
+            'note': action.note,
+        }
+    if isinstance(action, LocalDeleteAction):
+        return {
+            'op': 'local_delete',
+            'name': action.relative_name,
+            'path': action.full_path,
+            'local': _local_state(action.full_path),
+        }
+    raise SyncPlanError(f'cannot plan {action}')
+
+
+class SyncPlanWriter:
+    """
+    Writer of a sync plan to ``path``, an action at a time.
+
+    The plan is complete once ``finish`` wrote its trailer.
+    """
+
+    def __init__(self, path: str, source_uri: str, destination_uri: str):
+        self.path = path
+        self.files = 0
+        self.bytes = 0
+        self._file = open(path, 'w', encoding='ascii')
+        self._write(
+            {'plan': PLAN_FORMAT_VERSION, 'source': source_uri, 'destination': destination_uri}
+        )
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def write(self, action: AbstractAction) -> None:
+        self._write(encode_action(action))
+        self.files += 1
+        self.bytes += action.get_bytes()
+
+    def finish(self) -> None:
+        self._write({'end': True, 'files': self.files, 'bytes': self.bytes})
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@dataclasses.dataclass
+class CheckPlanned:
+    """
+    Hook of actions checking that a local file is in the state the plan was made with.
+    """
+
+    path: str
+    state: list[int] | None
+
+    def __call__(self, action, do_action, bucket: Bucket, reporter: ProgressReport) -> None:
+        if _local_state(self.path) != self.state:
+            raise PlanPreconditionFailed(f'{self.path} changed since the plan was made')
+        do_action(bucket, reporter)
+
+
+def _check_planned(action: AbstractAction, path: str, state: list[int] | None) -> AbstractAction:
+    return add_hook(action, CheckPlanned(path, state))
+
+
+class SyncPlanReader:
+    """
+    Reader of a sync plan from ``path``.
+
+    The header and the trailer are read upfront, so that an incomplete plan is rejected
+    before any of its actions is taken.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            header = self._parse(self._file.readline())
+            if header.get('plan') != PLAN_FORMAT_VERSION:
+                raise SyncPlanError(f'{path} is not a sync plan of a supported version')
+            try:
+                trailer = self._parse(_read_last_line(self._file))
+            except SyncPlanError:
+                trailer = {}  # the plan was cut short in the middle of a line
+            if not trailer.get('end'):
+                raise SyncPlanError(f'{path} is incomplete')
+        except BaseException:
+            self._file.close()
+            raise
+        self.source_uri = header['source']
+        self.destination_uri = header['destination']
+        self.files = trailer['files']
+        self.bytes = trailer['bytes']
+
+    def _parse(self, line: bytes) -> dict:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise SyncPlanError(f'{self.path} is not a sync plan')
+        if not isinstance(record, dict):
+            raise SyncPlanError(f'{self.path} is not a sync plan')
+        return record
+
+    def iter_actions(
+        self,
+        source_folder,
+        dest_folder,
+        encryption_settings_provider: AbstractSyncEncryptionSettingsProvider,
+        customize_action: Callable[[AbstractAction], AbstractAction],
+    ) -> Iterator[AbstractAction]:
+        """
+        Yield the actions of the plan, customized by ``customize_action``.
+        """
+        source_bucket = source_folder.bucket if source_folder.folder_type() == 'b2' else None
+        dest_bucket = dest_folder.bucket if dest_folder.folder_type() == 'b2' else None
+        copies_by_file_id: dict[str, list[ServerSideCopyAction]] = {}
+        self._file.seek(0)
+        self._file.readline()  # the header
+        for line in self._file:
+            record = self._parse(line)
+            if record.get('end'):
+                return
+            op = record['op']
+            if op in ('upload', 'server_copy'):
+                action = customize_action(
+                    self._make_upload(record, dest_bucket, encryption_settings_provider)
+                )
+                if op == 'server_copy':
+                    action = ServerSideCopyAction(
+                        action, _decode_version(record['from'], dest_bucket)
+                    )
+                    copies_by_file_id.setdefault(action.source_version.id_, []).append(action)
+                yield _check_planned(action, record['path'], [record['mtime'], record['size']])
+            elif op == 'download':
+                source_path = self._make_b2_path(record, source_bucket)
+                action = B2DownloadAction(
+                    source_path, record['b2_name'], record['path'], encryption_settings_provider
+                )
+                yield _check_planned(customize_action(action), record['path'], record['local'])
+            elif op == 'copy':
+                action = B2CopyAction(
+                    record['b2_name'],
+                    self._make_b2_path(record, source_bucket),
+                    record['dest_b2_name'],
+                    source_bucket,
+                    dest_bucket,
+                    encryption_settings_provider,
+                )
+                yield customize_action(action)
+            elif op == 'hide':
+                yield customize_action(B2HideAction(record['name'], record['b2_name']))
+            elif op == 'delete':
+                action = customize_action(
+                    B2DeleteAction(record['name'], record['b2_name'], record['id'], record['note'])
+                )
+                if record['id'] in copies_by_file_id:
+                    action = wait_for_copies(action, copies_by_file_id[record['id']])
+                yield action
+            elif op == 'local_delete':
+                action = customize_action(LocalDeleteAction(record['name'], record['path']))
+                yield _check_planned(action, record['path'], record['local'])
+            else:
+                raise SyncPlanError(f'unknown action {op!r} in {self.path}')
+
+    def _make_upload(
+        self,
+        record: dict,
+        dest_bucket: Bucket,
+        encryption_settings_provider: AbstractSyncEncryptionSettingsProvider,
+    ) -> B2UploadAction:
+        args = (
+            record['path'],
+            record['name'],
+            record['b2_name'],
+            record['mtime'],
+            record['size'],
+            encryption_settings_provider,
+        )
+        if 'version' in record:
+            # incremental uploads append to the file version they replace
+            return CliUploadAction(
+                *args,
+                file_version=_decode_version(record['version'], dest_bucket),
+                absolute_minimum_part_size=record['min_part_size'],
+            )
+        return B2UploadAction(*args)
+
+    def _make_b2_path(self, record: dict, bucket: Bucket) -> B2Path:
+        file_version = _decode_version(record['version'], bucket)
+        return B2Path(record['name'], selected_version=file_version, all_versions=[file_version])
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_last_line(file, chunk_size: int = 4096) -> bytes:
+    file.seek(0, os.SEEK_END)
+    position = file.tell()
+    data = b''
+    # the last line ends with a newline, so two of them delimit it
+    while position > 0 and data.count(b'\n') < 2:
+        step = min(chunk_size, position)
+        position -= step
+        file.seek(position)
+        data = file.read(step) + data
+    return data.rstrip(b'\n').rsplit(b'\n', 1)[-1]
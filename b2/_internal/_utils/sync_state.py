@@ -0,0 +1,265 @@
+######################################################################
+#
+# File: b2/_internal/_utils/sync_state.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Local database of the state of a B2 sync destination.
+
+Listing a destination with millions of files takes millions of ``b2_list_file_versions``
+results on every sync, even if only a few files changed.  Instead, the latest version
+of every file is recorded in an SQLite database, once from a full listing and then
+from the results of the sync actions, and later syncs read the destination from it.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+
+from b2sdk.v3 import (
+    LARGE_FILE_SHA1,
+    B2Api,
+    EncryptionMode,
+    EncryptionSetting,
+    FileVersion,
+)
+
+from b2._internal._utils.b2_listing import ShardedB2Folder
+
+UNKNOWN_ENCRYPTION = EncryptionSetting(mode=EncryptionMode.UNKNOWN)
+
+
+class SyncStateDb:
+    """
+    SQLite database of the latest file versions of one B2 folder.
+
+    The database may hold several folders, identified by their ``b2://`` URI.
+    Writes come from the sync threads, so they go through a single, locked connection
+    and are committed in batches; ``close`` commits the rest.
+
+    A database of an older ``SCHEMA_VERSION`` is emptied, so the next sync of every folder
+    lists it in full.
+    """
+
+    COMMIT_EVERY = 1000
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path: str, folder_uri: str):
+        self.path = path
+        self.folder_uri = folder_uri
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._connection = self._connect()
+        with self._connection:
+            (schema_version,) = self._connection.execute('PRAGMA user_version').fetchone()
+            if schema_version != self.SCHEMA_VERSION:
+                self._connection.execute('DROP TABLE IF EXISTS folder')
+                self._connection.execute('DROP TABLE IF EXISTS file')
+                self._connection.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS folder (
+                    uri TEXT PRIMARY KEY,
+                    full_listing_millis INTEGER
+                )
+                """
+            )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file (
+                    folder TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mod_time_millis INTEGER NOT NULL,
+                    upload_timestamp INTEGER NOT NULL,
+                    sha1 TEXT,
+                    file_info TEXT NOT NULL,
+                    PRIMARY KEY (folder, name)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL lets ``iter_files`` read a consistent snapshot while the sync records its results
+        connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+    def get_full_listing_millis(self) -> int | None:
+        """
+        Return the time of the last complete full listing of the folder, ``None`` if there was none.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT full_listing_millis FROM folder WHERE uri = ?', (self.folder_uri,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def start_full_listing(self) -> None:
+        """
+        Forget all files of the folder, which are about to be recorded again from a full listing.
+
+        Until ``finish_full_listing`` is called, the folder has no complete listing.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM folder WHERE uri = ?', (self.folder_uri,))
+            self._connection.execute('DELETE FROM file WHERE folder = ?', (self.folder_uri,))
+
+    def finish_full_listing(self, listing_millis: int) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO folder (uri, full_listing_millis) VALUES (?, ?)',
+                (self.folder_uri, listing_millis),
+            )
+            self._uncommitted = 0
+
+    def record(self, relative_name: str, file_version: FileVersion) -> None:
+        """
+        Record ``file_version`` as the latest version of the file.
+        """
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO file VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    self.folder_uri,
+                    relative_name,
+                    file_version.id_,
+                    file_version.action,
+                    file_version.size,
+                    file_version.mod_time_millis,
+                    file_version.upload_timestamp,
+                    _known_sha1(file_version),
+                    # compressed files keep their original size and sha1 in there
+                    json.dumps(file_version.file_info or {}, separators=(',', ':')),
+                ),
+            )
+            self._count_write()
+
+    def forget(self, relative_name: str, file_id: str) -> None:
+        """
+        Forget the file, if ``file_id`` is the version recorded for it.
+        """
+        with self._lock:
+            self._connection.execute(
+                'DELETE FROM file WHERE folder = ? AND name = ? AND id = ?',
+                (self.folder_uri, relative_name, file_id),
+            )
+            self._count_write()
+
+    def _count_write(self) -> None:
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_EVERY:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    def iter_files(self) -> Iterator[tuple]:
+        """
+        Yield the recorded files as
+        ``(name, id, action, size, mod_time_millis, upload_timestamp, sha1, file_info)``,
+        in the order of B2 listings, i.e. by the UTF-8 bytes of their names.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._uncommitted = 0
+        connection = self._connect()
+        try:
+            yield from connection.execute(
+                """
+                SELECT name, id, action, size, mod_time_millis, upload_timestamp, sha1, file_info
+                FROM file WHERE folder = ? ORDER BY name
+                """,
+                (self.folder_uri,),
+            )
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _known_sha1(file_version: FileVersion) -> str | None:
+    # large files have no sha1 of their own, unless given one in their file info
+    if file_version.content_sha1 in (None, 'none'):
+        return file_version.file_info.get(LARGE_FILE_SHA1)
+    return file_version.content_sha1
+
+
+class StateDbB2Folder(ShardedB2Folder):
+    """
+    B2 folder reading its files from a ``SyncStateDb``.
+
+    With ``full_listing`` set, the folder is listed in B2 instead and the latest version
+    of every file is recorded in the database along the way.  Only latest versions are
+    recorded, so the files read from the database have no older versions.
+    """
+
+    def __init__(
+        self,
+        bucket_name: str,
+        folder_name: str,
+        api: B2Api,
+        state_db: SyncStateDb,
+        full_listing: bool = False,
+        list_threads: int = 1,
+    ):
+        super().__init__(bucket_name, folder_name, api, list_threads)
+        self.state_db = state_db
+        self.full_listing = full_listing
+
+    def get_file_versions(self):
+        if self.full_listing:
+            yield from self._list_and_record()
+            return
+        for (
+            name,
+            id_,
+            action,
+            size,
+            mod_time_millis,
+            upload_timestamp,
+            sha1,
+            file_info,
+        ) in self.state_db.iter_files():
+            yield FileVersion(
+                api=self.api,
+                id_=id_,
+                file_name=self.prefix + name,
+                size=size,
+                content_type=None,
+                content_sha1=sha1,
+                file_info=json.loads(file_info),
+                upload_timestamp=upload_timestamp,
+                account_id=None,
+                bucket_id=self.bucket.id_,
+                action=action,
+                content_md5=None,
+                server_side_encryption=UNKNOWN_ENCRYPTION,
+            )
+
+    def _list_and_record(self):
+        self.state_db.start_full_listing()
+        current_name = None
+        for file_version in super().get_file_versions():
+            name = file_version.file_name[len(self.prefix) :]
+            # versions of a file are listed newest first
+            if name != current_name and file_version.action != 'start':
+                self.state_db.record(name, file_version)
+                current_name = name
+            yield file_version
@@ -11,12 +11,15 @@ from __future__ import annotations
 
 import dataclasses
 import re
+import threading
 from collections.abc import Sequence
+from concurrent.futures import Future
 from functools import singledispatchmethod
 from pathlib import Path
 
 from b2sdk.v3 import (
     B2Api,
+    Bucket,
     DownloadVersion,
     FileVersion,
     Filter,
@@ -237,3 +240,33 @@ class B2URIAdapter:
     def _(self, source: B2URI, destination: B2URI, *args, **kwargs):
         file_info = self.get_file_info_by_uri(source)
         return self.copy_by_uri(B2FileIdURI(file_info.id_), destination, *args, **kwargs)
+
+
+class CachingB2URIAdapter(B2URIAdapter):
+    """
+    B2URIAdapter looking each bucket up only once, for resolving many URIs at once.
+
+    A bucket, or the error of looking it up, is kept for the life of the adapter, and
+    threads asking for a bucket which is being looked up wait for that lookup.
+    """
+
+    def __init__(self, api: B2Api):
+        super().__init__(api)
+        self._buckets: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_bucket_by_name(self, bucket_name: str) -> Bucket:
+        with self._lock:
+            future = self._buckets.get(bucket_name)
+            lookup = future is None
+            if lookup:
+                future = self._buckets[bucket_name] = Future()
+        if lookup:
+            try:
+                future.set_result(self.api.get_bucket_by_name(bucket_name))
+            except Exception as error:
+                future.set_exception(error)
+        return future.result()
+
+    def get_file_info_by_name(self, bucket_name: str, file_name: str) -> DownloadVersion:
+        return self.get_bucket_by_name(bucket_name).get_file_info_by_name(file_name)
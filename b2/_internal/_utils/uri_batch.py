@@ -0,0 +1,109 @@
+######################################################################
+#
+# File: b2/_internal/_utils/uri_batch.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Resolution of many B2 URIs at once, for ``file info`` and ``file url`` with ``--stdin``
+or ``--from-file``.
+
+The URIs, one per line, are resolved by a pool of threads, which takes only as many of them
+from the input as it has room for.  A URI repeated in the input is resolved, and reported,
+only the first time.  The results come out in the order of the input or, if asked to,
+as they are resolved, so that a slow URI does not hold back the ones after it.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from b2sdk.v3.exception import B2Error
+
+
+@dataclass(frozen=True)
+class Resolution:
+    uri: str
+    result: object = None
+    error: str | None = None
+
+
+class UriBatch:
+    """
+    Resolution of URIs by ``resolve``, called by the threads of the pool with the text
+    of a URI.
+
+    A URI failing with one of ``errors``, by default a B2 error or a ``ValueError``,
+    as invalid URIs do, gets a resolution with the error, and the others go on.
+    """
+
+    def __init__(
+        self,
+        resolve: Callable[[str], object],
+        threads: int,
+        ordered: bool = True,
+        queue_size: int | None = None,
+        errors: tuple[type[Exception], ...] = (B2Error, ValueError),
+    ):
+        self.resolve = resolve
+        self.threads = threads
+        self.ordered = ordered
+        self.queue_size = queue_size or 2 * threads
+        self.errors = errors
+        self.duplicates = 0
+
+    def uris(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Yield the URIs of the lines, skipping blank lines and repeated URIs.
+        """
+        seen = set()
+        for line in lines:
+            uri = line.strip()
+            if not uri:
+                continue
+            if uri in seen:
+                self.duplicates += 1
+                continue
+            seen.add(uri)
+            yield uri
+
+    def run(self, lines: Iterable[str]) -> Iterator[Resolution]:
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            if self.ordered:
+                yield from self._run_ordered(executor, lines)
+            else:
+                yield from self._run_unordered(executor, lines)
+
+    def _run_ordered(self, executor, lines: Iterable[str]) -> Iterator[Resolution]:
+        pending: deque[Future] = deque()
+        for uri in self.uris(lines):
+            if len(pending) >= self.queue_size:
+                yield pending.popleft().result()
+            pending.append(executor.submit(self._resolve, uri))
+        while pending:
+            yield pending.popleft().result()
+
+    def _run_unordered(self, executor, lines: Iterable[str]) -> Iterator[Resolution]:
+        pending: set[Future] = set()
+        for uri in self.uris(lines):
+            if len(pending) >= self.queue_size:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(self._resolve, uri))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def _resolve(self, uri: str) -> Resolution:
+        try:
+            return Resolution(uri, result=self.resolve(uri))
+        except self.errors as error:
+            return Resolution(uri, error=str(error))
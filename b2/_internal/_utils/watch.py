@@ -0,0 +1,383 @@
+######################################################################
+#
+# File: b2/_internal/_utils/watch.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Watching of a local folder for changes, for ``sync --watch``.
+
+Changes are reported as paths relative to the watched folder: a changed file, or
+a directory which appeared, disappeared or was moved, with everything in it.
+On Linux they come from inotify; elsewhere, or when inotify cannot be used,
+the folder is scanned every few seconds and compared with the previous scan.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import dataclasses
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable, Iterator
+
+from b2sdk.v3 import DEFAULT_SCAN_MANAGER, B2Api, B2Folder, FileVersion, ScanPoliciesManager
+
+from b2._internal._utils.local_scan import ParallelLocalFolder
+
+logger = logging.getLogger(__name__)
+
+# how often a folder which cannot be watched with inotify is scanned for changes, by default
+DEFAULT_POLL_INTERVAL = 10
+# how long a batch of changes may keep growing while changes keep coming, at most
+MAX_BATCH_SECONDS = 60
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, length of the name
+
+
+@dataclasses.dataclass
+class Changes:
+    """
+    Paths which changed, relative to the watched folder, or a request to sync all of it.
+    """
+
+    paths: set[str] = dataclasses.field(default_factory=set)
+    full_sync: bool = False
+
+    def update(self, other: Changes) -> None:
+        self.paths |= other.paths
+        self.full_sync = self.full_sync or other.full_sync
+
+    def __bool__(self):
+        return bool(self.paths) or self.full_sync
+
+
+class InotifyWatcher:
+    """
+    Watcher of a local folder, and of its subdirectories, with inotify.
+
+    Symlinked and excluded directories are not watched, so changes in them are only
+    synced by the periodic full syncs.
+    """
+
+    def __init__(self, root: str, policies_manager: ScanPoliciesManager):
+        self.root = root
+        self.policies_manager = policies_manager
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise _os_error(root)
+        self._directories: dict[int, str] = {}  # relative paths of the watched directories
+        self._lost_watches = False
+        try:
+            self._watch_tree('')
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read(self, timeout: float) -> Changes:
+        """
+        Return the changes reported within ``timeout`` seconds, if any.
+        """
+        changes = Changes()
+        if self._lost_watches:
+            self._lost_watches = False
+            changes.full_sync = True
+        readable, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not readable:
+            return changes
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changes
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_length].rstrip(b'\0')
+            offset += name_length
+            self._handle_event(wd, mask, os.fsdecode(name), changes)
+        return changes
+
+    def _handle_event(self, wd: int, mask: int, name: str, changes: Changes) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # events were dropped, only a full sync can find out what they were about
+            changes.full_sync = True
+            return
+        if mask & IN_IGNORED:
+            self._directories.pop(wd, None)
+            return
+        directory = self._directories.get(wd)
+        if directory is None:
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            if directory == '':
+                # the watched folder itself is gone
+                changes.full_sync = True
+            return
+        if not name:
+            return
+        relative_path = f'{directory}/{name}' if directory else name
+        changes.paths.add(relative_path)
+        if mask & IN_ISDIR:
+            if mask & (IN_MOVED_FROM | IN_DELETE):
+                self._unwatch_tree(relative_path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(relative_path)
+
+    def _watch_tree(self, relative_path: str) -> None:
+        top = os.path.join(self.root, relative_path) if relative_path else self.root
+        for path, dir_names, _ in os.walk(top):
+            directory = os.path.relpath(path, self.root).replace(os.sep, '/')
+            if directory == '.':
+                directory = ''
+            if directory and self.policies_manager.should_exclude_local_directory(directory):
+                dir_names.clear()
+                continue
+            mask = WATCH_MASK
+            if not directory:
+                mask &= ~IN_DONT_FOLLOW  # the watched folder may be a symlink
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+            if wd < 0:
+                error = _os_error(path)
+                if not directory:
+                    raise error
+                dir_names.clear()
+                if error.errno == errno.ENOENT:
+                    continue  # removed already, which is reported by the event of its parent
+                if error.errno == errno.ENOSPC:
+                    logger.warning('cannot watch %s, the limit of inotify watches is reached', path)
+                # changes in the directory are missed, a full sync will find them
+                self._lost_watches = True
+                continue
+            self._directories[wd] = directory
+
+    def _unwatch_tree(self, relative_path: str) -> None:
+        prefix = relative_path + '/'
+        for wd, directory in list(self._directories.items()):
+            if directory == relative_path or directory.startswith(prefix):
+                del self._directories[wd]
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+
+class PollingWatcher:
+    """
+    Watcher of a local folder, which scans it every ``interval`` seconds.
+    """
+
+    def __init__(
+        self, folder: ParallelLocalFolder, policies_manager: ScanPoliciesManager, interval: float
+    ):
+        self.folder = folder
+        self.policies_manager = policies_manager
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next_scan = time.monotonic() + interval
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        return {
+            local_path.relative_path: (local_path.mod_time, local_path.size)
+            for local_path in self.folder.all_files(None, self.policies_manager)
+        }
+
+    def read(self, timeout: float) -> Changes:
+        """
+        Return the changes found by a scan, if one is due within ``timeout`` seconds.
+        """
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(timeout, 0))
+            return Changes()
+        time.sleep(max(wait, 0))
+        snapshot = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+        changed = {
+            relative_path
+            for relative_path in snapshot.keys() | self._snapshot.keys()
+            if snapshot.get(relative_path) != self._snapshot.get(relative_path)
+        }
+        self._snapshot = snapshot
+        return Changes(changed)
+
+
+def open_watcher(
+    folder: ParallelLocalFolder,
+    policies_manager: ScanPoliciesManager,
+    poll_interval: float | None = None,
+) -> InotifyWatcher | PollingWatcher:
+    """
+    Return an inotify watcher of the folder, or a polling one if inotify cannot be used or ``poll_interval`` is set.
+    """
+    if poll_interval is None:
+        try:
+            return InotifyWatcher(folder.root, policies_manager)
+        except OSError as e:
+            logger.warning('cannot watch %s with inotify, polling it instead: %s', folder.root, e)
+    return PollingWatcher(folder, policies_manager, poll_interval or DEFAULT_POLL_INTERVAL)
+
+
+def iter_batches(
+    watcher: InotifyWatcher | PollingWatcher,
+    debounce: float,
+    full_sync_interval: float | None,
+) -> Iterator[Changes]:
+    """
+    Yield batches of changes, forever.
+
+    A batch is yielded once no change came for ``debounce`` seconds, or once it has been
+    collected for ``MAX_BATCH_SECONDS``, so that a file written to all the time does not hold
+    back the others.  A full sync is requested every ``full_sync_interval`` seconds.
+    """
+    next_full_sync = None
+    if full_sync_interval:
+        next_full_sync = time.monotonic() + full_sync_interval
+    batch = Changes()
+    batch_started = last_change = None
+    while True:
+        now = time.monotonic()
+        if next_full_sync is not None and now >= next_full_sync:
+            batch.full_sync = True
+        if batch.full_sync or (
+            batch and (now - last_change >= debounce or now - batch_started >= MAX_BATCH_SECONDS)
+        ):
+            if batch.full_sync:
+                batch.paths.clear()
+                if full_sync_interval:
+                    next_full_sync = now + full_sync_interval
+            yield batch
+            batch = Changes()
+            batch_started = last_change = None
+            continue
+
+        timeout = debounce
+        if batch:
+            timeout = min(last_change + debounce, batch_started + MAX_BATCH_SECONDS) - now
+        elif next_full_sync is not None:
+            timeout = max(next_full_sync - now, 0)
+        changes = watcher.read(timeout)
+        if changes:
+            now = time.monotonic()
+            if not batch:
+                batch_started = now
+            last_change = now
+            batch.update(changes)
+
+
+class WatchedLocalFolder(ParallelLocalFolder):
+    """
+    Local folder, of which only the files at, and under, some paths are synced.
+    """
+
+    def __init__(self, root: str, threads: int, relative_paths: Iterable[str]):
+        super().__init__(root, threads)
+        self.relative_paths = set(relative_paths)
+
+    def all_files(self, reporter, policies_manager=DEFAULT_SCAN_MANAGER):
+        return self.some_files(reporter, policies_manager, self.relative_paths)
+
+
+class WatchedB2Folder(B2Folder):
+    """
+    B2 folder, of which only the files at, and under, some paths are listed.
+    """
+
+    def __init__(
+        self, bucket_name: str, folder_name: str, api: B2Api, relative_paths: Iterable[str]
+    ):
+        super().__init__(bucket_name, folder_name, api)
+        self.relative_paths = set(relative_paths)
+
+    def get_file_versions(self) -> Iterator[FileVersion]:
+        file_versions = {}
+        for relative_path in self.relative_paths:
+            file_name = self.prefix + relative_path
+            # a path can name a file, a folder, or both
+            for file_version in self.bucket.list_file_versions(file_name):
+                file_versions[file_version.id_] = file_version
+            for file_version, _ in self.bucket.ls(
+                file_name + '/', latest_only=False, recursive=True
+            ):
+                file_versions[file_version.id_] = file_version
+        # versions of a file are listed newest first, a stable sort keeps them so
+        yield from sorted(file_versions.values(), key=lambda file_version: file_version.file_name)
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.ENOSYS, 'inotify is only available on Linux')
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    try:
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except AttributeError:
+        raise OSError(errno.ENOSYS, 'inotify is not supported by the C library')
+    return libc
+
+
+def _os_error(path: str) -> OSError:
+    error_number = ctypes.get_errno()
+    return OSError(error_number, os.strerror(error_number), path)
@@ -142,6 +142,8 @@ B2.register_subcommand(GetUrl)
 B2.register_subcommand(MakeUrl)
 B2.register_subcommand(MakeFriendlyUrl)
 B2.register_subcommand(Sync)
+B2.register_subcommand(Pack)
+B2.register_subcommand(Unpack)
 B2.register_subcommand(UpdateBucket)
 B2.register_subcommand(UploadFile)
 B2.register_subcommand(UploadUnboundStream)
@@ -22,6 +22,7 @@ AUTOCOMPLETE.autocomplete_from_cache()
 
 import argparse
 import base64
+import collections
 import contextlib
 import csv
 import dataclasses
@@ -33,24 +34,29 @@ import json
 import locale
 import logging
 import logging.config
+import math
 import os
 import pathlib
 import platform
+import posixpath
 import queue
 import re
 import signal
+import sqlite3
 import subprocess
 import sys
 import threading
 import time
 import unicodedata
 from abc import ABCMeta, abstractmethod
+from collections.abc import Iterator
 from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from contextlib import suppress
 from enum import Enum
 from typing import Any, BinaryIO
 
 import b2sdk
+import platformdirs
 import requests
 import rst2ansi
 from b2sdk.v3 import (
@@ -60,6 +66,7 @@ from b2sdk.v3 import (
     B2_ACCOUNT_INFO_PROFILE_FILE,
     DEFAULT_MIN_PART_SIZE,
     DEFAULT_SCAN_MANAGER,
+    LARGE_FILE_SHA1,
     NO_RETENTION_BUCKET_SETTING,
     REALM_URLS,
     SRC_LAST_MODIFIED_MILLIS,
@@ -74,7 +81,9 @@ from b2sdk.v3 import (
     Bucket,
     BucketRetentionSetting,
     CompareVersionMode,
+    DoNothingProgressListener,
     DownloadedFile,
+    DownloadVersion,
     EncryptionAlgorithm,
     EncryptionKey,
     EncryptionMode,
@@ -85,16 +94,16 @@ from b2sdk.v3 import (
     KeepOrDeleteMode,
     LegalHold,
     LifecycleRule,
+    LocalFolder,
+    MtimeUpdatedFile,
     NewerFileSyncMode,
     ProgressReport,
     ReplicationConfiguration,
     ReplicationMonitor,
+    ReplicationReport,
     ReplicationRule,
     ReplicationSetupHelper,
     RetentionMode,
-    ScanPoliciesManager,
-    Synchronizer,
-    SyncReport,
     TqdmProgressListener,
     UploadMode,
     current_time_millis,
@@ -111,6 +120,7 @@ from b2sdk.v3 import (
 from b2sdk.v3.exception import (
     B2Error,
     BadFileInfo,
+    ChecksumMismatch,
     EmptyDirectory,
     FileNotPresent,
     MissingAccountData,
@@ -124,8 +134,11 @@ from tabulate import tabulate
 from b2._internal._cli.arg_parser_types import (
     parse_comma_separated_list,
     parse_default_retention_period,
+    parse_duration,
     parse_millis_from_float_timestamp,
+    parse_part_size,
     parse_range,
+    parse_size,
 )
 from b2._internal._cli.argcompleters import file_name_completer
 from b2._internal._cli.autocomplete_install import (
@@ -135,6 +148,7 @@ from b2._internal._cli.autocomplete_install import (
 )
 from b2._internal._cli.b2api import _get_b2api_for_profile, _get_inmemory_b2api
 from b2._internal._cli.b2args import (
+    B2ID_OR_FILE_LIKE_B2_URI_WITH_RANGE_ARG_TYPE,
     add_b2_bucket_uri_argument,
     add_b2_uri_argument,
     add_b2id_or_b2_bucket_uri_argument,
@@ -143,9 +157,11 @@ from b2._internal._cli.b2args import (
     add_b2id_or_file_like_b2_uri_or_bucket_name_argument,
     add_b2id_uri_argument,
     add_bucket_name_argument,
+    b2id_or_file_like_b2_uri,
     get_keyid_and_key_from_env_vars,
 )
 from b2._internal._cli.const import (
+    AUTO_PART_SIZE,
     B2_APPLICATION_KEY_ENV_VAR,
     B2_APPLICATION_KEY_ID_ENV_VAR,
     B2_CLI_DOCKER_ENV_VAR,
@@ -161,7 +177,80 @@ from b2._internal._cli.const import (
 from b2._internal._cli.obj_dumps import readable_yaml_dump
 from b2._internal._cli.obj_loads import validated_loads
 from b2._internal._cli.shell import detect_shell, resolve_short_call_name
-from b2._internal._utils.uri import B2URI, B2FileIdURI, B2URIAdapter, B2URIBase
+from b2._internal._utils.b2_listing import ShardedB2Folder
+from b2._internal._utils.buffer_pool import (
+    derive_memory_limited_settings,
+    upload_unbound_stream,
+)
+from b2._internal._utils.compiled_filters import (
+    CompiledFilterMatcher,
+    CompiledScanPoliciesManager,
+)
+from b2._internal._utils.compression import (
+    COMPRESSION_ALGORITHMS,
+    ORIGINAL_SHA1_FILE_INFO_KEY,
+    ORIGINAL_SIZE_FILE_INFO_KEY,
+    CompressingReader,
+    DecompressingWriter,
+    hash_file,
+)
+from b2._internal._utils.fan_out import SharedLocalScan
+from b2._internal._utils.large_file_cancel import CancelResult, UnfinishedLargeFilesCancel
+from b2._internal._utils.local_scan import ExternalSortLocalFolder, ParallelLocalFolder
+from b2._internal._utils.mmap_upload import (
+    IO_MODE_BUFFERED,
+    IO_MODE_MMAP,
+    IO_MODES,
+    upload_local_file,
+)
+from b2._internal._utils.pack import (
+    INDEX_FILE_NAME,
+    PACK_CONTENT_TYPE,
+    PACK_FILE_NAME_FORMAT,
+    MemberExtractingWriter,
+    PackIndex,
+    TarPackReader,
+    get_pack_file_name,
+    group_members,
+    load_index,
+    scan_local_folder,
+)
+from b2._internal._utils.part_copy import CopyRange, PartCopy, PartCopyError, plan_parts
+from b2._internal._utils.part_size import MAX_PART_SIZE, MAX_PARTS_COUNT, AdaptivePartSizer
+from b2._internal._utils.prefix_copy import PrefixCopy, RateLimiter, known_sha1
+from b2._internal._utils.replication_scan import MultiRuleReplicationScan
+from b2._internal._utils.replication_state import (
+    DEFAULT_SAMPLE_SIZE,
+    IncrementalReplicationScan,
+    ReplicationState,
+    ReplicationStateError,
+)
+from b2._internal._utils.scheduling import SCHEDULE_NAME, SCHEDULES
+from b2._internal._utils.sha1_compare import LocalHasher, Sha1Cache
+from b2._internal._utils.sync import CliSynchronizer, CliSyncReport
+from b2._internal._utils.sync_events import SyncEventWriter
+from b2._internal._utils.sync_plan import (
+    SyncPlanError,
+    SyncPlanReader,
+    SyncPlanWriter,
+    folder_uri,
+)
+from b2._internal._utils.sync_state import StateDbB2Folder, SyncStateDb
+from b2._internal._utils.uri import (
+    B2URI,
+    B2FileIdURI,
+    B2URIAdapter,
+    B2URIBase,
+    CachingB2URIAdapter,
+)
+from b2._internal._utils.uri_batch import UriBatch
+from b2._internal._utils.watch import (
+    Changes,
+    WatchedB2Folder,
+    WatchedLocalFolder,
+    iter_batches,
+    open_watcher,
+)
 from b2._internal.arg_parser import B2ArgumentParser, add_normalized_argument
 from b2._internal.class_registry import ClassRegistry
 from b2._internal.json_encoder import B2CliJsonEncoder
@@ -700,10 +789,22 @@ class FileIdAndOptionalFileNameMixin(Described):
         return file_info.file_name
 
 
+def _file_like_b2_uri(b2_uri: B2URIBase, by_id: bool | None = None) -> B2URIBase:
+    """
+    Check that a B2 URI parsed without knowing whether it should point to a file does.
+    """
+    try:
+        return b2id_or_file_like_b2_uri(str(b2_uri), by_id=by_id)
+    except ValueError as e:
+        raise CommandError(str(e))
+
+
 class B2URIFileArgMixin:
+    B2_URI_NARGS: str | None = None
+
     @classmethod
     def _setup_parser(cls, parser):
-        add_b2id_or_file_like_b2_uri_argument(parser)
+        add_b2id_or_file_like_b2_uri_argument(parser, nargs=cls.B2_URI_NARGS)
         super()._setup_parser(parser)
 
     def get_b2_uri_from_arg(self, args: argparse.Namespace) -> B2URIBase:
@@ -712,11 +813,12 @@ class B2URIFileArgMixin:
 
 class B2URIFileOrBucketNameFileNameArgMixin:
     SUPPORTS_B2_ID: bool = True
+    SUPPORTS_FOLDERS: bool = False
 
     @classmethod
     def _setup_parser(cls, parser):
         cls._b2_uri_arg = add_b2id_or_file_like_b2_uri_or_bucket_name_argument(
-            parser, by_id=cls.SUPPORTS_B2_ID
+            parser, by_id=cls.SUPPORTS_B2_ID, allow_folders=cls.SUPPORTS_FOLDERS
         )
         parser.add_argument('fileName', nargs='?', help=argparse.SUPPRESS)
         super()._setup_parser(parser)
@@ -827,6 +929,162 @@ class B2IDURIMixin:
         return args.B2_URI
 
 
+class CompressMixin(Described):
+    """
+    Use ``--compress gzip`` or ``--compress zstd`` to compress the data while uploading it.
+    The file is stored compressed, with the ``b2-content-encoding`` file info set accordingly,
+    so ``--content-encoding`` cannot be set to anything else.  For regular files, the size
+    and sha1 of the original data are stored in ``original_size`` and ``original_sha1`` file info.
+    ``zstd`` requires Python 3.14+ or the ``zstandard`` package.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser,
+            '--compress',
+            choices=COMPRESSION_ALGORITHMS,
+            default=None,
+            help='compress the data while uploading it',
+        )
+        super()._setup_parser(parser)  # noqa
+
+    def _set_content_encoding_from_compression(self, args) -> None:
+        if args.compress is None:
+            return
+        if args.content_encoding not in (None, args.compress):
+            raise CommandError(
+                f'--content-encoding {args.content_encoding} cannot be used with --compress {args.compress}'
+            )
+        if args.sha1 is not None:
+            raise CommandError('--sha1 cannot be used with --compress')
+        args.content_encoding = args.compress
+
+    def _file_info_with_original_data(self, local_file: str, file_info: dict | None) -> dict:
+        size, sha1 = hash_file(local_file)
+        return {
+            **(file_info or {}),
+            ORIGINAL_SIZE_FILE_INFO_KEY: str(size),
+            ORIGINAL_SHA1_FILE_INFO_KEY: sha1,
+        }
+
+    def _upload_stream(self, bucket, input_stream, compression: str | None, **kwargs):
+        with input_stream:
+            if compression is None:
+                return upload_unbound_stream(bucket, read_only_object=input_stream, **kwargs)
+            with CompressingReader(
+                input_stream, compression, threads=os.cpu_count() or 1
+            ) as compressed_stream:
+                return upload_unbound_stream(bucket, read_only_object=compressed_stream, **kwargs)
+
+
+class DecompressMixin(Described):
+    """
+    Use ``--decompress`` to decompress a file uploaded with ``--compress`` while downloading it,
+    according to its ``b2-content-encoding``.
+    If the file has ``original_sha1`` file info, the decompressed data is checked against it.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(parser, '--decompress', action='store_true', default=False)
+        super()._setup_parser(parser)  # noqa
+
+    def _save_decompressed(
+        self, downloaded_file: DownloadedFile, output_filepath: pathlib.Path
+    ) -> None:
+        download_version = downloaded_file.download_version
+        algorithm = download_version.content_encoding
+        if algorithm is None:
+            self._print_stderr('WARNING: File is not compressed, saving it as is.')
+            downloaded_file.save_to(output_filepath)
+            return
+        if algorithm not in COMPRESSION_ALGORITHMS:
+            raise CommandError(f'Cannot decompress content encoding {algorithm!r}')
+
+        if output_filepath == STDOUT_FILEPATH and platform.system() == 'Windows':
+            context = contextlib.nullcontext(sys.stdout.buffer)
+        elif output_filepath == STDOUT_FILEPATH or points_to_fifo(output_filepath):
+            context = open(output_filepath, 'wb')
+        else:
+            context = MtimeUpdatedFile(
+                output_filepath, mod_time_millis=download_version.mod_time_millis, mode='wb'
+            )
+        with context as output:
+            writer = DecompressingWriter(output, algorithm)
+            downloaded_file.save(writer, allow_seeking=False)
+            writer.finish()
+
+        expected_sha1 = download_version.file_info.get(ORIGINAL_SHA1_FILE_INFO_KEY)
+        if downloaded_file.check_hash and expected_sha1 and expected_sha1 != writer.sha1:
+            raise ChecksumMismatch(checksum_type='sha1', expected=expected_sha1, actual=writer.sha1)
+
+
+class MaxMemoryMixin(Described):
+    """
+    When uploading a stream, ``--max-memory`` caps the memory used by the upload buffers
+    (e.g. ``512M`` or ``2G``).
+    Part size and upload concurrency are derived from it: one buffer per upload thread plus
+    the one being filled from the stream, each of ``max-memory / buffers`` bytes,
+    with concurrency reduced if parts would otherwise get smaller than ``minPartSize``.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser,
+            '--max-memory',
+            type=parse_size,
+            default=None,
+            help='maximum memory used for upload buffers, in bytes or with a K, M, G, T suffix',
+        )
+        super()._setup_parser(parser)  # noqa
+
+
+class PartSizeMixin(Described):
+    """
+    Part size of large file uploads can be set with ``--part-size``, in bytes or with a K, M, G suffix.
+    With ``--part-size auto``, the throughput of uploaded parts is measured and the size of subsequent
+    parts is adjusted to maximize it, within the 5MB to 5GB range and the 10,000 parts limit of B2
+    Large Files.  The decisions are logged at debug level (see ``--verbose`` and ``--debug-logs``).
+    When uploading through memory buffers, parts are not grown beyond ``--max-memory`` allows;
+    without it, each of the buffers may grow to the size of the largest part.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser,
+            '--part-size',
+            type=parse_part_size,
+            default=None,
+            help='part size in bytes (must be in range of <minPartSize, 5GB>) or "auto"',
+        )
+        super()._setup_parser(parser)  # noqa
+
+
+class IoModeMixin(Described):
+    """
+    With ``--io-mode mmap``, regular files are read through memory mappings and their parts are handed
+    to hashing and to the network without being copied, which lowers CPU usage of large uploads.
+    It is meant for files which are not modified during the upload: a file modified before its part is mapped
+    is read the regular way instead, and a change of a mapped file fails the upload at the next read, but truncating
+    a file while its data is being hashed or sent kills the process with a bus error.
+    Streams, like named pipes or data read through memory buffers, are never mapped.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser,
+            '--io-mode',
+            choices=IO_MODES,
+            default=IO_MODE_BUFFERED,
+            help='how to read uploaded files',
+        )
+        super()._setup_parser(parser)  # noqa
+
+
 class UploadModeMixin(Described):
     """
     Use ``--incremental-mode`` to allow for incremental file uploads to safe bandwidth.  This will only affect files, which
@@ -911,6 +1169,71 @@ class ThreadsMixin(Described):
         self.api.services.upload_manager.set_thread_pool_size(threads)
 
 
+class UriBatchMixin(ThreadsMixin):
+    """
+    With ``--stdin`` or ``--from-file PATH``, B2 URIs are read from the standard input
+    or from the file instead, one per line, and resolved by a pool of threads; a URI
+    repeated in the input is resolved only once, and buckets are looked up only once.
+    For every URI, a JSON object is printed on a line of its own, with the URI in ``uri``
+    and what would be printed for it alone in ``result``, or why it could not be resolved
+    in ``error``.  The lines are printed in the order of the URIs in the input, or,
+    with ``--completion-order``, as soon as each URI is resolved.
+
+    {ThreadsMixin}
+
+    With ``--stdin`` or ``--from-file``, command returns 0 if all URIs were resolved
+    and a value different from 0 if any was not.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(parser, '--stdin', action='store_true')
+        add_normalized_argument(parser, '--from-file', metavar='PATH', default=None)
+        add_normalized_argument(parser, '--completion-order', action='store_true')
+        super()._setup_parser(parser)  # noqa
+
+    def _run(self, args):
+        if args.stdin or args.from_file is not None:
+            if args.stdin and args.from_file is not None:
+                raise CommandError('--stdin and --from-file cannot be used together')
+            if args.B2_URI is not None:
+                raise CommandError('B2_URI cannot be given with --stdin or --from-file')
+            return self._run_batch(args)
+        if args.B2_URI is None:
+            raise CommandError('B2_URI is required, unless --stdin or --from-file is given')
+        return super()._run(args)  # noqa
+
+    def _run_batch(self, args) -> int:
+        api = CachingB2URIAdapter(self.api.api)
+        batch = UriBatch(
+            lambda uri: self._resolve_uri(api, args, b2id_or_file_like_b2_uri(uri)),
+            self._get_threads_from_args(args),
+            ordered=not args.completion_order,
+            errors=(B2Error, ValueError, CommandError),
+        )
+        failed = False
+        with contextlib.ExitStack() as exit_stack:
+            if args.stdin:
+                lines = sys.stdin
+            else:
+                try:
+                    lines = exit_stack.enter_context(open(args.from_file, encoding='utf-8'))
+                except OSError as e:
+                    raise CommandError(f'cannot read {args.from_file}: {e}')
+            for resolution in batch.run(lines):
+                record = {'uri': resolution.uri}
+                if resolution.error is None:
+                    record['result'] = resolution.result
+                else:
+                    record['error'] = resolution.error
+                    failed = True
+                self._print(
+                    json.dumps(record, sort_keys=True, ensure_ascii=True, cls=B2CliJsonEncoder),
+                    enforce_output=True,
+                )
+        return 1 if failed else 0
+
+
 class _TqdmCloser:
     """
     On OSX using Tqdm with b2sdk causes semaphore leaks. This fix is located here and not in b2sdk, because after this
@@ -1433,7 +1756,7 @@ class AccountAuthorizeBase(Command):
         return os.environ.get(B2_ENVIRONMENT_ENV_VAR)
 
 
-class FileLargeUnfinishedCancelBase(Command):
+class FileLargeUnfinishedCancelBase(ThreadsMixin, Command):
     """
     When used with a b2id://fileId, cancels a large file upload.
     Cannot be used once the file is finished.  After finishing,
@@ -1441,7 +1764,22 @@ class FileLargeUnfinishedCancelBase(Command):
 
     When used with a b2://bucketName, lists all large files that
     have been started but not finished and cancels them.  Any parts
-    that have been uploaded will be deleted.
+    that have been uploaded will be deleted.  The files are canceled
+    by a pool of threads, and can be selected by the start of their
+    name, with the path of the URI, e.g. ``b2://bucketName/logs/``,
+    followed by ``--prefix``, and by their age with ``--older-than``,
+    e.g. ``--older-than 7d``; the age is given in seconds, minutes,
+    hours, days or weeks, with an ``s``, ``m``, ``h``, ``d`` or ``w`` suffix.
+
+    {ThreadsMixin}
+
+    The ``--dry-run`` option prints the files that would be canceled,
+    but cancels nothing.  With ``--count-parts``, the parts of every
+    file are listed before it is canceled, and the number of parts and
+    bytes reclaimed is printed at the end.
+
+    Command returns 0 if all files were canceled successfully and
+    a value different from 0 if any file was not.
 
     Requires capability:
 
@@ -1449,21 +1787,75 @@ class FileLargeUnfinishedCancelBase(Command):
     - **writeFiles**
     """
 
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser,
+            '--older-than',
+            type=parse_duration,
+            metavar='DURATION',
+            default=None,
+            help='cancel only files started longer than DURATION ago, e.g. 12h or 7d',
+        )
+        add_normalized_argument(
+            parser, '--prefix', default=None, help='cancel only files with names starting with it'
+        )
+        add_normalized_argument(parser, '--dry-run', action='store_true')
+        add_normalized_argument(parser, '--count-parts', action='store_true')
+        super()._setup_parser(parser)
+
     def _run(self, args):
         b2_uri = self.get_b2_uri_from_arg(args)
         if isinstance(b2_uri, B2FileIdURI):
+            if args.older_than is not None or args.prefix is not None or args.count_parts:
+                raise CommandError(
+                    '--older-than, --prefix and --count-parts require a b2:// URI of a bucket'
+                )
+            if args.dry_run:
+                self._print(b2_uri.file_id, 'would be canceled')
+                return 0
             self.api.cancel_large_file(b2_uri.file_id)
             self._print(b2_uri.file_id, 'canceled')
         elif isinstance(b2_uri, B2URI):
-            bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
-            for file_version in bucket.list_unfinished_large_files():
-                bucket.cancel_large_file(file_version.file_id)
-                self._print(file_version.file_id, 'canceled')
+            return self._cancel_all(args, b2_uri)
         else:
             self._print_stderr(f'ERROR: unsupported URI "{b2_uri}"')
             return 1
         return 0
 
+    def _cancel_all(self, args, b2_uri: B2URI) -> int:
+        bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
+        uploaded_before = None
+        if args.older_than is not None:
+            uploaded_before = int((time.time() - args.older_than.total_seconds()) * 1000)
+        cancel = UnfinishedLargeFilesCancel(
+            self.api,
+            bucket.id_,
+            self._get_threads_from_args(args),
+            prefix=b2_uri.path + (args.prefix or '') or None,
+            uploaded_before=uploaded_before,
+            count_parts=args.count_parts,
+            dry_run=args.dry_run,
+        )
+        status = 'would be canceled' if args.dry_run else 'canceled'
+
+        def report(result: CancelResult) -> None:
+            if result.error is not None:
+                self._print_stderr(
+                    f'Cancellation of file "{result.file.file_name}" ({result.file.file_id}) '
+                    f'failed: {result.error}'
+                )
+            else:
+                self._print(result.file.file_id, status)
+
+        cancel.run(report)
+        if args.count_parts:
+            self._print(
+                f'{cancel.files} large files {status}, {cancel.parts} parts and '
+                f'{cancel.bytes} bytes {"would be " if args.dry_run else ""}reclaimed'
+            )
+        return 1 if cancel.failed else 0
+
 
 class AccountClearBase(Command):
     """
@@ -1551,7 +1943,7 @@ class FileServerSideCopyBase(
     def get_destination_b2_uri(self, args) -> B2URI:
         raise NotImplementedError
 
-    def _run(self, args):
+    def _get_file_infos(self, args) -> dict | None:
         file_infos = None
         if args.info:
             file_infos = self._parse_file_infos(args.info)
@@ -1564,6 +1956,10 @@ class FileServerSideCopyBase(
                 '--metadata-directive is deprecated, the value of this argument is determined based on the existence of '
                 '--content-type and --info.'
             )
+        return file_infos
+
+    def _run(self, args):
+        file_infos = self._get_file_infos(args)
 
         source_b2_uri = self.get_source_b2_uri(args)
         destination_b2_uri = self.get_destination_b2_uri(args)
@@ -2005,6 +2401,7 @@ class DownloadCommand(
 class FileDownloadBase(
     ThreadsMixin,
     MaxDownloadStreamsMixin,
+    DecompressMixin,
     DownloadCommand,
 ):
     """
@@ -2016,6 +2413,7 @@ class FileDownloadBase(
     {WriteBufferSizeMixin}
     {SkipHashVerificationMixin}
     {MaxDownloadStreamsMixin}
+    {DecompressMixin}
 
     Requires capability:
 
@@ -2043,13 +2441,16 @@ class FileDownloadBase(
         self._print_download_info(downloaded_file, output_filepath)
         progress_listener.change_description(output_filepath.name)
 
-        downloaded_file.save_to(output_filepath)
+        if args.decompress:
+            self._save_decompressed(downloaded_file, output_filepath)
+        else:
+            downloaded_file.save_to(output_filepath)
         self._print('Download finished')
 
         return 0
 
 
-class FileCatBase(B2URIFileArgMixin, DownloadCommand):
+class FileCatBase(B2URIFileArgMixin, DecompressMixin, DownloadCommand):
     """
     Download content of a file-like object identified by B2 URI directly to stdout.
 
@@ -2057,23 +2458,63 @@ class FileCatBase(B2URIFileArgMixin, DownloadCommand):
     {SourceSseMixin}
     {WriteBufferSizeMixin}
     {SkipHashVerificationMixin}
+    {DecompressMixin}
+
+    With ``--member NAME``, the B2 URI has to point to the index of files packed
+    with ``{NAME} pack``, e.g. ``b2://bucketName/path/index.json``, and only the file
+    of given name is printed, fetched from its archive with a single ranged download.
+    The whole index is downloaded first, so for packs of millions of files, extracting
+    many of them with ``{NAME} unpack`` is faster than printing them one by one.
 
     Requires capability:
 
     - **readFiles**
     """
 
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser, '--member', metavar='NAME', help='name of a packed file to print'
+        )
+        super()._setup_parser(parser)
+
     def _run(self, args):
         target_filename = '-'
+        encryption_setting = self._get_source_sse_setting(args)
+        if args.member is not None:
+            return self._cat_member(args, encryption_setting)
         progress_listener = self.make_progress_listener(
             target_filename, args.no_progress or args.quiet
         )
-        encryption_setting = self._get_source_sse_setting(args)
         file_request = self.api.download_file_by_uri(
             args.B2_URI, progress_listener=progress_listener, encryption=encryption_setting
         )
         output_filepath = self.get_local_output_filepath(target_filename, file_request)
-        file_request.save_to(output_filepath)
+        if args.decompress:
+            self._save_decompressed(file_request, output_filepath)
+        else:
+            file_request.save_to(output_filepath)
+        return 0
+
+    def _cat_member(self, args, encryption_setting) -> int:
+        b2_uri = args.B2_URI
+        if not isinstance(b2_uri, B2URI):
+            raise CommandError('--member requires a b2:// URI of a pack index')
+        if args.decompress:
+            raise CommandError('--member cannot be used with --decompress')
+        index = load_index(self.api.download_file_by_uri(b2_uri, encryption=encryption_setting))
+        member = index.get_member(args.member)
+        if not member.size:
+            return 0
+        bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
+        progress_listener = self.make_progress_listener('-', args.no_progress or args.quiet)
+        file_request = bucket.download_file_by_name(
+            get_pack_file_name(b2_uri.path, index.packs[member.pack]),
+            progress_listener=progress_listener,
+            range_=(member.offset, member.offset + member.size - 1),
+            encryption=encryption_setting,
+        )
+        file_request.save_to(self.get_local_output_filepath('-', file_request))
         return 0
 
 
@@ -2166,10 +2607,15 @@ class FileInfoBase(Command):
 
     def _run(self, args):
         b2_uri = self.get_b2_uri_from_arg(args)
-        file_version = self.api.get_file_info_by_uri(b2_uri)
+        file_version = self._resolve_uri(self.api, args, b2_uri)
         self._print_json(file_version)
         return 0
 
+    def _resolve_uri(
+        self, api: B2URIAdapter, args, b2_uri: B2URIBase
+    ) -> FileVersion | DownloadVersion:
+        return api.get_file_info_by_uri(b2_uri)
+
 
 class BucketGetDownloadAuthBase(Command):
     """
@@ -2244,7 +2690,7 @@ class GetDownloadUrlWithAuthBase(Command):
         return 0
 
 
-class FileHideBase(Command):
+class HideFileBase(Command):
     """
     Upload a new, hidden, version of the given file.
 
@@ -2253,16 +2699,6 @@ class FileHideBase(Command):
     - **writeFiles**
     """
 
-    def _run(self, args):
-        b2_uri = self.get_b2_uri_from_arg(args)
-
-        bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
-        file_info = bucket.hide_file(b2_uri.path)
-        self._print_json(file_info)
-        return 0
-
-
-class HideFileBase(Command):
     @classmethod
     def _setup_parser(cls, parser):
         add_bucket_name_argument(parser)
@@ -2276,41 +2712,6 @@ class HideFileBase(Command):
         return 0
 
 
-class FileUnhideBase(Command):
-    """
-    Delete the "hide marker" for a given file.
-
-    Requires capability:
-
-    - **listFiles**
-    - **deleteFiles**
-
-    and optionally:
-
-    - **bypassGovernance**
-    """
-
-    @classmethod
-    def _setup_parser(cls, parser):
-        add_normalized_argument(parser, '--bypass-governance', action='store_true', default=False)
-        super()._setup_parser(parser)
-
-    def _run(self, args):
-        b2_uri = self.get_b2_uri_from_arg(args)
-
-        if isinstance(b2_uri, B2FileIdURI):
-            file_version = self.api.get_file_info_by_uri(b2_uri)
-            bucket = self.api.get_bucket_by_id(file_version.bucket_id)
-            file_name = file_version.file_name
-        else:
-            bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
-            file_name = b2_uri.path
-
-        file_id_and_name = bucket.unhide_file(file_name, args.bypass_governance)
-        self._print_json(file_id_and_name)
-        return 0
-
-
 class BucketListBase(Command):
     """
     List all of the buckets in the current account.
@@ -2475,11 +2876,20 @@ class FileLargeUnfinishedListBase(Command):
         return 0
 
 
-class AbstractLsCommand(Command, metaclass=ABCMeta):
+class VersionsMixin(Described):
     """
     The ``--versions`` option selects all versions of each file, not
     just the most recent.
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        parser.add_argument('--versions', action='store_true')
+        super()._setup_parser(parser)  # noqa
 
+
+class AbstractLsCommand(Command, metaclass=ABCMeta):
+    """
     The ``--recursive`` option will descend into folders, and will select
     only files, not folders.
 
@@ -2497,7 +2907,6 @@ class AbstractLsCommand(Command, metaclass=ABCMeta):
 
     @classmethod
     def _setup_parser(cls, parser):
-        parser.add_argument('--versions', action='store_true')
         parser.add_argument('-r', '--recursive', action='store_true')
         add_normalized_argument(parser, '--with-wildcard', action='store_true')
         parser.add_argument(
@@ -2525,16 +2934,27 @@ class AbstractLsCommand(Command, metaclass=ABCMeta):
             name = escape_control_chars(name)
         self._print(name)
 
-    def _get_ls_generator(self, args, b2_uri: B2URI | None = None):
+    def _get_ls_generator(self, args, b2_uri: B2URI | None = None, latest_only: bool | None = None):
         b2_uri = b2_uri or self.get_b2_uri_from_arg(args)
+        if latest_only is None:
+            # commands without ``--versions`` process the latest versions only
+            latest_only = not getattr(args, 'versions', False)
+        filters = args.filters
+        filter_matcher = None
+        if filters and args.recursive:
+            # without folders to collapse, files can be filtered here, in a single pass
+            filter_matcher = CompiledFilterMatcher(filters)
+            filters = []
         try:
-            yield from self.api.ls(
+            for file_version, folder_name in self.api.ls(
                 b2_uri,
-                latest_only=not args.versions,
+                latest_only=latest_only,
                 recursive=args.recursive,
                 with_wildcard=args.with_wildcard,
-                filters=args.filters,
-            )
+                filters=filters,
+            ):
+                if filter_matcher is None or filter_matcher.match(file_version.file_name):
+                    yield file_version, folder_name
         except Exception as err:
             raise CommandError(unprintable_to_hex(str(err))) from err
 
@@ -2542,7 +2962,7 @@ class AbstractLsCommand(Command, metaclass=ABCMeta):
         raise NotImplementedError
 
 
-class BaseLs(AbstractLsCommand, metaclass=ABCMeta):
+class BaseLs(VersionsMixin, AbstractLsCommand, metaclass=ABCMeta):
     """
     List files in a given folder.
 
@@ -2562,6 +2982,7 @@ class BaseLs(AbstractLsCommand, metaclass=ABCMeta):
 
     The ``--replication`` option adds replication status
 
+    {VersionsMixin}
     {AbstractLsCommand}
     """
 
@@ -2696,49 +3117,30 @@ class Ls(B2IDOrB2URIMixin, BaseLs):
     ALLOW_ALL_BUCKETS = True
 
 
-class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
+class AbstractBulkFileCommand(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
     """
-    Remove a "folder" or a set of files matching a pattern.
-
-    Use with caution!
-
-    .. note::
-
-        ``rm`` is a high-level command that under the hood utilizes multiple calls to the server,
-        which means the server cannot guarantee consistency between multiple operations. For
-        example if a file matching a pattern is uploaded during a run of ``rm`` command, it MIGHT
-        be deleted (as "latest") instead of the one present when the ``rm`` run has started.
-
-    If a file is in governance retention mode, and the retention period has not expired,
-    adding ``--bypass-governance`` is required.
-
-    To list (but not remove) files to be deleted, use ``--dry-run``.  You can also
-    list files via ``ls`` command - the listing behaviour is exactly the same.
+    Files are taken from the listing as they come, and processed by a pool of threads;
+    ``--queue-size`` sets how many of them are taken ahead, by default twice the number
+    of threads.
 
-    Progress is displayed on the console unless ``--no-progress`` is specified.
     {ThreadsMixin}
     {AbstractLsCommand}
 
     The ``--dry-run`` option prints all the files that would be affected by
-    the command, but removes nothing.
-
-    Normally, when an error happens during file removal, log is printed and the command
-    goes further. If any error should be immediately breaking the command,
-    ``--fail-fast`` can be passed to ensure that first error will stop the execution.
-    This could be useful to e.g. check whether provided credentials have **deleteFiles**
-    capabilities.
+    the command, but changes nothing.
 
-    .. note::
-
-        Using ``--fail-fast`` doesn't prevent the command from trying to remove further files.
-        It just stops the progress. Since multiple files are removed in parallel, it's possible
-        that just some of them were not reported.
+    Progress is displayed on the console unless ``--no-progress`` is specified.
+    Normally, when an error happens, log is printed and the command goes further.
+    With ``--fail-fast``, the first error stops the command, although files which are
+    already being processed in parallel are not stopped.
 
-    Command returns 0 if all files were removed successfully and
-    a value different from 0 if any file was left.
+    Command returns 0 if all files were processed successfully and
+    a value different from 0 if any file failed.
     """
 
     PROGRESS_REPORT_CLASS = ProgressReport
+    # the name of the operation on a file, for the error messages
+    OPERATION_NAME = 'Processing'
 
     class SubmitThread(threading.Thread):
         END_MARKER = object()
@@ -2747,7 +3149,7 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
 
         def __init__(
             self,
-            runner: BaseRm,
+            runner: AbstractBulkFileCommand,
             args: argparse.Namespace,
             messages_queue: queue.Queue,
             reporter: ProgressReport,
@@ -2758,8 +3160,8 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
             self.messages_queue = messages_queue
             self.reporter = reporter
             self.threads = threads
-            removal_queue_size = self.args.queue_size or (2 * self.threads)
-            self.semaphore = threading.BoundedSemaphore(value=removal_queue_size)
+            processing_queue_size = self.args.queue_size or (2 * self.threads)
+            self.semaphore = threading.BoundedSemaphore(value=processing_queue_size)
             self.fail_fast_event = threading.Event()
             self.mapping_lock = threading.Lock()
             self.futures_mapping = {}
@@ -2768,18 +3170,14 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
         def run(self) -> None:
             try:
                 with ThreadPoolExecutor(max_workers=self.threads) as executor:
-                    self._run_removal(executor)
+                    self._run_processing(executor)
             except Exception as error:
                 self.messages_queue.put((self.EXCEPTION_TAG, error))
             finally:
                 self.messages_queue.put(self.END_MARKER)
 
-        def _run_removal(self, executor: Executor):
-            for file_version, subdirectory in self.runner._get_ls_generator(self.args):
-                if subdirectory is not None:
-                    # This file_version is not for listing/deleting.
-                    # It is only here to list the subdirectory, so skip deleting it.
-                    continue
+        def _run_processing(self, executor: Executor):
+            for file_version in self.runner._get_file_versions_to_process(self.args):
                 # Obtaining semaphore limits number of elements that we fetch from LS.
                 self.semaphore.acquire(blocking=True)
                 # This event is updated before the semaphore is released. This way,
@@ -2788,29 +3186,21 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
                     break
 
                 self.reporter.update_total(1)
-                future = executor.submit(
-                    self.runner.api.delete_file_version,
-                    file_version.id_,
-                    file_version.file_name,
-                    self.args.bypass_governance,
-                )
+                future = executor.submit(self.runner._process_file_version, self.args, file_version)
                 with self.mapping_lock:
                     self.futures_mapping[future] = file_version
                 # Done callback is added after, so it's "sure" that mapping is updated earlier.
-                future.add_done_callback(self._removal_done)
+                future.add_done_callback(self._processing_done)
 
             self.reporter.end_total()
 
-        def _removal_done(self, future: Future) -> None:
+        def _processing_done(self, future: Future) -> None:
             with self.mapping_lock:
                 file_version = self.futures_mapping.pop(future)
 
             try:
                 future.result()
                 self.reporter.update_count(1)
-            except FileNotPresent:
-                # We wanted to remove this file anyway.
-                self.reporter.update_count(1)
             except B2Error as error:
                 if self.args.fail_fast:
                     # This is set before releasing the semaphore.
@@ -2825,24 +3215,51 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
 
     @classmethod
     def _setup_parser(cls, parser):
-        add_normalized_argument(parser, '--bypass-governance', action='store_true', default=False)
         add_normalized_argument(parser, '--dry-run', action='store_true')
         add_normalized_argument(
             parser,
             '--queue-size',
             type=int,
             default=None,
-            help='max elements fetched at once for removal, '
+            help='max elements fetched at once for processing, '
             'if left unset defaults to twice the number of threads.',
         )
         add_normalized_argument(parser, '--no-progress', action='store_true')
         add_normalized_argument(parser, '--fail-fast', action='store_true')
         super()._setup_parser(parser)
 
-    def _run(self, args):
-        if args.dry_run:
-            self._print_files(args)
-            return 0
+    def _get_file_versions_to_process(self, args) -> Iterator[FileVersion]:
+        for file_version, subdirectory in self._get_ls_generator(args):
+            if subdirectory is not None:
+                # This file_version is not for listing/processing.
+                # It is only here to list the subdirectory, so skip processing it.
+                continue
+            yield file_version
+
+    @abstractmethod
+    def _process_file_version(self, args, file_version: FileVersion) -> None:
+        """
+        Process a single file, called by the threads of the pool.
+        """
+
+    def _print_dry_run(self, args) -> None:
+        for file_version in self._get_file_versions_to_process(args):
+            self._print_file_version(args, file_version, None)
+
+    @classmethod
+    def _check_single_file_args(cls, args) -> None:
+        """
+        Check the arguments of a command processing a single file, without ``--recursive``.
+        """
+        if args.with_wildcard or args.filters or args.dry_run:
+            raise CommandError(
+                '--with-wildcard, --include, --exclude and --dry-run require --recursive'
+            )
+
+    def _run(self, args):
+        if args.dry_run:
+            self._print_dry_run(args)
+            return 0
         failed_on_any_file = False
         messages_queue = queue.Queue()
 
@@ -2861,7 +3278,7 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
                 if event_type == submit_thread.ERROR_TAG:
                     file_version, error = data
                     message = (
-                        f'Deletion of file "{file_version.file_name}" '
+                        f'{self.OPERATION_NAME} of file "{file_version.file_name}" '
                         f'({file_version.id_}) failed: {str(error)}'
                     )
                     reporter.print_completion(message)
@@ -2876,6 +3293,69 @@ class BaseRm(ThreadsMixin, AbstractLsCommand, metaclass=ABCMeta):
         return 1 if failed_on_any_file else 0
 
 
+class BaseRm(VersionsMixin, AbstractBulkFileCommand, metaclass=ABCMeta):
+    """
+    Remove a "folder" or a set of files matching a pattern.
+
+    Use with caution!
+
+    .. note::
+
+        ``rm`` is a high-level command that under the hood utilizes multiple calls to the server,
+        which means the server cannot guarantee consistency between multiple operations. For
+        example if a file matching a pattern is uploaded during a run of ``rm`` command, it MIGHT
+        be deleted (as "latest") instead of the one present when the ``rm`` run has started.
+
+    If a file is in governance retention mode, and the retention period has not expired,
+    adding ``--bypass-governance`` is required.
+
+    To list (but not remove) files to be deleted, use ``--dry-run``.  You can also
+    list files via ``ls`` command - the listing behaviour is exactly the same.
+
+    Progress is displayed on the console unless ``--no-progress`` is specified.
+    {ThreadsMixin}
+    {VersionsMixin}
+    {AbstractLsCommand}
+
+    The ``--dry-run`` option prints all the files that would be affected by
+    the command, but removes nothing.
+
+    Normally, when an error happens during file removal, log is printed and the command
+    goes further. If any error should be immediately breaking the command,
+    ``--fail-fast`` can be passed to ensure that first error will stop the execution.
+    This could be useful to e.g. check whether provided credentials have **deleteFiles**
+    capabilities.
+
+    .. note::
+
+        Using ``--fail-fast`` doesn't prevent the command from trying to remove further files.
+        It just stops the progress. Since multiple files are removed in parallel, it's possible
+        that just some of them were not reported.
+
+    Command returns 0 if all files were removed successfully and
+    a value different from 0 if any file was left.
+    """
+
+    OPERATION_NAME = 'Deletion'
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(parser, '--bypass-governance', action='store_true', default=False)
+        super()._setup_parser(parser)
+
+    def _process_file_version(self, args, file_version: FileVersion) -> None:
+        try:
+            self.api.delete_file_version(
+                file_version.id_, file_version.file_name, args.bypass_governance
+            )
+        except FileNotPresent:
+            # We wanted to remove this file anyway.
+            pass
+
+    def _print_dry_run(self, args) -> None:
+        self._print_files(args)
+
+
 class Rm(B2IDOrB2URIMixin, BaseRm):
     """
     {BaseRm}
@@ -2922,6 +3402,231 @@ class Rm(B2IDOrB2URIMixin, BaseRm):
     """
 
 
+class FileHideBase(AbstractBulkFileCommand):
+    """
+    Upload a new, hidden, version of the given file.
+
+    With ``--recursive``, hide all the files in the given folder instead, or, with
+    ``--with-wildcard``, all the files matching the given pattern.  Files which are
+    hidden already are not listed, so they are left alone.
+
+    {AbstractBulkFileCommand}
+
+    Requires capability:
+
+    - **writeFiles**
+    - **listFiles** (with ``--recursive``)
+    """
+
+    OPERATION_NAME = 'Hiding'
+
+    def _run(self, args):
+        b2_uri = self.get_b2_uri_from_arg(args)
+        if args.recursive:
+            self._bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
+            return super()._run(args)
+        self._check_single_file_args(args)
+        b2_uri = _file_like_b2_uri(b2_uri, by_id=False)
+
+        bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
+        file_info = bucket.hide_file(b2_uri.path)
+        self._print_json(file_info)
+        return 0
+
+    def _process_file_version(self, args, file_version: FileVersion) -> None:
+        self._bucket.hide_file(file_version.file_name)
+
+
+class FileUnhideBase(AbstractBulkFileCommand):
+    """
+    Delete the "hide marker" for a given file.
+
+    With ``--recursive``, unhide all the hidden files in the given folder instead, or, with
+    ``--with-wildcard``, all the hidden files matching the given pattern.  The hide markers
+    are taken from the listing of the file versions, so, unlike for a single file, they are
+    not looked up file by file.
+
+    {AbstractBulkFileCommand}
+
+    Requires capability:
+
+    - **listFiles**
+    - **deleteFiles**
+
+    and optionally:
+
+    - **bypassGovernance**
+    """
+
+    OPERATION_NAME = 'Unhiding'
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(parser, '--bypass-governance', action='store_true', default=False)
+        super()._setup_parser(parser)
+
+    def _run(self, args):
+        b2_uri = self.get_b2_uri_from_arg(args)
+        if args.recursive:
+            return super()._run(args)
+        self._check_single_file_args(args)
+        b2_uri = _file_like_b2_uri(b2_uri)
+
+        if isinstance(b2_uri, B2FileIdURI):
+            file_version = self.api.get_file_info_by_uri(b2_uri)
+            bucket = self.api.get_bucket_by_id(file_version.bucket_id)
+            file_name = file_version.file_name
+        else:
+            bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
+            file_name = b2_uri.path
+
+        file_id_and_name = bucket.unhide_file(file_name, args.bypass_governance)
+        self._print_json(file_id_and_name)
+        return 0
+
+    def _get_file_versions_to_process(self, args) -> Iterator[FileVersion]:
+        file_name = None
+        for file_version, _ in self._get_ls_generator(args, latest_only=False):
+            if file_version.file_name == file_name:
+                # an older version of a file already seen
+                continue
+            file_name = file_version.file_name
+            if file_version.action == 'hide':
+                yield file_version
+
+    def _process_file_version(self, args, file_version: FileVersion) -> None:
+        self.api.delete_file_version(
+            file_version.id_, file_version.file_name, args.bypass_governance
+        )
+
+
+class FileUpdateBase(LegalHoldMixin, AbstractBulkFileCommand):
+    """
+    Update file settings.
+
+    Setting legal holds only works in bucket with fileLockEnabled=true.
+
+    Retention:
+
+      Only works in bucket with fileLockEnabled=true. Providing a ``retention-mode`` other than ``none`` requires
+      providing ``retainUntil``, which has to be a future timestamp in the form of an integer representing milliseconds
+      since epoch.
+
+      If a file already is in governance mode, disabling retention or shortening it's period requires providing
+      ``--bypass-governance``.
+
+      If a file already is in compliance mode, disabling retention or shortening it's period is impossible.
+
+      In both cases prolonging the retention period is possible. Changing from governance to compliance is also supported.
+
+      {FILE_RETENTION_COMPATIBILITY_WARNING}
+
+    With ``--recursive``, update all the files in the given folder instead, or, with
+    ``--with-wildcard``, all the files matching the given pattern.  The files are taken
+    from the listing, which has their settings too, so they are not looked up file by file,
+    and files whose settings are already the given ones are skipped: an interrupted update
+    is resumed by running the command again.  ``--max-updates-per-second`` limits the rate
+    of the update requests.
+
+    {AbstractBulkFileCommand}
+
+    Requires capability:
+
+    - **readFiles**
+    - **writeFileLegalHolds** (if updating legal holds)
+    - **writeFileRetentions** (if updating retention)
+    - **bypassGovernance** (if ``--bypass-governance`` is used)
+    - **listFiles** (with ``--recursive``)
+    """
+
+    OPERATION_NAME = 'Update'
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        super()._setup_parser(parser)
+
+        add_normalized_argument(
+            parser,
+            '--file-retention-mode',
+            default=None,
+            choices=(RetentionMode.COMPLIANCE.value, RetentionMode.GOVERNANCE.value, 'none'),
+        )
+        add_normalized_argument(
+            parser,
+            '--retain-until',
+            type=parse_millis_from_float_timestamp,
+            metavar='TIMESTAMP',
+            default=None,
+        )
+        add_normalized_argument(parser, '--bypass-governance', action='store_true', default=False)
+        add_normalized_argument(
+            parser,
+            '--max-updates-per-second',
+            type=float,
+            default=None,
+            help='max update requests per second with --recursive',
+        )
+
+    def _run(self, args):
+        b2_uri = self.get_b2_uri_from_arg(args)
+        self._rate_limiter = RateLimiter(None)
+        if args.recursive:
+            if args.legal_hold is None and args.file_retention_mode is None:
+                raise CommandError(
+                    '--legal-hold or --file-retention-mode is required with --recursive'
+                )
+            if args.file_retention_mode not in (None, 'none') and args.retain_until is None:
+                raise CommandError(
+                    '--retain-until is required with --file-retention-mode '
+                    + args.file_retention_mode
+                )
+            self._rate_limiter = RateLimiter(args.max_updates_per_second)
+            self._skipped = 0
+            result = super()._run(args)
+            if self._skipped:
+                self._print_stderr(f'{self._skipped} files already up to date were skipped')
+            return result
+        self._check_single_file_args(args)
+        b2_uri = _file_like_b2_uri(b2_uri)
+
+        file_version = self.api.get_file_info_by_uri(b2_uri)
+        self._process_file_version(args, file_version)
+        return 0
+
+    @classmethod
+    def _get_file_retention(cls, args) -> FileRetentionSetting | None:
+        if args.file_retention_mode is None:
+            return None
+        if args.file_retention_mode == 'none':
+            return FileRetentionSetting(RetentionMode.NONE)
+        return FileRetentionSetting(RetentionMode(args.file_retention_mode), args.retain_until)
+
+    def _get_file_versions_to_process(self, args) -> Iterator[FileVersion]:
+        legal_hold = self._get_legal_hold_setting(args)
+        file_retention = self._get_file_retention(args)
+        for file_version in super()._get_file_versions_to_process(args):
+            if (legal_hold is None or file_version.legal_hold == legal_hold) and (
+                file_retention is None or file_version.file_retention == file_retention
+            ):
+                self._skipped += 1
+                continue
+            yield file_version
+
+    def _process_file_version(self, args, file_version: FileVersion) -> None:
+        if args.legal_hold is not None:
+            self._rate_limiter.wait()
+            self.api.update_file_legal_hold(
+                file_version.id_, file_version.file_name, LegalHold(args.legal_hold)
+            )
+
+        file_retention = self._get_file_retention(args)
+        if file_retention is not None:
+            self._rate_limiter.wait()
+            self.api.update_file_retention(
+                file_version.id_, file_version.file_name, file_retention, args.bypass_governance
+            )
+
+
 class FileUrlBase(Command):
     """
     Display download URL for a file
@@ -2955,20 +3660,23 @@ class FileUrlBase(Command):
 
     def _run(self, args):
         b2_uri = self.get_b2_uri_from_arg(args)
-        url = self.api.get_download_url_by_uri(b2_uri)
+        self._print(self._resolve_uri(self.api, args, b2_uri))
+        return 0
+
+    def _resolve_uri(self, api: B2URIAdapter, args, b2_uri: B2URIBase) -> str:
+        url = api.get_download_url_by_uri(b2_uri)
         if args.with_auth:
             if isinstance(b2_uri, B2FileIdURI):
                 raise CommandError(
                     '--with-auth param cannot be used with `b2id://` urls. Please, use `b2://bucket/filename` url format instead'
                 )
 
-            bucket = self.api.get_bucket_by_name(b2_uri.bucket_name)
+            bucket = api.get_bucket_by_name(b2_uri.bucket_name)
             auth_token = bucket.get_download_authorization(
                 file_name_prefix=b2_uri.path, valid_duration_in_seconds=args.duration
             )
             url += '?Authorization=' + auth_token
-        self._print(url)
-        return 0
+        return url
 
 
 class Sync(
@@ -2979,6 +3687,9 @@ class Sync(
     SkipHashVerificationMixin,
     MaxDownloadStreamsMixin,
     UploadModeMixin,
+    CompressMixin,
+    PartSizeMixin,
+    IoModeMixin,
     Command,
 ):
     """
@@ -2995,6 +3706,14 @@ class Sync(
 
     Use ``b2://<bucketName>/<prefix>`` for B2 paths, e.g. ``b2://my-bucket-name/a/path/prefix/``.
 
+    A local source can be synced to several B2 destinations at once, given one after another.
+    The source is then scanned, and hashed for ``--compare-versions sha1``, only once,
+    while every destination is compared and updated by a sync of its own, in parallel.
+    Their progress is not displayed; the actions taken for every destination are printed
+    under its URI once its sync ends.  ``--destination-server-side-encryption`` applies
+    to all destinations.  Several destinations cannot be used with ``--watch``,
+    ``--state-db``, ``--plan-out``, ``--apply-plan`` or ``--events-jsonl``.
+
     Progress is displayed on the console unless ``--no-progress`` is
     specified.  A list of actions taken is always printed.
 
@@ -3014,6 +3733,11 @@ class Sync(
     All the three parameters can be set to the same value by ``--threads``.
     Experiment with parameters if the defaults are not working well.
 
+    A B2 folder is listed by a single thread, one page of files after another.
+    With ``--list-threads`` set above 1, its subfolders are listed concurrently
+    by that many threads instead, which speeds up syncs of folders with many
+    subfolders when few files change.  It does not help a folder without subfolders.
+
     Users with low-performance networks may benefit from reducing the
     number of threads.  Using just one thread will minimize the impact
     on other users of the network.
@@ -3078,9 +3802,23 @@ class Sync(
     - ``none``:    Comparison using the file name only
     - ``modTime``: Comparison using the modification time (default)
     - ``size``:    Comparison using the file size
-
-    A future enhancement may add the ability to compare the SHA1 checksum
-    of the files.
+    - ``sha1``:    Comparison using the SHA1 checksum of the file contents
+
+    With ``sha1``, local files of the same size as their B2 counterparts are hashed by
+    ``--hash-threads THREADS`` threads, 4 by default, and their hashes are kept in
+    a SQLite database, so that a file is read again only once it changes.  The database
+    is in the user cache directory, unless given with ``--sha1-cache PATH``.  B2 files
+    which have no SHA1 checksum, like large files uploaded without one, are always
+    considered different, and get one when synced.
+
+    When syncing a local folder to B2, ``--copy-existing`` makes files whose contents
+    the destination already has, for example after a directory was renamed, be copied
+    from those files on the server instead of being uploaded.  The destination files
+    are indexed by size and SHA1 checksum first, which lists the destination once more;
+    local files of the sizes found are hashed like with ``sha1``.  Deletions of indexed files
+    are made after all other actions, so that they can be copied from.
+    Large files are copied in parts, concurrently.  The number of bytes not uploaded
+    is reported at the end.  B2 to B2 syncs always copy files on the server.
 
     Fuzzy comparison of files based on modTime or size can be enabled by
     specifying the ``--compare-threshold`` option.  This will treat modTimes
@@ -3138,6 +3876,79 @@ class Sync(
     {SkipHashVerificationMixin}
     {MaxDownloadStreamsMixin}
     {UploadModeMixin}
+    {CompressMixin}
+
+    Compressed files are stored with their compressed size, so ``--compare-versions size``
+    would consider all of them changed.  Every file is compressed by a single thread, and read
+    once more beforehand to hash its original data, unless ``--compare-versions sha1`` hashed
+    it already.  Each sync thread compressing a file keeps up to two parts of it in memory;
+    with ``--max-memory SIZE``, those parts are sized so that they take at most SIZE
+    in total, which has to fit two parts of the minimum size per sync thread.
+
+    {PartSizeMixin}
+    {IoModeMixin}
+
+    Actions are scheduled in the order of the file names, so a sync may end with a few
+    large files transferred while most threads are idle.  ``--schedule largest-first``
+    lets out the actions of the largest files first, and ``--schedule mixed`` takes turns
+    between small (under 1MB), medium (under 100MB) and large files, so that large transfers
+    use the bandwidth while small ones keep the request rate up; the default is ``name``.
+    Either looks ahead at most 1000 actions, and reports the throughput of every size class
+    at the end.
+
+    Local folders are scanned by a single thread.  On network file systems, where every
+    directory listing and ``stat`` call waits for the server, use ``--scan-threads THREADS``
+    to scan them with that many threads instead; files are still compared in name order.
+
+    Scanning a local folder keeps the files of every directory on the path of the scan
+    in memory, which for huge directories takes a lot of it.  With ``--max-memory SIZE``,
+    in bytes or with a K, M, G suffix, local folders are scanned in no particular order
+    and their files are sorted on disk instead: runs of files taking up to about SIZE
+    of memory are sorted, written to temporary files and merged.  It cannot be used
+    with ``--scan-threads``, and the index of ``--copy-existing``, one entry for every
+    distinct size and SHA1 checksum of the destination files, is kept in memory still.
+
+    When syncing a local folder to B2, ``--state-db PATH`` keeps the state of the
+    destination in a local SQLite database, so that it does not have to be listed in full
+    on every sync.  The first sync with a database lists the destination and records
+    the latest version of every file; later syncs read the destination from the database
+    and record the files they upload, hide and delete.  One database can serve several
+    destinations.
+
+    Changes made to the destination by anything else are not seen while the database
+    is trusted, and neither are older versions of the files, so ``--keep-days``
+    only removes them on a full listing.  Use ``--state-db-max-age DAYS`` to list
+    the destination in full again, and refresh the database, once the last full listing
+    is older than that; remove the database to do it on the next sync.
+
+    When syncing a local folder to B2, ``--watch`` keeps the sync running: after the first
+    sync, the local folder is watched for changes, with inotify on Linux, and only
+    the changed paths are synced, in batches.  A batch is synced once no change came for
+    ``--watch-debounce SECONDS``, 2 by default.  Where inotify is not available, or with
+    ``--watch-poll-interval SECONDS``, the folder is scanned for changes every that many
+    seconds instead, 10 by default.  Changes can be missed, for example in symlinked
+    directories, so the whole folder is synced again every ``--watch-full-sync-interval SECONDS``,
+    3600 by default, or never if set to 0.  Stop watching with Ctrl+C.
+
+    To review a sync before it is made, use ``--plan-out PATH``: the sync runs like
+    with ``--dry-run``, and the actions it would take are written to a plan file, with
+    the files and versions they concern.  ``--apply-plan PATH``, given the same source
+    and destination, then takes the actions of the plan, without scanning or comparing
+    the folders again.  Actions fail if the local files they read, overwrite or delete
+    changed since the plan was made, and so do downloads, copies and deletions of B2 file
+    versions which are gone.  The other options, like thread counts, part sizes and
+    encryption, apply to both steps as given; filters and comparison options only matter
+    when the plan is made.
+
+    For tools driving syncs, ``--events-jsonl PATH`` writes what the sync does to a file
+    as JSON objects, one per line, each with a timestamp ``ts`` and a kind ``event``:
+    ``sync_start`` and ``sync_end``, ``scan`` once the files are listed and once they are
+    compared, ``action_start`` and ``action_finish`` for every file transferred, hidden
+    or deleted, with its bytes and duration, ``retry`` for requests to B2 retried after
+    a pause, ``error`` and ``warning``, and a ``progress`` snapshot of the counts and
+    the throughput every second.  With ``--events-jsonl -``, the events are written
+    to the standard output, and the progress and the list of actions taken go
+    to the standard error instead.
 
     Requires capabilities:
 
@@ -3149,6 +3960,12 @@ class Sync(
     DEFAULT_SYNC_THREADS = 10
     DEFAULT_DOWNLOAD_THREADS = 10
     DEFAULT_UPLOAD_THREADS = 10
+    DEFAULT_LIST_THREADS = 1
+    DEFAULT_HASH_THREADS = 4
+    DEFAULT_WATCH_DEBOUNCE = 2
+    DEFAULT_WATCH_FULL_SYNC_INTERVAL = 3600
+    ONE_DAY_MILLIS = 24 * 60 * 60 * 1000
+    MIN_MAX_MEMORY = 1000 * 1000
 
     FAIL_ON_REPORTER_ERRORS_OR_WARNINGS = True
 
@@ -3168,9 +3985,20 @@ class Sync(
             parser, '--upload-threads', type=int, default=cls.DEFAULT_UPLOAD_THREADS
         )
         add_normalized_argument(
-            parser, '--compare-versions', default='modTime', choices=('none', 'modTime', 'size')
+            parser, '--list-threads', type=int, default=cls.DEFAULT_LIST_THREADS
+        )
+        add_normalized_argument(
+            parser,
+            '--compare-versions',
+            default='modTime',
+            choices=('none', 'modTime', 'size', 'sha1'),
         )
         add_normalized_argument(parser, '--compare-threshold', type=int, metavar='MILLIS')
+        add_normalized_argument(
+            parser, '--hash-threads', type=int, default=cls.DEFAULT_HASH_THREADS, metavar='THREADS'
+        )
+        add_normalized_argument(parser, '--sha1-cache', metavar='PATH')
+        add_normalized_argument(parser, '--copy-existing', action='store_true')
         add_normalized_argument(
             parser, '--exclude-regex', action='append', default=[], metavar='REGEX'
         )
@@ -3194,9 +4022,35 @@ class Sync(
             default=None,
             metavar='TIMESTAMP',
         )
+        add_normalized_argument(parser, '--scan-threads', type=int, metavar='THREADS')
+        add_normalized_argument(parser, '--max-memory', type=parse_size, metavar='SIZE')
+        add_normalized_argument(parser, '--state-db', metavar='PATH')
+        add_normalized_argument(parser, '--state-db-max-age', type=float, metavar='DAYS')
+        add_normalized_argument(parser, '--watch', action='store_true')
+        add_normalized_argument(
+            parser,
+            '--watch-debounce',
+            type=float,
+            default=cls.DEFAULT_WATCH_DEBOUNCE,
+            metavar='SECONDS',
+        )
+        add_normalized_argument(
+            parser,
+            '--watch-full-sync-interval',
+            type=float,
+            default=cls.DEFAULT_WATCH_FULL_SYNC_INTERVAL,
+            metavar='SECONDS',
+        )
+        add_normalized_argument(parser, '--watch-poll-interval', type=float, metavar='SECONDS')
+        add_normalized_argument(parser, '--schedule', choices=SCHEDULES, default=SCHEDULE_NAME)
+        add_normalized_argument(parser, '--events-jsonl', metavar='PATH')
+        plan_group = parser.add_mutually_exclusive_group()
+        add_normalized_argument(plan_group, '--plan-out', metavar='PATH')
+        add_normalized_argument(plan_group, '--apply-plan', metavar='PATH')
         super()._setup_parser(parser)  # add parameters from the mixins, and the parent class
         parser.add_argument('source')
         parser.add_argument('destination')
+        parser.add_argument('more_destinations', nargs='*', metavar='destination')
 
         skip_group = parser.add_mutually_exclusive_group()
         add_normalized_argument(skip_group, '--skip-newer', action='store_true')
@@ -3225,18 +4079,290 @@ class Sync(
         self.api.services.upload_manager.set_thread_pool_size(upload_threads)
         self.api.services.download_manager.set_thread_pool_size(download_threads)
 
-        source = parse_folder(args.source, self.console_tool.api)
-        destination = parse_folder(args.destination, self.console_tool.api)
+        local_folder_class = LocalFolder
+        if args.scan_threads is not None:
+            if args.scan_threads < 1:
+                raise CommandError('--scan-threads must be at least 1')
+            local_folder_class = functools.partial(ParallelLocalFolder, threads=args.scan_threads)
+        if args.max_memory is not None:
+            if args.scan_threads is not None:
+                raise CommandError('--max-memory cannot be used with --scan-threads')
+            if args.max_memory < self.MIN_MAX_MEMORY:
+                raise CommandError('--max-memory must be at least 1M')
+            local_folder_class = functools.partial(
+                ExternalSortLocalFolder, max_memory=args.max_memory
+            )
+        if args.list_threads < 1:
+            raise CommandError('--list-threads must be at least 1')
+        b2_folder_class = functools.partial(ShardedB2Folder, list_threads=args.list_threads)
+        source = parse_folder(
+            args.source, self.console_tool.api, local_folder_class, b2_folder_class
+        )
+        destination = parse_folder(
+            args.destination, self.console_tool.api, local_folder_class, b2_folder_class
+        )
+        destinations = [destination] + [
+            parse_folder(uri, self.console_tool.api, local_folder_class, b2_folder_class)
+            for uri in args.more_destinations
+        ]
         allow_empty_source = args.allow_empty_source or VERSION_0_COMPATIBILITY
+        now_millis = current_time_millis()
+        if len(destinations) > 1:
+            self._check_fan_out_args(args, source, destinations)
+        if args.watch:
+            self._check_watch_args(args, source, destination)
+
+        with contextlib.ExitStack() as exit_stack:
+            sync_state = None
+            if args.state_db is not None:
+                sync_state = exit_stack.enter_context(
+                    self._open_state_db(args, source, destination)
+                )
+            elif args.state_db_max_age is not None:
+                raise CommandError('--state-db-max-age requires --state-db')
+
+            if args.copy_existing and (
+                source.folder_type() != 'local' or destination.folder_type() != 'b2'
+            ):
+                raise CommandError('--copy-existing can only be used to sync a local folder to B2')
+            local_hasher = None
+            if args.compare_versions == 'sha1' or args.copy_existing:
+                local_hasher = exit_stack.enter_context(
+                    self._open_local_hasher(args, source, destination)
+                )
+            plan_writer = plan_reader = None
+            if args.plan_out is not None:
+                plan_writer = exit_stack.enter_context(
+                    self._open_plan_writer(args, source, destination)
+                )
+            elif args.apply_plan is not None:
+                plan_reader = exit_stack.enter_context(
+                    self._open_plan_reader(args, source, destination)
+                )
+            events = None
+            if args.events_jsonl is not None:
+                events = exit_stack.enter_context(self._open_event_writer(args, exit_stack))
+
+            synchronizer = self.get_synchronizer_from_args(
+                args,
+                sync_threads,
+                policies_manager,
+                allow_empty_source,
+                self.api.session.account_info.get_absolute_minimum_part_size(),
+                sync_state=sync_state,
+                local_hasher=local_hasher,
+                plan_writer=plan_writer,
+                events=events,
+            )
+            if args.watch:
+                return self._watch(args, synchronizer, source, destination, sync_state)
+            if len(destinations) > 1:
+                return self._fan_out(args, synchronizer, source, destinations, now_millis)
+            if sync_state is not None and plan_reader is None:
+                destination = self._get_state_db_folder(args, destination, sync_state, now_millis)
+            return self._sync(args, synchronizer, source, destination, now_millis, plan_reader)
+
+    def _check_fan_out_args(self, args, source, destinations) -> None:
+        if source.folder_type() != 'local' or any(
+            destination.folder_type() != 'b2' for destination in destinations
+        ):
+            raise CommandError('several destinations can only be used to sync a local folder to B2')
+        for option, value in [
+            ('--watch', args.watch),
+            ('--state-db', args.state_db),
+            ('--plan-out', args.plan_out),
+            ('--apply-plan', args.apply_plan),
+            ('--events-jsonl', args.events_jsonl),
+        ]:
+            if value:
+                raise CommandError(f'{option} cannot be used with several destinations')
 
-        synchronizer = self.get_synchronizer_from_args(
-            args,
-            sync_threads,
-            policies_manager,
-            allow_empty_source,
-            self.api.session.account_info.get_absolute_minimum_part_size(),
+    def _fan_out(self, args, synchronizer, source, destinations, now_millis: int):
+        """
+        Sync the source to all destinations in parallel, scanning it once, and print
+        the actions taken for every destination, in their order, once its sync ends.
+        """
+        shared_scan = SharedLocalScan(source, len(destinations))
+        with ThreadPoolExecutor(
+            max_workers=len(destinations), thread_name_prefix='sync-fan-out'
+        ) as executor:
+            results = [
+                executor.submit(
+                    self._fan_out_sync,
+                    args,
+                    synchronizer,
+                    shared_scan,
+                    index,
+                    destination,
+                    now_millis,
+                )
+                for index, destination in enumerate(destinations)
+            ]
+            status = 0
+            error = None
+            for destination, result in zip(destinations, results):
+                report, destination_status, destination_error = result.result()
+                self.stdout.write(f'{folder_uri(destination)}:\n{report}')
+                status = max(status, destination_status)
+                error = error or destination_error
+        if error is not None:
+            raise error
+        return status
+
+    def _fan_out_sync(self, args, synchronizer, shared_scan, index: int, destination, now_millis):
+        report = io.StringIO()
+        try:
+            status = self._sync(
+                args,
+                synchronizer,
+                shared_scan.view(index),
+                destination,
+                now_millis,
+                report_stream=report,
+            )
+        except Exception as e:
+            return report.getvalue(), 1, e
+        finally:
+            shared_scan.detach(index)
+        return report.getvalue(), status, None
+
+    def _check_watch_args(self, args, source, destination) -> None:
+        if source.folder_type() != 'local' or destination.folder_type() != 'b2':
+            raise CommandError('--watch can only be used to sync a local folder to B2')
+        if args.watch_debounce < 0:
+            raise CommandError('--watch-debounce cannot be negative')
+        if args.watch_full_sync_interval < 0:
+            raise CommandError('--watch-full-sync-interval cannot be negative')
+        if args.watch_poll_interval is not None and args.watch_poll_interval <= 0:
+            raise CommandError('--watch-poll-interval must be positive')
+        if args.plan_out is not None or args.apply_plan is not None:
+            raise CommandError('--watch cannot be used with sync plans')
+
+    def _watch(self, args, synchronizer, source, destination, sync_state: SyncStateDb | None):
+        """
+        Sync the whole source, then the paths which change in it, until interrupted.
+        """
+        scan_threads = args.scan_threads or 1
+        policies_manager = synchronizer.policies_manager
+        watched_folder = ParallelLocalFolder(source.root, scan_threads)
+        # the watch starts before the first sync, so that changes made during it are not missed
+        with open_watcher(watched_folder, policies_manager, args.watch_poll_interval) as watcher:
+            batches = iter_batches(watcher, args.watch_debounce, args.watch_full_sync_interval)
+            changes = Changes(full_sync=True)
+            status = 0
+            while changes is not None:
+                now_millis = current_time_millis()
+                if changes.full_sync:
+                    batch_source, batch_destination = source, destination
+                    if sync_state is not None:
+                        batch_destination = self._get_state_db_folder(
+                            args, destination, sync_state, now_millis
+                        )
+                else:
+                    batch_source = WatchedLocalFolder(source.root, scan_threads, changes.paths)
+                    batch_destination = WatchedB2Folder(
+                        destination.bucket_name,
+                        destination.folder_name,
+                        self.console_tool.api,
+                        changes.paths,
+                    )
+                status = max(
+                    status,
+                    self._sync(args, synchronizer, batch_source, batch_destination, now_millis),
+                )
+                changes = next(batches, None)
+        return status
+
+    def _open_state_db(self, args, source, destination) -> SyncStateDb:
+        if source.folder_type() != 'local' or destination.folder_type() != 'b2':
+            raise CommandError('--state-db can only be used to sync a local folder to B2')
+        try:
+            return SyncStateDb(args.state_db, folder_uri(destination))
+        except sqlite3.Error as e:
+            raise CommandError(f'cannot open state database {args.state_db}: {e}')
+
+    def _open_local_hasher(self, args, source, destination) -> LocalHasher:
+        if args.hash_threads < 1:
+            raise CommandError('--hash-threads must be at least 1')
+        if source.folder_type() == 'b2' and destination.folder_type() == 'b2':
+            return LocalHasher(1)  # hashes of B2 files are listed, there is nothing to hash
+        path = args.sha1_cache
+        try:
+            if path is None:
+                cache_dir = platformdirs.user_cache_dir(appname='b2', appauthor='backblaze')
+                os.makedirs(cache_dir, exist_ok=True)
+                path = os.path.join(cache_dir, 'sha1-cache.sqlite')
+            cache = Sha1Cache(path)
+        except (OSError, sqlite3.Error) as e:
+            raise CommandError(f'cannot open sha1 cache {path}: {e}')
+        return LocalHasher(args.hash_threads, cache)
+
+    def _open_plan_writer(self, args, source, destination) -> SyncPlanWriter:
+        try:
+            return SyncPlanWriter(args.plan_out, folder_uri(source), folder_uri(destination))
+        except OSError as e:
+            raise CommandError(f'cannot write sync plan {args.plan_out}: {e}')
+
+    def _open_event_writer(self, args, exit_stack: contextlib.ExitStack) -> SyncEventWriter:
+        if args.events_jsonl == '-':
+            return SyncEventWriter(self.stdout)
+        try:
+            stream = exit_stack.enter_context(open(args.events_jsonl, 'w', encoding='utf-8'))
+        except OSError as e:
+            raise CommandError(f'cannot write events {args.events_jsonl}: {e}')
+        return SyncEventWriter(stream)
+
+    def _open_plan_reader(self, args, source, destination) -> SyncPlanReader:
+        try:
+            plan_reader = SyncPlanReader(args.apply_plan)
+        except OSError as e:
+            raise CommandError(f'cannot read sync plan {args.apply_plan}: {e}')
+        except SyncPlanError as e:
+            raise CommandError(str(e))
+        if (plan_reader.source_uri, plan_reader.destination_uri) != (
+            folder_uri(source),
+            folder_uri(destination),
+        ):
+            plan_reader.close()
+            raise CommandError(
+                f'{args.apply_plan} is a plan to sync {plan_reader.source_uri}'
+                f' to {plan_reader.destination_uri}'
+            )
+        return plan_reader
+
+    def _get_state_db_folder(self, args, destination, sync_state: SyncStateDb, now_millis: int):
+        full_listing_millis = sync_state.get_full_listing_millis()
+        full_listing = full_listing_millis is None or (
+            args.state_db_max_age is not None
+            and now_millis - full_listing_millis > args.state_db_max_age * self.ONE_DAY_MILLIS
+        )
+        if full_listing and args.dry_run:
+            # a dry run does not change the database, so it just lists the destination
+            return destination
+        return StateDbB2Folder(
+            destination.bucket_name,
+            destination.folder_name,
+            self.console_tool.api,
+            sync_state,
+            full_listing=full_listing,
+            list_threads=args.list_threads,
         )
 
+    def _sync(
+        self,
+        args,
+        synchronizer,
+        source,
+        destination,
+        now_millis: int,
+        plan_reader: SyncPlanReader | None = None,
+        report_stream=None,
+    ):
+        """
+        Sync the source to the destination once.
+
+        The report goes to ``report_stream`` without progress, if given.
+        """
         kwargs = {}
         read_encryption_settings = {}
         write_encryption_settings = {}
@@ -3261,15 +4387,34 @@ class Sync(
                 write_bucket_settings=write_encryption_settings,
             )
 
-        with SyncReport(self.stdout, args.no_progress or args.quiet) as reporter:
-            try:
-                synchronizer.sync_folders(
-                    source_folder=source,
-                    dest_folder=destination,
-                    now_millis=current_time_millis(),
-                    reporter=reporter,
-                    **kwargs,
+        events = synchronizer.events
+        no_progress = args.no_progress or args.quiet
+        if report_stream is not None:
+            no_progress = True
+        elif args.events_jsonl == '-':
+            report_stream = self.stderr
+        else:
+            report_stream = self.stdout
+        with CliSyncReport(report_stream, no_progress) as reporter:
+            if events is not None:
+                reporter.report_events(events)
+                events.emit(
+                    'sync_start',
+                    source=folder_uri(source),
+                    destination=folder_uri(destination),
+                    dry_run=synchronizer.dry_run,
                 )
+            try:
+                if plan_reader is not None:
+                    synchronizer.apply_plan(plan_reader, source, destination, reporter, **kwargs)
+                else:
+                    synchronizer.sync_folders(
+                        source_folder=source,
+                        dest_folder=destination,
+                        now_millis=now_millis,
+                        reporter=reporter,
+                        **kwargs,
+                    )
             except EmptyDirectory as ex:
                 raise CommandError(
                     f'Directory {ex.path} is empty.  Use --allow-empty-source to sync anyway.'
@@ -3278,12 +4423,25 @@ class Sync(
                 raise CommandError(f'{ex.path} is not a directory')
             except UnableToCreateDirectory as ex:
                 raise CommandError(f'unable to create directory {ex.path}')
+            reporter.print_summary()
+            if isinstance(destination, StateDbB2Folder) and destination.full_listing:
+                destination.state_db.finish_full_listing(now_millis)
+            status = 0
             if self.FAIL_ON_REPORTER_ERRORS_OR_WARNINGS and reporter.has_errors_or_warnings():
-                return 1
-        return 0
+                status = 1
+        if events is not None:
+            events.snapshot = None
+            events.emit(
+                'sync_end',
+                status=status,
+                transferred_files=reporter.transfer_files,
+                transferred_bytes=reporter.transfer_bytes,
+                duration=round(time.time() - reporter.start_time, 6),
+            )
+        return status
 
     def get_policies_manager_from_args(self, args):
-        return ScanPoliciesManager(
+        return CompiledScanPoliciesManager(
             exclude_dir_regexes=args.exclude_dir_regex,
             exclude_file_regexes=args.exclude_regex,
             include_file_regexes=args.include_regex,
@@ -3299,6 +4457,10 @@ class Sync(
         policies_manager=DEFAULT_SCAN_MANAGER,
         allow_empty_source=False,
         absolute_minimum_part_size=None,
+        sync_state=None,
+        local_hasher=None,
+        plan_writer=None,
+        events=None,
     ):
         if args.replace_newer:
             newer_file_mode = NewerFileSyncMode.REPLACE
@@ -3313,6 +4475,9 @@ class Sync(
             compare_version_mode = CompareVersionMode.MODTIME
         elif args.compare_versions == 'size':
             compare_version_mode = CompareVersionMode.SIZE
+        elif args.compare_versions == 'sha1':
+            # the sha1 policies of the synchronizer ignore the mode
+            compare_version_mode = CompareVersionMode.NONE
         else:
             compare_version_mode = CompareVersionMode.MODTIME
         compare_threshold = args.compare_threshold
@@ -3329,10 +4494,33 @@ class Sync(
 
         upload_mode = self._get_upload_mode_from_args(args)
 
-        return Synchronizer(
+        part_size = part_sizer = None
+        if args.part_size == AUTO_PART_SIZE:
+            # parts of local files are read straight from the disk, so memory does not limit them
+            part_sizer = AdaptivePartSizer(
+                initial_part_size=self.api.session.account_info.get_recommended_part_size(),
+                min_part_size=absolute_minimum_part_size or DEFAULT_MIN_PART_SIZE,
+            )
+        else:
+            part_size = args.part_size
+
+        compression_buffer_size = None
+        if args.compress is not None and args.max_memory is not None:
+            # every sync thread may be compressing a file, into two buffers of its share of memory
+            min_part_size = part_size or absolute_minimum_part_size or DEFAULT_MIN_PART_SIZE
+            if args.max_memory < 2 * min_part_size * max_workers:
+                raise CommandError(
+                    f'--max-memory has to be at least {2 * min_part_size * max_workers} bytes '
+                    f'to compress with {max_workers} sync threads'
+                )
+            _, compression_buffer_size = derive_memory_limited_settings(
+                args.max_memory // max_workers, 1, min_part_size, part_size=part_size
+            )
+
+        return CliSynchronizer(
             max_workers,
             policies_manager=policies_manager,
-            dry_run=args.dry_run,
+            dry_run=args.dry_run or plan_writer is not None,
             allow_empty_source=allow_empty_source,
             newer_file_mode=newer_file_mode,
             keep_days_or_delete=keep_days_or_delete,
@@ -3341,7 +4529,158 @@ class Sync(
             keep_days=keep_days,
             upload_mode=upload_mode,
             absolute_minimum_part_size=absolute_minimum_part_size,
+            part_size=part_size,
+            part_sizer=part_sizer,
+            compression=args.compress,
+            compression_buffer_size=compression_buffer_size,
+            io_mode=args.io_mode,
+            sync_state=sync_state,
+            local_hasher=local_hasher,
+            compare_sha1=args.compare_versions == 'sha1',
+            copy_existing=args.copy_existing,
+            plan_writer=plan_writer,
+            schedule=args.schedule,
+            events=events,
+        )
+
+
+class Pack(ThreadsMixin, MaxMemoryMixin, DestinationSseMixin, Command):
+    """
+    Pack files of a local folder into a few large archive objects.
+
+    Storing every small file as an object of its own costs an upload request per file.
+    Instead, this command streams the files, in name order, into uncompressed tar archives
+    ``pack-00000.tar``, ``pack-00001.tar``, ... under the given B2 URI, uploading each
+    of them as a large file, and stores an ``index.json`` object next to them,
+    which maps every file name to its archive and to the byte offset of its data.
+
+    Use ``--pack-size`` to set the size of the archives, in bytes or with a K, M, G suffix,
+    1GB by default.  A file larger than that gets an archive of its own.
+
+    Packed files can be restored with ``{NAME} unpack``, or printed one at a time with
+    ``{NAME} file cat --member NAME b2://bucketName/path/index.json``.
+
+    {ThreadsMixin}
+    {MaxMemoryMixin}
+    {DestinationSseMixin}
+
+    Requires capability:
+
+    - **listBuckets**
+    - **writeFiles**
+    """
+
+    DEFAULT_PACK_SIZE = 1000 * 1000 * 1000
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_normalized_argument(
+            parser,
+            '--pack-size',
+            type=parse_size,
+            default=cls.DEFAULT_PACK_SIZE,
+            help='size of the archives in bytes',
+        )
+        parser.add_argument('localFolder')
+        add_b2_uri_argument(
+            parser,
+            help='B2 URI of the folder to store the archives and the index in, e.g. b2://bucketName/packed/',
+        )
+        super()._setup_parser(parser)
+
+    def _run(self, args):
+        if not os.path.isdir(args.localFolder):
+            raise CommandError(f'{args.localFolder} is not a directory')
+        self._set_threads_from_args(args)
+        threads = self._get_threads_from_args(args)
+        bucket = self.api.get_bucket_by_name(args.B2_URI.bucket_name)
+        encryption = self._get_destination_sse_setting(args)
+        buffers_count, buffer_size = threads + 1, None
+        if args.max_memory is not None:
+            try:
+                buffers_count, buffer_size = derive_memory_limited_settings(
+                    args.max_memory,
+                    threads,
+                    self.api.account_info.get_absolute_minimum_part_size(),
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        index = PackIndex()
+        members = scan_local_folder(args.localFolder)
+        for number, group in enumerate(group_members(members, args.pack_size)):
+            pack_name = PACK_FILE_NAME_FORMAT.format(number)
+            with TarPackReader(group, number) as pack_stream:
+                upload_unbound_stream(
+                    bucket,
+                    pack_stream,
+                    posixpath.join(args.B2_URI.path, pack_name),
+                    buffers_count=buffers_count,
+                    buffer_size=buffer_size,
+                    content_type=PACK_CONTENT_TYPE,
+                    file_info=None,
+                    encryption=encryption,
+                )
+            index.packs.append(pack_name)
+            index.members.extend(group)
+            self._print(f'{pack_name}: {len(group)} files')
+
+        file_version = bucket.upload_bytes(
+            index.to_bytes(),
+            posixpath.join(args.B2_URI.path, INDEX_FILE_NAME),
+            content_type='application/json',
+            encryption=encryption,
+        )
+        self._print_json(file_version)
+        return 0
+
+
+class Unpack(SourceSseMixin, Command):
+    """
+    Extract packed files into a local folder.
+
+    Reads the index written by ``{NAME} pack`` from the given B2 URI and downloads the archives one after another,
+    writing the files out of the downloaded stream as it arrives.  Checksums of the files
+    are verified and their modification times are restored.
+
+    {SourceSseMixin}
+
+    Requires capability:
+
+    - **listBuckets**
+    - **readFiles**
+    """
+
+    @classmethod
+    def _setup_parser(cls, parser):
+        add_b2_uri_argument(
+            parser,
+            help='B2 URI of the folder holding the archives and the index, e.g. b2://bucketName/packed/',
         )
+        parser.add_argument('localFolder')
+        super()._setup_parser(parser)
+
+    def _run(self, args):
+        bucket = self.api.get_bucket_by_name(args.B2_URI.bucket_name)
+        encryption = self._get_source_sse_setting(args)
+        index_file_name = posixpath.join(args.B2_URI.path, INDEX_FILE_NAME)
+        index = load_index(bucket.download_file_by_name(index_file_name, encryption=encryption))
+
+        members_by_pack = collections.defaultdict(list)
+        for member in index.members:
+            members_by_pack[member.pack].append(member)
+        os.makedirs(args.localFolder, exist_ok=True)
+        extracted = 0
+        for number, pack_name in enumerate(index.packs):
+            downloaded_file = bucket.download_file_by_name(
+                get_pack_file_name(index_file_name, pack_name), encryption=encryption
+            )
+            with MemberExtractingWriter(members_by_pack[number], args.localFolder) as writer:
+                downloaded_file.save(writer, allow_seeking=False)
+                writer.finish()
+            extracted += writer.extracted
+        self._print(f'{extracted} files unpacked')
+        return 0
 
 
 class BucketUpdateBase(DefaultSseMixin, LifecycleRulesMixin, Command):
@@ -3575,8 +4914,40 @@ class UploadFileMixin(
         Translate `file upload` kwargs to unbound_upload equivalents
         """
         kwargs['large_file_sha1'] = kwargs.pop('sha1_sum', None)
-        kwargs['buffers_count'] = kwargs['threads'] + 1
-        kwargs['read_size'] = kwargs['min_part_size'] or DEFAULT_MIN_PART_SIZE
+        max_memory = kwargs.pop('max_memory', None)
+        auto_part_size = kwargs.get('recommended_upload_part_size') == AUTO_PART_SIZE
+        if auto_part_size:
+            kwargs['recommended_upload_part_size'] = None
+        min_part_size = kwargs['min_part_size'] or DEFAULT_MIN_PART_SIZE
+        if max_memory is None:
+            kwargs['buffers_count'] = kwargs['threads'] + 1
+        else:
+            try:
+                kwargs['buffers_count'], kwargs['buffer_size'] = derive_memory_limited_settings(
+                    max_memory,
+                    kwargs['threads'],
+                    min_part_size,
+                    part_size=kwargs.get('recommended_upload_part_size'),
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+        if auto_part_size:
+            account_info = self.api.session.account_info
+            recommended_part_size = account_info.get_recommended_part_size()
+            try:
+                part_sizer = AdaptivePartSizer(
+                    initial_part_size=recommended_part_size,
+                    min_part_size=(
+                        kwargs['min_part_size'] or account_info.get_absolute_minimum_part_size()
+                    ),
+                    # without --max-memory, parts, and the buffers holding them, may grow up to 5GB
+                    memory_limit=kwargs.get('buffer_size'),
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            kwargs['part_sizer'] = part_sizer
+            kwargs['buffer_size'] = part_sizer.part_size
+        kwargs['read_size'] = min_part_size
         return kwargs
 
     def get_input_stream(self, filename: str) -> str | int | io.BinaryIO:
@@ -3602,7 +4973,15 @@ class UploadFileMixin(
         pass
 
 
-class FileUploadBase(UploadFileMixin, UploadModeMixin, Command):
+class FileUploadBase(
+    UploadFileMixin,
+    CompressMixin,
+    PartSizeMixin,
+    MaxMemoryMixin,
+    IoModeMixin,
+    UploadModeMixin,
+    Command,
+):
     """
     Upload single file to the given bucket.
 
@@ -3624,6 +5003,13 @@ class FileUploadBase(UploadFileMixin, UploadModeMixin, Command):
     {FileRetentionSettingMixin}
     {LegalHoldMixin}
     {UploadModeMixin}
+    {CompressMixin}
+    {PartSizeMixin}
+    {MaxMemoryMixin}
+    {IoModeMixin}
+
+    When ``--part-size auto`` or ``--compress`` is set, regular files are read through the memory
+    buffers too, like streams, so ``--max-memory`` applies and incremental upload is not possible.
 
     The ``--custom-upload-timestamp``, in milliseconds-since-epoch, can be used
     to artificially change the upload timestamp of the file for the purpose
@@ -3637,31 +5023,53 @@ class FileUploadBase(UploadFileMixin, UploadModeMixin, Command):
     """
 
     def get_execute_kwargs(self, args) -> dict:
+        self._set_content_encoding_from_compression(args)
         kwargs = super().get_execute_kwargs(args)
         kwargs['upload_mode'] = self._get_upload_mode_from_args(args)
+        kwargs['recommended_upload_part_size'] = args.part_size
+        kwargs['max_memory'] = args.max_memory
+        kwargs['compression'] = args.compress
+        kwargs['io_mode'] = args.io_mode
         return kwargs
 
-    def execute_operation(self, local_file, bucket, threads, **kwargs):
+    def execute_operation(self, local_file, bucket, threads, compression, io_mode, **kwargs):
         try:
             input_stream = self.get_input_stream(local_file)
         except self.NotAnInputStream:  # it is a regular file
-            file_version = bucket.upload_local_file(local_file=local_file, **kwargs)
-        else:
-            if kwargs.pop('upload_mode', None) != UploadMode.FULL:
-                self._print_stderr(
-                    'WARNING: Ignoring upload mode setting as we are uploading a stream.'
+            if compression is not None:
+                reason = 'uploading compressed data'
+                kwargs['file_info'] = self._file_info_with_original_data(
+                    local_file, kwargs['file_info']
                 )
-            kwargs = self.upload_file_kwargs_to_unbound_upload(threads=threads, **kwargs)
-            del kwargs['threads']
-            input_stream = self.file_identifier_to_read_stream(
-                input_stream, kwargs['min_part_size'] or DEFAULT_MIN_PART_SIZE
-            )
-            with input_stream:
-                file_version = bucket.upload_unbound_stream(read_only_object=input_stream, **kwargs)
-        return file_version
+            elif kwargs['recommended_upload_part_size'] == AUTO_PART_SIZE:
+                reason = 'uploading through memory buffers'
+                kwargs['total_bytes'] = os.path.getsize(local_file)
+            else:
+                del kwargs['max_memory']
+                if io_mode == IO_MODE_MMAP or kwargs['recommended_upload_part_size'] is not None:
+                    return upload_local_file(
+                        bucket, local_file=local_file, io_mode=io_mode, **kwargs
+                    )
+                del kwargs['recommended_upload_part_size']
+                return bucket.upload_local_file(local_file=local_file, **kwargs)
+            input_stream = local_file
+        else:
+            reason = 'uploading a stream'
+        if kwargs.pop('upload_mode', None) != UploadMode.FULL:
+            self._print_stderr(f'WARNING: Ignoring upload mode setting as we are {reason}.')
+        if io_mode != IO_MODE_BUFFERED:
+            self._print_stderr(f'WARNING: Ignoring io mode setting as we are {reason}.')
+        kwargs = self.upload_file_kwargs_to_unbound_upload(threads=threads, **kwargs)
+        del kwargs['threads']
+        input_stream = self.file_identifier_to_read_stream(
+            input_stream, kwargs['min_part_size'] or DEFAULT_MIN_PART_SIZE
+        )
+        return self._upload_stream(bucket, input_stream, compression, **kwargs)
 
 
-class UploadUnboundStreamBase(UploadFileMixin, Command):
+class UploadUnboundStreamBase(
+    UploadFileMixin, CompressMixin, PartSizeMixin, MaxMemoryMixin, Command
+):
     """
     Uploads an unbound stream to the given bucket.
 
@@ -3678,6 +5086,11 @@ class UploadUnboundStreamBase(UploadFileMixin, Command):
     The maximum memory use for the upload buffers can be estimated at ``partSize * threads``, that is ~1GB by default.
     What is more, B2 Large File may consist of at most 10,000 parts, so ``minPartSize`` should be adjusted accordingly,
     if you expect the stream to be larger than 50GB.
+    The buffers are allocated once and reused for the whole upload.
+
+    {CompressMixin}
+    {PartSizeMixin}
+    {MaxMemoryMixin}
 
     {ProgressMixin}
     {ThreadsMixin}
@@ -3698,13 +5111,6 @@ class UploadUnboundStreamBase(UploadFileMixin, Command):
 
     @classmethod
     def _setup_parser(cls, parser):
-        add_normalized_argument(
-            parser,
-            '--part-size',
-            type=int,
-            default=None,
-            help=('part size in bytes. Must be in range of <minPartSize, 5GB>'),
-        )
         add_normalized_argument(
             parser,
             '--unused-buffer-timeout-seconds',
@@ -3718,13 +5124,16 @@ class UploadUnboundStreamBase(UploadFileMixin, Command):
         super()._setup_parser(parser)
 
     def get_execute_kwargs(self, args) -> dict:
+        self._set_content_encoding_from_compression(args)
         kwargs = super().get_execute_kwargs(args)
-        kwargs = self.upload_file_kwargs_to_unbound_upload(**kwargs)
         kwargs['recommended_upload_part_size'] = args.part_size
+        kwargs['max_memory'] = args.max_memory
+        kwargs = self.upload_file_kwargs_to_unbound_upload(**kwargs)
         kwargs['unused_buffer_timeout_seconds'] = args.unused_buffer_timeout_seconds
+        kwargs['compression'] = args.compress
         return kwargs
 
-    def execute_operation(self, local_file, bucket, threads, **kwargs):
+    def execute_operation(self, local_file, bucket, threads, compression, **kwargs):
         try:
             input_stream = self.get_input_stream(local_file)
         except self.NotAnInputStream:  # it is a regular file
@@ -3734,85 +5143,15 @@ class UploadUnboundStreamBase(UploadFileMixin, Command):
                 'Use of `file upload` command is recommended.'
             )
             input_stream = local_file
+            if compression is not None:
+                kwargs['file_info'] = self._file_info_with_original_data(
+                    local_file, kwargs['file_info']
+                )
 
         input_stream = self.file_identifier_to_read_stream(
             input_stream, kwargs['min_part_size'] or DEFAULT_MIN_PART_SIZE
         )
-        with input_stream:
-            file_version = bucket.upload_unbound_stream(read_only_object=input_stream, **kwargs)
-        return file_version
-
-
-class FileUpdateBase(B2URIFileArgMixin, LegalHoldMixin, Command):
-    """
-    Update file settings.
-
-    Setting legal holds only works in bucket with fileLockEnabled=true.
-
-    Retention:
-
-      Only works in bucket with fileLockEnabled=true. Providing a ``retention-mode`` other than ``none`` requires
-      providing ``retainUntil``, which has to be a future timestamp in the form of an integer representing milliseconds
-      since epoch.
-
-      If a file already is in governance mode, disabling retention or shortening it's period requires providing
-      ``--bypass-governance``.
-
-      If a file already is in compliance mode, disabling retention or shortening it's period is impossible.
-
-      In both cases prolonging the retention period is possible. Changing from governance to compliance is also supported.
-
-      {FILE_RETENTION_COMPATIBILITY_WARNING}
-
-    Requires capability:
-
-    - **readFiles**
-    - **writeFileLegalHolds** (if updating legal holds)
-    - **writeFileRetentions** (if updating retention)
-    - **bypassGovernance** (if ``--bypass-governance`` is used)
-    """
-
-    @classmethod
-    def _setup_parser(cls, parser):
-        super()._setup_parser(parser)
-
-        add_normalized_argument(
-            parser,
-            '--file-retention-mode',
-            default=None,
-            choices=(RetentionMode.COMPLIANCE.value, RetentionMode.GOVERNANCE.value, 'none'),
-        )
-        add_normalized_argument(
-            parser,
-            '--retain-until',
-            type=parse_millis_from_float_timestamp,
-            metavar='TIMESTAMP',
-            default=None,
-        )
-        add_normalized_argument(parser, '--bypass-governance', action='store_true', default=False)
-
-    def _run(self, args):
-        b2_uri = self.get_b2_uri_from_arg(args)
-        file_version = self.api.get_file_info_by_uri(b2_uri)
-
-        if args.legal_hold is not None:
-            self.api.update_file_legal_hold(
-                file_version.id_, file_version.file_name, LegalHold(args.legal_hold)
-            )
-
-        if args.file_retention_mode is not None:
-            if args.file_retention_mode == 'none':
-                file_retention = FileRetentionSetting(RetentionMode.NONE)
-            else:
-                file_retention = FileRetentionSetting(
-                    RetentionMode(args.file_retention_mode), args.retain_until
-                )
-
-            self.api.update_file_retention(
-                file_version.id_, file_version.file_name, file_retention, args.bypass_governance
-            )
-
-        return 0
+        return self._upload_stream(bucket, input_stream, compression, **kwargs)
 
 
 class UpdateFileLegalHoldBase(FileIdAndOptionalFileNameMixin, Command):
@@ -4083,6 +5422,8 @@ class ReplicationStatusBase(Command):
 
     Inspects files in only source or both source and destination buckets
     (potentially from different accounts) and provides detailed replication statistics.
+    The source bucket is listed once for all its replication rules, and the destination
+    buckets of the rules are listed at the same time.
 
     Please be aware that only latest file versions are inspected, so any previous
     file versions are not represented in these statistics.
@@ -4097,6 +5438,16 @@ class ReplicationStatusBase(Command):
     ``--columns``
     Comma-separated list of columns to be shown. The rows are still grouped by _all_
     columns, no matter which of them are shown / hidden when using ``--columns`` flag.
+
+    ``--state``
+    File the statistics are saved to, to be updated by the next run with the same file,
+    instead of scanning the buckets again.  The source bucket is still listed, but only
+    the files uploaded since the last run, and a sample of the files whose replication
+    was pending, are examined, and looked up in the destination bucket one by one.
+    ``--sample`` sets how many of the pending files are examined again, 1000 by default.
+    Pending files deleted since the last run are taken out of the statistics; other deleted
+    or overwritten files are only accounted for by a full scan, which is made when the state
+    file does not exist yet, or when the rule, or ``--dont-scan-destination``, changed.
     """
 
     @classmethod
@@ -4117,8 +5468,14 @@ class ReplicationStatusBase(Command):
             type=lambda value: re.split(r', ?', value),
             metavar='COLUMN ONE,COLUMN TWO',
         )
+        add_normalized_argument(parser, '--state', metavar='PATH')
+        add_normalized_argument(parser, '--sample', type=int, metavar='SIZE')
 
     def _run(self, args):
+        if args.sample is not None and not args.state:
+            raise CommandError('--sample requires --state')
+        if args.sample is not None and args.sample < 0:
+            raise CommandError('--sample must not be negative')
         destination_api = args.destination_profile and _get_b2api_for_profile(
             args.destination_profile
         )
@@ -4138,16 +5495,39 @@ class ReplicationStatusBase(Command):
                 )
                 return 1
 
-        results = {
-            rule.name: self.get_results_for_rule(
-                bucket=bucket,
-                rule=rule,
-                destination_api=destination_api,
-                scan_destination=not args.dont_scan_destination,
-                quiet=args.no_progress or args.quiet,
-            )
-            for rule in rules
-        }
+        state = None
+        if args.state:
+            try:
+                state = ReplicationState.load(args.state, bucket.id_)
+            except ReplicationStateError as e:
+                raise CommandError(str(e))
+
+        with ProgressReport(sys.stdout, args.no_progress or args.quiet) as reporter:
+            if state is None:
+                scan = MultiRuleReplicationScan(
+                    bucket,
+                    rules,
+                    reporter,
+                    destination_api=destination_api,
+                    scan_destination=not args.dont_scan_destination,
+                )
+            else:
+                scan = IncrementalReplicationScan(
+                    bucket,
+                    rules,
+                    reporter,
+                    state,
+                    destination_api=destination_api,
+                    scan_destination=not args.dont_scan_destination,
+                    sample_size=DEFAULT_SAMPLE_SIZE if args.sample is None else args.sample,
+                )
+            reports = scan.scan()
+        if state is not None:
+            try:
+                state.save(args.state)
+            except OSError as e:
+                raise CommandError(f'cannot write state file {args.state}: {e}')
+        results = {rule.name: self.get_results_from_report(reports[rule.name]) for rule in rules}
 
         if args.columns[0] != 'all':
             results = {
@@ -4187,7 +5567,10 @@ class ReplicationStatusBase(Command):
             report=ProgressReport(sys.stdout, quiet),
         )
         report = monitor.scan(scan_destination=scan_destination)
+        return cls.get_results_from_report(report)
 
+    @classmethod
+    def get_results_from_report(cls, report: ReplicationReport) -> list[dict]:
         return [
             {
                 **dataclasses.asdict(result),
@@ -5194,15 +6577,27 @@ class File(Command):
 
 
 @File.subcommands_registry.register
-class FileInfo(B2URIFileArgMixin, FileInfoBase):
-    __doc__ = FileInfoBase.__doc__
+class FileInfo(B2URIFileArgMixin, UriBatchMixin, FileInfoBase):
+    """
+    {FileInfoBase}
+
+    {UriBatchMixin}
+    """
+
     COMMAND_NAME = 'info'
+    B2_URI_NARGS = '?'
 
 
 @File.subcommands_registry.register
-class FileUrl(B2URIFileArgMixin, FileUrlBase):
-    __doc__ = FileUrlBase.__doc__
+class FileUrl(B2URIFileArgMixin, UriBatchMixin, FileUrlBase):
+    """
+    {FileUrlBase}
+
+    {UriBatchMixin}
+    """
+
     COMMAND_NAME = 'url'
+    B2_URI_NARGS = '?'
 
 
 @File.subcommands_registry.register
@@ -5224,21 +6619,265 @@ class FileDownload(B2URIFileArgMixin, FileDownloadBase):
 
 
 @File.subcommands_registry.register
-class FileServerSideCopy(FileServerSideCopyBase):
-    __doc__ = FileServerSideCopyBase.__doc__
+class FileServerSideCopy(ThreadsMixin, FileServerSideCopyBase):
+    """
+    {FileServerSideCopyBase}
+
+    With ``--part-size``, a file larger than the part size, or a ``--range`` of it,
+    is copied as a large file, in copy parts of that size, in bytes or with a K, M, G suffix.
+    The parts are copied by a pool of threads, every part is retried on its own if it fails,
+    and the progress is displayed as they are done.  Otherwise, b2sdk copies files up to 5GB
+    in a single piece.
+
+    With ``--concat``, given once for every source instead of ``sourceB2Uri``, the destination
+    file is assembled from the sources, in the order they are given.  Each source is copied
+    whole, or just an inclusive range of its bytes given after ``@``, like
+    ``b2://bucketName/video.bin@0,99999999``.  Every source but the last one has to be
+    at least as long as the minimum part size, 5MB.  Unless ``--content-type`` and ``--info``
+    are given, the destination file gets the metadata of the first source.
+
+    With ``--recursive``, the source and the destination are folders, like
+    ``b2://bucketName/photos/``, and every file under the source folder is copied
+    to the same name under the destination folder.  The files are copied by a pool
+    of threads, taking files from the listing of the source as it goes; files larger than
+    the part size, by default the recommended one, are copied in parts, which share another
+    pool of threads; the parts of a file too large for 10000 of them are enlarged to fit.
+    The content type and the file info are those of each source file,
+    unless ``--content-type`` and ``--info`` are given.
+
+    Files which are already in the destination folder, with the same size and the same sha1,
+    are not copied again, so an interrupted copy is resumed by running the command again.
+    Files whose sha1 is unknown, as it is for large files uploaded without one, are always
+    copied; files copied in parts get the sha1 of their source in their file info, as
+    ``large_file_sha1``, so that they are not copied again.
+    ``--max-copies-per-second`` limits the rate at which copies are started, and
+    ``--queue-size`` how many files are taken from the listing ahead of the copies;
+    it defaults to twice the number of threads.
+
+    {ThreadsMixin}
+
+    Progress is displayed on the console unless ``--no-progress`` is specified.
+    A recursive copy returns 0 if all files were copied successfully and
+    a value different from 0 if any file was not.
+
+    Requires capability:
+
+    - **listFiles** (with ``--recursive``)
+    """
+
     COMMAND_NAME = 'server-side-copy'
 
     @classmethod
     def _setup_parser(cls, parser):
-        add_b2id_or_file_like_b2_uri_argument(parser, 'sourceB2Uri')
-        add_b2id_or_file_like_b2_uri_argument(parser, 'destinationB2Uri', by_id=False)
+        # folders are only valid with --recursive, which is checked once the arguments are parsed
+        add_b2id_or_b2_uri_argument(parser, 'sourceB2Uri', nargs='?')
+        add_b2id_or_b2_uri_argument(parser, 'destinationB2Uri')
+        add_normalized_argument(parser, '--part-size', type=parse_size, default=None)
+        add_normalized_argument(
+            parser,
+            '--concat',
+            type=B2ID_OR_FILE_LIKE_B2_URI_WITH_RANGE_ARG_TYPE,
+            action='append',
+            metavar='SOURCE[@START,END]',
+            help='source to assemble the destination from, can be given many times',
+        )
+        add_normalized_argument(parser, '--recursive', action='store_true')
+        add_normalized_argument(
+            parser,
+            '--queue-size',
+            type=int,
+            default=None,
+            help='max files fetched at once for copying with --recursive, '
+            'if left unset defaults to twice the number of threads.',
+        )
+        add_normalized_argument(
+            parser,
+            '--max-copies-per-second',
+            type=float,
+            default=None,
+            help='max copies started per second with --recursive',
+        )
+        add_normalized_argument(parser, '--no-progress', action='store_true')
         super()._setup_parser(parser)
 
     def get_source_b2_uri(self, args) -> B2URIBase:
-        return args.sourceB2Uri
+        return _file_like_b2_uri(args.sourceB2Uri)
 
     def get_destination_b2_uri(self, args) -> B2URI:
-        return args.destinationB2Uri
+        return _file_like_b2_uri(args.destinationB2Uri, by_id=False)
+
+    def _run(self, args):
+        if args.part_size is not None:
+            min_part_size = self.api.account_info.get_absolute_minimum_part_size()
+            if not min_part_size <= args.part_size <= MAX_PART_SIZE:
+                raise CommandError(
+                    f'--part-size must be between {min_part_size} and {MAX_PART_SIZE} bytes'
+                )
+        threads = self._get_threads_from_args(args)
+        self.api.services.copy_manager.set_thread_pool_size(threads)
+        if args.concat:
+            if args.sourceB2Uri is not None:
+                raise CommandError('sourceB2Uri cannot be given with --concat')
+            if args.recursive or args.range is not None:
+                raise CommandError('--concat cannot be used with --recursive or --range')
+            return self._concatenate(args, threads)
+        if args.sourceB2Uri is None:
+            raise CommandError('sourceB2Uri is required, unless --concat is given')
+        if args.recursive:
+            return self._copy_folder(args, threads)
+        if args.part_size is not None:
+            return self._copy_file_in_parts(args, threads)
+        return super()._run(args)
+
+    def _copy_file_in_parts(self, args, threads: int) -> int:
+        source_version = self.api.get_file_info_by_uri(self.get_source_b2_uri(args))
+        copy_range = self._copy_range(source_version, args.range)
+        if copy_range.length <= args.part_size:
+            return super()._run(args)
+        return self._copy_ranges(args, threads, source_version, [copy_range])
+
+    def _concatenate(self, args, threads: int) -> int:
+        source_versions = [self.api.get_file_info_by_uri(b2_uri) for b2_uri, _ in args.concat]
+        copy_ranges = [
+            self._copy_range(source_version, bytes_range)
+            for source_version, (_, bytes_range) in zip(source_versions, args.concat)
+        ]
+        return self._copy_ranges(args, threads, source_versions[0], copy_ranges)
+
+    @classmethod
+    def _copy_range(cls, file_version: FileVersion, bytes_range: tuple | None) -> CopyRange:
+        if bytes_range is None:
+            return CopyRange(file_version.id_, 0, file_version.size)
+        start, end = bytes_range
+        if end >= file_version.size:
+            raise CommandError('The range in the request is outside the size of the file')
+        return CopyRange(file_version.id_, start, end - start + 1)
+
+    def _copy_ranges(
+        self, args, threads: int, source_version: FileVersion, copy_ranges: list[CopyRange]
+    ) -> int:
+        destination = self.get_destination_b2_uri(args)
+        account_info = self.api.account_info
+        try:
+            parts = plan_parts(
+                copy_ranges,
+                args.part_size or account_info.get_recommended_part_size(),
+                account_info.get_absolute_minimum_part_size(),
+            )
+        except PartCopyError as e:
+            raise CommandError(str(e))
+        file_infos = self._get_file_infos(args)
+        if file_infos is None:
+            file_infos = dict(source_version.file_info)
+            if copy_ranges != [CopyRange(source_version.id_, 0, source_version.size)]:
+                # the sha1 of the source is not that of the copy
+                file_infos.pop(LARGE_FILE_SHA1, None)
+        bucket = self.api.get_bucket_by_name(destination.bucket_name)
+        settings = dict(
+            content_type=args.content_type or source_version.content_type,
+            file_info=file_infos,
+            destination_encryption=self._get_destination_sse_setting(args),
+            source_encryption=self._get_source_sse_setting(args),
+            legal_hold=self._get_legal_hold_setting(args),
+            file_retention=self._get_file_retention_setting(args),
+        )
+        if len(parts) == 1:
+            (part,) = parts
+            file_version = bucket.copy(
+                part.file_id, destination.path, offset=part.offset, length=part.length, **settings
+            )
+        else:
+            file_version = PartCopy(self.api, parts, threads).copy(
+                bucket.id_,
+                destination.path,
+                progress_listener=self.make_progress_listener(
+                    str(destination), args.no_progress or args.quiet
+                ),
+                **settings,
+            )
+        self._print_json(file_version)
+        return 0
+
+    def _copy_folder(self, args, threads: int) -> int:
+        source, destination = args.sourceB2Uri, args.destinationB2Uri
+        if not isinstance(source, B2URI) or not isinstance(destination, B2URI):
+            raise CommandError('--recursive requires b2:// URIs of folders')
+        if args.range is not None:
+            raise CommandError('--range cannot be used with --recursive')
+        source_prefix = _folder_prefix(source.path)
+        destination_prefix = _folder_prefix(destination.path)
+        if source.bucket_name == destination.bucket_name and (
+            source_prefix.startswith(destination_prefix)
+            or destination_prefix.startswith(source_prefix)
+        ):
+            raise CommandError('source and destination folders cannot overlap')
+
+        file_infos = self._get_file_infos(args)
+        destination_encryption_setting = self._get_destination_sse_setting(args)
+        source_encryption_setting = self._get_source_sse_setting(args)
+        legal_hold = self._get_legal_hold_setting(args)
+        file_retention = self._get_file_retention_setting(args)
+        source_bucket = self.api.get_bucket_by_name(source.bucket_name)
+        destination_bucket = self.api.get_bucket_by_name(destination.bucket_name)
+        part_size = args.part_size or self.api.account_info.get_recommended_part_size()
+        min_part_size = self.api.account_info.get_absolute_minimum_part_size()
+
+        def copy(file_version: FileVersion, destination_name: str) -> FileVersion:
+            content_type, file_info = args.content_type, file_infos
+            if content_type is None and file_info is None:
+                # the listing has the metadata, there is no need to fetch it, even with SSE-C
+                content_type, file_info = file_version.content_type, file_version.file_info
+            settings = dict(
+                content_type=content_type,
+                file_info=file_info,
+                destination_encryption=destination_encryption_setting,
+                source_encryption=source_encryption_setting,
+                legal_hold=legal_hold,
+                file_retention=file_retention,
+            )
+            if file_version.size <= part_size:
+                return destination_bucket.copy(file_version.id_, destination_name, **settings)
+            sha1 = known_sha1(file_version)
+            if file_info is not None and sha1 is not None and LARGE_FILE_SHA1 not in file_info:
+                # a copy in parts has no sha1 of its own, which a later run needs to skip it
+                settings['file_info'] = {**file_info, LARGE_FILE_SHA1: sha1}
+            # files too large for the part size are copied in as many parts as a large file takes
+            file_part_size = max(part_size, math.ceil(file_version.size / MAX_PARTS_COUNT))
+            parts = plan_parts(
+                [CopyRange(file_version.id_, 0, file_version.size)], file_part_size, min_part_size
+            )
+            return PartCopy(self.api, parts, threads, executor=part_executor).copy(
+                destination_bucket.id_,
+                destination_name,
+                progress_listener=DoNothingProgressListener(),
+                **settings,
+            )
+
+        prefix_copy = PrefixCopy(
+            (file_version for file_version, _ in source_bucket.ls(source_prefix, recursive=True)),
+            source_prefix,
+            (
+                file_version
+                for file_version, _ in destination_bucket.ls(destination_prefix, recursive=True)
+            ),
+            destination_prefix,
+            copy,
+            threads=threads,
+            queue_size=args.queue_size,
+            rate=args.max_copies_per_second,
+        )
+        with ThreadPoolExecutor(max_workers=threads) as part_executor:
+            with ProgressReport(self.stdout, args.no_progress or args.quiet) as reporter:
+                prefix_copy.run(reporter)
+        if prefix_copy.skipped:
+            self._print_stderr(f'{prefix_copy.skipped} files already copied were skipped')
+        return 1 if prefix_copy.failed else 0
+
+
+def _folder_prefix(path: str) -> str:
+    if path and not path.endswith('/'):
+        return path + '/'
+    return path
 
 
 @File.subcommands_registry.register
@@ -5253,16 +6892,17 @@ class FileHide(B2URIFileOrBucketNameFileNameArgMixin, FileHideBase):
     __doc__ = FileHideBase.__doc__
     COMMAND_NAME = 'hide'
     SUPPORTS_B2_ID = False
+    SUPPORTS_FOLDERS = True
 
 
 @File.subcommands_registry.register
-class FileUnhide(B2URIFileArgMixin, FileUnhideBase):
+class FileUnhide(B2IDOrB2URIMixin, FileUnhideBase):
     __doc__ = FileUnhideBase.__doc__
     COMMAND_NAME = 'unhide'
 
 
 @File.subcommands_registry.register
-class FileUpdate(FileUpdateBase):
+class FileUpdate(B2IDOrB2URIMixin, FileUpdateBase):
     __doc__ = FileUpdateBase.__doc__
     COMMAND_NAME = 'update'
 
@@ -5329,7 +6969,7 @@ class CopyFileById(CmdReplacedByMixin, FileServerSideCopyLegacyBase):
 
 
 class HideFile(CmdReplacedByMixin, HideFileBase):
-    __doc__ = FileHideBase.__doc__
+    __doc__ = HideFileBase.__doc__
     replaced_by_cmd = (File, FileHide)
 
 
@@ -5407,7 +7047,7 @@ class FileLargeUnfinishedList(B2BucketURIMixin, FileLargeUnfinishedListBase):
 
 
 @FileLargeUnfinished.subcommands_registry.register
-class FileLargeUnfinishedCancel(B2IDOrB2BucketURIMixin, FileLargeUnfinishedCancelBase):
+class FileLargeUnfinishedCancel(B2IDOrB2URIMixin, FileLargeUnfinishedCancelBase):
     __doc__ = FileLargeUnfinishedCancelBase.__doc__
     COMMAND_NAME = 'cancel'
 
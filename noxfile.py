@@ -277,6 +277,13 @@ def test(session):
         session.notify('integration')
 
 
+@nox.session(python=PYTHON_DEFAULT_VERSION)
+def benchmark(session):
+    """Run benchmarks."""
+    uv_install(session, groups=('test',))
+    session.run('pytest', '-s', *PYTEST_GLOBAL_ARGS, *session.posargs, 'test/benchmark')
+
+
 @nox.session(python=PYTHON_DEFAULT_VERSION)
 def cleanup_buckets(session):
     """Remove buckets from previous test runs."""
@@ -0,0 +1,14 @@
+######################################################################
+#
+# File: test/benchmark/__init__.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+B2 CLI benchmarks
+
+Not part of the regular test runs; use ``nox -s benchmark``.
+"""
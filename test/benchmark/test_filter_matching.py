@@ -0,0 +1,87 @@
+######################################################################
+#
+# File: test/benchmark/test_filter_matching.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Throughput of matching file names against hundreds of sync regexes and ``ls`` wildcards,
+pattern by pattern as b2sdk does, and in a single pass with compiled filters.
+
+The corpus has ``B2_BENCHMARK_NAME_COUNT`` names, 100 thousand by default; set it to
+10000000 for the full corpus, which takes a while with the pattern by pattern matchers.
+"""
+
+import fnmatch
+import os
+import random
+import time
+
+from b2sdk.v3 import Filter, FilterType, RegexSet
+
+from b2._internal._utils.compiled_filters import CompiledFilterMatcher, PatternSet
+
+NAME_COUNT = int(os.environ.get('B2_BENCHMARK_NAME_COUNT', '100000'))
+
+EXTENSIONS = ['txt', 'jpg', 'log', 'tmp', 'py', 'json', 'bak', 'csv']
+
+
+def make_names(count: int) -> list:
+    rng = random.Random(0)
+    return [
+        f'project{rng.randrange(1000)}/dir{rng.randrange(100)}/file{number}.'
+        f'{rng.choice(EXTENSIONS)}'
+        for number in range(count)
+    ]
+
+
+# literal prefixes, exact names and other regexes, as --exclude-regex would get them
+REGEXES = (
+    [f'project{number}/' for number in range(0, 400, 2)]
+    + [rf'project{number}/dir0/file{number}\.txt$' for number in range(50)]
+    + [rf'.*/dir{number}/.*\.(tmp|bak)$' for number in range(50)]
+)
+
+# --include and --exclude wildcards
+WILDCARDS = (
+    [Filter.exclude(f'project{number}/*') for number in range(0, 400, 2)]
+    + [Filter.include(f'project{number}/dir0/file{number}.txt') for number in range(50)]
+    + [Filter.exclude(f'*/dir{number}/*.tmp') for number in range(50)]
+)
+
+
+def b2sdk_filter_match(filters, name: str) -> bool:
+    # FilterMatcher.match of b2sdk, which it does not export
+    include_file = True
+    for filter_ in filters:
+        if fnmatch.fnmatchcase(name, filter_.pattern):
+            include_file = filter_.type == FilterType.INCLUDE
+    return include_file
+
+
+def measure(match, names) -> tuple:
+    started = time.perf_counter()
+    matched = sum(1 for name in names if match(name))
+    return matched, len(names) / (time.perf_counter() - started)
+
+
+def test_filter_matching():
+    names = make_names(NAME_COUNT)
+    results = {}
+    regex_set, pattern_set = RegexSet(REGEXES), PatternSet(REGEXES)
+    results[f'{len(REGEXES)} regexes, b2sdk'] = measure(regex_set.matches, names)
+    results[f'{len(REGEXES)} regexes, compiled'] = measure(pattern_set.matches, names)
+    matcher = CompiledFilterMatcher(WILDCARDS)
+    results[f'{len(WILDCARDS)} wildcards, b2sdk'] = measure(
+        lambda name: b2sdk_filter_match(WILDCARDS, name), names
+    )
+    results[f'{len(WILDCARDS)} wildcards, compiled'] = measure(matcher.match, names)
+
+    print()
+    for name, (matched, rate) in results.items():
+        print(f'{name:>24}: {matched:>9} of {len(names)} matched, {rate:>12,.0f} names/s')
+    for kind in [f'{len(REGEXES)} regexes', f'{len(WILDCARDS)} wildcards']:
+        assert results[f'{kind}, b2sdk'][0] == results[f'{kind}, compiled'][0]
@@ -0,0 +1,90 @@
+######################################################################
+#
+# File: test/benchmark/test_sync_scan_memory.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+Peak RSS of a sync of a local folder, with and without ``--max-memory``.
+
+The folder is a single flat directory, the worst case of ``LocalFolder``, which sorts
+the entries of every directory in memory.  It is synced, as a dry run, to an empty bucket
+of the B2 simulator, so that the files are counted and compared, like in a real sync,
+but not uploaded.  Every sync runs in a fresh process, so that its peak RSS is its own,
+and for two sizes of the folder: the peak RSS with ``LocalFolder`` grows with the number
+of files, while that with ``ExternalSortLocalFolder`` stays flat.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('resource')  # peak RSS is only measured on Unix
+
+FILE_COUNT = int(os.environ.get('B2_BENCHMARK_FILE_COUNT', '100000'))
+MAX_MEMORY = 10 * 1000 * 1000
+# growth of the peak RSS with --max-memory, from N to 2N files, taken for noise
+TOLERANCE = 0.1
+
+SYNC_SCRIPT = """
+import os, resource, sys
+from b2sdk.v3 import B2Api, B2Folder, B2HttpApiConfig, LocalFolder, RawSimulator, StubAccountInfo
+from b2._internal._utils.local_scan import ExternalSortLocalFolder
+from b2._internal._utils.sync import CliSyncReport, CliSynchronizer
+
+root, max_memory = sys.argv[1], int(sys.argv[2])
+if max_memory:
+    source = ExternalSortLocalFolder(root, max_memory)
+else:
+    source = LocalFolder(root)
+api = B2Api(StubAccountInfo(), None, api_config=B2HttpApiConfig(_raw_api_class=RawSimulator))
+api.authorize_account(*api.session.raw_api.create_account(), realm='production')
+api.create_bucket('bucket', 'allPrivate')
+synchronizer = CliSynchronizer(10, dry_run=True)
+with open(os.devnull, 'w') as devnull, CliSyncReport(devnull, True) as reporter:
+    synchronizer.sync_folders(source, B2Folder('bucket', '', api), 0, reporter)
+print(reporter.total_count, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+@pytest.fixture(scope='module')
+def flat_folders(tmp_path_factory):
+    folders = {}
+    for file_count in (FILE_COUNT, 2 * FILE_COUNT):
+        folder = tmp_path_factory.mktemp(f'flat-{file_count}')
+        for number in range(file_count):
+            # names out of order, as file systems list them anyway
+            open(folder / f'{(number * 7919) % file_count:09}-file.txt', 'wb').close()
+        folders[file_count] = folder
+    return folders
+
+
+def peak_rss_mb(folder, max_memory: int) -> float:
+    output = subprocess.check_output(
+        [sys.executable, '-c', SYNC_SCRIPT, str(folder), str(max_memory)], text=True
+    )
+    count, max_rss = map(int, output.split())
+    assert count == len(os.listdir(folder))
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    return max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def test_peak_rss(flat_folders):
+    results = {}
+    for name, max_memory in [('LocalFolder', 0), ('--max-memory 10M', MAX_MEMORY)]:
+        results[name] = [peak_rss_mb(folder, max_memory) for folder in flat_folders.values()]
+
+    print()
+    file_counts = list(flat_folders)
+    print(f'{"":>18}  ' + '  '.join(f'{count:>9} files' for count in file_counts))
+    for name, peaks in results.items():
+        print(f'{name:>18}  ' + '  '.join(f'{peak:>9.1f} MiB  ' for peak in peaks))
+
+    local_peaks, external_peaks = results['LocalFolder'], results['--max-memory 10M']
+    assert external_peaks[1] <= external_peaks[0] * (1 + TOLERANCE)
+    assert local_peaks[1] > local_peaks[0] * (1 + TOLERANCE)
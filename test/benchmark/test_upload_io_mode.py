@@ -0,0 +1,79 @@
+######################################################################
+#
+# File: test/benchmark/test_upload_io_mode.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+"""
+CPU time per GB of reading a local file for a large file upload, with and without ``--io-mode mmap``.
+
+Every part is opened twice, as by b2sdk: once to compute its sha1 and once to send it,
+here to ``os.devnull`` in the block size of ``http.client``.  The file is read once upfront,
+so that it is served from the page cache and the disk speed does not matter.
+"""
+
+import os
+import time
+
+import pytest
+from b2sdk.v3 import IncrementalHexDigester, RangeOfInputStream, UploadSourceLocalFile
+
+from b2._internal._cli.arg_parser_types import parse_size
+from b2._internal._utils.mmap_upload import IO_MODE_BUFFERED, IO_MODE_MMAP, MmapUploadSource
+
+FILE_SIZE = parse_size(os.environ.get('B2_BENCHMARK_FILE_SIZE', '512M'))
+PART_SIZE = 100 * 1000 * 1000
+SEND_BLOCK_SIZE = 8192
+
+SOURCE_CLASSES = {
+    IO_MODE_BUFFERED: UploadSourceLocalFile,
+    IO_MODE_MMAP: MmapUploadSource,
+}
+
+
+@pytest.fixture(scope='module')
+def large_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp('benchmark') / 'large_file'
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for _ in range(FILE_SIZE // len(block)):
+            f.write(block)
+    with open(path, 'rb') as f:
+        while f.read(len(block)):
+            pass
+    return path
+
+
+def upload_parts(source, sink_fd) -> list[str]:
+    sha1s = []
+    size = source.get_content_length()
+    for offset in range(0, size, PART_SIZE):
+        length = min(PART_SIZE, size - offset)
+        with RangeOfInputStream(source.open(), offset, length) as stream:
+            sha1s.append(IncrementalHexDigester(stream).update_from_stream())
+        with RangeOfInputStream(source.open(), offset, length) as stream:
+            while data := stream.read(SEND_BLOCK_SIZE):
+                os.write(sink_fd, data)
+    return sha1s
+
+
+def test_cpu_time_per_gb(large_file):
+    results = {}
+    sha1s = {}
+    sink_fd = os.open(os.devnull, os.O_WRONLY)
+    try:
+        for io_mode, source_class in SOURCE_CLASSES.items():
+            source = source_class(large_file)
+            started = time.process_time()
+            sha1s[io_mode] = upload_parts(source, sink_fd)
+            results[io_mode] = (time.process_time() - started) / (FILE_SIZE / 1e9)
+    finally:
+        os.close(sink_fd)
+
+    assert sha1s[IO_MODE_MMAP] == sha1s[IO_MODE_BUFFERED]
+    print()
+    for io_mode, cpu_seconds_per_gb in results.items():
+        print(f'{io_mode:>10}: {cpu_seconds_per_gb:.3f} CPU s/GB')
@@ -0,0 +1,61 @@
+######################################################################
+#
+# File: test/unit/_cli/test_arg_parser_types.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import argparse
+import datetime
+
+import pytest
+
+from b2._internal._cli.arg_parser_types import parse_duration, parse_part_size, parse_size
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        ('1024', 1024),
+        ('64M', 64_000_000),
+        ('1.5G', 1_500_000_000),
+        ('2kb', 2000),
+    ],
+)
+def test_parse_size(value, expected):
+    assert parse_size(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'M', '-1', '10X'])
+def test_parse_size__invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size(value)
+
+
+@pytest.mark.parametrize(
+    'value, expected', [('auto', 'auto'), ('AUTO', 'auto'), ('10M', 10_000_000)]
+)
+def test_parse_part_size(value, expected):
+    assert parse_part_size(value) == expected
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        ('90s', datetime.timedelta(seconds=90)),
+        ('30m', datetime.timedelta(minutes=30)),
+        ('1.5h', datetime.timedelta(minutes=90)),
+        ('7D', datetime.timedelta(days=7)),
+        ('2w', datetime.timedelta(days=14)),
+    ],
+)
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', '10', 'd', '-1d', '3y'])
+def test_parse_duration__invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_duration(value)
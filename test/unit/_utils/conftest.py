@@ -0,0 +1,47 @@
+######################################################################
+#
+# File: test/unit/_utils/conftest.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import pytest
+from b2sdk.v3 import (
+    B2Api,
+    B2HttpApiConfig,
+    InMemoryAccountInfo,
+    InMemoryCache,
+    RawSimulator,
+    ReplicationConfiguration,
+    ReplicationRule,
+)
+
+
+@pytest.fixture
+def source_bucket():
+    api = B2Api(
+        InMemoryAccountInfo(),
+        cache=InMemoryCache(),
+        api_config=B2HttpApiConfig(_raw_api_class=RawSimulator),
+    )
+    application_key_id, master_key = api.session.raw_api.create_account()
+    api.authorize_account(application_key_id, master_key, 'production')
+    source = api.create_bucket('source', 'allPrivate')
+    destinations = [api.create_bucket(f'destination{i}', 'allPrivate') for i in range(3)]
+    for name in ['a/1', 'a/2', 'a/b/3', 'ab/4', 'c/5', '6']:
+        source.upload_bytes(b'data', name)
+    destinations[0].upload_bytes(b'data', 'a/1')
+    destinations[0].upload_bytes(b'data', 'a/7')
+    destinations[2].upload_bytes(b'data', 'c/5')
+    # the simulator does not take replication configurations, only the scan needs it
+    source.replication = ReplicationConfiguration(
+        rules=[
+            ReplicationRule(destinations[0].id_, 'rule-a', file_name_prefix='a'),
+            ReplicationRule(destinations[1].id_, 'rule-ab', file_name_prefix='a/b/'),
+            ReplicationRule(destinations[2].id_, 'rule-all'),
+        ],
+        source_key_id=application_key_id,
+    )
+    return source
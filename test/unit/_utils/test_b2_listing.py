@@ -0,0 +1,99 @@
+######################################################################
+#
+# File: test/unit/_utils/test_b2_listing.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import pytest
+from b2sdk.v3 import B2Folder
+
+from b2._internal._utils import b2_listing
+from b2._internal._utils.b2_listing import ShardedB2Folder
+
+FILE_NAMES = [
+    'a.txt',
+    'a/b.txt',
+    'a/c/d.txt',
+    'a/c/e.txt',
+    'a0.txt',
+    'dir/f/g.txt',
+    'dir/h/i.txt',
+    'dir/j.txt',
+    'é/k.txt',
+]
+
+
+@pytest.fixture
+def files(b2_cli, bucket, api_bucket):
+    for file_name in FILE_NAMES:
+        api_bucket.upload_bytes(b'v1', file_name)
+    api_bucket.upload_bytes(b'v2', 'a/c/d.txt')
+    api_bucket.hide_file('dir/j.txt')
+    return api_bucket
+
+
+def listing(folder):
+    return [
+        (file_version.file_name, file_version.id_) for file_version in folder.get_file_versions()
+    ]
+
+
+@pytest.mark.parametrize('list_threads', [2, 3, 10])
+@pytest.mark.parametrize('folder_name', ['', 'a', 'dir', 'a.txt', 'missing'])
+def test_same_as_b2_folder(files, list_threads, folder_name, monkeypatch):
+    monkeypatch.setattr(b2_listing, 'SHARD_PAGE_SIZE', 1)
+    monkeypatch.setattr(b2_listing, 'SHARD_BUFFER_PAGES', 1)
+    expected = listing(B2Folder(files.name, folder_name, files.api))
+    assert listing(ShardedB2Folder(files.name, folder_name, files.api, list_threads)) == expected
+
+
+def test_shards(files, monkeypatch):
+    listed = []
+    original_list = b2_listing._Shard.list
+
+    def spy_list(shard, folder, stopped):
+        listed.append(shard.prefix)
+        original_list(shard, folder, stopped)
+
+    monkeypatch.setattr(b2_listing._Shard, 'list', spy_list)
+
+    # 2 threads for 3 subfolders, the top level is not split
+    listing(ShardedB2Folder(files.name, '', files.api, 2))
+    assert sorted(listed) == ['a/', 'dir/', 'é/']
+
+    # 4 threads, the subfolders are split into theirs, which have no subfolders to list concurrently
+    listed.clear()
+    assert listing(ShardedB2Folder(files.name, '', files.api, 4)) == listing(
+        B2Folder(files.name, '', files.api)
+    )
+    assert listed == []
+
+    listed.clear()
+    listing(ShardedB2Folder(files.name, 'dir', files.api, 2))
+    assert sorted(listed) == ['dir/f/', 'dir/h/']
+
+
+def test_errors_are_raised(files, monkeypatch):
+    ls = files.ls
+
+    def failing_ls(path, *args, recursive, **kwargs):
+        if recursive:
+            raise RuntimeError('listing failed')
+        return ls(path, *args, recursive=recursive, **kwargs)
+
+    monkeypatch.setattr(files, 'ls', failing_ls)
+    folder = ShardedB2Folder(files.name, '', files.api, 2)
+    folder.bucket = files
+    with pytest.raises(RuntimeError, match='listing failed'):
+        listing(folder)
+
+
+def test_early_close(files, monkeypatch):
+    monkeypatch.setattr(b2_listing, 'SHARD_PAGE_SIZE', 1)
+    monkeypatch.setattr(b2_listing, 'SHARD_BUFFER_PAGES', 1)
+    file_versions = ShardedB2Folder(files.name, '', files.api, 2).get_file_versions()
+    assert next(file_versions).file_name == 'a.txt'
+    file_versions.close()  # does not wait for the blocked listers forever
@@ -0,0 +1,117 @@
+######################################################################
+#
+# File: test/unit/_utils/test_buffer_pool.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import hashlib
+import io
+
+import pytest
+
+from b2._internal._utils.buffer_pool import (
+    BufferPool,
+    BufferPoolTimeout,
+    MemoryViewStream,
+    PooledWriteIntentGenerator,
+    derive_memory_limited_settings,
+)
+
+
+class ReadOnlySource:
+    """Source without ``readinto``, returning at most ``chunk`` bytes per read."""
+
+    def __init__(self, data, chunk):
+        self.stream = io.BytesIO(data)
+        self.chunk = chunk
+
+    def read(self, size):
+        return self.stream.read(min(size, self.chunk))
+
+
+class TestBufferPool:
+    def test_buffers_are_reused(self):
+        pool = BufferPool(buffers_count=2, buffer_size=10)
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        assert pool.allocated == 1
+
+    def test_timeout_when_exhausted(self):
+        pool = BufferPool(buffers_count=1, buffer_size=10)
+        pool.acquire()
+        with pytest.raises(BufferPoolTimeout):
+            pool.acquire(timeout=0.01)
+
+
+def test_memory_view_stream():
+    released = []
+    stream = MemoryViewStream(memoryview(b'abcdef'), lambda: released.append(True))
+    assert len(stream) == 6
+    assert stream.read(4) == b'abcd'
+    assert stream.read() == b'ef'
+    stream.seek(1)
+    assert stream.read(2) == b'bc'
+    stream.close()
+    stream.close()
+    assert released == [True]
+
+
+@pytest.mark.parametrize(
+    'source_factory',
+    [
+        pytest.param(io.BytesIO, id='readinto'),
+        pytest.param(lambda data: ReadOnlySource(data, chunk=3), id='read'),
+    ],
+)
+def test_generator_splits_stream_into_pooled_parts(source_factory):
+    data = bytes(range(256)) * 10
+    pool = BufferPool(buffers_count=2, buffer_size=1000)
+    generator = PooledWriteIntentGenerator(
+        source_factory(data), pool, queue_timeout_seconds=1, read_size=64
+    )
+
+    parts = []
+    for intent in generator.iterator():
+        source = intent.outbound_source
+        with source.open() as stream:
+            part = stream.read()
+        assert source.get_content_sha1() == hashlib.sha1(part).hexdigest()
+        parts.append((intent.destination_offset, part))
+
+    assert [(offset, len(part)) for offset, part in parts] == [(0, 1000), (1000, 1000), (2000, 560)]
+    assert b''.join(part for _, part in parts) == data
+    assert pool.allocated == 1  # every part was released before the next one was filled
+
+
+def test_generator_empty_stream():
+    generator = PooledWriteIntentGenerator(
+        io.BytesIO(b''), BufferPool(2, 10), queue_timeout_seconds=1
+    )
+    intents = list(generator.iterator())
+    assert len(intents) == 1
+    assert intents[0].outbound_source.get_content_length() == 0
+
+
+@pytest.mark.parametrize(
+    'max_memory, threads, part_size, expected',
+    [
+        (1100, 10, None, (11, 100)),
+        (100, 10, None, (10, 10)),
+        (20, 10, None, (2, 10)),
+        (100, 10, 30, (3, 30)),
+    ],
+)
+def test_derive_memory_limited_settings(max_memory, threads, part_size, expected):
+    assert (
+        derive_memory_limited_settings(max_memory, threads, min_part_size=10, part_size=part_size)
+        == expected
+    )
+
+
+def test_derive_memory_limited_settings__too_little_memory():
+    with pytest.raises(ValueError, match='at least 20 bytes'):
+        derive_memory_limited_settings(19, 10, min_part_size=10)
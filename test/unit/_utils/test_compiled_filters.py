@@ -0,0 +1,120 @@
+######################################################################
+#
+# File: test/unit/_utils/test_compiled_filters.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import fnmatch
+import random
+import re
+
+import pytest
+from b2sdk.v3 import Filter, FilterType, RegexSet, ScanPoliciesManager
+from b2sdk.v3.exception import InvalidArgument
+
+from b2._internal._utils.compiled_filters import (
+    CompiledFilterMatcher,
+    CompiledScanPoliciesManager,
+    PatternSet,
+)
+
+NAMES = [
+    '',
+    'a',
+    'a.txt',
+    'a.txt\n',
+    'a$',
+    'ab',
+    'b/a.txt',
+    'b/c/d.log',
+    'photos/kitten.jpg',
+    'photos2/puppy.jpg',
+    'photos.txt',
+    'x' * 10,
+    'aba',
+    'abab',
+]
+
+REGEXES = [
+    'a',
+    'a.txt',
+    r'a\.txt',
+    r'a\.txt$',
+    r'a\$',
+    '$',
+    '',
+    'b/',
+    r'.*\.log$',
+    'photos$',
+    'photos',
+    '(?i)A',
+    '(ab)\\1',
+    '(?P<x>ab)(?P=x)?a',
+    '(a)|b',
+    'x{3,}',
+    r'\w+/',
+    'a|photos2',
+]
+
+WILDCARDS = ['*', 'a*', '*.txt', 'a.txt', 'b/*', '*/*.log', '?', 'a?a*', '[ab]*', 'photos*', '']
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_regexes_match_like_b2sdk(seed):
+    patterns = random.Random(seed).sample(REGEXES, k=random.Random(seed).randint(0, 8))
+    reference = RegexSet(patterns)
+    pattern_set = PatternSet(patterns)
+    for name in NAMES:
+        assert pattern_set.matches(name) == reference.matches(name), (patterns, name)
+        last = max(
+            (index for index, pattern in enumerate(patterns) if re.match(pattern, name)),
+            default=-1,
+        )
+        assert pattern_set.last_match(name) == last, (patterns, name)
+
+
+def filter_matches(filters, name):
+    # FilterMatcher of b2sdk, which it does not export
+    included = not filters or any(filter_.type == FilterType.EXCLUDE for filter_ in filters)
+    for filter_ in filters:
+        if fnmatch.fnmatchcase(name, filter_.pattern):
+            included = filter_.type == FilterType.INCLUDE
+    return included
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_filters_match_like_b2sdk(seed):
+    rng = random.Random(seed)
+    filters = [
+        rng.choice([Filter.include, Filter.exclude])(pattern)
+        for pattern in rng.choices(WILDCARDS, k=rng.randint(0, 6))
+    ]
+    matcher = CompiledFilterMatcher(filters)
+    for name in NAMES:
+        assert matcher.match(name) == filter_matches(filters, name), (filters, name)
+
+
+def test_scan_policies_manager():
+    kwargs = dict(
+        exclude_dir_regexes=['node_modules', r'build$'],
+        exclude_file_regexes=[r'.*\.tmp$', 'cache/'],
+        include_file_regexes=[r'cache/keep\.tmp'],
+    )
+    reference = ScanPoliciesManager(**kwargs)
+    manager = CompiledScanPoliciesManager(**{key: iter(value) for key, value in kwargs.items()})
+    for path in ['a.tmp', 'cache/x', 'cache/keep.tmp', 'src/a.py', 'node_modules2', 'build2']:
+        assert manager.should_exclude_relative_path(path) == (
+            reference.should_exclude_relative_path(path)
+        )
+        assert manager.should_exclude_local_directory(path) == (
+            reference.should_exclude_local_directory(path)
+        )
+        assert manager.should_exclude_b2_directory(path) == (
+            reference.should_exclude_b2_directory(path)
+        )
+
+    with pytest.raises(InvalidArgument):
+        CompiledScanPoliciesManager(exclude_file_regexes=['('])
@@ -0,0 +1,91 @@
+######################################################################
+#
+# File: test/unit/_utils/test_compression.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import gzip
+import hashlib
+import io
+
+import pytest
+
+from b2._internal._utils import compression
+from b2._internal._utils.compression import (
+    GZIP,
+    ZSTD,
+    CompressingReader,
+    DecompressingWriter,
+    DecompressionError,
+    UnsupportedCompression,
+)
+
+DATA = b''.join(b'line %d of a log\n' % i for i in range(50000))
+
+zstd_available = pytest.mark.skipif(
+    compression._zstd is None and compression._zstandard is None, reason='zstd is not available'
+)
+
+
+@pytest.mark.parametrize('algorithm', [GZIP, pytest.param(ZSTD, marks=zstd_available)])
+def test_round_trip(algorithm):
+    with CompressingReader(io.BytesIO(DATA), algorithm, threads=2, chunk_size=4096) as reader:
+        compressed = reader.read()
+    assert len(compressed) < len(DATA) / 5
+    assert reader.original_size == len(DATA)
+    assert reader.original_sha1 == hashlib.sha1(DATA).hexdigest()
+
+    output = io.BytesIO()
+    writer = DecompressingWriter(output, algorithm)
+    for i in range(0, len(compressed), 1000):
+        writer.write(compressed[i : i + 1000])
+    writer.finish()
+    assert output.getvalue() == DATA
+    assert writer.sha1 == hashlib.sha1(DATA).hexdigest()
+
+
+def test_gzip_is_compatible():
+    with CompressingReader(io.BytesIO(DATA), GZIP) as reader:
+        assert gzip.decompress(reader.read()) == DATA
+
+    output = io.BytesIO()
+    writer = DecompressingWriter(output, GZIP)
+    writer.write(gzip.compress(b'first ') + gzip.compress(b'second'))
+    writer.finish()
+    assert output.getvalue() == b'first second'
+
+
+def test_close_before_end():
+    reader = CompressingReader(io.BytesIO(DATA), GZIP, chunk_size=16, queue_size=1)
+    reader.read(10)
+    reader.close()
+    assert not reader._thread.is_alive()
+
+
+def test_source_error_is_raised():
+    class FailingSource:
+        def read(self, size):
+            raise OSError('broken pipe')
+
+    with CompressingReader(FailingSource(), GZIP) as reader:
+        with pytest.raises(OSError, match='broken pipe'):
+            reader.read()
+
+
+def test_invalid_data():
+    writer = DecompressingWriter(io.BytesIO(), GZIP)
+    with pytest.raises(DecompressionError):
+        writer.write(b'not gzip at all')
+
+    writer = DecompressingWriter(io.BytesIO(), GZIP)
+    writer.write(gzip.compress(DATA)[:100])
+    with pytest.raises(DecompressionError):
+        writer.finish()
+
+
+def test_unknown_algorithm():
+    with pytest.raises(UnsupportedCompression):
+        CompressingReader(io.BytesIO(), 'lzma')
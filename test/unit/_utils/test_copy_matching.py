@@ -0,0 +1,106 @@
+######################################################################
+#
+# File: test/unit/_utils/test_copy_matching.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import hashlib
+from unittest import mock
+
+from b2sdk.v3 import (
+    SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    B2DeleteAction,
+    B2Path,
+    B2UploadAction,
+)
+from b2sdk.v3.exception import B2Error
+
+from b2._internal._utils.copy_matching import CopyMatcher, ServerSideCopyAction, WaitForCopies
+from b2._internal._utils.sha1_compare import LocalHasher
+
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def b2_path(name, data, file_id, **file_info):
+    version = mock.Mock(
+        id_=file_id,
+        file_name=f'dir/{name}',
+        size=len(data),
+        content_sha1=sha1(data),
+        file_info=file_info,
+    )
+    return B2Path(name, selected_version=version, all_versions=[version])
+
+
+def upload(tmp_path, name, data):
+    (tmp_path / name).write_bytes(data)
+    return B2UploadAction(
+        str(tmp_path / name),
+        name,
+        f'dir/{name}',
+        1000,
+        len(data),
+        SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    )
+
+
+def test_copy_matcher(tmp_path):
+    uploads = [
+        upload(tmp_path, 'same.txt', b'hello'),
+        upload(tmp_path, 'other.txt', b'world'),
+        upload(tmp_path, 'resized.txt', b'hello world'),
+        upload(tmp_path, 'empty.txt', b''),
+    ]
+    deleted = B2DeleteAction('old.txt', 'dir/old.txt', 'id-old', '')
+    kept = B2DeleteAction('gzipped.txt', 'dir/gzipped.txt', 'id-gzipped', '')
+
+    with LocalHasher(2) as hasher:
+        matcher = CopyMatcher(hasher, window=1)
+        matcher.index(b2_path('old.txt', b'hello', 'id-old'))
+        matcher.index(
+            b2_path('gzipped.txt', b'world', 'id-gzipped', **{'b2-content-encoding': 'gzip'})
+        )
+        matcher.index(None)
+        matched = list(matcher.match([deleted, kept, *uploads]))
+
+    copy = matched[1]
+    assert isinstance(copy, ServerSideCopyAction)
+    assert copy.source_version.id_ == 'id-old'
+    assert matched[0] is kept
+    assert matched[2:] == [*uploads[1:], deleted]
+    assert deleted.hooks == (WaitForCopies([copy]),)
+
+
+def test_copy_matcher_indexes_folder_first(tmp_path):
+    folder = mock.Mock()
+    folder.all_files.return_value = iter([b2_path('z-old.txt', b'hello', 'id-old')])
+    action = upload(tmp_path, 'a.txt', b'hello')
+
+    with LocalHasher(2) as hasher:
+        matcher = CopyMatcher(hasher)
+        matcher.index_folder(folder, None)
+        (copy,) = matcher.match([action])
+
+    assert isinstance(copy, ServerSideCopyAction)
+    assert copy.upload is action
+
+
+def test_server_side_copy_falls_back_to_upload(tmp_path):
+    action = upload(tmp_path, 'same.txt', b'hello')
+    copy = ServerSideCopyAction(action, b2_path('old.txt', b'hello', 'id-old').selected_version)
+    bucket = mock.Mock()
+    bucket.copy.side_effect = B2Error('copy failed')
+    reporter = mock.Mock()
+
+    with mock.patch.object(B2UploadAction, 'do_action') as do_action:
+        copy.run(bucket, reporter)
+    do_action.assert_called_once_with(bucket, reporter)
+    assert not copy.copied
+    assert copy.done.is_set()
+    reporter.print_completion.assert_called_once_with('upload same.txt')
+    reporter.update_copied.assert_not_called()
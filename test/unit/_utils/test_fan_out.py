@@ -0,0 +1,82 @@
+######################################################################
+#
+# File: test/unit/_utils/test_fan_out.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import LocalFolder
+
+from b2._internal._utils.fan_out import SharedLocalScan
+
+
+@pytest.fixture
+def folder(tmp_path):
+    for name in ['a.txt', 'b.txt', 'c.txt', 'd/e.txt']:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(b'x')
+    return LocalFolder(str(tmp_path))
+
+
+def test_views_share_one_scan(folder):
+    shared_scan = SharedLocalScan(folder, 3, queue_size=1)
+    views = [shared_scan.view(index) for index in range(3)]
+    reporters = [mock.Mock() for _ in views]
+
+    def read_all(index):
+        return [path.relative_path for path in views[index].all_files(reporters[index])]
+
+    def read_one(index):
+        files = views[index].all_files(reporters[index])
+        first = next(files).relative_path
+        files.close()
+        return [first]
+
+    with (
+        mock.patch.object(
+            LocalFolder, 'all_files', side_effect=LocalFolder.all_files, autospec=True
+        ) as all_files,
+        ThreadPoolExecutor(4) as executor,
+    ):
+        counted = executor.submit(lambda: sum(1 for _ in views[0].all_files(None)))
+        results = [executor.submit(read_all, 0), executor.submit(read_one, 1)]
+        results.append(executor.submit(read_all, 2))
+        results = [result.result(timeout=10) for result in results]
+
+    assert all_files.call_count == 1
+    assert results == [['a.txt', 'b.txt', 'c.txt', 'd/e.txt'], ['a.txt'], results[0]]
+    assert counted.result(timeout=10) == 4
+
+
+def test_scan_error_reaches_every_view(folder):
+    shared_scan = SharedLocalScan(folder, 2)
+    with mock.patch.object(LocalFolder, 'all_files', side_effect=OSError('gone')):
+        with ThreadPoolExecutor(2) as executor:
+            results = [
+                executor.submit(list, shared_scan.view(index).all_files(mock.Mock()))
+                for index in range(2)
+            ]
+            for result in results:
+                with pytest.raises(OSError, match='gone'):
+                    result.result(timeout=10)
+
+
+def test_scan_problems_reach_every_report(folder):
+    os.symlink('missing', os.path.join(folder.root, 'broken'))
+    shared_scan = SharedLocalScan(folder, 2)
+    reporters = [mock.Mock(), mock.Mock()]
+    with ThreadPoolExecutor(2) as executor:
+        for result in [
+            executor.submit(list, shared_scan.view(index).all_files(reporters[index]))
+            for index in range(2)
+        ]:
+            result.result(timeout=10)
+    for reporter in reporters:
+        reporter.local_access_error.assert_called_once_with(os.path.join(folder.root, 'broken'))
@@ -0,0 +1,80 @@
+######################################################################
+#
+# File: test/unit/_utils/test_large_file_cancel.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import threading
+import time
+from unittest import mock
+
+from b2sdk.v3.exception import B2Error
+
+from b2._internal._utils.large_file_cancel import UnfinishedLargeFilesCancel
+
+
+def make_api(file_count, batch_size=2):
+    files = [
+        {'fileId': str(number), 'fileName': f'file{number}', 'uploadTimestamp': number * 1000}
+        for number in range(file_count)
+    ]
+
+    def list_unfinished_large_files(bucket_id, start_file_id, max_file_count, prefix):
+        start = int(start_file_id or 0)
+        batch = files[start : start + batch_size]
+        next_file_id = str(start + batch_size) if start + batch_size < len(files) else None
+        return {'files': batch, 'nextFileId': next_file_id}
+
+    api = mock.Mock()
+    api.session.list_unfinished_large_files.side_effect = list_unfinished_large_files
+    return api
+
+
+def test_unfinished_files_older_than():
+    cancel = UnfinishedLargeFilesCancel(make_api(5), 'bucket', threads=1, uploaded_before=3000)
+    assert [unfinished.file_id for unfinished in cancel.unfinished_files()] == ['0', '1', '2']
+
+
+def test_run_reports_in_order_and_counts():
+    api = make_api(6)
+
+    def cancel_large_file(file_id):
+        # later files finish first
+        time.sleep((6 - int(file_id)) / 100)
+        if file_id == '4':
+            raise B2Error('nope')
+
+    api.cancel_large_file.side_effect = cancel_large_file
+    api.list_parts.side_effect = lambda file_id: [mock.Mock(content_length=100)] * int(file_id)
+    cancel = UnfinishedLargeFilesCancel(api, 'bucket', threads=3, count_parts=True)
+    results = []
+    cancel.run(results.append)
+    assert [result.file.file_id for result in results] == ['0', '1', '2', '3', '4', '5']
+    assert str(results[4].error) == 'nope'
+    assert (cancel.files, cancel.parts, cancel.bytes, cancel.failed) == (5, 11, 1100, 1)
+
+
+def test_run_bounds_the_listing():
+    api = make_api(10, batch_size=1)
+    release = threading.Event()
+    api.cancel_large_file.side_effect = lambda file_id: release.wait(10)
+    cancel = UnfinishedLargeFilesCancel(api, 'bucket', threads=1)
+    thread = threading.Thread(target=cancel.run, args=(lambda result: None,))
+    thread.start()
+    thread.join(0.2)
+    # two files are pending, and the listing waits for the first one
+    assert api.session.list_unfinished_large_files.call_count == 3
+    release.set()
+    thread.join(10)
+    assert cancel.files == 10
+
+
+def test_dry_run():
+    api = make_api(3)
+    cancel = UnfinishedLargeFilesCancel(api, 'bucket', threads=2, dry_run=True)
+    cancel.run(lambda result: None)
+    assert cancel.files == 3
+    api.cancel_large_file.assert_not_called()
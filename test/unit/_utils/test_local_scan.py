@@ -0,0 +1,181 @@
+######################################################################
+#
+# File: test/unit/_utils/test_local_scan.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import os
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import LocalFolder, ScanPoliciesManager
+
+from b2._internal._utils import local_scan
+from b2._internal._utils.local_scan import ExternalSortLocalFolder, ParallelLocalFolder
+
+FILES = [
+    'a.txt',
+    'a/b.txt',
+    'a/c/d.txt',
+    'a0.txt',
+    'excluded/e.txt',
+    'f/excluded/g.txt',
+    'f/h.txt',
+    'back\\slash.txt',
+    'é/i.txt',
+]
+
+
+@pytest.fixture
+def local_folder(tmp_path):
+    for name in FILES:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+    (tmp_path / 'a' / 'loop').symlink_to(tmp_path / 'a')
+    (tmp_path / 'f' / 'link').symlink_to(tmp_path / 'a' / 'c')
+    (tmp_path / 'broken').symlink_to(tmp_path / 'missing')
+    return tmp_path
+
+
+def scan(folder, policies_manager):
+    reporter = mock.Mock()
+    paths = [
+        (path.relative_path, path.absolute_path, path.mod_time, path.size)
+        for path in folder.all_files(reporter, policies_manager)
+    ]
+    return paths, sorted(map(str, reporter.mock_calls))
+
+
+@pytest.mark.parametrize('threads', [1, 4])
+@pytest.mark.parametrize('prefetched_per_thread', [1, 1000])
+@pytest.mark.parametrize(
+    'policies_manager',
+    [
+        ScanPoliciesManager(),
+        ScanPoliciesManager(
+            exclude_dir_regexes=['excluded', 'f/excluded'], exclude_all_symlinks=True
+        ),
+    ],
+)
+def test_same_as_local_folder(
+    local_folder, threads, prefetched_per_thread, policies_manager, monkeypatch
+):
+    monkeypatch.setattr(local_scan, 'PREFETCHED_DIRECTORIES_PER_THREAD', prefetched_per_thread)
+    expected = scan(LocalFolder(str(local_folder)), policies_manager)
+    assert expected[0]  # sanity check
+    assert scan(ParallelLocalFolder(str(local_folder), threads), policies_manager) == expected
+
+
+@pytest.mark.parametrize('max_memory', [1, 1000, 1000 * 1000])
+@pytest.mark.parametrize(
+    'policies_manager',
+    [
+        ScanPoliciesManager(),
+        ScanPoliciesManager(
+            exclude_dir_regexes=['excluded', 'f/excluded'], exclude_all_symlinks=True
+        ),
+    ],
+)
+def test_external_sort_same_as_local_folder(
+    local_folder, max_memory, policies_manager, tmp_path_factory, monkeypatch
+):
+    # a run per file, merged in several passes with the smallest memory
+    monkeypatch.setattr(local_scan, 'MAX_MERGE_FAN_IN', 2)
+    for number in range(20):
+        (local_folder / 'a' / f'{number:02}-{"x" * number}.txt').write_text('x')
+    temp_dir = tmp_path_factory.mktemp('runs')
+    expected = scan(LocalFolder(str(local_folder)), policies_manager)
+    folder = ExternalSortLocalFolder(str(local_folder), max_memory, str(temp_dir))
+    assert scan(folder, policies_manager) == expected
+    assert not os.listdir(temp_dir)
+
+
+def test_external_sort_closes_runs(local_folder, tmp_path_factory, monkeypatch):
+    readers = []
+    read_run = local_scan._read_run
+
+    def spy_read_run(path):
+        readers.append(read_run(path))
+        return readers[-1]
+
+    monkeypatch.setattr(local_scan, '_read_run', spy_read_run)
+    temp_dir = tmp_path_factory.mktemp('runs')
+    files = ExternalSortLocalFolder(str(local_folder), 1, str(temp_dir)).all_files(mock.Mock())
+    next(files)
+    files.close()
+    assert readers
+    assert all(reader.gi_frame is None for reader in readers)
+    assert not os.listdir(temp_dir)
+
+
+def test_external_sort_counts_unsorted(local_folder, tmp_path_factory, monkeypatch):
+    def failing_write_run(path, entries):
+        raise AssertionError('counting files does not sort them')
+
+    temp_dir = tmp_path_factory.mktemp('runs')
+    folder = ExternalSortLocalFolder(str(local_folder), 1000 * 1000, str(temp_dir))
+    expected = [path.relative_path for path in folder.all_files(mock.Mock())]
+    monkeypatch.setattr(local_scan, '_write_run', failing_write_run)
+    folder.max_memory = 1
+    assert sorted(path.relative_path for path in folder.all_files(None)) == expected
+
+
+def test_excluded_directories_are_not_scanned(local_folder, monkeypatch):
+    scanned = []
+    scandir = os.scandir
+
+    def spy_scandir(path):
+        scanned.append(os.path.relpath(path, local_folder))
+        return scandir(path)
+
+    monkeypatch.setattr(local_scan.os, 'scandir', spy_scandir)
+    policies_manager = ScanPoliciesManager(exclude_dir_regexes=['a', 'f'])
+    paths = [
+        path.relative_path
+        for path in ParallelLocalFolder(str(local_folder), 4).all_files(None, policies_manager)
+    ]
+    assert paths == ['a.txt', 'a0.txt', 'excluded/e.txt', 'é/i.txt']
+    assert sorted(scanned) == ['.', 'excluded', 'é']
+
+
+def test_errors_are_raised(local_folder, monkeypatch):
+    def failing_scandir(path):
+        raise OSError('scan failed')
+
+    monkeypatch.setattr(local_scan.os, 'scandir', failing_scandir)
+    with pytest.raises(OSError, match='scan failed'):
+        list(ParallelLocalFolder(str(local_folder), 2).all_files(None))
+
+
+@pytest.mark.parametrize(
+    'policies_manager',
+    [ScanPoliciesManager(), ScanPoliciesManager(exclude_dir_regexes=['f/excluded'])],
+)
+def test_some_files(local_folder, policies_manager):
+    relative_paths = [
+        'a/c',
+        'a/c/d.txt',
+        'a0.txt',
+        'f',
+        'missing',
+        'back\\slash.txt',
+        'a/loop/b.txt',
+    ]
+    all_paths = [
+        path.relative_path
+        for path in LocalFolder(str(local_folder)).all_files(mock.Mock(), policies_manager)
+    ]
+    expected = [
+        path
+        for path in all_paths
+        if any(path == prefix or path.startswith(prefix + '/') for prefix in relative_paths)
+    ]
+    assert expected  # sanity check
+    paths = ParallelLocalFolder(str(local_folder), 2).some_files(
+        None, policies_manager, relative_paths
+    )
+    assert [path.relative_path for path in paths] == expected
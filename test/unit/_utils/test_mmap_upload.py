@@ -0,0 +1,89 @@
+######################################################################
+#
+# File: test/unit/_utils/test_mmap_upload.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import hashlib
+import io
+import os
+
+import pytest
+
+from b2._internal._utils import mmap_upload
+from b2._internal._utils.mmap_upload import (
+    IO_MODE_MMAP,
+    MappedFileChanged,
+    MappedFileStream,
+    MmapUploadSource,
+    upload_local_file,
+)
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def local_file(tmp_path):
+    path = tmp_path / 'file.bin'
+    path.write_bytes(CONTENT)
+    return path
+
+
+def test_mapped_file_stream(local_file):
+    source = MmapUploadSource(local_file)
+    stream = source.open()
+    assert isinstance(stream, MappedFileStream)
+    data = stream.read(100)
+    assert isinstance(data, memoryview)
+    assert data == CONTENT[:100]
+    stream.seek(1000)
+    assert stream.read() == CONTENT[1000:]
+    assert stream.read() == b''
+    stream.close()  # `data` still references the mapping
+    assert data == CONTENT[:100]
+    assert source.get_content_sha1() == hashlib.sha1(CONTENT).hexdigest()
+
+
+def test_fallback_to_regular_reads(local_file, tmp_path):
+    source = MmapUploadSource(local_file)
+    local_file.write_bytes(CONTENT[:10])
+    with source.open() as stream:
+        assert isinstance(stream, io.BufferedReader)
+
+    empty_file = tmp_path / 'empty'
+    empty_file.touch()
+    with MmapUploadSource(empty_file).open() as stream:
+        assert stream.read() == b''
+
+
+def test_truncation_while_mapped(local_file):
+    source = MmapUploadSource(local_file)
+    with source.open() as stream:
+        assert stream.read(10) == CONTENT[:10]
+        os.truncate(local_file, 10)
+        with pytest.raises(MappedFileChanged):
+            stream.read(100)
+
+
+def test_upload_local_file_mmap(b2_cli, bucket, api_bucket, local_file, monkeypatch):
+    opened = []
+
+    class SpyStream(MappedFileStream):
+        def __init__(self, mapping, f):
+            super().__init__(mapping, f)
+            opened.append(self)
+
+    monkeypatch.setattr(mmap_upload, 'MappedFileStream', SpyStream)
+    file_version = upload_local_file(
+        api_bucket, str(local_file), 'file.bin', io_mode=IO_MODE_MMAP, file_info={}
+    )
+
+    assert file_version.size == len(CONTENT)
+    assert len(opened) > 1  # the file was uploaded in parts
+    assert all(stream.closed for stream in opened)
+    downloaded = io.BytesIO()
+    api_bucket.download_file_by_name('file.bin').save(downloaded)
+    assert downloaded.getvalue() == CONTENT
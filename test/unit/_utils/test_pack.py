@@ -0,0 +1,129 @@
+######################################################################
+#
+# File: test/unit/_utils/test_pack.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import io
+import os
+import tarfile
+
+import pytest
+
+from b2._internal._utils.pack import (
+    MemberExtractingWriter,
+    PackError,
+    PackIndex,
+    PackMember,
+    TarPackReader,
+    group_members,
+    scan_local_folder,
+)
+
+FILES = {
+    'a.txt': b'hello',
+    'dir/b.bin': bytes(range(256)) * 5,
+    'dir/empty': b'',
+    'dir/sub/' + 'long-name-' * 20: b'long name',
+}
+
+
+@pytest.fixture
+def local_folder(tmp_path):
+    for name, content in FILES.items():
+        path = tmp_path / 'src' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        os.utime(path, (1500111222, 1500111222))
+    return tmp_path / 'src'
+
+
+def make_pack(members, pack=0):
+    reader = TarPackReader(members, pack)
+    return io.BufferedReader(reader, buffer_size=7).read()
+
+
+def test_pack_is_readable_tar_with_correct_offsets(local_folder):
+    members = list(scan_local_folder(local_folder))
+    assert [member.name for member in members] == sorted(FILES)
+    data = make_pack(members)
+
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        assert {info.name: tar.extractfile(info).read() for info in tar} == FILES
+    for member in members:
+        assert data[member.offset : member.offset + member.size] == FILES[member.name]
+        assert member.mod_time_millis == 1500111222000
+
+
+def test_group_members(local_folder):
+    members = list(scan_local_folder(local_folder))
+    groups = list(group_members(members, pack_size=2048))
+    # headers take 512 bytes, so the small files do not fit together, the long name needs a PAX header
+    assert [[member.name for member in group] for group in groups] == [
+        [name] for name in sorted(FILES)
+    ]
+    assert list(group_members(members, pack_size=10**6)) == [members]
+
+
+def test_index_roundtrip(local_folder):
+    members = list(scan_local_folder(local_folder))
+    make_pack(members)
+    index = PackIndex(packs=['pack-00000.tar'], members=members)
+    loaded = PackIndex.from_bytes(index.to_bytes())
+    assert loaded == index
+    assert loaded.get_member('dir/b.bin').sha1 == members[1].sha1
+    with pytest.raises(PackError):
+        loaded.get_member('missing')
+    with pytest.raises(PackError):
+        PackIndex.from_bytes(b'{"version": 2}')
+
+
+def test_index_members_sorted_by_name():
+    names = ['b', 'a/z', 'a0', 'a.txt', 'c']
+    index = PackIndex(packs=['pack-00000.tar'], members=[PackMember(name, 1, 0) for name in names])
+    loaded = PackIndex.from_bytes(index.to_bytes())
+    assert [member.name for member in loaded.members] == sorted(names)
+    for name in names:
+        assert loaded.get_member(name).name == name
+    with pytest.raises(PackError):
+        loaded.get_member('a')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 100, 10**6])
+def test_member_extracting_writer(local_folder, tmp_path, chunk_size):
+    members = list(scan_local_folder(local_folder))
+    data = make_pack(members)
+    target = tmp_path / 'dst'
+    with MemberExtractingWriter(members, str(target)) as writer:
+        for position in range(0, len(data), chunk_size):
+            writer.write(data[position : position + chunk_size])
+        writer.finish()
+    assert writer.extracted == len(FILES)
+    for name, content in FILES.items():
+        assert (target / name).read_bytes() == content
+        assert os.path.getmtime(target / name) == 1500111222
+
+
+def test_member_extracting_writer_errors(local_folder, tmp_path):
+    members = list(scan_local_folder(local_folder))
+    data = make_pack(members)
+
+    members[0].sha1 = '0' * 40
+    with pytest.raises(PackError, match='checksum mismatch'):
+        with MemberExtractingWriter(members, str(tmp_path / 'dst')) as writer:
+            writer.write(data)
+
+    members[0].sha1 = None
+    with pytest.raises(PackError, match='pack ended'):
+        with MemberExtractingWriter(members, str(tmp_path / 'dst')) as writer:
+            writer.write(data[: members[1].offset + 1])
+            writer.finish()
+
+    evil = PackMember('../evil', 5, 0, offset=members[0].offset)
+    with pytest.raises(PackError, match='relative path'):
+        with MemberExtractingWriter([evil], str(tmp_path / 'dst')) as writer:
+            writer.write(data)
+    assert not (tmp_path / 'evil').exists()
@@ -0,0 +1,95 @@
+######################################################################
+#
+# File: test/unit/_utils/test_part_copy.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from unittest import mock
+
+import pytest
+from b2sdk.v3.exception import AccessDenied, B2ConnectionError
+
+from b2._internal._utils.part_copy import (
+    CopyPart,
+    CopyRange,
+    PartCopy,
+    PartCopyError,
+    plan_parts,
+)
+
+
+def test_plan_parts():
+    parts = plan_parts(
+        [CopyRange('a', 0, 25), CopyRange('b', 100, 10), CopyRange('c', 5, 23)],
+        part_size=10,
+        min_part_size=4,
+    )
+    assert parts == [
+        CopyPart(1, 'a', 0, 10),
+        CopyPart(2, 'a', 10, 10),
+        CopyPart(3, 'a', 20, 5),
+        CopyPart(4, 'b', 100, 10),
+        CopyPart(5, 'c', 5, 10),
+        # the remainder of 3 bytes is too short for a part of its own
+        CopyPart(6, 'c', 15, 13),
+    ]
+    assert parts[-1].bytes_range == (15, 27)
+
+
+def test_plan_parts_shares_remainder_with_full_part():
+    parts = plan_parts([CopyRange('a', 0, 21)], part_size=10, min_part_size=4, max_part_size=10)
+    assert [part.length for part in parts] == [10, 5, 6]
+
+
+def test_plan_parts_errors():
+    with pytest.raises(PartCopyError, match='range 1 has 3 bytes'):
+        plan_parts([CopyRange('a', 0, 3), CopyRange('b', 0, 10)], part_size=10, min_part_size=4)
+    with pytest.raises(PartCopyError, match='10001 parts'):
+        plan_parts([CopyRange('a', 0, 10001)], part_size=1, min_part_size=1)
+
+
+@pytest.fixture
+def api():
+    api = mock.Mock()
+    api.session.start_large_file.return_value = {'fileId': 'large'}
+    api.session.copy_part.side_effect = lambda file_id, large_file_id, part_number, **kwargs: {
+        'contentSha1': f'sha1-{part_number}'
+    }
+    return api
+
+
+def copy(api, parts, **kwargs):
+    return PartCopy(api, parts, threads=2, retry_delay=0, **kwargs).copy(
+        'bucket', 'name', 'text/plain', {}, progress_listener=mock.Mock()
+    )
+
+
+def test_part_copy_retries_parts(api):
+    failures = [B2ConnectionError('reset')]
+    copy_part = api.session.copy_part.side_effect
+
+    def flaky_copy_part(*args, **kwargs):
+        if args[2] == 2 and failures:
+            raise failures.pop()
+        return copy_part(*args, **kwargs)
+
+    api.session.copy_part.side_effect = flaky_copy_part
+    parts = plan_parts([CopyRange('a', 0, 30)], part_size=10, min_part_size=1)
+    copy(api, parts)
+    assert api.session.copy_part.call_count == 4
+    api.session.finish_large_file.assert_called_once_with('large', ['sha1-1', 'sha1-2', 'sha1-3'])
+    api.file_version_factory.from_api_response.assert_called_once()
+
+
+def test_part_copy_cancels_large_file_on_failure(api):
+    api.session.copy_part.side_effect = AccessDenied()
+    parts = plan_parts([CopyRange('a', 0, 30)], part_size=10, min_part_size=1)
+    with pytest.raises(AccessDenied):
+        copy(api, parts, attempts=3)
+    # errors which are not worth retrying are not retried
+    assert api.session.copy_part.call_count <= 3
+    api.session.cancel_large_file.assert_called_once_with('large')
+    api.session.finish_large_file.assert_not_called()
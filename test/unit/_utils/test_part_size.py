@@ -0,0 +1,89 @@
+######################################################################
+#
+# File: test/unit/_utils/test_part_size.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import io
+import itertools
+
+import pytest
+
+from b2._internal._utils import buffer_pool
+from b2._internal._utils.buffer_pool import AdaptiveWriteIntentGenerator, BufferPool
+from b2._internal._utils.part_size import AdaptivePartSizer
+
+MB = 1000 * 1000
+
+
+def feed(sizer, throughput, samples=AdaptivePartSizer.SAMPLES_PER_STEP):
+    """Record ``samples`` parts of the current size uploaded with given throughput (bytes/s)."""
+    part_size = sizer.part_size
+    for _ in range(samples):
+        sizer.record(part_size, part_size, part_size / throughput)
+
+
+def test_grows_while_throughput_improves():
+    sizer = AdaptivePartSizer(initial_part_size=10 * MB)
+    feed(sizer, 10 * MB)
+    assert sizer.part_size == 20 * MB
+    feed(sizer, 20 * MB)
+    assert sizer.part_size == 40 * MB
+
+
+def test_reverses_then_settles_on_best():
+    sizer = AdaptivePartSizer(initial_part_size=10 * MB)
+    feed(sizer, 10 * MB)
+    feed(sizer, 10 * MB)  # 20MB parts are not faster
+    assert sizer.part_size == 5 * MB
+    feed(sizer, 5 * MB)  # neither are 5MB ones
+    assert sizer.part_size == 10 * MB
+    feed(sizer, 100 * MB)
+    assert sizer.part_size == 10 * MB  # settled, further samples are ignored
+
+
+def test_ignores_samples_of_other_part_sizes():
+    sizer = AdaptivePartSizer(initial_part_size=10 * MB)
+    for _ in range(5):
+        sizer.record(7 * MB, 7 * MB, 1)
+    assert sizer.part_size == 10 * MB
+
+
+def test_limits():
+    sizer = AdaptivePartSizer(initial_part_size=100 * MB, memory_limit=50 * MB)
+    assert sizer.part_size == 50 * MB
+    assert sizer.next_part_size(total_bytes=10000 * 60 * MB) == 50 * MB
+    assert sizer.next_part_size(total_bytes=10000 * 30 * MB) == 50 * MB
+    assert sizer.next_part_size(total_bytes=10000 * 60 * MB, parts_count=9999) == 50 * MB
+
+    sizer = AdaptivePartSizer(initial_part_size=10 * MB, max_parts=10)
+    assert sizer.next_part_size(total_bytes=200 * MB) == 20 * MB
+    # unknown size: the rest of the stream is assumed to be as large as what was read so far
+    assert sizer.next_part_size(transferred_bytes=300 * MB, parts_count=5) == 60 * MB
+
+    with pytest.raises(ValueError):
+        AdaptivePartSizer(initial_part_size=10 * MB, memory_limit=1 * MB)
+
+
+def test_adaptive_write_intent_generator(monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(buffer_pool.time, 'monotonic', lambda: next(clock))
+    sizer = AdaptivePartSizer(initial_part_size=4, min_part_size=2, max_part_size=16)
+    pool = BufferPool(buffers_count=2, buffer_size=4)
+    data = bytes(range(30))
+    generator = AdaptiveWriteIntentGenerator(
+        io.BytesIO(data), pool, queue_timeout_seconds=1, part_sizer=sizer, total_bytes=len(data)
+    )
+    lengths = []
+    result = b''
+    for intent in generator.iterator():
+        stream = intent.outbound_source.open()
+        result += stream.read()
+        lengths.append(intent.length)
+        stream.close()  # every part takes one clock tick, so larger parts are faster
+    assert result == data
+    assert lengths == [4, 4, 8, 8, 6]
+    assert pool.allocated <= 2
@@ -0,0 +1,105 @@
+######################################################################
+#
+# File: test/unit/_utils/test_prefix_copy.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import threading
+from unittest import mock
+
+import pytest
+from b2sdk.v3.exception import B2Error
+
+from b2._internal._utils.prefix_copy import PrefixCopy, RateLimiter
+
+
+def file_version(name, size=1, sha1='a'):
+    return mock.Mock(file_name=name, size=size, content_sha1=sha1, file_info={}, id_=f'id-{name}')
+
+
+def test_jobs_skip_copied_files():
+    prefix_copy = PrefixCopy(
+        [
+            file_version('src/a'),
+            file_version('src/b', size=2),
+            file_version('src/c', sha1='none'),
+            file_version('src/d', sha1='b'),
+            file_version('src/e'),
+            file_version('src/f', sha1='none'),
+        ],
+        'src/',
+        [
+            file_version('dst/0'),
+            file_version('dst/a'),
+            file_version('dst/b'),
+            file_version('dst/c'),
+            file_version('dst/d'),
+            file_version('dst/f', sha1='none'),
+        ],
+        'dst/',
+        copy=None,
+        threads=1,
+    )
+    # same sizes prove nothing without the sha1 of both files
+    assert [job.destination_name for job in prefix_copy.jobs()] == [
+        'dst/b',
+        'dst/c',
+        'dst/d',
+        'dst/e',
+        'dst/f',
+    ]
+    assert prefix_copy.skipped == 1
+
+
+def test_run_bounds_the_listing_and_reports_failures():
+    running = threading.Semaphore(0)
+    listed = []
+
+    def source_files():
+        for name in ['src/a', 'src/b', 'src/c', 'src/d']:
+            listed.append(name)
+            yield file_version(name)
+
+    def copy(source, destination_name):
+        running.acquire(timeout=10)
+        if destination_name == 'dst/b':
+            raise B2Error('nope')
+
+    prefix_copy = PrefixCopy(source_files(), 'src/', [], 'dst/', copy, threads=1, queue_size=2)
+    reporter = mock.Mock()
+    thread = threading.Thread(target=prefix_copy.run, args=(reporter,))
+    thread.start()
+    thread.join(0.2)
+    # two files are queued, the third one waits for room
+    assert listed == ['src/a', 'src/b', 'src/c']
+    for _ in range(4):
+        running.release()
+    thread.join(10)
+    assert [(job.destination_name, str(error)) for job, error in prefix_copy.failed] == [
+        ('dst/b', 'nope')
+    ]
+    assert reporter.update_count.call_count == 4
+
+
+def test_run_raises_unexpected_errors():
+    def copy(source, destination_name):
+        raise ValueError('bad')
+
+    prefix_copy = PrefixCopy([file_version('src/a')], 'src/', [], 'dst/', copy, threads=1)
+    with pytest.raises(ValueError, match='bad'):
+        prefix_copy.run(mock.Mock())
+
+
+def test_rate_limiter():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+    for _ in range(5):
+        limiter.wait()
+    assert now[0] == 1.0
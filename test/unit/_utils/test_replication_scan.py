@@ -0,0 +1,105 @@
+######################################################################
+#
+# File: test/unit/_utils/test_replication_scan.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import (
+    ProgressReport,
+    ReplicationConfiguration,
+    ReplicationMonitor,
+    ReplicationRule,
+)
+
+from b2._internal._utils.replication_scan import (
+    MultiRuleReplicationScan,
+    common_folder,
+    rule_folder,
+)
+
+
+def monitor_results(bucket, scan_destination):
+    return {
+        rule.name: ReplicationMonitor(bucket, rule, report=ProgressReport(mock.Mock(), True))
+        .scan(scan_destination=scan_destination)
+        .counter_by_status
+        for rule in bucket.replication.rules
+    }
+
+
+@pytest.mark.parametrize(
+    'folders,expected',
+    [
+        (['a/', 'a/b/'], 'a/'),
+        (['a/', 'ab/'], ''),
+        (['a/b/c/', 'a/b/d/'], 'a/b/'),
+        (['a/', ''], ''),
+    ],
+)
+def test_common_folder(folders, expected):
+    assert common_folder(folders) == expected
+
+
+def test_rule_folder():
+    assert [
+        rule_folder(ReplicationRule('id', 'r', file_name_prefix=prefix))
+        for prefix in ['', 'a', 'a/']
+    ] == [
+        '',
+        'a/',
+        'a/',
+    ]
+
+
+@pytest.mark.parametrize('scan_destination', [True, False])
+def test_scan_matches_a_monitor_per_rule(source_bucket, scan_destination):
+    reporter = ProgressReport(mock.Mock(), True)
+    reports = MultiRuleReplicationScan(
+        source_bucket,
+        source_bucket.replication.rules,
+        reporter,
+        scan_destination=scan_destination,
+        queue_size=1,
+    ).scan()
+    results = {name: report.counter_by_status for name, report in reports.items()}
+    assert results == monitor_results(source_bucket, scan_destination)
+    assert [sum(counter.values()) for counter in results.values()] == (
+        [4, 1, 6] if scan_destination else [3, 1, 6]
+    )
+
+
+def test_scan_lists_the_source_once(source_bucket):
+    with mock.patch.object(
+        source_bucket.api.session,
+        'list_file_versions',
+        wraps=source_bucket.api.session.list_file_versions,
+    ) as list_file_versions:
+        MultiRuleReplicationScan(
+            source_bucket,
+            source_bucket.replication.rules,
+            ProgressReport(mock.Mock(), True),
+            scan_destination=False,
+        ).scan()
+    assert list_file_versions.call_count == 1
+
+
+def test_scan_raises_destination_errors(source_bucket):
+    rules = source_bucket.replication.rules
+    source_bucket.replication = ReplicationConfiguration(
+        rules=[*rules, ReplicationRule('missing', 'rule-missing')],
+        source_key_id=source_bucket.replication.source_key_id,
+    )
+    scan = MultiRuleReplicationScan(
+        source_bucket,
+        source_bucket.replication.rules,
+        ProgressReport(mock.Mock(), True),
+        queue_size=1,
+    )
+    with pytest.raises(Exception):
+        scan.scan()
@@ -0,0 +1,184 @@
+######################################################################
+#
+# File: test/unit/_utils/test_replication_state.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import (
+    EncryptionMode,
+    ProgressReport,
+    ReplicationConfiguration,
+    ReplicationRule,
+    ReplicationScanResult,
+    ReplicationStatus,
+)
+
+from b2._internal._utils.replication_scan import MultiRuleReplicationScan
+from b2._internal._utils.replication_state import (
+    IncrementalReplicationScan,
+    ReplicationState,
+    ReplicationStateError,
+    result_from_dict,
+    result_to_dict,
+)
+
+
+def set_replication_status(bucket, file_name, status):
+    simulated_bucket = bucket.api.session.raw_api.bucket_id_to_bucket[bucket.id_]
+    for (name, _), simulated_file in simulated_bucket.file_name_and_id_to_file.items():
+        if name == file_name:
+            simulated_file.replication_status = status
+
+
+def full_scan(bucket, scan_destination=True):
+    reports = MultiRuleReplicationScan(
+        bucket,
+        bucket.replication.rules,
+        ProgressReport(mock.Mock(), True),
+        scan_destination=scan_destination,
+    ).scan()
+    return {name: report.counter_by_status for name, report in reports.items()}
+
+
+def incremental_scan(bucket, state, now, **kwargs):
+    reports = IncrementalReplicationScan(
+        bucket,
+        bucket.replication.rules,
+        ProgressReport(mock.Mock(), True),
+        state,
+        clock=lambda: now,
+        **kwargs,
+    ).scan()
+    return {name: report.counter_by_status for name, report in reports.items()}
+
+
+def pending_count(counter):
+    return sum(
+        count
+        for result, count in counter.items()
+        if result.source_replication_status == ReplicationStatus.PENDING
+    )
+
+
+def test_result_round_trip():
+    result = ReplicationScanResult(
+        source_replication_status=ReplicationStatus.PENDING,
+        source_encryption_mode=EncryptionMode.UNKNOWN,
+        source_has_hide_marker=False,
+    )
+    assert result_from_dict(result_to_dict(result)) == result
+    assert result_from_dict(result_to_dict(ReplicationScanResult())) == ReplicationScanResult()
+
+
+@pytest.mark.parametrize('scan_destination', [True, False])
+def test_first_scan_is_a_full_scan(source_bucket, tmp_path, scan_destination):
+    state = ReplicationState(source_bucket.id_)
+    results = incremental_scan(source_bucket, state, 100, scan_destination=scan_destination)
+    assert results == full_scan(source_bucket, scan_destination)
+
+    state_path = str(tmp_path / 'state.json')
+    state.save(state_path)
+    loaded = ReplicationState.load(state_path, source_bucket.id_)
+    assert loaded == state
+    assert loaded.rules['rule-a'].scanned_before == 100_000
+
+
+def test_next_scan_examines_new_and_pending_files(source_bucket):
+    set_replication_status(source_bucket, 'a/2', ReplicationStatus.PENDING)
+    set_replication_status(source_bucket, 'c/5', ReplicationStatus.PENDING)
+    state = ReplicationState(source_bucket.id_)
+    # the simulator stamps uploads of the source bucket 5000, 5001, ...
+    incremental_scan(source_bucket, state, 5.006)
+    assert set(state.rules['rule-a'].pending) == {'2'}
+    assert set(state.rules['rule-all'].pending) == {'a/2', 'c/5'}
+
+    set_replication_status(source_bucket, 'a/2', ReplicationStatus.COMPLETED)
+    source_bucket.delete_file_version(
+        *next(
+            (file_version.id_, file_version.file_name)
+            for file_version, _ in source_bucket.ls('c/5')
+        )
+    )
+    source_bucket.upload_bytes(b'data', 'a/8')
+    with mock.patch.object(
+        IncrementalReplicationScan, '_look_up', wraps=IncrementalReplicationScan._look_up
+    ) as look_up:
+        results = incremental_scan(source_bucket, state, 200)
+
+    # the new file, the pending one and the deleted pending one, for the rules they fall under
+    assert sorted(call.args[2] for call in look_up.call_args_list) == [
+        '2',
+        '8',
+        'a/2',
+        'a/8',
+        'c/5',
+    ]
+    assert results == full_scan(source_bucket)
+    assert state.rules['rule-all'].pending == {}
+
+
+def test_sample_size_limits_the_pending_files_examined(source_bucket):
+    set_replication_status(source_bucket, 'a/1', ReplicationStatus.PENDING)
+    set_replication_status(source_bucket, 'a/2', ReplicationStatus.PENDING)
+    state = ReplicationState(source_bucket.id_)
+    incremental_scan(source_bucket, state, 100, scan_destination=False)
+
+    set_replication_status(source_bucket, 'a/1', ReplicationStatus.COMPLETED)
+    set_replication_status(source_bucket, 'a/2', ReplicationStatus.COMPLETED)
+    results = incremental_scan(source_bucket, state, 200, scan_destination=False, sample_size=1)
+    assert pending_count(results['rule-a']) == 1
+    results = incremental_scan(source_bucket, state, 300, scan_destination=False, sample_size=1)
+    assert results == full_scan(source_bucket, scan_destination=False)
+
+
+def test_files_uploaded_during_the_scan_are_left_for_the_next_one(source_bucket):
+    state = ReplicationState(source_bucket.id_)
+    results = incremental_scan(source_bucket, state, 5.003, scan_destination=False)
+    assert sum(results['rule-all'].values()) == 3
+    results = incremental_scan(source_bucket, state, 100, scan_destination=False)
+    assert results == full_scan(source_bucket, scan_destination=False)
+
+
+def test_changed_rule_is_scanned_again(source_bucket):
+    state = ReplicationState(source_bucket.id_)
+    incremental_scan(source_bucket, state, 100)
+    rules = source_bucket.replication.rules
+    source_bucket.replication = ReplicationConfiguration(
+        rules=[
+            rules[0],
+            rules[1],
+            ReplicationRule(rules[2].destination_bucket_id, 'rule-all', file_name_prefix='c'),
+        ],
+        source_key_id=source_bucket.replication.source_key_id,
+    )
+    results = incremental_scan(source_bucket, state, 200)
+    assert results == full_scan(source_bucket)
+    assert state.rules['rule-all'].file_name_prefix == 'c'
+
+
+def test_load_missing_file(tmp_path):
+    assert ReplicationState.load(str(tmp_path / 'state.json'), 'bucket') == ReplicationState(
+        'bucket'
+    )
+
+
+@pytest.mark.parametrize(
+    'content,message',
+    [
+        ('{', 'cannot read state file'),
+        ('{"version": 1, "bucketId": "other", "rules": {}}', 'is for bucket other, not bucket'),
+        ('{"version": 2, "bucketId": "bucket", "rules": {}}', 'has version 2, expected 1'),
+        ('{"version": 1, "bucketId": "bucket"}', 'invalid state file'),
+    ],
+)
+def test_load_errors(tmp_path, content, message):
+    state_path = tmp_path / 'state.json'
+    state_path.write_text(content)
+    with pytest.raises(ReplicationStateError, match=message):
+        ReplicationState.load(str(state_path), 'bucket')
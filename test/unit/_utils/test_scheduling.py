@@ -0,0 +1,128 @@
+######################################################################
+#
+# File: test/unit/_utils/test_scheduling.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import B2DeleteAction
+
+from b2._internal._utils.copy_matching import wait_for_copies
+from b2._internal._utils.scheduling import ActionScheduler, size_class, time_transfer
+from b2._internal._utils.sync import CliSyncReport
+
+KB = 1000
+MB = 1000 * 1000
+
+
+class FakeAction(B2DeleteAction):
+    def __init__(self, name, size, kind='upload'):
+        super().__init__(name, f'dir/{name}', f'id-{name}', '')
+        self.size = size
+        self.kind = kind
+
+    def get_bytes(self):
+        return self.size
+
+    def do_action(self, bucket, reporter):
+        pass
+
+    def __repr__(self):
+        return f'{self.kind} {self.relative_name}'
+
+
+def scheduled(schedule, actions, window=2):
+    return [repr(action) for action in ActionScheduler(schedule, window).schedule_actions(actions)]
+
+
+def test_size_class():
+    assert [size_class(size) for size in [0, MB - 1, MB, 100 * MB]] == [
+        'small',
+        'small',
+        'medium',
+        'large',
+    ]
+
+
+def test_name_schedule_keeps_the_order():
+    actions = [FakeAction('a', 1), FakeAction('b', 200 * MB)]
+    assert scheduled('name', actions) == ['upload a', 'upload b']
+
+
+def test_largest_first_within_the_window():
+    actions = [
+        FakeAction('a', 1 * KB),
+        FakeAction('b', 3 * KB),
+        FakeAction('c', 2 * KB),
+        FakeAction('d', 5 * KB),
+        FakeAction('e', 4 * KB),
+    ]
+    # a window of 2 actions lets the largest one out whenever a third one comes
+    assert scheduled('largest-first', actions) == [
+        'upload b',
+        'upload d',
+        'upload e',
+        'upload c',
+        'upload a',
+    ]
+
+
+def test_mixed_takes_turns_between_size_classes():
+    actions = [FakeAction(f's{number}', KB) for number in range(4)]
+    actions += [FakeAction('m', 2 * MB), FakeAction('l', 200 * MB)]
+    assert scheduled('mixed', actions, window=10) == [
+        'upload l',
+        'upload m',
+        'upload s0',
+        'upload s1',
+        'upload s2',
+        'upload s3',
+    ]
+
+
+def test_actions_of_a_file_stay_together():
+    actions = [
+        FakeAction('a', KB),
+        FakeAction('a', 0, 'delete'),
+        FakeAction('b', 2 * KB),
+        FakeAction('b', 0, 'delete'),
+    ]
+    assert scheduled('largest-first', actions, window=10) == [
+        'upload b',
+        'delete b',
+        'upload a',
+        'delete a',
+    ]
+
+
+def test_waiting_deletes_come_after_the_window():
+    copy = FakeAction('copy', 5 * KB)
+    delete = wait_for_copies(FakeAction('old', 0, 'delete'), [copy])
+    actions = [FakeAction('a', KB), copy, delete, FakeAction('b', 2 * KB)]
+    assert scheduled('largest-first', actions, window=10) == [
+        'upload copy',
+        'upload a',
+        'delete old',
+        'upload b',
+    ]
+
+
+@pytest.mark.parametrize('schedule', ['largest-first', 'mixed'])
+def test_transfers_are_timed(schedule):
+    actions = list(
+        ActionScheduler(schedule).schedule_actions([FakeAction('a', 0), FakeAction('b', 2 * MB)])
+    )
+    assert [time_transfer in getattr(action, 'hooks', ()) for action in actions] == [True, False]
+
+    reporter = CliSyncReport(mock.Mock(), True)
+    for action in actions:
+        action.do_action(None, reporter)
+    assert list(reporter.class_throughput) == ['medium']
+    assert reporter.class_throughput['medium'][:2] == [1, 2 * MB]
+    reporter.print_summary()
+    reporter.close()
@@ -0,0 +1,123 @@
+######################################################################
+#
+# File: test/unit/_utils/test_sha1_compare.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import hashlib
+import os
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import B2Path, LocalPath
+
+from b2._internal._utils import sha1_compare
+from b2._internal._utils.sha1_compare import (
+    HashedLocalPath,
+    LocalHasher,
+    Sha1Cache,
+    get_content_sha1,
+    hash_ahead,
+)
+
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    hashed = []
+    hash_file = sha1_compare.hash_file
+
+    def spy_hash_file(path):
+        hashed.append(os.path.basename(path))
+        return hash_file(path)
+
+    monkeypatch.setattr(sha1_compare, 'hash_file', spy_hash_file)
+    return hashed
+
+
+def test_hashes_are_memoized(tmp_path, hashed):
+    path = tmp_path / 'a.txt'
+    path.write_bytes(b'hello')
+    cache_path = str(tmp_path / 'cache.sqlite')
+
+    with LocalHasher(2, Sha1Cache(cache_path)) as hasher:
+        assert hasher.submit(str(path)).result() == sha1(b'hello')
+        assert hasher.hash(str(path)) == sha1(b'hello')
+    assert hashed == ['a.txt']
+
+    with LocalHasher(2, Sha1Cache(cache_path)) as hasher:
+        assert hasher.hash(str(path)) == sha1(b'hello')
+        assert hashed == ['a.txt']
+
+        # restoring the modification time does not hide the change
+        stat = os.stat(path)
+        path.write_bytes(b'world')
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert hasher.hash(str(path)) == sha1(b'world')
+        assert hashed == ['a.txt', 'a.txt']
+
+
+def file_version(size=5, content_sha1=None, file_info=None):
+    return mock.Mock(size=size, content_sha1=content_sha1, file_info=file_info or {})
+
+
+@pytest.mark.parametrize(
+    'version,expected',
+    [
+        (file_version(content_sha1='aaa'), 'aaa'),
+        (file_version(content_sha1='none', file_info={'large_file_sha1': 'bbb'}), 'bbb'),
+        (file_version(content_sha1='none'), None),
+        (
+            file_version(
+                content_sha1='ccc',
+                file_info={'b2-content-encoding': 'gzip', 'original_sha1': 'ddd'},
+            ),
+            'ddd',
+        ),
+    ],
+)
+def test_get_content_sha1(version, expected):
+    assert get_content_sha1(version) == expected
+
+
+def test_hash_ahead(tmp_path, hashed, monkeypatch):
+    monkeypatch.setattr(sha1_compare, 'HASH_LOOKAHEAD', 2)
+    pairs = []
+    for name, local_data, remote_data in [
+        ('new.txt', b'new', None),
+        ('same.txt', b'same', b'same'),
+        ('resized.txt', b'resized', b'other'),
+        ('changed.txt', b'changed', b'CHANGED'),
+    ]:
+        (tmp_path / name).write_bytes(local_data)
+        local_path = LocalPath(str(tmp_path / name), name, 1, len(local_data))
+        b2_path = None
+        if remote_data is not None:
+            version = file_version(len(remote_data), sha1(remote_data))
+            b2_path = B2Path(name, selected_version=version, all_versions=[version])
+        pairs.append((local_path, b2_path))
+    pairs.append((None, B2Path('gone.txt', file_version(), [file_version()])))
+
+    with LocalHasher(2) as hasher:
+        result = list(hash_ahead(pairs, hasher))
+    assert [source.relative_path if source else None for source, _ in result] == [
+        'new.txt',
+        'same.txt',
+        'resized.txt',
+        'changed.txt',
+        None,
+    ]
+    assert sorted(hashed) == ['changed.txt', 'same.txt']
+
+    policy_class = sha1_compare.Sha1SyncPolicyManager().get_policy_class('local-to-b2', False, 0)
+    different = [
+        policy_class.files_are_different(mock.Mock(), source, dest) for source, dest in result[1:4]
+    ]
+    assert different == [False, True, True]
+    assert isinstance(result[1][0], HashedLocalPath)
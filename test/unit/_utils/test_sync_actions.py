@@ -0,0 +1,109 @@
+######################################################################
+#
+# File: test/unit/_utils/test_sync_actions.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from unittest import mock
+
+from b2sdk.v3 import (
+    SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    B2HideAction,
+    B2UploadAction,
+)
+
+from b2._internal._utils.sync_actions import CliUploadAction, UploadOptions, add_hook
+
+
+def test_hooks_run_last_added_first():
+    calls = []
+
+    def hook(name):
+        def run(action, do_action, bucket, reporter):
+            calls.append(f'{name} before')
+            do_action(bucket, reporter)
+            calls.append(f'{name} after')
+
+        return run
+
+    action = B2HideAction('a.txt', 'dir/a.txt')
+    add_hook(add_hook(action, hook('inner')), hook('outer'))
+    assert type(action).__name__ == 'B2HideAction'
+    bucket = mock.Mock()
+    bucket.hide_file.side_effect = lambda name: calls.append(f'hide {name}')
+    action.do_action(bucket, None)
+    assert calls == [
+        'outer before',
+        'inner before',
+        'hide dir/a.txt',
+        'inner after',
+        'outer after',
+    ]
+
+
+def test_upload_with_options(tmp_path):
+    (tmp_path / 'a.txt').write_bytes(b'hello')
+    upload = B2UploadAction(
+        str(tmp_path / 'a.txt'),
+        'a.txt',
+        'dir/a.txt',
+        1000,
+        5,
+        SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    )
+    sync_state = mock.Mock()
+    action = CliUploadAction.from_action(
+        upload, options=UploadOptions(part_size=100, sync_state=sync_state)
+    )
+    assert (str(action), action.file_version) == (str(upload), None)
+
+    bucket = mock.Mock()
+    action.do_action(bucket, None)
+    (sources, name), kwargs = bucket.concatenate.call_args
+    assert (sources, name) == ([action.upload_source], 'dir/a.txt')
+    assert kwargs['recommended_upload_part_size'] == 100
+    sync_state.record.assert_called_once_with('a.txt', bucket.concatenate.return_value)
+
+
+def test_upload_with_known_sha1(tmp_path):
+    (tmp_path / 'a.txt').write_bytes(b'hello')
+    upload = B2UploadAction(
+        str(tmp_path / 'a.txt'),
+        'a.txt',
+        'dir/a.txt',
+        1000,
+        5,
+        SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    )
+    action = CliUploadAction.from_action(upload, content_sha1='f' * 40)
+    assert action.upload_source.get_content_sha1() == 'f' * 40
+
+
+def test_upload_compressed_with_known_sha1(tmp_path):
+    (tmp_path / 'a.txt').write_bytes(b'hello')
+    upload = B2UploadAction(
+        str(tmp_path / 'a.txt'),
+        'a.txt',
+        'dir/a.txt',
+        1000,
+        5,
+        SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    )
+    action = CliUploadAction.from_action(
+        upload,
+        options=UploadOptions(compression='gzip', compression_buffer_size=1000),
+        content_sha1='f' * 40,
+    )
+    with (
+        mock.patch('b2._internal._utils.sync_actions.hash_file') as hash_file,
+        mock.patch('b2._internal._utils.sync_actions.upload_unbound_stream') as upload_stream,
+    ):
+        action.do_action(mock.Mock(), None)
+    hash_file.assert_not_called()
+    kwargs = upload_stream.call_args.kwargs
+    assert (kwargs['buffers_count'], kwargs['buffer_size']) == (2, 1000)
+    assert kwargs['file_info']['original_size'] == '5'
+    assert kwargs['file_info']['original_sha1'] == 'f' * 40
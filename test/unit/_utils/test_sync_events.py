@@ -0,0 +1,78 @@
+######################################################################
+#
+# File: test/unit/_utils/test_sync_events.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import io
+import json
+import logging
+import time
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import B2HideAction
+
+from b2._internal._utils.sync_events import (
+    RETRY_LOGGER_NAME,
+    RETRY_MESSAGE,
+    SyncEventWriter,
+    report_events,
+)
+
+
+def read_events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_progress_snapshots():
+    stream = io.StringIO()
+    with SyncEventWriter(stream, interval=0.01) as events:
+        events.snapshot = lambda: {'transferred_files': 1}
+        time.sleep(0.1)
+        events.snapshot = None
+        events.emit('sync_end', status=0)
+
+    written = read_events(stream)
+    assert written[-1]['event'] == 'sync_end'
+    progress = [event for event in written if event['event'] == 'progress']
+    assert len(progress) >= 2
+    assert progress[0]['transferred_files'] == 1
+    assert [event['ts'] for event in written] == sorted(event['ts'] for event in written)
+
+
+class FailingHide(B2HideAction):
+    def do_action(self, bucket, reporter):
+        # a retry logged by b2sdk while the action runs
+        logging.getLogger(RETRY_LOGGER_NAME).info(RETRY_MESSAGE, 1, 'server asked us to')
+        raise ValueError('no way')
+
+
+def test_action_events():
+    retry_logger = logging.getLogger(RETRY_LOGGER_NAME)
+    level = retry_logger.level
+    stream = io.StringIO()
+    with SyncEventWriter(stream) as events:
+        report_events(B2HideAction('a.txt', 'dir/a.txt'), events).do_action(mock.Mock(), None)
+        with pytest.raises(ValueError):
+            report_events(FailingHide('b.txt', 'dir/b.txt'), events).do_action(None, None)
+        retry_logger.info(RETRY_MESSAGE, 2, 'that is what the default exponential backoff is')
+    assert retry_logger.level == level
+
+    written = read_events(stream)
+    assert [(event['event'], event.get('file')) for event in written] == [
+        ('action_start', 'a.txt'),
+        ('action_finish', 'a.txt'),
+        ('action_start', 'b.txt'),
+        ('retry', 'b.txt'),
+        ('action_finish', 'b.txt'),
+        ('retry', None),
+    ]
+    assert written[1]['op'] == 'hide'
+    assert written[1]['ok'] is True
+    assert written[3]['delay'] == 1
+    assert written[4]['ok'] is False
+    assert written[4]['error'] == "ValueError('no way')"
@@ -0,0 +1,137 @@
+######################################################################
+#
+# File: test/unit/_utils/test_sync_plan.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import io
+from unittest import mock
+
+import pytest
+from b2sdk.v3 import (
+    SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER,
+    B2DeleteAction,
+    B2HideAction,
+    B2UploadAction,
+    EncryptionMode,
+    EncryptionSetting,
+    FileVersion,
+    LocalDeleteAction,
+)
+
+from b2._internal._utils.copy_matching import ServerSideCopyAction, WaitForCopies
+from b2._internal._utils.sync_actions import CliUploadAction
+from b2._internal._utils.sync_plan import (
+    PlanPreconditionFailed,
+    SyncPlanError,
+    SyncPlanReader,
+    SyncPlanWriter,
+    _read_last_line,
+)
+
+ENCRYPTION_PROVIDER = SERVER_DEFAULT_SYNC_ENCRYPTION_SETTINGS_PROVIDER
+
+
+def file_version(file_id, name, size=5):
+    return FileVersion(
+        api=None,
+        id_=file_id,
+        file_name=name,
+        size=size,
+        content_type='text/plain',
+        content_sha1='none',
+        file_info={'large_file_sha1': 'aaa'},
+        upload_timestamp=1000,
+        account_id=None,
+        bucket_id='bucket-id',
+        action='upload',
+        content_md5=None,
+        server_side_encryption=EncryptionSetting(mode=EncryptionMode.NONE),
+    )
+
+
+def folders():
+    source = mock.Mock(root='/src')
+    source.folder_type.return_value = 'local'
+    destination = mock.Mock(bucket_name='bucket', folder_name='dir')
+    destination.folder_type.return_value = 'b2'
+    return source, destination
+
+
+def test_plan_round_trip(tmp_path):
+    (tmp_path / 'new.txt').write_bytes(b'hello')
+    (tmp_path / 'moved.txt').write_bytes(b'world')
+    mtime = int((tmp_path / 'new.txt').stat().st_mtime * 1000)
+    upload = B2UploadAction(
+        str(tmp_path / 'new.txt'), 'new.txt', 'dir/new.txt', mtime, 5, ENCRYPTION_PROVIDER
+    )
+    incremental = B2UploadAction(
+        str(tmp_path / 'moved.txt'), 'moved.txt', 'dir/moved.txt', 1, 5, ENCRYPTION_PROVIDER
+    )
+    incremental.file_version = file_version('id-moved', 'dir/moved.txt', 3)
+    incremental.absolute_minimum_part_size = 100
+    copy = ServerSideCopyAction(incremental, file_version('id-old', 'dir/old.txt'))
+    actions = [
+        upload,
+        copy,
+        B2HideAction('hidden.txt', 'dir/hidden.txt'),
+        B2DeleteAction('old.txt', 'dir/old.txt', 'id-old', ''),
+        LocalDeleteAction('gone.txt', str(tmp_path / 'gone.txt')),
+    ]
+
+    plan_path = str(tmp_path / 'plan.jsonl')
+    with SyncPlanWriter(plan_path, '/src', 'b2://bucket/dir') as writer:
+        for action in actions:
+            writer.write(action)
+        writer.finish()
+
+    source, destination = folders()
+    with SyncPlanReader(plan_path) as reader:
+        assert (reader.source_uri, reader.destination_uri) == ('/src', 'b2://bucket/dir')
+        assert (reader.files, reader.bytes) == (5, 10)
+        loaded = list(
+            reader.iter_actions(source, destination, ENCRYPTION_PROVIDER, lambda action: action)
+        )
+
+    assert [str(action) for action in loaded] == [str(action) for action in actions]
+    assert isinstance(loaded[1].upload, CliUploadAction)
+    assert loaded[1].upload.file_version.id_ == 'id-moved'
+    assert loaded[1].source_version.file_info == {'large_file_sha1': 'aaa'}
+    assert loaded[3].hooks == (WaitForCopies([loaded[1]]),)
+
+    # an upload only runs if the file did not change since the plan was made
+    bucket = mock.Mock()
+    with mock.patch.object(B2UploadAction, 'do_action') as do_action:
+        loaded[0].do_action(bucket, None)
+        do_action.assert_called_once_with(bucket, None)
+        (tmp_path / 'new.txt').write_bytes(b'changed')
+        with pytest.raises(PlanPreconditionFailed):
+            loaded[0].do_action(bucket, None)
+
+
+@pytest.mark.parametrize(
+    'content,error',
+    [
+        (b'', 'is not a sync plan'),
+        (
+            b'{"plan":2,"source":"a","destination":"b"}\n',
+            'is not a sync plan of a supported version',
+        ),
+        (b'{"plan":1,"source":"a","destination":"b"}\n', 'is incomplete'),
+        (b'{"plan":1,"source":"a","destination":"b"}\n{"op":"hide","na', 'is incomplete'),
+    ],
+)
+def test_invalid_plans(tmp_path, content, error):
+    plan_path = tmp_path / 'plan.jsonl'
+    plan_path.write_bytes(content)
+    with pytest.raises(SyncPlanError, match=error):
+        SyncPlanReader(str(plan_path))
+
+
+def test_read_last_line():
+    lines = b''.join(b'%d\n' % number for number in range(1000))
+    assert _read_last_line(io.BytesIO(lines), chunk_size=7) == b'999'
+    assert _read_last_line(io.BytesIO(b'only\n'), chunk_size=2) == b'only'
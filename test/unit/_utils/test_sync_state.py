@@ -0,0 +1,78 @@
+######################################################################
+#
+# File: test/unit/_utils/test_sync_state.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import sqlite3
+
+import pytest
+
+from b2._internal._utils.sync_state import StateDbB2Folder, SyncStateDb
+
+
+@pytest.fixture
+def state_db(tmp_path):
+    with SyncStateDb(str(tmp_path / 'state.db'), 'b2://bucket/dir') as state_db:
+        yield state_db
+
+
+def test_full_listing(b2_cli, bucket, api_bucket, state_db):
+    api_bucket.upload_bytes(b'old', 'dir/a.txt', file_info={'src_last_modified_millis': '1000'})
+    latest = api_bucket.upload_bytes(
+        b'new', 'dir/a.txt', file_info={'src_last_modified_millis': '2000'}
+    )
+    api_bucket.upload_bytes(b'\xe2\x82\xac', 'dir/€.txt')
+    api_bucket.hide_file('dir/€.txt')
+    api_bucket.upload_bytes(b'outside', 'other.txt')
+
+    folder = StateDbB2Folder(bucket, 'dir', api_bucket.api, state_db, full_listing=True)
+    listed = [(fv.file_name, fv.id_) for fv in folder.get_file_versions()]
+    assert len(listed) == 4
+    assert state_db.get_full_listing_millis() is None
+    state_db.finish_full_listing(12345)
+    assert state_db.get_full_listing_millis() == 12345
+
+    folder = StateDbB2Folder(bucket, 'dir', api_bucket.api, state_db)
+    paths = list(folder.all_files(reporter=None))
+    assert [path.relative_path for path in paths] == ['a.txt', '€.txt']
+    a, euro = (path.selected_version for path in paths)
+    assert (a.id_, a.size, a.mod_time_millis, a.content_sha1) == (
+        latest.id_,
+        3,
+        2000,
+        latest.content_sha1,
+    )
+    assert euro.action == 'hide'
+
+
+def test_record_and_forget(tmp_path, b2_cli, bucket, api_bucket):
+    state_db = SyncStateDb(str(tmp_path / 'state.db'), 'b2://bucket/dir')
+    file_version = api_bucket.upload_bytes(b'data', 'dir/z.txt')
+    state_db.record('z.txt', file_version)
+    state_db.record('y.txt', file_version)
+    state_db.forget('y.txt', 'another-id')
+    assert [row[0] for row in state_db.iter_files()] == ['y.txt', 'z.txt']
+    state_db.forget('y.txt', file_version.id_)
+    assert [row[0] for row in state_db.iter_files()] == ['z.txt']
+
+    # folders are kept apart, and the database survives reopening
+    state_db.close()
+    with SyncStateDb(state_db.path, 'b2://bucket/other') as other:
+        assert list(other.iter_files()) == []
+    with SyncStateDb(state_db.path, 'b2://bucket/dir') as reopened:
+        assert [row[0] for row in reopened.iter_files()] == ['z.txt']
+
+
+def test_older_schema_is_emptied(tmp_path):
+    path = str(tmp_path / 'state.db')
+    with SyncStateDb(path, 'b2://bucket/dir') as state_db:
+        state_db.finish_full_listing(12345)
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA user_version = 1')
+    connection.close()
+    with SyncStateDb(path, 'b2://bucket/dir') as state_db:
+        assert state_db.get_full_listing_millis() is None
@@ -0,0 +1,77 @@
+######################################################################
+#
+# File: test/unit/_utils/test_uri_batch.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import threading
+import time
+
+import pytest
+from b2sdk.v3.exception import B2Error
+
+from b2._internal._utils.uri_batch import Resolution, UriBatch
+
+
+def resolve(uri):
+    if uri == 'bad':
+        raise ValueError('invalid')
+    if uri == 'gone':
+        raise B2Error('not found')
+    # earlier URIs take longer
+    time.sleep((5 - int(uri)) / 20 if uri.isdigit() else 0)
+    return uri.upper()
+
+
+def test_uris_skip_blank_and_repeated_lines():
+    batch = UriBatch(resolve, threads=1)
+    assert list(batch.uris(['a\n', '  \n', 'b\n', 'a\n', ' b '])) == ['a', 'b']
+    assert batch.duplicates == 2
+
+
+def test_run_in_input_order():
+    batch = UriBatch(resolve, threads=4)
+    assert list(batch.run(['1', '2', 'bad', '3', 'gone', '1'])) == [
+        Resolution('1', result='1'),
+        Resolution('2', result='2'),
+        Resolution('bad', error='invalid'),
+        Resolution('3', result='3'),
+        Resolution('gone', error='not found'),
+    ]
+
+
+def test_run_in_completion_order():
+    batch = UriBatch(resolve, threads=4, ordered=False)
+    resolutions = list(batch.run(['1', '2', '3', '4']))
+    assert [resolution.uri for resolution in resolutions] == ['4', '3', '2', '1']
+
+
+def test_run_bounds_the_input():
+    release = threading.Event()
+    read = []
+
+    def lines():
+        for number in range(10):
+            read.append(number)
+            yield str(number)
+
+    batch = UriBatch(lambda uri: release.wait(10), threads=1, queue_size=2)
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(batch.run(lines())))
+    thread.start()
+    thread.join(0.2)
+    assert read == [0, 1, 2]
+    release.set()
+    thread.join(10)
+    assert len(results) == 10
+
+
+def test_run_raises_unexpected_errors():
+    def fail(uri):
+        raise KeyError(uri)
+
+    with pytest.raises(KeyError):
+        list(UriBatch(fail, threads=1).run(['a']))
@@ -0,0 +1,165 @@
+######################################################################
+#
+# File: test/unit/_utils/test_watch.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import os
+import sys
+
+import pytest
+from b2sdk.v3 import ScanPoliciesManager
+
+from b2._internal._utils import watch
+from b2._internal._utils.local_scan import ParallelLocalFolder
+from b2._internal._utils.watch import (
+    Changes,
+    InotifyWatcher,
+    PollingWatcher,
+    WatchedB2Folder,
+    WatchedLocalFolder,
+    iter_batches,
+)
+
+
+class EndOfEvents(Exception):
+    pass
+
+
+class FakeWatcher:
+    """
+    Watcher reporting scripted changes, on a fake clock.
+    """
+
+    def __init__(self, events, monkeypatch):
+        self.now = 0.0
+        self.events = sorted(events)  # (time, changes)
+        monkeypatch.setattr(watch.time, 'monotonic', lambda: self.now)
+
+    def read(self, timeout):
+        if not self.events:
+            raise EndOfEvents
+        event_time, changes = self.events[0]
+        if event_time > self.now + timeout:
+            self.now += timeout
+            return Changes()
+        self.events.pop(0)
+        self.now = max(self.now, event_time)
+        return changes
+
+
+def batches(watcher, debounce, full_sync_interval=None):
+    result = []
+    try:
+        for batch in iter_batches(watcher, debounce, full_sync_interval):
+            result.append((watcher.now, sorted(batch.paths), batch.full_sync))
+    except EndOfEvents:
+        pass
+    return result
+
+
+def test_iter_batches_debounces(monkeypatch):
+    watcher = FakeWatcher(
+        [
+            (1, Changes({'a'})),
+            (2, Changes({'b'})),
+            (2.5, Changes({'a'})),
+            (10, Changes({'c'})),
+            (20, Changes()),
+        ],
+        monkeypatch,
+    )
+    assert batches(watcher, debounce=2) == [(4.5, ['a', 'b'], False), (12, ['c'], False)]
+
+
+def test_iter_batches_limits_batch_duration(monkeypatch):
+    monkeypatch.setattr(watch, 'MAX_BATCH_SECONDS', 5)
+    events = [(time, Changes({f'f{time}'})) for time in range(10)]
+    watcher = FakeWatcher(events + [(20, Changes())], monkeypatch)
+    assert batches(watcher, debounce=2) == [
+        (5, ['f0', 'f1', 'f2', 'f3', 'f4', 'f5'], False),
+        (11, ['f6', 'f7', 'f8', 'f9'], False),
+    ]
+
+
+def test_iter_batches_full_sync(monkeypatch):
+    watcher = FakeWatcher(
+        [(1, Changes({'a'})), (4, Changes(full_sync=True)), (25, Changes())], monkeypatch
+    )
+    assert batches(watcher, debounce=2, full_sync_interval=10) == [
+        (3, ['a'], False),
+        (4, [], True),
+        (14, [], True),
+        (24, [], True),
+    ]
+
+
+def test_polling_watcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(watch.time, 'sleep', lambda seconds: None)
+    (tmp_path / 'a.txt').write_text('a')
+    (tmp_path / 'b.txt').write_text('b')
+    watcher = PollingWatcher(ParallelLocalFolder(str(tmp_path), 1), ScanPoliciesManager(), 0)
+    assert watcher.read(1) == Changes()
+    (tmp_path / 'a.txt').write_text('changed')
+    (tmp_path / 'b.txt').unlink()
+    (tmp_path / 'c').mkdir()
+    (tmp_path / 'c' / 'd.txt').write_text('d')
+    assert watcher.read(1) == Changes({'a.txt', 'b.txt', 'c/d.txt'})
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is only on Linux')
+def test_inotify_watcher(tmp_path):
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    (tmp_path / 'excluded').mkdir()
+    policies_manager = ScanPoliciesManager(exclude_dir_regexes=['excluded'])
+    with InotifyWatcher(str(tmp_path), policies_manager) as watcher:
+        (tmp_path / 'a' / 'b' / 'c.txt').write_text('c')
+        (tmp_path / 'excluded' / 'd.txt').write_text('d')
+        (tmp_path / 'new' / 'dir').mkdir(parents=True)
+        assert watcher.read(1) == Changes({'a/b/c.txt', 'new'})
+
+        # new directories are watched
+        (tmp_path / 'new' / 'dir' / 'e.txt').write_text('e')
+        assert watcher.read(1) == Changes({'new/dir/e.txt'})
+
+        # moved directories are watched at their new path
+        os.rename(tmp_path / 'a', tmp_path / 'moved')
+        assert watcher.read(1) == Changes({'a', 'moved'})
+        (tmp_path / 'moved' / 'b' / 'c.txt').unlink()
+        assert watcher.read(1) == Changes({'moved/b/c.txt'})
+
+        assert watcher.read(0) == Changes()
+
+
+def test_watched_folders(tmp_path, b2_cli, bucket, api_bucket):
+    for name in ['a.txt', 'a/b.txt', 'a0.txt', 'c/d.txt']:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(name)
+        api_bucket.upload_bytes(b'old', f'dir/{name}')
+    api_bucket.upload_bytes(b'new', 'dir/a.txt')
+    api_bucket.upload_bytes(b'gone', 'dir/a/gone.txt')
+
+    relative_paths = ['a', 'a.txt', 'c/d.txt', 'missing']
+    local_folder = WatchedLocalFolder(str(tmp_path), 2, relative_paths)
+    assert [path.relative_path for path in local_folder.all_files(None)] == [
+        'a.txt',
+        'a/b.txt',
+        'c/d.txt',
+    ]
+
+    b2_folder = WatchedB2Folder(api_bucket.name, 'dir', api_bucket.api, relative_paths)
+    b2_paths = list(b2_folder.all_files(None))
+    assert [path.relative_path for path in b2_paths] == [
+        'a.txt',
+        'a/b.txt',
+        'a/gone.txt',
+        'c/d.txt',
+    ]
+    assert [version.size for version in b2_paths[0].all_versions] == [3, 3]
+    assert (
+        b2_paths[0].selected_version.upload_timestamp > b2_paths[0].all_versions[1].upload_timestamp
+    )
@@ -7,6 +7,7 @@
 # License https://www.backblaze.com/using_b2_code.html
 #
 ######################################################################
+import hashlib
 import os
 import pathlib
 
@@ -283,3 +284,49 @@ def test_download_file_by_uri__explicit_file_target_allows_unsupported_server_na
     )
 
     assert output_path.read_text() == 'hello world'
+
+
+@pytest.fixture
+def uploaded_compressed_txt(b2_cli, bucket, local_file):
+    local_file.write_text('compress me ' * 1000)
+    os.utime(local_file, (1500111222, 1500111222))
+    b2_cli.run(
+        ['file', 'upload', '--no-progress', '--compress', 'gzip', bucket, str(local_file), 'c.txt'],
+        expected_json_in_stdout={
+            'fileInfo': {
+                'b2-content-encoding': 'gzip',
+                'original_sha1': hashlib.sha1(local_file.read_bytes()).hexdigest(),
+                'original_size': str(local_file.stat().st_size),
+                'src_last_modified_millis': '1500111222000',
+            },
+        },
+        remove_version=True,
+    )
+    return {'bucket': bucket, 'fileName': 'c.txt', 'content': local_file.read_text()}
+
+
+def test_cat__decompress(b2_cli, uploaded_compressed_txt, capfd):
+    b2_cli.run(['file', 'cat', '--no-progress', 'b2://my-bucket/c.txt'])
+    assert len(capfd.readouterr().out) < len(uploaded_compressed_txt['content'])
+
+    b2_cli.run(['file', 'cat', '--no-progress', '--decompress', 'b2://my-bucket/c.txt'])
+    assert capfd.readouterr().out == uploaded_compressed_txt['content']
+
+
+def test_download_file__decompress(b2_cli, uploaded_compressed_txt, tmp_path):
+    output_path = tmp_path / 'output.txt'
+
+    b2_cli.run(
+        ['file', 'download', '-q', '--decompress', 'b2://my-bucket/c.txt', str(output_path)],
+    )
+    assert output_path.read_text() == uploaded_compressed_txt['content']
+
+
+def test_download_file__decompress_not_compressed(b2_cli, uploaded_file, tmp_path):
+    output_path = tmp_path / 'output.txt'
+
+    b2_cli.run(
+        ['file', 'download', '-q', '--decompress', 'b2id://9999', str(output_path)],
+        expected_stderr='WARNING: File is not compressed, saving it as is.\n',
+    )
+    assert output_path.read_text() == uploaded_file['content']
@@ -10,6 +10,7 @@
 from __future__ import annotations
 
 import pytest
+from b2sdk.v3.exception import AccessDenied
 
 
 @pytest.mark.apiver(to_ver=3)
@@ -42,3 +43,111 @@ def test_file_hide__by_b2_uri(b2_cli, api_bucket, uploaded_file):
 def test_file_hide__cannot_hide_by_b2id(b2_cli, api_bucket, uploaded_file):
     b2_cli.run(['file', 'hide', f"b2id://{uploaded_file['fileId']}"], expected_status=2)
     assert list(api_bucket.ls())
+
+
+@pytest.fixture
+def hide_files(api_bucket):
+    for name in ['a/1.txt', 'a/2.log', 'a/b/3.txt', 'c/4.txt']:
+        api_bucket.upload_bytes(b'data', name)
+    return api_bucket
+
+
+def latest_names(bucket):
+    return [file_version.file_name for file_version, _ in bucket.ls(recursive=True)]
+
+
+@pytest.mark.apiver
+def test_file_hide__recursive(b2_cli, hide_files):
+    b2_cli.run(['file', 'hide', '--recursive', '--no-progress', 'b2://my-bucket/a/'])
+    assert latest_names(hide_files) == ['c/4.txt']
+
+
+@pytest.mark.apiver
+def test_file_hide__recursive_with_wildcard_and_filters(b2_cli, hide_files):
+    b2_cli.run(
+        [
+            'file',
+            'hide',
+            '--recursive',
+            '--with-wildcard',
+            '--no-progress',
+            '--exclude',
+            'a/b/*',
+            'b2://my-bucket/a/*.txt',
+        ]
+    )
+    assert latest_names(hide_files) == ['a/2.log', 'a/b/3.txt', 'c/4.txt']
+
+
+@pytest.mark.apiver
+def test_file_hide__dry_run(b2_cli, hide_files):
+    b2_cli.run(
+        ['file', 'hide', '--recursive', '--dry-run', 'b2://my-bucket/a/b/'],
+        expected_stdout='a/b/3.txt\n',
+    )
+    assert len(latest_names(hide_files)) == 4
+
+
+@pytest.mark.apiver
+def test_file_hide__bulk_options_require_recursive(b2_cli, hide_files):
+    b2_cli.run(
+        ['file', 'hide', '--with-wildcard', 'b2://my-bucket/a/*.txt'],
+        expected_stderr='ERROR: --with-wildcard, --include, --exclude and --dry-run require --recursive\n',
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'hide', 'b2://my-bucket/a/'],
+        expected_stderr=(
+            'ERROR: B2 URI pointing to a file-like object is required, '
+            'but b2://my-bucket/a/ was provided\n'
+        ),
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'hide', '--recursive', '--versions', 'b2://my-bucket/a/'],
+        expected_status=2,
+    )
+    assert len(latest_names(hide_files)) == 4
+
+
+@pytest.mark.apiver
+def test_file_unhide__recursive(b2_cli, hide_files):
+    for name in ['a/1.txt', 'a/b/3.txt', 'c/4.txt']:
+        hide_files.hide_file(name)
+    # hidden, then uploaded again: nothing to unhide
+    hide_files.hide_file('a/2.log')
+    hide_files.upload_bytes(b'data', 'a/2.log')
+
+    b2_cli.run(
+        ['file', 'unhide', '--recursive', '--dry-run', 'b2://my-bucket/a/'],
+        expected_stdout='a/1.txt\na/b/3.txt\n',
+    )
+    assert latest_names(hide_files) == ['a/2.log']
+
+    b2_cli.run(['file', 'unhide', '--recursive', '--no-progress', 'b2://my-bucket/a/'])
+    assert latest_names(hide_files) == ['a/1.txt', 'a/2.log', 'a/b/3.txt']
+
+
+@pytest.mark.apiver
+def test_file_unhide__recursive_failure(b2_cli, hide_files, monkeypatch):
+    hide_files.hide_file('a/1.txt')
+    hide_files.hide_file('a/2.log')
+
+    def delete_file_version(*args, **kwargs):
+        raise AccessDenied()
+
+    monkeypatch.setattr(b2_cli.b2_api, 'delete_file_version', delete_file_version)
+    b2_cli.run(
+        [
+            'file',
+            'unhide',
+            '--recursive',
+            '--no-progress',
+            '--threads',
+            '1',
+            '--fail-fast',
+            'b2://my-bucket/a/',
+        ],
+        expected_status=1,
+    )
+    assert latest_names(hide_files) == ['a/b/3.txt', 'c/4.txt']
@@ -7,6 +7,8 @@
 # License https://www.backblaze.com/using_b2_code.html
 #
 ######################################################################
+import json
+
 import pytest
 
 
@@ -58,3 +60,62 @@ def test_file_info__b2id_uri(b2_cli, uploaded_file_version):
         ['file', 'info', f'b2id://{uploaded_file_version["fileId"]}'],
         expected_json_in_stdout=uploaded_file_version,
     )
+
+
+def test_file_info__from_file(b2_cli, bucket, tmp_path, uploaded_download_version):
+    file_id = uploaded_download_version['fileId']
+    uris = tmp_path / 'uris.txt'
+    uris.write_text(
+        f'b2://{bucket}/file1.txt\n'
+        f'b2id://{file_id}\n'
+        '\n'
+        f'b2://{bucket}/file1.txt\n'
+        f'b2://{bucket}/missing.txt\n'
+        'b2://no-such-bucket/file1.txt\n'
+        f'b2://{bucket}/\n'
+    )
+    _, stdout, _ = b2_cli.run(
+        ['file', 'info', '--from-file', str(uris), '--threads', '2'], expected_status=1
+    )
+    records = [json.loads(line) for line in stdout.splitlines()]
+    assert [record['uri'] for record in records] == [
+        f'b2://{bucket}/file1.txt',
+        f'b2id://{file_id}',
+        f'b2://{bucket}/missing.txt',
+        'b2://no-such-bucket/file1.txt',
+        f'b2://{bucket}/',
+    ]
+    assert uploaded_download_version.items() <= records[0]['result'].items()
+    assert records[1]['result']['fileId'] == file_id
+    assert records[1]['result']['action'] == 'upload'
+    assert all('error' in record for record in records[2:])
+
+
+def test_file_info__stdin(b2_cli, bucket, mock_stdin, uploaded_download_version):
+    mock_stdin.write(f'b2://{bucket}/file1.txt\n')
+    mock_stdin.close()
+    _, stdout, _ = b2_cli.run(['file', 'info', '--stdin', '--completion-order'])
+    record = json.loads(stdout)
+    assert record['uri'] == f'b2://{bucket}/file1.txt'
+    assert uploaded_download_version.items() <= record['result'].items()
+
+
+def test_file_info__uri_source_errors(b2_cli, bucket, tmp_path):
+    b2_cli.run(
+        ['file', 'info'],
+        expected_stderr='ERROR: B2_URI is required, unless --stdin or --from-file is given\n',
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'info', '--from-file', str(tmp_path / 'uris.txt'), f'b2://{bucket}/file1.txt'],
+        expected_stderr='ERROR: B2_URI cannot be given with --stdin or --from-file\n',
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'info', '--from-file', str(tmp_path / 'missing.txt')],
+        expected_stderr=(
+            f"ERROR: cannot read {tmp_path / 'missing.txt'}: "
+            f"[Errno 2] No such file or directory: '{tmp_path / 'missing.txt'}'\n"
+        ),
+        expected_status=1,
+    )
@@ -0,0 +1,127 @@
+######################################################################
+#
+# File: test/unit/console_tool/test_file_large_unfinished_cancel.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from __future__ import annotations
+
+import hashlib
+import io
+import time
+
+import pytest
+
+
+@pytest.fixture
+def unfinished_files(b2_cli, api_bucket):
+    """
+    Start large files: two old ones, one of them with parts, and a recent one.
+    """
+    session = b2_cli.b2_api.session
+    now = int(time.time() * 1000)
+    for name, upload_timestamp, parts in [
+        ('old/1.bin', now - 10 * 24 * 3600 * 1000, [b'a' * 300, b'b' * 200]),
+        ('old/2.bin', now - 10 * 24 * 3600 * 1000, []),
+        ('new/3.bin', now, [b'c' * 100]),
+    ]:
+        file_id = session.start_large_file(
+            api_bucket.id_, name, 'b2/x-auto', {}, custom_upload_timestamp=upload_timestamp
+        )['fileId']
+        for part_number, data in enumerate(parts, 1):
+            session.upload_part(
+                file_id, part_number, len(data), hashlib.sha1(data).hexdigest(), io.BytesIO(data)
+            )
+    return api_bucket
+
+
+def unfinished_names(bucket):
+    return sorted(unfinished.file_name for unfinished in bucket.list_unfinished_large_files())
+
+
+@pytest.mark.apiver
+def test_cancel__older_than(b2_cli, unfinished_files):
+    b2_cli.run(
+        ['file', 'large', 'unfinished', 'cancel', '--older-than', '7d', 'b2://my-bucket'],
+        expected_stdout='9999 canceled\n9998 canceled\n',
+    )
+    assert unfinished_names(unfinished_files) == ['new/3.bin']
+
+
+@pytest.mark.apiver
+def test_cancel__prefix_and_count_parts(b2_cli, unfinished_files):
+    b2_cli.run(
+        [
+            'file',
+            'large',
+            'unfinished',
+            'cancel',
+            '--prefix',
+            'new/',
+            '--count-parts',
+            'b2://my-bucket',
+        ],
+        expected_stdout=(
+            '9997 canceled\n1 large files canceled, 1 parts and 100 bytes reclaimed\n'
+        ),
+    )
+    assert unfinished_names(unfinished_files) == ['old/1.bin', 'old/2.bin']
+
+
+@pytest.mark.apiver
+def test_cancel__dry_run(b2_cli, unfinished_files):
+    b2_cli.run(
+        [
+            'file',
+            'large',
+            'unfinished',
+            'cancel',
+            '--dry-run',
+            '--count-parts',
+            '--threads',
+            '2',
+            'b2://my-bucket',
+        ],
+        expected_stdout=(
+            '9999 would be canceled\n9998 would be canceled\n9997 would be canceled\n'
+            '3 large files would be canceled, 3 parts and 600 bytes would be reclaimed\n'
+        ),
+    )
+    assert len(unfinished_names(unfinished_files)) == 3
+
+
+@pytest.mark.apiver
+def test_cancel__filters_require_bucket(b2_cli, unfinished_files):
+    b2_cli.run(
+        ['file', 'large', 'unfinished', 'cancel', '--older-than', '1d', 'b2id://9999'],
+        expected_stderr=(
+            'ERROR: --older-than, --prefix and --count-parts require a b2:// URI of a bucket\n'
+        ),
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'large', 'unfinished', 'cancel', '--older-than', 'soon', 'b2://my-bucket'],
+        expected_status=2,
+    )
+    assert len(unfinished_names(unfinished_files)) == 3
+
+
+@pytest.mark.apiver
+def test_cancel__path_and_prefix(b2_cli, unfinished_files):
+    b2_cli.run(
+        ['file', 'large', 'unfinished', 'cancel', 'b2://my-bucket/old/'],
+        expected_stdout='9999 canceled\n9998 canceled\n',
+    )
+    assert unfinished_names(unfinished_files) == ['new/3.bin']
+
+
+@pytest.mark.apiver
+def test_cancel__prefix_follows_path(b2_cli, unfinished_files):
+    b2_cli.run(
+        ['file', 'large', 'unfinished', 'cancel', '--prefix', '2', 'b2://my-bucket/old/'],
+        expected_stdout='9998 canceled\n',
+    )
+    assert unfinished_names(unfinished_files) == ['new/3.bin', 'old/1.bin']
@@ -9,7 +9,11 @@
 ######################################################################
 from __future__ import annotations
 
+import hashlib
+import io
+
 import pytest
+from b2sdk.v3 import LARGE_FILE_SHA1
 
 
 @pytest.mark.apiver
@@ -212,3 +216,226 @@ def test_file_hide__by_b2id_uri(b2_cli, api_bucket, uploaded_file):
         ],
     )
     assert [fv.file_name for fv, _ in api_bucket.ls()] == ['copy.bin', uploaded_file['fileName']]
+
+
+@pytest.fixture
+def source_files(api_bucket):
+    for name in ['src/a.txt', 'src/b/c.txt', 'src/d.txt', 'srcx/e.txt']:
+        api_bucket.upload_bytes(
+            name.encode(), name, content_type='text/plain', file_info={'k': name}
+        )
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__recursive(b2_cli, api_bucket, source_files):
+    b2_cli.run(
+        [
+            'file',
+            'server-side-copy',
+            '--recursive',
+            '--no-progress',
+            '--threads',
+            '2',
+            'b2://my-bucket/src/',
+            'b2://my-bucket/dst',
+        ],
+    )
+    copies = {
+        file_version.file_name: file_version
+        for file_version, _ in api_bucket.ls('dst', recursive=True)
+    }
+    assert sorted(copies) == ['dst/a.txt', 'dst/b/c.txt', 'dst/d.txt']
+    assert copies['dst/b/c.txt'].content_type == 'text/plain'
+    assert copies['dst/b/c.txt'].file_info == {'k': 'src/b/c.txt'}
+    assert api_bucket.get_file_info_by_name('dst/d.txt').size == len('src/d.txt')
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__recursive_large_file(b2_cli, api_bucket, monkeypatch):
+    api_bucket.upload_bytes(b'x' * 3000, 'src/big', content_type='text/plain', file_info={'k': 'v'})
+    monkeypatch.setattr(b2_cli.b2_api.account_info, 'get_recommended_part_size', lambda: 1000)
+    b2_cli.run(
+        ['file', 'server-side-copy', '--recursive', 'b2://my-bucket/src/', 'b2://my-bucket/dst/']
+    )
+    copy = api_bucket.get_file_info_by_name('dst/big')
+    assert (copy.size, copy.content_type, copy.file_info['k']) == (3000, 'text/plain', 'v')
+    # copied in parts, as a large file, with the sha1 of the source
+    assert copy.content_sha1 == 'none'
+    assert copy.file_info[LARGE_FILE_SHA1] == hashlib.sha1(b'x' * 3000).hexdigest()
+
+    b2_cli.run(
+        ['file', 'server-side-copy', '--recursive', 'b2://my-bucket/src/', 'b2://my-bucket/dst/'],
+        expected_stderr='1 files already copied were skipped\n',
+    )
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__recursive_too_many_parts(b2_cli, api_bucket, monkeypatch):
+    api_bucket.upload_bytes(b'x' * 3000, 'src/big')
+    monkeypatch.setattr(b2_cli.b2_api.account_info, 'get_recommended_part_size', lambda: 1000)
+    monkeypatch.setattr('b2._internal.console_tool.MAX_PARTS_COUNT', 2)
+    b2_cli.run(
+        ['file', 'server-side-copy', '--recursive', 'b2://my-bucket/src/', 'b2://my-bucket/dst/']
+    )
+    copy = api_bucket.get_file_info_by_name('dst/big')
+    assert copy.size == 3000
+    assert [part.content_length for part in api_bucket.list_parts(copy.id_)] == [1500, 1500]
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__recursive_resume(b2_cli, api_bucket, source_files):
+    api_bucket.upload_bytes(b'src/a.txt', 'dst/a.txt')
+    api_bucket.upload_bytes(b'other', 'dst/d.txt')
+    b2_cli.run(
+        ['file', 'server-side-copy', '--recursive', 'b2://my-bucket/src', 'b2://my-bucket/dst/'],
+        expected_stderr='1 files already copied were skipped\n',
+    )
+    versions = [
+        file_version.file_name
+        for file_version, _ in api_bucket.ls('dst', latest_only=False, recursive=True)
+    ]
+    assert versions == ['dst/a.txt', 'dst/b/c.txt', 'dst/d.txt', 'dst/d.txt']
+
+    b2_cli.run(
+        ['file', 'server-side-copy', '--recursive', 'b2://my-bucket/src', 'b2://my-bucket/dst/'],
+        expected_stderr='3 files already copied were skipped\n',
+    )
+
+
+@pytest.mark.apiver
+@pytest.mark.parametrize(
+    'source,destination,options,message',
+    [
+        ('b2id://9999', 'b2://my-bucket/dst/', [], '--recursive requires b2:// URIs of folders'),
+        (
+            'b2://my-bucket/src/',
+            'b2://my-bucket/src/dst/',
+            [],
+            'source and destination folders cannot overlap',
+        ),
+        (
+            'b2://my-bucket/src/',
+            'b2://my-bucket/dst/',
+            ['--range', '0,1'],
+            '--range cannot be used with --recursive',
+        ),
+    ],
+)
+def test_file_server_side_copy__recursive_invalid(
+    b2_cli, api_bucket, source, destination, options, message
+):
+    b2_cli.run(
+        ['file', 'server-side-copy', '--recursive', *options, source, destination],
+        expected_stderr=f'ERROR: {message}\n',
+        expected_status=1,
+    )
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__folder_without_recursive(b2_cli, api_bucket, uploaded_file):
+    b2_cli.run(
+        ['file', 'server-side-copy', 'b2://my-bucket/src/', 'b2://my-bucket/dst/'],
+        expected_stderr='ERROR: B2 URI pointing to a file-like object is required, '
+        'but b2://my-bucket/src/ was provided\n',
+        expected_status=1,
+    )
+
+
+def read_file(bucket, file_name):
+    buffer = io.BytesIO()
+    bucket.download_file_by_name(file_name).save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__part_size(b2_cli, api_bucket):
+    data = bytes(range(256)) * 12
+    api_bucket.upload_bytes(data, 'big', content_type='text/plain', file_info={'k': 'v'})
+    b2_cli.run(
+        [
+            'file',
+            'server-side-copy',
+            '--part-size',
+            '1000',
+            '--threads',
+            '2',
+            '--range',
+            '10,3009',
+            'b2://my-bucket/big',
+            'b2://my-bucket/copy',
+        ],
+        expected_json_in_stdout={
+            'fileName': 'copy',
+            'size': 3000,
+            'contentType': 'text/plain',
+            'contentSha1': 'none',
+            'fileInfo': {'k': 'v'},
+        },
+    )
+    assert read_file(api_bucket, 'copy') == data[10:3010]
+
+
+@pytest.mark.apiver
+def test_file_server_side_copy__concat(b2_cli, api_bucket):
+    first, second = b'a' * 500, bytes(range(256)) * 2
+    api_bucket.upload_bytes(first, 'first', content_type='text/plain')
+    api_bucket.upload_bytes(second, 'second', content_type='image/png')
+    b2_cli.run(
+        [
+            'file',
+            'server-side-copy',
+            '--concat',
+            'b2://my-bucket/first',
+            '--concat',
+            'b2://my-bucket/second@6,305',
+            '--concat',
+            'b2id://9998@0,9',
+            '--part-size',
+            '250',
+            'b2://my-bucket/joined',
+        ],
+        expected_json_in_stdout={'fileName': 'joined', 'size': 810, 'contentType': 'text/plain'},
+    )
+    assert read_file(api_bucket, 'joined') == first + second[6:306] + second[:10]
+
+
+@pytest.mark.apiver
+@pytest.mark.parametrize(
+    'argv,message',
+    [
+        (
+            ['--concat', 'b2://my-bucket/a', 'b2://my-bucket/b', 'b2://my-bucket/c'],
+            'sourceB2Uri cannot be given with --concat',
+        ),
+        (
+            ['--concat', 'b2://my-bucket/a', '--recursive', 'b2://my-bucket/c/'],
+            '--concat cannot be used with --recursive or --range',
+        ),
+        (['b2://my-bucket/c'], 'sourceB2Uri is required, unless --concat is given'),
+        (
+            ['--part-size', '100', 'b2://my-bucket/a', 'b2://my-bucket/c'],
+            '--part-size must be between 200 and 5000000000 bytes',
+        ),
+        (
+            [
+                '--concat',
+                'b2://my-bucket/a@0,100',
+                '--concat',
+                'b2://my-bucket/a',
+                'b2://my-bucket/c',
+            ],
+            'every range but the last one must be at least 200 bytes long, range 1 has 101 bytes',
+        ),
+        (
+            ['--concat', 'b2://my-bucket/a@0,300', 'b2://my-bucket/c'],
+            'The range in the request is outside the size of the file',
+        ),
+    ],
+)
+def test_file_server_side_copy__concat_invalid(b2_cli, api_bucket, argv, message):
+    api_bucket.upload_bytes(b'x' * 300, 'a')
+    b2_cli.run(
+        ['file', 'server-side-copy', *argv],
+        expected_stderr=f'ERROR: {message}\n',
+        expected_status=1,
+    )
@@ -0,0 +1,173 @@
+######################################################################
+#
+# File: test/unit/console_tool/test_file_update.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from __future__ import annotations
+
+import pytest
+from b2sdk.v3 import FileRetentionSetting, LegalHold, RetentionMode
+from b2sdk.v3.exception import AccessDenied
+
+
+@pytest.fixture
+def locked_bucket(b2_cli, bucket_info):
+    bucket = b2_cli.b2_api.create_bucket('locked-bucket', 'allPrivate', is_file_lock_enabled=True)
+    for name in ['a/1.txt', 'a/2.txt', 'a/b/3.txt', 'c/4.txt']:
+        bucket.upload_bytes(b'data', name)
+    return bucket
+
+
+def legal_holds(bucket):
+    return {
+        file_version.file_name: file_version.legal_hold
+        for file_version, _ in bucket.ls(recursive=True)
+    }
+
+
+@pytest.mark.apiver
+def test_file_update__single_file(b2_cli, locked_bucket):
+    b2_cli.run(['file', 'update', '--legal-hold', 'on', 'b2://locked-bucket/a/1.txt'])
+    assert legal_holds(locked_bucket)['a/1.txt'] == LegalHold.ON
+    assert legal_holds(locked_bucket)['a/2.txt'] != LegalHold.ON
+
+
+@pytest.mark.apiver
+def test_file_update__recursive(b2_cli, locked_bucket):
+    b2_cli.run(
+        [
+            'file',
+            'update',
+            '--recursive',
+            '--no-progress',
+            '--legal-hold',
+            'on',
+            'b2://locked-bucket/a/',
+        ]
+    )
+    assert legal_holds(locked_bucket) == {
+        'a/1.txt': LegalHold.ON,
+        'a/2.txt': LegalHold.ON,
+        'a/b/3.txt': LegalHold.ON,
+        'c/4.txt': LegalHold.UNSET,
+    }
+
+    # files already updated are skipped
+    b2_cli.run(
+        [
+            'file',
+            'update',
+            '--recursive',
+            '--no-progress',
+            '--legal-hold',
+            'on',
+            '--max-updates-per-second',
+            '100',
+            'b2://locked-bucket/',
+        ],
+        expected_stderr='3 files already up to date were skipped\n',
+    )
+    assert set(legal_holds(locked_bucket).values()) == {LegalHold.ON}
+
+
+@pytest.mark.apiver
+def test_file_update__recursive_retention(b2_cli, locked_bucket):
+    retain_until = 4102444800
+    b2_cli.run(
+        [
+            'file',
+            'update',
+            '--recursive',
+            '--no-progress',
+            '--with-wildcard',
+            '--file-retention-mode',
+            'governance',
+            '--retain-until',
+            str(retain_until),
+            'b2://locked-bucket/*/1.txt',
+        ]
+    )
+    retentions = {
+        file_version.file_name: file_version.file_retention
+        for file_version, _ in locked_bucket.ls(recursive=True)
+    }
+    assert retentions['a/1.txt'] == FileRetentionSetting(
+        RetentionMode.GOVERNANCE, retain_until * 1000
+    )
+    assert retentions['a/2.txt'].mode != RetentionMode.GOVERNANCE
+
+
+@pytest.mark.apiver
+def test_file_update__dry_run(b2_cli, locked_bucket):
+    b2_cli.run(
+        [
+            'file',
+            'update',
+            '--recursive',
+            '--dry-run',
+            '--legal-hold',
+            'on',
+            'b2://locked-bucket/a/',
+        ],
+        expected_stdout='a/1.txt\na/2.txt\na/b/3.txt\n',
+    )
+    assert LegalHold.ON not in legal_holds(locked_bucket).values()
+
+
+@pytest.mark.apiver
+def test_file_update__recursive_failure(b2_cli, locked_bucket, monkeypatch):
+    def update_file_legal_hold(file_id, file_name, legal_hold):
+        raise AccessDenied()
+
+    monkeypatch.setattr(b2_cli.b2_api, 'update_file_legal_hold', update_file_legal_hold)
+    b2_cli.run(
+        [
+            'file',
+            'update',
+            '--recursive',
+            '--no-progress',
+            '--legal-hold',
+            'on',
+            '--threads',
+            '1',
+            'b2://locked-bucket/c/',
+        ],
+        expected_stdout=(
+            'Update of file "c/4.txt" (9996) failed: '
+            'This call with these parameters is not allowed for this auth token\n'
+        ),
+        expected_status=1,
+    )
+
+
+@pytest.mark.apiver
+def test_file_update__invalid_arguments(b2_cli, locked_bucket):
+    b2_cli.run(
+        ['file', 'update', '--recursive', 'b2://locked-bucket/a/'],
+        expected_stderr='ERROR: --legal-hold or --file-retention-mode is required with --recursive\n',
+        expected_status=1,
+    )
+    b2_cli.run(
+        [
+            'file',
+            'update',
+            '--recursive',
+            '--file-retention-mode',
+            'compliance',
+            'b2://locked-bucket/a/',
+        ],
+        expected_stderr='ERROR: --retain-until is required with --file-retention-mode compliance\n',
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'update', '--legal-hold', 'on', 'b2://locked-bucket/a/'],
+        expected_stderr=(
+            'ERROR: B2 URI pointing to a file-like object is required, '
+            'but b2://locked-bucket/a/ was provided\n'
+        ),
+        expected_status=1,
+    )
@@ -7,6 +7,8 @@
 # License https://www.backblaze.com/using_b2_code.html
 #
 ######################################################################
+import json
+
 import pytest
 
 
@@ -70,3 +72,35 @@ def test_get_url__b2id_uri__with_auth__error(b2_cli, uploaded_file):
         expected_stderr='ERROR: --with-auth param cannot be used with `b2id://` urls. Please, use `b2://bucket/filename` url format instead\n',
         expected_status=1,
     )
+
+
+def test_get_url__from_file__with_auth(
+    b2_cli, bucket, tmp_path, uploaded_file, uploaded_file_url, monkeypatch
+):
+    uris = tmp_path / 'uris.txt'
+    uris.write_text(
+        f'b2://{bucket}/{uploaded_file["fileName"]}\n'
+        f'b2id://{uploaded_file["fileId"]}\n'
+        f'b2://{bucket}/other.txt\n'
+    )
+    lookups = []
+    get_bucket_by_name = b2_cli.b2_api.get_bucket_by_name
+    monkeypatch.setattr(
+        b2_cli.b2_api,
+        'get_bucket_by_name',
+        lambda name: lookups.append(name) or get_bucket_by_name(name),
+    )
+    _, stdout, _ = b2_cli.run(
+        ['file', 'url', '--with-auth', '--from-file', str(uris)], expected_status=1
+    )
+    records = [json.loads(line) for line in stdout.splitlines()]
+    assert records[0]['result'].startswith(f'{uploaded_file_url}?Authorization=')
+    assert records[1] == {
+        'uri': f'b2id://{uploaded_file["fileId"]}',
+        'error': '--with-auth param cannot be used with `b2id://` urls. Please, use `b2://bucket/filename` url format instead',
+    }
+    assert records[2]['result'].startswith(
+        f'http://download.example.com/file/{bucket}/other.txt?Authorization='
+    )
+    # the bucket is looked up once for both files
+    assert lookups == [bucket]
@@ -0,0 +1,94 @@
+######################################################################
+#
+# File: test/unit/console_tool/test_pack.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+import os
+
+import pytest
+
+FILES = {
+    'a.txt': b'hello',
+    'dir/b.bin': bytes(range(256)) * 5,
+    'dir/empty': b'',
+    'dir/sub/c.txt': b'nested',
+}
+
+
+@pytest.fixture
+def packed(b2_cli, bucket, tmp_path):
+    source = tmp_path / 'src'
+    for name, content in FILES.items():
+        path = source / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        os.utime(path, (1500111222, 1500111222))
+    b2_cli.run(
+        ['pack', '--pack-size', '4200', str(source), f'b2://{bucket}/packed/'],
+        expected_json_in_stdout={'fileName': 'packed/index.json'},
+        expected_part_of_stdout='pack-00000.tar: 2 files\npack-00001.tar: 2 files\n',
+    )
+    return source
+
+
+def test_pack_unpack(b2_cli, bucket, packed, tmp_path):
+    b2_cli.run(
+        ['ls', f'b2://{bucket}/packed/'],
+        expected_stdout='packed/index.json\npacked/pack-00000.tar\npacked/pack-00001.tar\n',
+    )
+    target = tmp_path / 'dst'
+    b2_cli.run(
+        ['unpack', f'b2://{bucket}/packed/', str(target)],
+        expected_stdout='4 files unpacked\n',
+    )
+    for name, content in FILES.items():
+        assert (target / name).read_bytes() == content
+        assert os.path.getmtime(target / name) == 1500111222
+
+
+def test_cat_member(b2_cli, bucket, packed, capfdbinary):
+    index_uri = f'b2://{bucket}/packed/index.json'
+    for name, content in FILES.items():
+        b2_cli.run(['file', 'cat', '--no-progress', '--member', name, index_uri])
+        assert capfdbinary.readouterr().out == content
+
+    b2_cli.run(
+        ['file', 'cat', '--no-progress', '--member', 'missing', index_uri],
+        expected_stderr="ERROR: Pack error: 'missing' is not a member of the pack\n",
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['file', 'cat', '--no-progress', '--member', 'a.txt', 'b2id://9999'],
+        expected_stderr='ERROR: --member requires a b2:// URI of a pack index\n',
+        expected_status=1,
+    )
+
+
+def test_pack__not_a_directory(b2_cli, bucket, tmp_path):
+    b2_cli.run(
+        ['pack', str(tmp_path / 'missing'), f'b2://{bucket}/packed/'],
+        expected_stderr=f'ERROR: {tmp_path / "missing"} is not a directory\n',
+        expected_status=1,
+    )
+
+
+def test_pack__max_memory(b2_cli, bucket, api_bucket, tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'a.bin').write_bytes(bytes(range(256)) * 8)
+    b2_cli.run(
+        ['pack', '--max-memory', '100', str(source), f'b2://{bucket}/packed/'],
+        expected_stderr='ERROR: --max-memory has to be at least 400 bytes (two buffers of 200 bytes)\n',
+        expected_status=1,
+    )
+    b2_cli.run(
+        ['pack', '--threads', '1', '--max-memory', '1K', str(source), f'b2://{bucket}/packed/'],
+        expected_part_of_stdout='pack-00000.tar: 1 files\n',
+    )
+    pack = api_bucket.get_file_info_by_name('packed/pack-00000.tar')
+    # uploaded in parts of half the memory
+    assert pack.content_sha1 == 'none'
@@ -0,0 +1,27 @@
+######################################################################
+#
+# File: test/unit/console_tool/test_replication_status.py
+#
+# Copyright 2026 Backblaze Inc. All Rights Reserved.
+#
+# License https://www.backblaze.com/using_b2_code.html
+#
+######################################################################
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    'options,message',
+    [
+        (['--sample', '10'], '--sample requires --state'),
+        (['--state', 'state.json', '--sample', '-1'], '--sample must not be negative'),
+    ],
+)
+def test_replication_status_sample_errors(b2_cli, bucket, options, message):
+    b2_cli.run(
+        ['replication', 'status', bucket, *options],
+        expected_stderr=f'ERROR: {message}\n',
+        expected_status=1,
+    )
@@ -7,6 +7,8 @@
 # License https://www.backblaze.com/using_b2_code.html
 #
 ######################################################################
+import hashlib
+import io
 import os
 
 import pytest
@@ -222,3 +224,136 @@ def test_upload_file__threads_setting(b2_cli, bucket, tmp_path):
     )
 
     assert b2_cli.console_tool.api.services.upload_manager.get_thread_pool_size() == num_threads
+
+
+def test_upload_file__auto_part_size(b2_cli, bucket, tmp_path):
+    """Test `file upload` of a regular file with part size adapted to throughput"""
+    content = 'hello world'
+    local_file1 = tmp_path / 'file1.txt'
+    local_file1.write_text(content)
+
+    b2_cli.run(
+        [
+            'file',
+            'upload',
+            '--no-progress',
+            '--part-size',
+            'auto',
+            '--incremental-mode',
+            'my-bucket',
+            str(local_file1),
+            'file1.txt',
+        ],
+        expected_json_in_stdout={
+            'action': 'upload',
+            'contentSha1': '2aae6c35c94fcfb415dbe95f408b9ce91ee846ed',
+            'fileInfo': {
+                'src_last_modified_millis': f'{local_file1.stat().st_mtime_ns // 1000000}'
+            },
+            'fileName': 'file1.txt',
+            'size': len(content),
+        },
+        remove_version=True,
+        expected_stderr='WARNING: Ignoring upload mode setting as we are uploading through memory buffers.\n',
+    )
+
+
+def test_upload_file__compress_conflicting_content_encoding(b2_cli, bucket, local_file):
+    b2_cli.run(
+        [
+            'file',
+            'upload',
+            '--no-progress',
+            '--compress',
+            'gzip',
+            '--content-encoding',
+            'br',
+            'my-bucket',
+            str(local_file),
+            'file1.txt',
+        ],
+        expected_stderr='ERROR: --content-encoding br cannot be used with --compress gzip\n',
+        expected_status=1,
+    )
+
+
+def test_upload_file__io_mode_mmap(b2_cli, bucket, api_bucket, tmp_path):
+    """Test `file upload` of a large file read through memory mappings"""
+    content = bytes(range(256)) * 4
+    local_file1 = tmp_path / 'file1.bin'
+    local_file1.write_bytes(content)
+
+    b2_cli.run(
+        [
+            'file',
+            'upload',
+            '--no-progress',
+            '--io-mode',
+            'mmap',
+            'my-bucket',
+            str(local_file1),
+            'file1.bin',
+        ],
+        expected_json_in_stdout={
+            'action': 'upload',
+            'fileName': 'file1.bin',
+            'size': len(content),
+        },
+        remove_version=True,
+    )
+    downloaded = io.BytesIO()
+    api_bucket.download_file_by_name('file1.bin').save(downloaded)
+    assert downloaded.getvalue() == content
+
+
+@skip_on_windows
+def test_upload_file__io_mode_mmap__named_pipe(b2_cli, bucket, tmpdir, bg_executor):
+    content = 'hello world'
+    local_file1 = tmpdir.join('file1.txt')
+    os.mkfifo(str(local_file1))
+    writer = bg_executor.submit(local_file1.write, content)
+
+    b2_cli.run(
+        [
+            'file',
+            'upload',
+            '--no-progress',
+            '--io-mode',
+            'mmap',
+            'my-bucket',
+            str(local_file1),
+            'file1.txt',
+        ],
+        expected_json_in_stdout={'fileName': 'file1.txt', 'size': len(content)},
+        remove_version=True,
+        expected_stderr='WARNING: Ignoring io mode setting as we are uploading a stream.\n',
+    )
+    writer.result(timeout=1)
+
+
+def test_upload_file__fixed_part_size(b2_cli, bucket, api_bucket, tmp_path):
+    """Test `file upload` of a regular file in parts of given size, not through memory buffers"""
+    local_file1 = tmp_path / 'file1.bin'
+    local_file1.write_bytes(b'x' * 3000)
+
+    b2_cli.run(
+        [
+            'file',
+            'upload',
+            '--no-progress',
+            '--quiet',
+            '--part-size',
+            '1000',
+            '--incremental-mode',
+            'my-bucket',
+            str(local_file1),
+            'file1.bin',
+        ],
+    )
+
+    file_version = api_bucket.get_file_info_by_name('file1.bin')
+    assert file_version.size == 3000
+    assert file_version.content_sha1 == 'none'
+    assert file_version.file_info['large_file_sha1'] == hashlib.sha1(b'x' * 3000).hexdigest()
+    parts = list(b2_cli.b2_api.list_parts(file_version.id_))
+    assert [part.content_length for part in parts] == [1000, 1000, 1000]
@@ -11,6 +11,8 @@ import os
 
 from b2sdk.v3 import DEFAULT_MIN_PART_SIZE
 
+from b2._internal import console_tool
+from b2._internal._utils.part_size import MAX_PART_SIZE, AdaptivePartSizer
 from test.helpers import skip_on_windows
 
 UUS_DEPRECATION_WARNING = (
@@ -133,3 +135,105 @@ def test_upload_unbound_stream__regular_file(b2_cli, bucket, tmpdir):
         expected_stderr=f'{UUS_DEPRECATION_WARNING}'
         'WARNING: You are using a stream upload command to upload a regular file. While it will work, it is inefficient. Use of `file upload` command is recommended.\n',
     )
+
+
+@skip_on_windows
+def test_upload_unbound_stream__max_memory(b2_cli, bucket, tmpdir, bg_executor):
+    """Test upload_unbound_stream derives part size from --max-memory"""
+    expected_size = 2 * DEFAULT_MIN_PART_SIZE + 500  # three parts of at most DEFAULT_MIN_PART_SIZE
+
+    filename = 'named_pipe.txt'
+    fifo_file = tmpdir.join('fifo_file.txt')
+    os.mkfifo(str(fifo_file))
+    writer = bg_executor.submit(lambda: fifo_file.write('x' * expected_size))
+
+    b2_cli.run(
+        [
+            'upload-unbound-stream',
+            '--max-memory',
+            str(2 * DEFAULT_MIN_PART_SIZE),
+            '--no-progress',
+            'my-bucket',
+            str(fifo_file),
+            filename,
+        ],
+        expected_json_in_stdout={'action': 'upload', 'fileName': filename, 'size': expected_size},
+        remove_version=True,
+        expected_stderr=UUS_DEPRECATION_WARNING,
+    )
+    writer.result(timeout=1)
+
+
+def test_upload_unbound_stream__max_memory_too_small(b2_cli, bucket, mock_stdin):
+    mock_stdin.write('x')
+    mock_stdin.close()
+
+    b2_cli.run(
+        ['upload-unbound-stream', '--max-memory', '1M', '--no-progress', 'my-bucket', '-', 'x.txt'],
+        expected_stderr=UUS_DEPRECATION_WARNING
+        + f'ERROR: --max-memory has to be at least {2 * DEFAULT_MIN_PART_SIZE} bytes '
+        f'(two buffers of {DEFAULT_MIN_PART_SIZE} bytes)\n',
+        expected_status=1,
+    )
+
+
+@skip_on_windows
+def test_upload_unbound_stream__auto_part_size(b2_cli, bucket, tmpdir, bg_executor):
+    """Test upload_unbound_stream with part size adapted to throughput within --max-memory"""
+    expected_size = 2 * DEFAULT_MIN_PART_SIZE + 500
+
+    filename = 'named_pipe.txt'
+    fifo_file = tmpdir.join('fifo_file.txt')
+    os.mkfifo(str(fifo_file))
+    writer = bg_executor.submit(lambda: fifo_file.write('x' * expected_size))
+
+    b2_cli.run(
+        [
+            'upload-unbound-stream',
+            '--part-size',
+            'auto',
+            '--max-memory',
+            str(2 * DEFAULT_MIN_PART_SIZE),
+            '--no-progress',
+            'my-bucket',
+            str(fifo_file),
+            filename,
+        ],
+        expected_json_in_stdout={'action': 'upload', 'fileName': filename, 'size': expected_size},
+        remove_version=True,
+        expected_stderr=UUS_DEPRECATION_WARNING,
+    )
+    writer.result(timeout=1)
+
+
+def test_upload_unbound_stream__auto_part_size_without_max_memory(
+    b2_cli, bucket, mock_stdin, monkeypatch
+):
+    """Test that without --max-memory parts may grow over the recommended part size"""
+    part_sizers = []
+
+    class SpyPartSizer(AdaptivePartSizer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            part_sizers.append(self)
+
+    monkeypatch.setattr(console_tool, 'AdaptivePartSizer', SpyPartSizer)
+    mock_stdin.write('x')
+    mock_stdin.close()
+
+    b2_cli.run(
+        [
+            'upload-unbound-stream',
+            '--part-size',
+            'auto',
+            '--no-progress',
+            'my-bucket',
+            '-',
+            'x.txt',
+        ],
+        expected_json_in_stdout={'action': 'upload', 'fileName': 'x.txt', 'size': 1},
+        remove_version=True,
+        expected_stderr=UUS_DEPRECATION_WARNING,
+    )
+    (part_sizer,) = part_sizers
+    assert part_sizer.max_part_size == MAX_PART_SIZE
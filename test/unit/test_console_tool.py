@@ -13,7 +13,7 @@ import os
 import pathlib
 import re
 from functools import cache
-from io import StringIO
+from io import BytesIO, StringIO
 from itertools import chain, product
 from tempfile import TemporaryDirectory
 from typing import Optional
@@ -25,6 +25,7 @@ from b2sdk.v3 import (
     ALL_CAPABILITIES,
     B2Api,
     B2HttpApiConfig,
+    LocalFolder,
     ProgressReport,
     RawSimulator,
     StubAccountInfo,
@@ -40,6 +41,7 @@ from b2._internal._cli.const import (
     B2_APPLICATION_KEY_ID_ENV_VAR,
     B2_ENVIRONMENT_ENV_VAR,
 )
+from b2._internal._utils.watch import Changes
 from b2._internal.b2v3.rm import Rm as v3Rm
 from b2._internal.b2v4.registry import Rm as v4Rm
 from b2._internal.version import VERSION
@@ -2320,6 +2322,614 @@ class TestConsoleTool(BaseConsoleToolTest):
             command = ['sync', '--no-progress', temp_dir, 'b2://my-bucket']
             self._run_command(command, expected_stdout, '', 0)
 
+    def test_sync_auto_part_size(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            file_path = os.path.join(temp_dir, 'test.txt')
+            with open(file_path, 'wb') as f:
+                f.write(b'hello world')
+            expected_stdout = """
+            upload test.txt
+            """
+
+            command = ['sync', '--no-progress', '--part-size', 'auto', temp_dir, 'b2://my-bucket']
+            self._run_command(command, expected_stdout, '', 0)
+
+    def test_sync_compress(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            file_path = os.path.join(temp_dir, 'test.txt')
+            with open(file_path, 'wb') as f:
+                f.write(b'hello world')
+            expected_stdout = """
+            upload test.txt
+            """
+
+            command = ['sync', '--no-progress', '--compress', 'gzip', temp_dir, 'b2://my-bucket']
+            self._run_command(command, expected_stdout, '', 0)
+
+        file_version = self.b2_api.get_bucket_by_name('my-bucket').get_file_info_by_name('test.txt')
+        assert file_version.content_encoding == 'gzip'
+        assert file_version.file_info['original_size'] == '11'
+        assert file_version.file_info['original_sha1'] == '2aae6c35c94fcfb415dbe95f408b9ce91ee846ed'
+
+    def test_sync_compress_max_memory(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            with open(os.path.join(temp_dir, 'test.txt'), 'wb') as f:
+                f.write(b'hello world' * 100)
+            command = ['sync', '--no-progress', '--compress', 'gzip', '--threads', '2']
+            self._run_command(
+                [
+                    *command,
+                    '--max-memory',
+                    '1M',
+                    '--part-size',
+                    '1000000',
+                    temp_dir,
+                    'b2://my-bucket',
+                ],
+                '',
+                'ERROR: --max-memory has to be at least 4000000 bytes to compress with 2 sync threads\n',
+                1,
+            )
+            self._run_command(
+                [*command, '--max-memory', '1M', temp_dir, 'b2://my-bucket'],
+                'upload test.txt\n',
+                '',
+                0,
+            )
+
+        file_version = self.b2_api.get_bucket_by_name('my-bucket').get_file_info_by_name('test.txt')
+        assert file_version.file_info['original_size'] == '1100'
+
+    def test_sync_io_mode_mmap(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            content = bytes(range(256)) * 4
+            with open(os.path.join(temp_dir, 'test.bin'), 'wb') as f:
+                f.write(content)
+            expected_stdout = """
+            upload test.bin
+            """
+
+            command = ['sync', '--no-progress', '--io-mode', 'mmap', temp_dir, 'b2://my-bucket']
+            self._run_command(command, expected_stdout, '', 0)
+
+        downloaded = BytesIO()
+        self.b2_api.get_bucket_by_name('my-bucket').download_file_by_name('test.bin').save(
+            downloaded
+        )
+        assert downloaded.getvalue() == content
+
+    def test_sync_scan_threads(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, 'a', 'c'))
+            os.mkdir(os.path.join(temp_dir, 'skip'))
+            for file_name in ('a.txt', 'a/b.txt', 'a/c/d.txt', 'a0.txt', 'skip/e.txt'):
+                self._make_local_file(temp_dir, file_name)
+            expected_stdout = """
+            upload a.txt
+            upload a/b.txt
+            upload a/c/d.txt
+            upload a0.txt
+            """
+            command = [
+                'sync',
+                '--no-progress',
+                '--threads',
+                '1',
+                '--scan-threads',
+                '4',
+                '--exclude-dir-regex',
+                'skip',
+                temp_dir,
+                'b2://my-bucket',
+            ]
+            self._run_command(command, expected_stdout, '', 0)
+
+            command = ['sync', '--scan-threads', '0', temp_dir, 'b2://my-bucket']
+            self._run_command(command, '', 'ERROR: --scan-threads must be at least 1\n', 1)
+
+    def test_sync_max_memory(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            source = os.path.join(temp_dir, 'src')
+            os.makedirs(os.path.join(source, 'a', 'c'))
+            for file_name in ('a.txt', 'a/b.txt', 'a/c/d.txt', 'a-b.txt', 'a0.txt'):
+                self._make_local_file(source, file_name)
+            command = ['sync', '--no-progress', '--threads', '1', '--max-memory', '1M']
+            expected_stdout = """
+            upload a-b.txt
+            upload a.txt
+            upload a/b.txt
+            upload a/c/d.txt
+            upload a0.txt
+            """
+            self._run_command([*command, source, 'b2://my-bucket'], expected_stdout, '', 0)
+            self._run_command([*command, source, 'b2://my-bucket'], '', '', 0)
+
+            # the local destination is sorted the same way
+            destination = os.path.join(temp_dir, 'dest')
+            os.makedirs(os.path.join(destination, 'a'))
+            self._make_local_file(destination, 'a/b.txt')
+            self._run_command(
+                [*command, '--skip-newer', 'b2://my-bucket', destination],
+                'dnload a-b.txt\ndnload a.txt\ndnload a/c/d.txt\ndnload a0.txt\n',
+                '',
+                0,
+            )
+
+            self._run_command(
+                ['sync', '--max-memory', '1K', source, 'b2://my-bucket'],
+                '',
+                'ERROR: --max-memory must be at least 1M\n',
+                1,
+            )
+            self._run_command(
+                ['sync', '--max-memory', '1M', '--scan-threads', '2', source, 'b2://my-bucket'],
+                '',
+                'ERROR: --max-memory cannot be used with --scan-threads\n',
+                1,
+            )
+
+    def test_sync_list_threads(self):
+        self._authorize_account()
+        self._create_my_bucket()
+        bucket = self.b2_api.get_bucket_by_name('my-bucket')
+        for file_name in ('a.txt', 'a/b.txt', 'c/d.txt', 'e/f.txt'):
+            bucket.upload_bytes(b'hello world', file_name)
+
+        with TempDir() as temp_dir:
+            expected_stdout = """
+            dnload a.txt
+            dnload a/b.txt
+            dnload c/d.txt
+            dnload e/f.txt
+            """
+            command = [
+                'sync',
+                '--no-progress',
+                '--threads',
+                '1',
+                '--list-threads',
+                '3',
+                'b2://my-bucket',
+                temp_dir,
+            ]
+            self._run_command(command, expected_stdout, '', 0)
+            assert self._read_file(os.path.join(temp_dir, 'e', 'f.txt')) == b'hello world'
+
+            command = ['sync', '--list-threads', '0', 'b2://my-bucket', temp_dir]
+            self._run_command(command, '', 'ERROR: --list-threads must be at least 1\n', 1)
+
+    def test_sync_state_db(self):
+        self._authorize_account()
+        self._create_my_bucket()
+        bucket = self.b2_api.get_bucket_by_name('my-bucket')
+
+        with TempDir() as temp_dir:
+            state_db = os.path.join(temp_dir, 'state.db')
+            source = os.path.join(temp_dir, 'src')
+            os.mkdir(source)
+            self._make_local_file(source, 'a.txt')
+            self._make_local_file(source, 'b.txt')
+            command = [
+                'sync',
+                '--no-progress',
+                '--threads',
+                '1',
+                '--delete',
+                '--state-db',
+                state_db,
+                source,
+            ]
+            self._run_command(
+                [*command, 'b2://my-bucket/dir'], 'upload a.txt\nupload b.txt\n', '', 0
+            )
+
+            # the database is trusted, so a file uploaded by someone else is not seen
+            bucket.upload_bytes(b'other', 'dir/c.txt')
+            os.remove(os.path.join(source, 'b.txt'))
+            self._make_local_file(source, 'd.txt')
+            self._run_command(
+                [*command, 'b2://my-bucket/dir'], 'delete b.txt\nupload d.txt\n', '', 0
+            )
+            self._run_command([*command, 'b2://my-bucket/dir'], '', '', 0)
+
+            # a full listing finds it
+            self._run_command(
+                [*command, '--state-db-max-age', '0', 'b2://my-bucket/dir'],
+                'delete c.txt\n',
+                '',
+                0,
+            )
+            # the same database keeps the state of other destinations apart
+            self._run_command(
+                [*command, 'b2://my-bucket/other'], 'upload a.txt\nupload d.txt\n', '', 0
+            )
+
+        assert [fv.file_name for fv, _ in bucket.ls(recursive=True)] == [
+            'dir/a.txt',
+            'dir/d.txt',
+            'other/a.txt',
+            'other/d.txt',
+        ]
+
+    def test_sync_state_db_compress(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            state_db = os.path.join(temp_dir, 'state.db')
+            source = os.path.join(temp_dir, 'src')
+            os.mkdir(source)
+            self._make_local_file(source, 'a.txt')
+            command = [
+                'sync',
+                '--no-progress',
+                '--compress',
+                'gzip',
+                '--compare-versions',
+                'sha1',
+                '--state-db',
+                state_db,
+                source,
+                'b2://my-bucket/dir',
+            ]
+            self._run_command(command, 'upload a.txt\n', '', 0)
+            # the original size and sha1 of the compressed file are read from the database
+            self._run_command(command, '', '', 0)
+
+    def test_sync_state_db_errors(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            state_db = os.path.join(temp_dir, 'state.db')
+            self._run_command(
+                ['sync', '--state-db', state_db, 'b2://my-bucket', temp_dir],
+                '',
+                'ERROR: --state-db can only be used to sync a local folder to B2\n',
+                1,
+            )
+            self._run_command(
+                ['sync', '--state-db-max-age', '1', temp_dir, 'b2://my-bucket'],
+                '',
+                'ERROR: --state-db-max-age requires --state-db\n',
+                1,
+            )
+
+    def test_sync_compare_versions_sha1(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            sha1_cache = os.path.join(temp_dir, 'sha1-cache.sqlite')
+            source = os.path.join(temp_dir, 'src')
+            os.mkdir(source)
+            for name in ('a.txt', 'b.txt', 'c.txt'):
+                self._make_local_file(source, name)
+            command = [
+                'sync',
+                '--no-progress',
+                '--threads',
+                '1',
+                '--compare-versions',
+                'sha1',
+                '--sha1-cache',
+                sha1_cache,
+                source,
+                'b2://my-bucket',
+            ]
+            self._run_command(command, 'upload a.txt\nupload b.txt\nupload c.txt\n', '', 0)
+
+            # a new modification time alone does not make a file different, new contents do
+            os.utime(os.path.join(source, 'a.txt'), (1, 1))
+            with open(os.path.join(source, 'b.txt'), 'wb') as f:
+                f.write(b'HELLO WORLD')
+            with open(os.path.join(source, 'c.txt'), 'wb') as f:
+                f.write(b'hello')
+            self._run_command(command, 'upload b.txt\nupload c.txt\n', '', 0)
+            self._run_command(command, '', '', 0)
+            assert os.path.exists(sha1_cache)
+
+            self._run_command(
+                [*command[:-2], '--hash-threads', '0', source, 'b2://my-bucket'],
+                '',
+                'ERROR: --hash-threads must be at least 1\n',
+                1,
+            )
+
+    def test_sync_copy_existing(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            sha1_cache = os.path.join(temp_dir, 'sha1-cache.sqlite')
+            source = os.path.join(temp_dir, 'src')
+            os.makedirs(os.path.join(source, 'old'))
+            self._make_local_file(os.path.join(source, 'old'), 'a.txt')
+            with open(os.path.join(source, 'old', 'b.txt'), 'wb') as f:
+                f.write(b'hello b')
+            command = [
+                'sync',
+                '--no-progress',
+                '--threads',
+                '1',
+                '--delete',
+                '--copy-existing',
+                '--sha1-cache',
+                sha1_cache,
+                source,
+                'b2://my-bucket',
+            ]
+            self._run_command(command, 'upload old/a.txt\nupload old/b.txt\n', '', 0)
+
+            # the renamed directory is copied on the server, a new file is uploaded
+            os.rename(os.path.join(source, 'old'), os.path.join(source, 'new'))
+            with open(os.path.join(source, 'new', 'c.txt'), 'wb') as f:
+                f.write(b'other world')
+            self._run_command(
+                command,
+                'copy old/a.txt -> new/a.txt\n'
+                'copy old/b.txt -> new/b.txt\n'
+                'upload new/c.txt\n'
+                'delete old/a.txt\n'
+                'delete old/b.txt\n'
+                'copied 2 files on the server, 18 B not uploaded\n',
+                '',
+                0,
+            )
+            self._run_command(command, '', '', 0)
+            self._run_command(
+                ['ls', '-r', 'b2://my-bucket'], 'new/a.txt\nnew/b.txt\nnew/c.txt\n', '', 0
+            )
+
+            self._run_command(
+                ['sync', '--copy-existing', 'b2://my-bucket', source],
+                '',
+                'ERROR: --copy-existing can only be used to sync a local folder to B2\n',
+                1,
+            )
+
+    def test_sync_plan(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            plan = os.path.join(temp_dir, 'plan.jsonl')
+            source = os.path.join(temp_dir, 'src')
+            os.mkdir(source)
+            self._make_local_file(source, 'a.txt')
+            self._make_local_file(source, 'b.txt')
+            options = ['sync', '--no-progress', '--threads', '1']
+            self._run_command(
+                [*options, '--plan-out', plan, source, 'b2://my-bucket/dir'],
+                'upload a.txt\nupload b.txt\n',
+                '',
+                0,
+            )
+            self._run_command(['ls', 'b2://my-bucket'], '', '', 0)
+
+            self._run_command(
+                [*options, '--apply-plan', plan, source, 'b2://my-bucket/other'],
+                '',
+                f'ERROR: {plan} is a plan to sync {source} to b2://my-bucket/dir\n',
+                1,
+            )
+            self._run_command(
+                [*options, '--apply-plan', plan, source, 'b2://my-bucket/dir'],
+                'upload a.txt\nupload b.txt\n',
+                '',
+                0,
+            )
+            self._run_command(['ls', 'b2://my-bucket/dir'], 'dir/a.txt\ndir/b.txt\n', '', 0)
+
+            # a download does not overwrite a local file made after the plan
+            destination = os.path.join(temp_dir, 'dest')
+            os.mkdir(destination)
+            self._run_command(
+                [*options, '--plan-out', plan, 'b2://my-bucket/dir', destination],
+                'dnload a.txt\ndnload b.txt\n',
+                '',
+                0,
+            )
+            self._make_local_file(destination, 'b.txt')
+            self._run_command(
+                [*options, '--apply-plan', plan, 'b2://my-bucket/dir', destination],
+                expected_part_of_stdout='dest/b.txt changed since the plan was made',
+                expected_stderr='ERROR: Incomplete sync: sync is incomplete\n',
+                expected_status=1,
+            )
+            assert self._read_file(os.path.join(destination, 'a.txt')) == b'hello world'
+
+            with open(plan, 'rb+') as f:
+                f.truncate(os.path.getsize(plan) - 10)
+            self._run_command(
+                [*options, '--apply-plan', plan, 'b2://my-bucket/dir', destination],
+                '',
+                f'ERROR: {plan} is incomplete\n',
+                1,
+            )
+
+    def test_sync_schedule(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            for name, size in [('a.txt', 10), ('b.txt', 30), ('c.txt', 20)]:
+                with open(os.path.join(temp_dir, name), 'wb') as f:
+                    f.write(b'x' * size)
+            command = ['sync', '--no-progress', '--threads', '1', '--schedule', 'largest-first']
+            self._run_command(
+                [*command, '--dry-run', temp_dir, 'b2://my-bucket'],
+                'upload b.txt\nupload c.txt\nupload a.txt\n',
+                '',
+                0,
+            )
+            _, stdout, _ = self._run_command(
+                [*command, temp_dir, 'b2://my-bucket'],
+                expected_stdout=None,
+                expected_part_of_stdout='upload b.txt\nupload c.txt\nupload a.txt\n',
+            )
+            assert 'small files: 3 transferred, 60 B in ' in stdout
+
+    def test_sync_events_jsonl(self):
+        self._authorize_account()
+        self._create_my_bucket()
+
+        with TempDir() as temp_dir:
+            self._make_local_file(temp_dir, 'a.txt')
+            self._make_local_file(temp_dir, 'b.txt')
+            command = ['sync', '--no-progress', '--threads', '1', '--events-jsonl', '-']
+            _, stdout, _ = self._run_command(
+                [*command, temp_dir, 'b2://my-bucket'],
+                expected_stdout=None,
+                expected_stderr='upload a.txt\nupload b.txt\n',
+            )
+            events = [json.loads(line) for line in stdout.splitlines()]
+            assert all(isinstance(event['ts'], float) for event in events)
+            events = [event for event in events if event['event'] != 'progress']
+            assert [event['event'] for event in events] == [
+                'sync_start',
+                'scan',
+                'scan',
+                'action_start',
+                'action_finish',
+                'action_start',
+                'action_finish',
+                'sync_end',
+            ]
+            assert events[0]['source'] == temp_dir
+            assert events[0]['destination'] == 'b2://my-bucket/'
+            assert {event['stage'] for event in events[1:3]} == {'list', 'compare'}
+            assert events[4]['op'] == 'upload'
+            assert events[4]['file'] == 'a.txt'
+            assert events[4]['bytes'] == 11
+            assert events[4]['ok'] is True
+            assert events[-1]['status'] == 0
+            assert events[-1]['transferred_bytes'] == 22
+
+            events_path = os.path.join(temp_dir, 'events.jsonl')
+            self._run_command(
+                [
+                    *command[:-1],
+                    events_path,
+                    '--exclude-regex',
+                    'events.*',
+                    temp_dir,
+                    'b2://my-bucket',
+                ],
+                '',
+                '',
+                0,
+            )
+            with open(events_path) as f:
+                events = [json.loads(line) for line in f]
+            assert events[-1]['event'] == 'sync_end'
+            assert events[-1]['transferred_files'] == 0
+
+    def test_sync_several_destinations(self):
+        self._authorize_account()
+        self._create_my_bucket()
+        self._run_command(['bucket', 'create', 'your-bucket', 'allPrivate'], 'bucket_1\n', '', 0)
+        self.b2_api.get_bucket_by_name('your-bucket').upload_bytes(b'hello world', 'dir/a.txt')
+
+        with TempDir() as temp_dir:
+            self._make_local_file(temp_dir, 'a.txt')
+            self._make_local_file(temp_dir, 'b.txt')
+            command = ['sync', '--threads', '1', '--compare-versions', 'size', temp_dir]
+            expected_stdout = """
+            b2://my-bucket/:
+            upload a.txt
+            upload b.txt
+            b2://your-bucket/dir:
+            upload b.txt
+            """
+            with mock.patch.object(
+                LocalFolder, 'all_files', side_effect=LocalFolder.all_files, autospec=True
+            ) as all_files:
+                self._run_command(
+                    [*command, 'b2://my-bucket', 'b2://your-bucket/dir'], expected_stdout, '', 0
+                )
+            assert all_files.call_count == 1
+
+            self._run_command(
+                [*command, 'b2://my-bucket', temp_dir],
+                '',
+                'ERROR: several destinations can only be used to sync a local folder to B2\n',
+                1,
+            )
+            self._run_command(
+                [*command, '--watch', 'b2://my-bucket', 'b2://your-bucket'],
+                '',
+                'ERROR: --watch cannot be used with several destinations\n',
+                1,
+            )
+
+    def test_sync_watch(self):
+        self._authorize_account()
+        self._create_my_bucket()
+        bucket = self.b2_api.get_bucket_by_name('my-bucket')
+
+        with TempDir() as temp_dir:
+            self._make_local_file(temp_dir, 'a.txt')
+            self._make_local_file(temp_dir, 'b.txt')
+
+            def batches(watcher, debounce, full_sync_interval):
+                assert (debounce, full_sync_interval) == (0.5, 3600)
+                os.remove(os.path.join(temp_dir, 'a.txt'))
+                self._make_local_file(temp_dir, 'c.txt')
+                yield Changes({'a.txt', 'c.txt'})
+                # a file of the destination is only seen by a full sync
+                bucket.upload_bytes(b'other', 'dir/d.txt')
+                yield Changes(full_sync=True)
+
+            command = [
+                'sync',
+                '--no-progress',
+                '--threads',
+                '1',
+                '--delete',
+                '--watch',
+                '--watch-debounce',
+                '0.5',
+                temp_dir,
+                'b2://my-bucket/dir',
+            ]
+            expected_stdout = """
+            upload a.txt
+            upload b.txt
+            delete a.txt
+            upload c.txt
+            delete d.txt
+            """
+            with mock.patch('b2._internal.console_tool.iter_batches', batches):
+                self._run_command(command, expected_stdout, '', 0)
+            file_names = [file_version.file_name for file_version, _ in bucket.ls('dir')]
+            assert file_names == ['dir/b.txt', 'dir/c.txt']
+
+            self._run_command(
+                ['sync', '--watch', 'b2://my-bucket', temp_dir],
+                '',
+                'ERROR: --watch can only be used to sync a local folder to B2\n',
+                1,
+            )
+
     def test_sync_empty_folder_when_not_enabled(self):
         self._authorize_account()
         self._create_my_bucket()